@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Concurrency benchmark: sync client on worker threads vs AsyncPoznoteClient.
+
+Before the async client, every MCP tool was a sync function and FastMCP ran it
+through anyio's worker-thread pool (40 threads by default). This script
+replays that setup against a simulated Poznote API and compares it with
+awaiting AsyncPoznoteClient directly, reporting the peak number of requests
+in flight upstream and the latency distribution seen by the callers.
+
+No Poznote instance is needed: the API is an httpx.MockTransport that answers
+after a fixed delay, standing in for PHP-FPM.
+
+Usage:
+    python benchmarks/bench_async_tools.py --agents 100 --calls 5 --latency-ms 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+
+import anyio
+import httpx
+
+from poznote_mcp.client import AsyncPoznoteClient, PoznoteClient
+
+BASE_URL = "http://poznote.test/api/v1"
+NOTE_PAYLOAD = {
+    "success": True,
+    "note": {"id": 1, "heading": "Benchmark", "content": "<p>" + "x" * 2000 + "</p>"},
+}
+
+
+class InFlight:
+    """Thread-safe counter of concurrent upstream requests"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.current = 0
+        self.peak = 0
+
+    def __enter__(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self.current -= 1
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_sync_in_threads(agents: int, calls: int, latency: float) -> tuple[list[float], int]:
+    in_flight = InFlight()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        with in_flight:
+            time.sleep(latency)
+        return httpx.Response(200, json=NOTE_PAYLOAD)
+
+    client = PoznoteClient(base_url=BASE_URL, service_token="bench")
+    client.client = httpx.Client(
+        base_url=BASE_URL, headers=client._base_headers, transport=httpx.MockTransport(handler),
+    )
+    samples: list[float] = []
+
+    async def agent(first_id: int):
+        # Distinct note ids, so request coalescing does not hide the concurrency.
+        for note_id in range(first_id, first_id + calls):
+            start = time.perf_counter()
+            # This is what FastMCP does with a sync tool function.
+            await anyio.to_thread.run_sync(client.get_note, note_id)
+            samples.append(time.perf_counter() - start)
+
+    try:
+        await asyncio.gather(*(agent(index * calls) for index in range(agents)))
+    finally:
+        client.close()
+    return samples, in_flight.peak
+
+
+async def run_async(agents: int, calls: int, latency: float) -> tuple[list[float], int]:
+    in_flight = InFlight()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        with in_flight:
+            await asyncio.sleep(latency)
+        return httpx.Response(200, json=NOTE_PAYLOAD)
+
+    client = AsyncPoznoteClient(base_url=BASE_URL, service_token="bench")
+    client.client = httpx.AsyncClient(
+        base_url=BASE_URL, headers=client._base_headers, transport=httpx.MockTransport(handler),
+    )
+    samples: list[float] = []
+
+    async def agent(first_id: int):
+        for note_id in range(first_id, first_id + calls):
+            start = time.perf_counter()
+            await client.get_note(note_id)
+            samples.append(time.perf_counter() - start)
+
+    try:
+        await asyncio.gather(*(agent(index * calls) for index in range(agents)))
+    finally:
+        await client.aclose()
+    return samples, in_flight.peak
+
+
+def _report(label: str, samples: list[float], peak: int, wall: float) -> None:
+    print(
+        f"{label:<26} peak in-flight {peak:>4}   "
+        f"p50 {statistics.median(samples) * 1000:8.1f} ms   "
+        f"p99 {_percentile(samples, 99) * 1000:8.1f} ms   "
+        f"{len(samples) / wall:8.0f} calls/s"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--agents", type=int, default=100, help="Concurrent tool callers (default: 100)")
+    parser.add_argument("--calls", type=int, default=5, help="Calls per agent (default: 5)")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Simulated API latency (default: 50)")
+    args = parser.parse_args()
+    latency = args.latency_ms / 1000
+
+    print(f"{args.agents} agents x {args.calls} get_note calls, {args.latency_ms:.0f} ms simulated API latency\n")
+
+    start = time.perf_counter()
+    samples, peak = await run_sync_in_threads(args.agents, args.calls, latency)
+    _report("before: sync + threads", samples, peak, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    samples, peak = await run_async(args.agents, args.calls, latency)
+    _report("after: AsyncPoznoteClient", samples, peak, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
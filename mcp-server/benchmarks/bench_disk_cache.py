@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Restart benchmark: time to the first warm responses with and without the disk cache.
+
+A first client plays an agent session (workspaces, folders and tags, then a
+set of notes) and is closed, like a container being redeployed. A second
+client, built from scratch, then replays the same session. Without the disk
+cache it starts cold; with POZNOTE_DISK_CACHE it finds the lists and the note
+bodies of the first run on disk.
+
+Reported per run: time to the first tool response, time until the whole
+session was served once, and the bytes the API had to send.
+
+No Poznote instance is needed: the API is an httpx.MockTransport that answers
+after a fixed delay plus transfer time, with weak body ETags and 304s like
+src/api/v1/index.php. A 304 is charged the same server time as a 200, since
+PHP still builds the body to compare its ETag.
+
+Usage:
+    python benchmarks/bench_disk_cache.py --notes 200 --note-kb 20 --latency-ms 30
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from poznote_mcp.client import AsyncPoznoteClient
+
+BASE_URL = "http://poznote.test/api/v1"
+
+
+class SimulatedApi:
+    def __init__(self, notes: int, note_kb: int, latency: float, bandwidth: float):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.bytes_sent = 0
+        content = "<p>" + "lorem ipsum " * (note_kb * 1024 // 12) + "</p>"
+        self.bodies = {
+            "/workspaces": {"success": True, "workspaces": [{"name": "Poznote"}, {"name": "Work"}]},
+            "/folders": {"success": True, "folders": [{"id": i, "name": f"Folder {i}"} for i in range(60)]},
+            "/tags": {"success": True, "tags": [f"tag{i}" for i in range(300)]},
+        }
+        for note_id in range(1, notes + 1):
+            self.bodies[f"/notes/{note_id}"] = {
+                "success": True,
+                "note": {"id": note_id, "heading": f"Note {note_id}", "content": content, "version": str(note_id)},
+            }
+        self.bodies = {path: json.dumps(body).encode() for path, body in self.bodies.items()}
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = self.bodies[request.url.path.removeprefix("/api/v1")]
+        tag = 'W/"' + hashlib.md5(body).hexdigest() + '"'
+        if tag in request.headers.get("If-None-Match", ""):
+            await asyncio.sleep(self.latency)
+            return httpx.Response(304, headers={"ETag": tag})
+        await asyncio.sleep(self.latency + len(body) / self.bandwidth)
+        self.bytes_sent += len(body)
+        return httpx.Response(200, content=body, headers={"ETag": tag, "Content-Type": "application/json"})
+
+
+def _client(api: SimulatedApi, disk_cache: str | None) -> AsyncPoznoteClient:
+    client = AsyncPoznoteClient(base_url=BASE_URL, service_token="bench", disk_cache_path=disk_cache)
+    client.client = httpx.AsyncClient(base_url=BASE_URL, headers=client._base_headers, transport=httpx.MockTransport(api))
+    return client
+
+
+async def session(client: AsyncPoznoteClient, notes: int) -> float:
+    """Run the agent session; returns the time to its first response"""
+    start = time.perf_counter()
+    await client.list_workspaces()
+    first = time.perf_counter() - start
+    await asyncio.gather(client.list_folders(), client.list_tags())
+    for note_id in range(1, notes + 1):
+        await client.get_note(note_id)
+    return first
+
+
+async def run(args, disk_cache: str | None) -> tuple[float, float, int]:
+    api = SimulatedApi(args.notes, args.note_kb, args.latency_ms / 1000, args.bandwidth_mb * 1e6)
+    before = _client(api, disk_cache)
+    await session(before, args.notes)
+    await before.aclose()
+
+    api.bytes_sent = 0
+    restarted = _client(api, disk_cache)
+    start = time.perf_counter()
+    first = await session(restarted, args.notes)
+    total = time.perf_counter() - start
+    await restarted.aclose()
+    return first, total, api.bytes_sent
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=200, help="Notes read in the session (default: 200)")
+    parser.add_argument("--note-kb", type=int, default=20, help="Size of one note body in KB (default: 20)")
+    parser.add_argument("--latency-ms", type=float, default=30, help="API processing time per request (default: 30)")
+    parser.add_argument("--bandwidth-mb", type=float, default=50, help="API to MCP transfer rate in MB/s (default: 50)")
+    args = parser.parse_args()
+
+    print(f"Session after a restart: 3 lists + {args.notes} notes of {args.note_kb} KB, "
+          f"{args.latency_ms:g} ms per request, {args.bandwidth_mb:g} MB/s\n")
+    print(f"{'':<16}{'first response':>16}{'whole session':>16}{'API bytes':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        for label, disk_cache in (("no disk cache", None), ("disk cache", str(Path(directory) / "cache.sqlite"))):
+            first, total, sent = await run(args, disk_cache)
+            print(f"{label:<16}{first * 1000:>13.1f} ms{total:>14.2f} s{sent / 1e6:>11.1f} MB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
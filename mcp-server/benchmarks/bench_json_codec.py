@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Micro-benchmark of the JSON codecs on realistic Poznote payloads.
+
+Times the two JSON hot spots of a tool call for every installed backend:
+decoding API responses (a /notes listing and a search result with note
+bodies) and encoding tool results, both indented (the default) and compact.
+
+Usage:
+    python benchmarks/bench_json_codec.py --notes 5000 --repeat 20
+"""
+
+import argparse
+import importlib.util
+import json
+import timeit
+
+from poznote_mcp import codec
+
+BACKENDS = ("stdlib", "orjson", "msgspec")
+
+
+def _listing(count: int) -> dict:
+    return {
+        "success": True,
+        "notes": [
+            {
+                "id": i,
+                "heading": f"Réunion projet {i}",
+                "tags": "work,project,2026",
+                "folder": f"Folder {i % 40}",
+                "folder_id": i % 40,
+                "workspace": "Poznote",
+                "updated": "2026-01-02 03:04:05",
+                "created": "2025-01-02 03:04:05",
+                "favorite": i % 7 == 0,
+                "type": "note",
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def _search(count: int) -> dict:
+    body = "<p>" + "Lorem ipsum dolor sit amet, café crème brûlée. " * 80 + "</p>"
+    return {
+        "success": True,
+        "notes": [
+            {"id": i, "heading": f"Note {i}", "content": body, "tags": "a,b", "updated": "2026-01-02 03:04:05"}
+            for i in range(count)
+        ],
+    }
+
+
+def _tool_result(listing: dict) -> dict:
+    notes = [
+        {"id": note["id"], "title": note["heading"], "tags": note["tags"], "folder": note["folder"]}
+        for note in listing["notes"]
+    ]
+    return {"count": len(notes), "notes": notes}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=5000, help="Notes in the listing payload (default: 5000)")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per measurement (default: 20)")
+    args = parser.parse_args()
+
+    listing_bytes = json.dumps(_listing(args.notes)).encode()
+    search_bytes = json.dumps(_search(100)).encode()
+    result = _tool_result(_listing(args.notes))
+    cases = [
+        ("decode /notes", lambda: codec.loads(listing_bytes)),
+        ("decode /notes/search", lambda: codec.loads(search_bytes)),
+        ("encode result, indented", lambda: codec.dumps(result)),
+        ("encode result, compact", lambda: codec.dumps(result, compact=True)),
+    ]
+
+    print(f"{args.notes} listed notes ({len(listing_bytes) / 1e6:.1f} MB), "
+          f"100 search hits ({len(search_bytes) / 1e6:.1f} MB), best of {args.repeat} runs\n")
+    installed = [name for name in BACKENDS if name == "stdlib" or importlib.util.find_spec(name)]
+    print(f"{'':<26}" + "".join(f"{name:>12}" for name in installed))
+    for label, call in cases:
+        timings = []
+        for name in installed:
+            codec.use(name)
+            timings.append(min(timeit.repeat(call, number=1, repeat=args.repeat)))
+        print(f"{label:<26}" + "".join(f"{seconds * 1000:>9.2f} ms" for seconds in timings))
+
+
+if __name__ == "__main__":
+    main()
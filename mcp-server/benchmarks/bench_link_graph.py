@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Link graph benchmark: multi-hop traversals among many linked notes.
+
+Builds the graph behind traverse_links from N synthetic notes, each linking
+to a few others with data-note-id, ?note= and [[wiki]] links. Link targets
+are drawn with a Zipf distribution, so a few hub notes have thousands of
+backlinks, like an index or a home note would.
+
+Reported: the time to read every note's links, to take one edited note
+again, and the latency of 3-hop traversals in each direction with the
+default fan-out, next to the notes they return.
+
+Usage:
+    python benchmarks/bench_link_graph.py --notes 100000 --queries 1000
+"""
+
+import argparse
+import random
+import time
+
+from poznote_mcp.linkgraph import LinkGraph
+
+
+def _content(note_id: int, count: int, links: int, weights: list[float], rng: random.Random) -> str:
+    parts = [f"<p>Note {note_id}</p>"]
+    for target in rng.choices(range(1, count + 1), weights, k=rng.randint(0, links * 2)):
+        kind = rng.random()
+        if kind < 0.6:
+            parts.append(f'<a data-note-id="{target}">link</a>')
+        elif kind < 0.9:
+            parts.append(f'<a href="index.php?note={target}">link</a>')
+        else:
+            parts.append(f"[[Note {target}]]")
+    return " ".join(parts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=100000, help="Notes to link (default: 100000)")
+    parser.add_argument("--links", type=int, default=4, help="Average links per note (default: 4)")
+    parser.add_argument("--queries", type=int, default=1000, help="Traversals per direction (default: 1000)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    weights = [1 / rank ** 0.8 for rank in range(1, args.notes + 1)]
+    notes = [
+        {"id": note_id, "heading": f"Note {note_id}", "workspace": "Poznote",
+         "content": _content(note_id, args.notes, args.links, weights, rng)}
+        for note_id in range(1, args.notes + 1)
+    ]
+    graph = LinkGraph()
+    start = time.perf_counter()
+    for note in notes:
+        graph.add("1", note)
+    graph.mark_ready("1")
+    built = time.perf_counter() - start
+
+    edited = rng.sample(notes, 100)
+    start = time.perf_counter()
+    for note in edited:
+        graph.add("1", {**note, "content": _content(note["id"], args.notes, args.links, weights, rng)})
+    edit = (time.perf_counter() - start) / len(edited)
+
+    stats = graph.stats()
+    print(f"{args.notes} notes, {stats['links']} links\n")
+    print(f"read every note        {built:8.2f} s")
+    print(f"one edited note        {edit * 1000:8.3f} ms")
+    for direction in ("out", "in", "both"):
+        timings, reached = [], 0
+        for note in rng.sample(notes, args.queries):
+            start = time.perf_counter()
+            _, nodes, _, _ = graph.traverse("1", note["id"], direction, depth=3)
+            timings.append(time.perf_counter() - start)
+            reached += len(nodes)
+        timings.sort()
+        p50 = timings[len(timings) // 2] * 1000
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000
+        print(f"3 hops {direction:<5} p50 {p50:6.2f} ms  p99 {p99:6.2f} ms  {reached / len(timings):6.0f} notes")
+
+
+if __name__ == "__main__":
+    main()
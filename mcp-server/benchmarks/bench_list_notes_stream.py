@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Memory and latency of list_notes(limit=...) with a full vs streaming decode.
+
+Before the streaming path, list_notes decoded the whole /notes payload and
+the tool sliced it to `limit` afterwards. This script serves a synthetic
+/notes response of N notes and compares that with the incremental decoder,
+which stops reading once `limit` notes arrived. Peak memory is measured
+with tracemalloc and excludes the body itself, which the fake API holds.
+
+Usage:
+    python benchmarks/bench_list_notes_stream.py --notes 80000 --limit 50
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+import httpx
+
+from poznote_mcp.client import AsyncPoznoteClient
+
+BASE_URL = "http://poznote.test/api/v1"
+CHUNK_SIZE = 64 * 1024
+
+
+def _body(count: int) -> bytes:
+    notes = [
+        {
+            "id": i,
+            "heading": f"Note {i}",
+            "tags": "work,project",
+            "folder": f"Folder {i % 40}",
+            "folder_id": i % 40,
+            "workspace": "Poznote",
+            "updated": "2026-01-02 03:04:05",
+            "created": "2025-01-02 03:04:05",
+            "favorite": 0,
+            "type": "note",
+        }
+        for i in range(count)
+    ]
+    return json.dumps({"success": True, "notes": notes}).encode()
+
+
+async def _measure(body: bytes, limit: int | None) -> tuple[float, float, int]:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        async def stream():
+            view = memoryview(body)
+            for start in range(0, len(body), CHUNK_SIZE):
+                yield bytes(view[start:start + CHUNK_SIZE])
+
+        return httpx.Response(200, content=stream())
+
+    client = AsyncPoznoteClient(base_url=BASE_URL, service_token="bench")
+    client.client = httpx.AsyncClient(
+        base_url=BASE_URL, headers=client._base_headers, transport=httpx.MockTransport(handler),
+    )
+    try:
+        tracemalloc.start()
+        start = time.perf_counter()
+        notes = await client.list_notes(limit=limit)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        await client.aclose()
+    return elapsed, peak, len(notes)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=80000, help="Notes in the /notes response (default: 80000)")
+    parser.add_argument("--limit", type=int, default=50, help="Notes requested (default: 50)")
+    args = parser.parse_args()
+
+    body = _body(args.notes)
+    print(f"/notes with {args.notes} notes ({len(body) / 1e6:.1f} MB), limit {args.limit}\n")
+
+    for label, limit in (("before: full decode", None), ("after: streaming decode", args.limit)):
+        elapsed, peak, count = await _measure(body, limit)
+        print(f"{label:<24} {elapsed * 1000:8.1f} ms   peak {peak / 1e6:7.1f} MB   decoded {count} notes")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
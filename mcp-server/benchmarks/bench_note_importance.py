@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Note importance benchmark: PageRank and components of a large link graph.
+
+Builds the link graph behind note_importance from N synthetic notes with M
+links in total, drawn with a Zipf distribution so that a few hub notes have
+most of the backlinks, then computes PageRank, degrees and connected
+components from it, once from scratch and once more after one link changed.
+
+Reported: the time to read the links into the graph, to compute the
+figures, to answer again while the graph is unchanged, and the PageRank
+iterations it took.
+
+Usage:
+    python benchmarks/bench_note_importance.py --notes 100000 --links 1000000
+"""
+
+import argparse
+import itertools
+import random
+import time
+
+from poznote_mcp.importance import ImportanceCache
+from poznote_mcp.linkgraph import LinkGraph
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=100000, help="Notes (default: 100000)")
+    parser.add_argument("--links", type=int, default=1000000, help="Links in total (default: 1000000)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cumulative = list(itertools.accumulate(1 / rank ** 0.8 for rank in range(1, args.notes + 1)))
+    targets = rng.choices(range(1, args.notes + 1), cum_weights=cumulative, k=args.links)
+    sources = sorted(rng.choices(range(1, args.notes + 1), k=args.links))
+    outgoing: dict[int, list[int]] = {note_id: [] for note_id in range(1, args.notes + 1)}
+    for source, target in zip(sources, targets):
+        outgoing[source].append(target)
+
+    graph = LinkGraph()
+    start = time.perf_counter()
+    for note_id, links in outgoing.items():
+        content = "".join(f'<a data-note-id="{target}">x</a>' for target in links)
+        graph.add("1", {"id": note_id, "heading": f"Note {note_id}", "workspace": "Poznote", "content": content})
+    graph.mark_ready("1")
+    built = time.perf_counter() - start
+
+    cache = ImportanceCache()
+    start = time.perf_counter()
+    importance = cache.get(graph, "1")
+    computed = time.perf_counter() - start
+    start = time.perf_counter()
+    cache.get(graph, "1")
+    cached = time.perf_counter() - start
+    graph.add("1", {"id": 1, "heading": "Note 1", "workspace": "Poznote", "content": '<a data-note-id="2">x</a>'})
+    start = time.perf_counter()
+    cache.get(graph, "1")
+    recomputed = time.perf_counter() - start
+
+    summary = importance.summary()
+    print(f"{summary['notes']} notes, {summary['links']} links, {summary['components']} components\n")
+    print(f"read the links         {built:8.2f} s")
+    print(f"compute                {computed:8.2f} s  ({summary['iterations']} PageRank iterations)")
+    print(f"unchanged graph        {cached * 1000:8.3f} ms")
+    print(f"after one link         {recomputed:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Related notes benchmark: top-k similar notes among many, with NumPy.
+
+Indexes N synthetic notes into the hashed TF-IDF matrix behind related_notes,
+then asks for the notes related to random ones. Each note is about one of
+`--topics` topics: most of its words come from that topic's own vocabulary,
+the rest from words every topic uses, so a good answer is mostly notes of
+the same topic.
+
+Reported: the time to index every note (including the IDF reweighting as
+the index grows), query latency percentiles, the share of the top 10 that is
+on the note's topic, and the time a restarted server takes to answer from
+the memory-mapped files.
+
+Usage:
+    python benchmarks/bench_related_notes.py --notes 100000 --dimensions 256
+"""
+
+import argparse
+import random
+import string
+import tempfile
+import time
+
+from poznote_mcp.relatedindex import RelatedIndex
+
+
+def _words(count: int, rng: random.Random) -> list[str]:
+    return ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10))) for _ in range(count)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=100000, help="Notes to index (default: 100000)")
+    parser.add_argument("--words", type=int, default=150, help="Words per note (default: 150)")
+    parser.add_argument("--topics", type=int, default=500, help="Topics the notes are about (default: 500)")
+    parser.add_argument("--dimensions", type=int, default=256, help="Vector size (default: 256)")
+    parser.add_argument("--queries", type=int, default=500, help="Queries to time (default: 500)")
+    parser.add_argument("--directory", help="Keep the matrix in memory-mapped files there (default: a temporary one)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    common = _words(2000, rng)
+    topics = [_words(40, rng) for _ in range(args.topics)]
+    directory = args.directory or tempfile.mkdtemp(prefix="poznote-related-")
+    index = RelatedIndex(dimensions=args.dimensions, directory=directory)
+
+    topic_of = {}
+    notes = []
+    own = args.words // 3
+    for note_id in range(1, args.notes + 1):
+        topic = topic_of[note_id] = rng.randrange(args.topics)
+        words = rng.choices(topics[topic], k=own) + rng.choices(common, k=args.words - own)
+        rng.shuffle(words)
+        notes.append({"id": note_id, "heading": " ".join(words[:4]), "content": " ".join(words[4:]), "workspace": "Poznote"})
+
+    start = time.perf_counter()
+    for note in notes:
+        index.add("1", note)
+    index.mark_ready("1")
+    built = time.perf_counter() - start
+
+    timings = []
+    on_topic = 0
+    targets = rng.sample(range(1, args.notes + 1), args.queries)
+    for note_id in targets:
+        start = time.perf_counter()
+        _, related = index.related("1", note_id, 10)
+        timings.append(time.perf_counter() - start)
+        on_topic += sum(topic_of[item["id"]] == topic_of[note_id] for item in related)
+    timings.sort()
+
+    start = time.perf_counter()
+    restarted = RelatedIndex(dimensions=args.dimensions, directory=directory)
+    restarted.related("1", targets[0], 10)
+    reloaded = time.perf_counter() - start
+
+    def percentile(share: float) -> float:
+        return timings[min(len(timings) - 1, int(len(timings) * share))] * 1000
+
+    stats = index.stats()
+    print(f"{args.notes} notes of {args.words} words, {args.dimensions} dimensions, "
+          f"{stats['bytes'] / 1e6:.0f} MB in {directory}\n")
+    print(f"index every note       {built:8.2f} s ({stats['reweights']} reweights)")
+    print(f"query p50              {percentile(0.5):8.2f} ms")
+    print(f"query p90              {percentile(0.9):8.2f} ms")
+    print(f"query p99              {percentile(0.99):8.2f} ms")
+    print(f"top 10 on topic        {on_topic / (10 * len(targets)):8.1%}")
+    print(f"restart, first answer  {reloaded:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
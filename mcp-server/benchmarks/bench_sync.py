@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Sync benchmark: requests and bytes to keep a local copy of every note current.
+
+The naive way, and the only one before sync_notes(), is GET /notes and then
+GET /notes/{id} for every note. The sync does that once (with concurrent
+body fetches), then only compares GET /notes, the metadata of the notes,
+and fetches the notes that did change.
+
+Reported: the first full sync, a steady-state sync with no change, and one
+after `--changed` notes were edited, each with its requests, API bytes and
+duration, next to one naive refresh.
+
+No Poznote instance is needed: the API is an httpx.MockTransport that answers
+after a fixed delay plus transfer time, with weak body ETags and 304s on
+the notes (not on their listing) like src/api/v1/index.php.
+
+Usage:
+    python benchmarks/bench_sync.py --notes 50000 --changed 20 --latency-ms 2
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+
+import httpx
+
+from poznote_mcp.client import AsyncPoznoteClient
+from poznote_mcp.views import NoteViews
+
+BASE_URL = "http://poznote.test/api/v1"
+
+
+class SimulatedApi:
+    def __init__(self, notes: int, note_kb: int, latency: float, bandwidth: float):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.requests = 0
+        self.bytes_sent = 0
+        self.content = "<p>" + "lorem ipsum " * (note_kb * 1024 // 12) + "</p>"
+        self.notes = {
+            note_id: {"id": note_id, "heading": f"Note {note_id}", "tags": "", "folder_id": note_id % 50,
+                      "workspace": "Poznote", "updated": "2026-03-01 10:00:00"}
+            for note_id in range(1, notes + 1)
+        }
+        self._listing = None
+
+    def edit(self, count: int) -> None:
+        for note_id in range(1, count + 1):
+            self.notes[note_id]["updated"] = "2026-03-02 10:00:00"
+        self._listing = None
+
+    def _body(self, path: str) -> bytes:
+        if path == "/notes":
+            if self._listing is None:
+                self._listing = json.dumps({"success": True, "notes": list(self.notes.values())}).encode()
+            return self._listing
+        note = self.notes[int(path.rsplit("/", 1)[-1])]
+        return json.dumps({"success": True, "note": {**note, "content": self.content}}).encode()
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        path = request.url.path.removeprefix("/api/v1")
+        body = self._body(path)
+        if path == "/notes":
+            await asyncio.sleep(self.latency + len(body) / self.bandwidth)
+            self.bytes_sent += len(body)
+            return httpx.Response(200, content=body, headers={"Content-Type": "application/json"})
+        tag = 'W/"' + hashlib.md5(body).hexdigest() + '"'
+        if tag in request.headers.get("If-None-Match", ""):
+            await asyncio.sleep(self.latency)
+            return httpx.Response(304, headers={"ETag": tag})
+        await asyncio.sleep(self.latency + len(body) / self.bandwidth)
+        self.bytes_sent += len(body)
+        return httpx.Response(200, content=body, headers={"ETag": tag, "Content-Type": "application/json"})
+
+
+async def measure(api: SimulatedApi, work) -> tuple[int, int, float]:
+    api.requests = api.bytes_sent = 0
+    start = time.perf_counter()
+    await work()
+    return api.requests, api.bytes_sent, time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=50000, help="Notes of the user (default: 50000)")
+    parser.add_argument("--note-kb", type=int, default=2, help="Size of one note body in KB (default: 2)")
+    parser.add_argument("--changed", type=int, default=20, help="Notes edited between syncs (default: 20)")
+    parser.add_argument("--latency-ms", type=float, default=2, help="API processing time per request (default: 2)")
+    parser.add_argument("--bandwidth-mb", type=float, default=200, help="API to MCP transfer rate in MB/s (default: 200)")
+    args = parser.parse_args()
+
+    api = SimulatedApi(args.notes, args.note_kb, args.latency_ms / 1000, args.bandwidth_mb * 1e6)
+    client = AsyncPoznoteClient(base_url=BASE_URL, service_token="bench", http_cache_mb=256)
+    client.client = httpx.AsyncClient(base_url=BASE_URL, headers=client._base_headers, transport=httpx.MockTransport(api))
+    views = client.views = NoteViews(client, search_index=False)
+
+    async def naive():
+        notes = await client.list_notes()
+        semaphore = asyncio.Semaphore(views.note_sync.concurrency)
+
+        async def fetch(note_id):
+            async with semaphore:
+                await client.fetch_note(note_id)
+
+        await asyncio.gather(*(fetch(note["id"]) for note in notes))
+
+    print(f"{args.notes} notes of {args.note_kb} KB, {args.latency_ms:g} ms per request, "
+          f"{views.note_sync.concurrency} concurrent fetches\n")
+    print(f"{'':<26}{'requests':>10}{'API bytes':>14}{'time':>10}")
+    rows = [("full sync", lambda: views.sync_notes()), ("sync, nothing changed", lambda: views.sync_notes())]
+    for label, work in rows:
+        requests, sent, seconds = await measure(api, work)
+        print(f"{label:<26}{requests:>10}{sent / 1e6:>11.1f} MB{seconds:>9.2f}s")
+    api.edit(args.changed)
+    requests, sent, seconds = await measure(api, lambda: views.sync_notes())
+    print(f"{f'sync, {args.changed} notes edited':<26}{requests:>10}{sent / 1e6:>11.1f} MB{seconds:>9.2f}s")
+    requests, sent, seconds = await measure(api, naive)
+    print(f"{'naive list + get all':<26}{requests:>10}{sent / 1e6:>11.1f} MB{seconds:>9.2f}s")
+    print(f"\nsync stats: {views.sync_stats()['notes_per_second']} notes/s over all passes")
+    await client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
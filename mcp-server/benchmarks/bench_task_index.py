@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Task index benchmark: query_tasks over tens of thousands of tasks.
+
+Builds the task index behind query_tasks from a synthetic GET /tasks
+response with N tasks spread over tasklist notes in a few workspaces, a
+third of them done, one in ten important, and most due within a year.
+
+Reported: the time to load the response, to answer a few typical queries
+(the open tasks due in a week, the important ones of a workspace, every open
+task with only the first page returned), and to move one task after a write.
+
+Usage:
+    python benchmarks/bench_task_index.py --tasks 50000 --notes 2000
+"""
+
+import argparse
+import datetime
+import random
+import statistics
+import time
+
+from poznote_mcp.taskindex import TaskIndex
+
+
+def _timed(function, repeat: int) -> tuple[float, object]:
+    timings, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=50000, help="Tasks (default: 50000)")
+    parser.add_argument("--notes", type=int, default=2000, help="Tasklist notes (default: 2000)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    start_day = datetime.date(2026, 1, 1)
+    notes = [
+        {"id": note_id, "heading": f"List {note_id}", "folder": f"Folder {note_id % 50}", "folder_id": note_id % 50,
+         "workspace": f"Workspace {note_id % 4}", "tasks": []}
+        for note_id in range(1, args.notes + 1)
+    ]
+    for task_id in range(args.tasks):
+        due = None
+        if rng.random() < 0.8:
+            due = (start_day + datetime.timedelta(days=rng.randrange(365))).isoformat()
+            if rng.random() < 0.3:
+                due += f"T{rng.randrange(24):02d}:{rng.choice((0, 15, 30, 45)):02d}"
+        rng.choice(notes)["tasks"].append({
+            "id": task_id, "text": f"Task {task_id}", "completed": rng.random() < 0.33,
+            "important": rng.random() < 0.1, "dueAt": due, "dueReminder": due is not None,
+        })
+
+    index = TaskIndex()
+    start = time.perf_counter()
+    index.load("1", notes)
+    loaded = time.perf_counter() - start
+
+    queries = {
+        "open, due in a week": lambda: index.query("1", completed=False, due_from="2026-06-01", due_to="2026-06-07"),
+        "important of a workspace": lambda: index.query("1", completed=False, important=True, workspace="Workspace 2", sort="important"),
+        "all open, first page": lambda: index.query("1", completed=False),
+    }
+    print(f"{args.tasks} tasks in {args.notes} notes\n")
+    print(f"load                       {loaded * 1000:8.1f} ms")
+    for name, query in queries.items():
+        seconds, result = _timed(query, args.repeat)
+        print(f"{name:<26} {seconds * 1000:8.3f} ms  ({result['total']} tasks)")
+
+    moved = next(note["id"] for note in notes if any(task["id"] == 7 for task in note["tasks"]))
+
+    def move():
+        task = {"id": 7, "text": "Task 7", "completed": False, "important": True, "dueAt": f"2026-0{rng.randrange(1, 10)}-15"}
+        index.put_task("1", moved, task)
+
+    seconds, _ = _timed(move, args.repeat)
+    print(f"one task written           {seconds * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Title index benchmark: fuzzy title lookups among many notes.
+
+Builds the index behind find_notes_by_title from N synthetic titles, then
+looks up titles of existing notes with one letter changed, as an agent that
+remembers a title approximately would. Titles are 2 to 6 words drawn with a
+Zipf distribution from a random vocabulary, so a few words appear in a third
+of the titles, like "notes" or a year would.
+
+Reported: the time to index the titles, to index the same list again (an
+unchanged GET /notes answered from the HTTP cache), lookup latency
+percentiles and how often the note the query was made from ranks first.
+
+Usage:
+    python benchmarks/bench_title_index.py --notes 100000 --queries 1000
+"""
+
+import argparse
+import random
+import string
+import time
+
+from poznote_mcp.titleindex import TitleIndex
+
+
+def _titles(count: int, vocabulary: int, rng: random.Random) -> list[str]:
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))) for _ in range(vocabulary)]
+    weights = [1 / rank for rank in range(1, vocabulary + 1)]
+    return [" ".join(rng.choices(words, weights, k=rng.randint(2, 6))).capitalize() for _ in range(count)]
+
+
+def _typo(title: str, rng: random.Random) -> str:
+    position = rng.randrange(len(title))
+    return title[:position] + rng.choice(string.ascii_lowercase) + title[position + 1:]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=100000, help="Titles to index (default: 100000)")
+    parser.add_argument("--vocabulary", type=int, default=20000, help="Distinct words (default: 20000)")
+    parser.add_argument("--queries", type=int, default=1000, help="Lookups to time (default: 1000)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    notes = [
+        {"id": note_id, "heading": heading, "workspace": "Poznote", "updated": "2026-03-01 10:00:00"}
+        for note_id, heading in enumerate(_titles(args.notes, args.vocabulary, rng), 1)
+    ]
+    index = TitleIndex()
+    start = time.perf_counter()
+    index.add_notes("1", notes, complete=True)
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    index.add_notes("1", notes, complete=True)
+    relisted = time.perf_counter() - start
+
+    targets = rng.sample(notes, args.queries)
+    timings = []
+    first = 0
+    for note in targets:
+        query = _typo(note["heading"], rng)
+        start = time.perf_counter()
+        found, _ = index.find("1", query)
+        timings.append(time.perf_counter() - start)
+        first += bool(found) and found[0]["id"] == note["id"]
+    timings.sort()
+
+    def percentile(share: float) -> float:
+        return timings[min(len(timings) - 1, int(len(timings) * share))] * 1000
+
+    stats = index.stats()
+    print(f"{args.notes} titles, {stats['words']} distinct words\n")
+    print(f"index every title      {built:8.2f} s")
+    print(f"same list again        {relisted:8.2f} s")
+    print(f"lookup p50             {percentile(0.5):8.3f} ms")
+    print(f"lookup p90             {percentile(0.9):8.3f} ms")
+    print(f"lookup p99             {percentile(0.99):8.3f} ms")
+    print(f"typo'd title first     {first / len(targets):8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Upcoming reminders benchmark: a 90-day calendar of recurring reminders.
+
+Makes N synthetic reminders, first set at random times over the last two
+years, most of them recurring every few minutes, hours, days, weeks, months
+or years, and lists their occurrences over the next D days in the user's
+timezone, like upcoming_reminders does.
+
+Reported: the time to expand and merge the occurrences, with the default
+limit of 100 and with a limit of 1000.
+
+Usage:
+    python benchmarks/bench_upcoming_reminders.py --reminders 5000 --days 90
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from poznote_mcp.reminders import Reminder, upcoming, window
+
+RECURRENCES = ["30i", "2h", "1d", "3d", "1w", "2w", "1m", "3m", "1y", None]
+# Weights of RECURRENCES: most reminders repeat every few days or weeks.
+WEIGHTS = [1, 1, 10, 5, 15, 10, 15, 5, 5, 10]
+
+
+def _timed(function, repeat: int) -> tuple[float, object]:
+    timings, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reminders", type=int, default=5000, help="Reminders (default: 5000)")
+    parser.add_argument("--days", type=int, default=90, help="Days in the calendar (default: 90)")
+    parser.add_argument("--timezone", default="Europe/Paris")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    start, end = window("2026-03-01", args.days, args.timezone)
+    reminders = [
+        Reminder(
+            rng.choice(("note", "task")), index, start - rng.randrange(2 * 365 * 86400) + 30 * 86400,
+            rng.choices(RECURRENCES, WEIGHTS)[0], f"Note {index}",
+        )
+        for index in range(args.reminders)
+    ]
+
+    print(f"{args.reminders} reminders over {args.days} days\n")
+    for limit in (100, 1000):
+        seconds, result = _timed(lambda: upcoming(reminders, start, end, args.timezone, limit), args.repeat)
+        print(f"limit {limit:<9} {seconds * 1000:8.1f} ms  ({len(result['occurrences'])} of {result['total']} occurrences)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,40 @@
 """
-Poznote API Client - HTTP client for communicating with Poznote REST API
+Poznote API Client - HTTP clients for communicating with Poznote REST API
+
+PoznoteClient is the blocking client, handy for scripts. AsyncPoznoteClient
+exposes the same methods as coroutines on top of httpx.AsyncClient; the MCP
+server uses it so tool calls never tie up a worker thread while waiting on
+the API.
+
+Both clients own the requests and the caches in front of them, and drop
+what a write makes stale. The local views behind the index-backed tools are
+kept by NoteViews (views.py), which an AsyncPoznoteClient feeds with what it
+reads and writes.
 """
 
 import httpx
-from typing import Optional
+import asyncio
+import copy
 import os
 import logging
+import re
+import threading
+import time
+
+from . import codec, deadline
+from .diskcache import METADATA, open_disk_cache
+from .httpcache import ConditionalCache, body_etag
+from .jsonstream import JSONArrayStream
+from .metacache import DEFAULT_MAX_STALE, MISS, STALE, MetadataCache, parse_ttls
+from .notecache import NoteCache
+from .pagination import DEFAULT_WINDOW_TTL, ResultWindows
+from .resilience import (
+    DEFAULT_RETRY_POLICIES,
+    HEAVY_PATH_PREFIXES,
+    CircuitBreaker,
+    endpoint_class,
+    is_upstream_failure,
+)
 
 logger = logging.getLogger("poznote-mcp.client")
 
@@ -14,10 +43,50 @@ DEFAULT_TIMEOUT = 30.0
 # Extended timeout for heavy operations (backup/restore/git sync)
 HEAVY_TIMEOUT = 120.0
 DEFAULT_SERVICE_TOKEN_FILE = "/var/www/html/data/.mcp_token"
-
-
-class PoznoteClient:
-    """Client for Poznote REST API v1"""
+# How often (seconds) the token file's mtime is checked for a rotated token
+TOKEN_CHECK_INTERVAL = 1.0
+# Connection pool defaults (httpx's own defaults). Size max connections to the
+# number of PHP-FPM workers (pm.max_children) that can actually serve them.
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 5.0
+# Circuit breaker: consecutive upstream failures before failing fast, and how
+# long to wait before letting a probe request through.
+DEFAULT_BREAKER_FAILURES = 5
+DEFAULT_BREAKER_RESET_TIMEOUT = 30.0
+# Memory for bodies kept for conditional GETs (see httpcache.py)
+DEFAULT_HTTP_CACHE_MB = 16
+# Read-through cache of get_note results (see notecache.py)
+DEFAULT_NOTE_CACHE_MB = 32
+DEFAULT_NOTE_CACHE_TTL = 30.0
+# Size cap of the optional on-disk cache tier (see diskcache.py)
+DEFAULT_DISK_CACHE_MB = 256
+
+_NOTE_PATH = re.compile(r"^/notes/(\d+)(?:/|$)")
+
+
+def _copy_metadata(value):
+    """Copy of a cached list (or dict of lists) handed to a caller, nested items included"""
+    return copy.deepcopy(value)
+
+
+def _env_number(name: str, default, cast=int):
+    """Read a positive number from the environment, falling back to default."""
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        number = cast(value)
+    except ValueError:
+        number = None
+    if number is None or number <= 0:
+        logger.warning("Invalid %s value %r; expected a positive number. Falling back to %s.", name, value, default)
+        return default
+    return number
+
+
+class _PoznoteClientBase:
+    """Configuration and request helpers shared by the sync and async clients"""
     
     def __init__(
         self,
@@ -26,11 +95,33 @@ class PoznoteClient:
         service_token_file: str | None = None,
         username: str | None = None,
         password: str | None = None,
+        max_connections: int | None = None,
+        max_keepalive_connections: int | None = None,
+        keepalive_expiry: float | None = None,
+        http2: bool | None = None,
+        api_socket: str | None = None,
+        breaker_failures: int | None = None,
+        breaker_reset_timeout: float | None = None,
+        http_cache_mb: float | None = None,
+        note_cache_mb: float | None = None,
+        note_cache_ttl: float | None = None,
+        metadata_ttls: dict[str, float] | None = None,
+        disk_cache_path: str | None = None,
+        disk_cache_mb: float | None = None,
     ):
         # Default includes Poznote's typical dev port (8040). Users can override with POZNOTE_API_URL.
         self.base_url = (base_url or os.getenv("POZNOTE_API_URL", "http://localhost:8040/api/v1")).rstrip("/")
+        # Optional Unix domain socket of a co-located nginx. When set, requests
+        # go through the socket and base_url only provides the Host and path.
+        self.api_socket = self._parse_socket_path(api_socket or os.getenv("POZNOTE_API_SOCKET"))
         self.service_token_file = service_token_file or os.getenv("POZNOTE_SERVICE_TOKEN_FILE", DEFAULT_SERVICE_TOKEN_FILE)
         self.service_token = service_token or self._load_service_token(self.service_token_file)
+        # A token read from the file is reloaded when the file changes (see
+        # refresh_service_token); one passed in explicitly never is.
+        self._token_from_file = not service_token
+        self._token_lock = threading.Lock()
+        self._token_checked_at = time.monotonic()
+        self._token_file_state = self._file_state(self.service_token_file)
         self.password = password or ""
 
         # By default the MCP server operates as the first admin profile.
@@ -40,7 +131,7 @@ class PoznoteClient:
         
         # Configure HTTP client authentication.
         # The preferred production path is the shared Bearer token generated by Poznote.
-        auth = None
+        self._auth = None
         self._base_headers = {
             "Accept": "application/json",
             "Content-Type": "application/json",
@@ -50,19 +141,161 @@ class PoznoteClient:
         if self.service_token:
             self._base_headers["Authorization"] = f"Bearer {self.service_token}"
         elif self.password:
-            auth = httpx.BasicAuth(self.username, self.password)
-        
-        # Transport with automatic retries for transient network errors
-        transport = httpx.HTTPTransport(retries=2)
-        
-        self.client = httpx.Client(
-            base_url=self.base_url,
-            auth=auth,
-            timeout=DEFAULT_TIMEOUT,
-            headers=self._base_headers,
-            transport=transport,
+            self._auth = httpx.BasicAuth(self.username, self.password)
+
+        # Connection pool sizing. Requests beyond max_connections wait for a
+        # free connection (up to the pool timeout), see pool_stats().
+        self.limits = httpx.Limits(
+            max_connections=max_connections or _env_number("POZNOTE_HTTP_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS),
+            max_keepalive_connections=max_keepalive_connections
+            or _env_number("POZNOTE_HTTP_MAX_KEEPALIVE", DEFAULT_MAX_KEEPALIVE_CONNECTIONS),
+            keepalive_expiry=keepalive_expiry
+            or _env_number("POZNOTE_HTTP_KEEPALIVE_EXPIRY", DEFAULT_KEEPALIVE_EXPIRY, float),
+        )
+        self.http2 = http2 if http2 is not None else os.getenv("POZNOTE_HTTP2") == "true"
+        if self.http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning(
+                    "HTTP/2 was requested but the 'h2' package is not installed "
+                    "(pip install 'poznote-mcp-server[http2]'); using HTTP/1.1."
+                )
+                self.http2 = False
+
+        # Single-flight table: identical GETs in flight at the same time share
+        # one upstream request (see _flight_key).
+        self._inflight: dict = {}
+        self._flight_counts = {"upstream": 0, "coalesced": 0}
+
+        # Retries happen here rather than in the transport, with a policy per
+        # endpoint class and a breaker shared by every request (see resilience.py).
+        self.retry_policies = dict(DEFAULT_RETRY_POLICIES)
+        self.breaker = CircuitBreaker(
+            failure_threshold=breaker_failures or _env_number("POZNOTE_BREAKER_FAILURES", DEFAULT_BREAKER_FAILURES),
+            reset_timeout=breaker_reset_timeout
+            or _env_number("POZNOTE_BREAKER_RESET_TIMEOUT", DEFAULT_BREAKER_RESET_TIMEOUT, float),
+        )
+        self._retry_counts = {endpoint: 0 for endpoint in self.retry_policies}
+
+        # Optional SQLite file backing the caches below, so that a restart
+        # starts warm; None unless POZNOTE_DISK_CACHE names a file.
+        disk_cache_mb = disk_cache_mb or _env_number("POZNOTE_DISK_CACHE_MB", DEFAULT_DISK_CACHE_MB, float)
+        self.disk_cache = open_disk_cache(
+            disk_cache_path or os.getenv("POZNOTE_DISK_CACHE"), int(disk_cache_mb * 1024 * 1024)
+        )
+
+        # Validated bodies of frequently re-read endpoints, revalidated with
+        # If-None-Match / If-Modified-Since instead of downloaded again.
+        cache_mb = http_cache_mb or _env_number("POZNOTE_HTTP_CACHE_MB", DEFAULT_HTTP_CACHE_MB, float)
+        self.http_cache = ConditionalCache(max_bytes=int(cache_mb * 1024 * 1024), disk=self.disk_cache)
+
+        # Notes read through get_note, served without a request for a short
+        # while and dropped by this client's own writes.
+        note_cache_mb = note_cache_mb or _env_number("POZNOTE_NOTE_CACHE_MB", DEFAULT_NOTE_CACHE_MB, float)
+        self.note_cache = NoteCache(
+            max_bytes=int(note_cache_mb * 1024 * 1024),
+            ttl=note_cache_ttl or _env_number("POZNOTE_NOTE_CACHE_TTL", DEFAULT_NOTE_CACHE_TTL, float),
         )
 
+        # Workspace, folder, tag and share lists, served stale while they are
+        # refreshed in the background.
+        self.metadata_cache = MetadataCache(
+            ttls={**parse_ttls(os.getenv("POZNOTE_METADATA_TTLS")), **(metadata_ttls or {})},
+            max_stale=_env_number("POZNOTE_METADATA_MAX_STALE", DEFAULT_MAX_STALE, float),
+        )
+
+        # Sorted and ranked results behind the cursors of list_notes and
+        # search_notes (see pagination.py).
+        self.result_windows = ResultWindows(ttl=_env_number("POZNOTE_RESULT_WINDOW_TTL", DEFAULT_WINDOW_TTL, float))
+
+        # Local views fed by what this client reads and writes: a NoteViews
+        # (see views.py) the MCP server sets, None for a bare client.
+        self.views = None
+
+    @staticmethod
+    def _parse_socket_path(value: str | None) -> str | None:
+        """Accept "unix:/path/to.sock" as well as a bare "/path/to.sock"."""
+        if not value or not value.strip():
+            return None
+        value = value.strip()
+        if value.startswith("unix:"):
+            value = value[len("unix:"):]
+        return value or None
+
+    def _transport_options(self) -> dict:
+        return {"retries": 0, "limits": self.limits, "http2": self.http2, "uds": self.api_socket}
+
+    def pool_stats(self) -> dict:
+        """Snapshot of the upstream connection pool
+
+        in_use connections are serving a request, idle ones are kept alive for
+        reuse, and waiting counts requests queued for a free connection.
+        """
+        pool = getattr(self._transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        requests = list(getattr(pool, "_requests", []))
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return {
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+            "http2": self.http2,
+            "connections": len(connections),
+            "in_use": len(connections) - idle,
+            "idle": idle,
+            "waiting": sum(1 for request in requests if request.is_queued()),
+        }
+
+    @staticmethod
+    def _file_state(path: str | None) -> tuple | None:
+        try:
+            stat = os.stat(path) if path else None
+        except OSError:
+            return None
+        return stat and (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def refresh_service_token(self, force: bool = False) -> bool:
+        """Pick up a rotated token from the token file; True if it changed
+
+        Without force, the file is only stat()ed, at most once per
+        TOKEN_CHECK_INTERVAL, and re-read when its mtime, size or inode moved.
+        The Authorization header is swapped in place, so the connection pool
+        and caches stay warm.
+        """
+        if not self._token_from_file:
+            return False
+        with self._token_lock:
+            now = time.monotonic()
+            if not force and now - self._token_checked_at < TOKEN_CHECK_INTERVAL:
+                return False
+            self._token_checked_at = now
+            state = self._file_state(self.service_token_file)
+            if not force and state == self._token_file_state:
+                return False
+            self._token_file_state = state
+            token = self._load_service_token(self.service_token_file)
+            if not token or token == self.service_token:
+                return False
+            self.service_token = token
+            # Swap in a new dict so concurrent readers see either token, never a mix.
+            self._base_headers = {**self._base_headers, "Authorization": f"Bearer {token}"}
+            self._auth = None
+            client = getattr(self, "client", None)
+            if client is not None:
+                client.headers["Authorization"] = self._base_headers["Authorization"]
+                client.auth = None
+        logger.info("Reloaded the Poznote service token from %s", self.service_token_file)
+        return True
+
+    def _with_current_token(self, kwargs: dict) -> dict:
+        """Request kwargs whose Authorization header is the current token"""
+        headers = kwargs.get("headers")
+        current = self._base_headers.get("Authorization")
+        if headers is None or current is None or headers.get("Authorization") == current:
+            return kwargs
+        return {**kwargs, "headers": {**headers, "Authorization": current}}
+
     @staticmethod
     def _load_service_token(token_file: str | None) -> str:
         if not token_file:
@@ -74,6 +307,100 @@ class PoznoteClient:
         except OSError:
             return ""
 
+    def _note_cache_key(self, note_id: int, workspace: str | None, user_id: str | int | None) -> tuple:
+        return NoteCache.key(self.user_id if user_id is None else user_id, workspace, note_id)
+
+    def _invalidate_after_write(self, path: str, headers: dict | None) -> None:
+        """Drop cached notes a write to `path` may have changed"""
+        user_id = (headers or {}).get("X-User-ID", self.user_id)
+        # Any write can move a note within a sorted list or a ranking.
+        self.result_windows.drop(None if path.startswith(HEAVY_PATH_PREFIXES) else user_id)
+        match = _NOTE_PATH.match(path)
+        if match:
+            # The note itself, its tasks, reminder, folder, conversion, restore...
+            self.note_cache.invalidate(user_id, match.group(1))
+            self._drop_metadata(user_id, "tags", "shared")
+        elif path.startswith(("/workspaces", "/folders", "/trash")):
+            # Renamed workspaces and deleted folders change notes we cannot name.
+            self.note_cache.invalidate_user(user_id)
+            self._drop_metadata(user_id)
+        elif path.startswith(HEAVY_PATH_PREFIXES):
+            # A restored backup or a git pull can rewrite any note of anyone.
+            self.note_cache.clear()
+            self._drop_metadata(None)
+        elif path.startswith("/notes"):
+            # A new note can bring new tags.
+            self._drop_metadata(user_id, "tags")
+        if self.views is not None:
+            self.views.written(user_id, path, match.group(1) if match else None)
+
+    def invalidate_cached(
+        self, user_id: str | int, note_id: int | None = None, lists: tuple[str, ...] | None = None
+    ) -> None:
+        """Drop what is cached for a user after a change made outside this client
+
+        With a note_id, that note and the given metadata lists (all when None)
+        are dropped; without one, everything cached for the user is.
+        """
+        user_id = str(user_id)
+        self.result_windows.drop(user_id)
+        if self.views is not None:
+            self.views.invalidate(user_id, note_id)
+        if note_id is None:
+            self.note_cache.invalidate_user(user_id)
+            self._drop_metadata(user_id)
+            return
+        self.note_cache.invalidate(user_id, note_id)
+        if lists is None:
+            self._drop_metadata(user_id)
+        elif lists:
+            self._drop_metadata(user_id, *lists)
+
+    def _metadata_key(self, endpoint: str, workspace: str | None, user_id: str | int | None) -> tuple:
+        return MetadataCache.key(endpoint, self.user_id if user_id is None else user_id, workspace)
+
+    def _drop_metadata(self, user_id: str | None, *endpoints: str) -> None:
+        """Drop a user's metadata lists (everyone's for None), in memory and on disk"""
+        if user_id is None:
+            self.metadata_cache.clear()
+        else:
+            self.metadata_cache.invalidate(user_id, *endpoints)
+        if self.disk_cache is not None:
+            # Lists are small: dropping all of the user's is simpler than picking.
+            self.disk_cache.delete_all(METADATA, user_id)
+
+    def _load_metadata(self, key: tuple):
+        """A list kept on disk by an earlier run, put back as a stale entry; None if there is none"""
+        if self.disk_cache is None:
+            return None
+        stored = self.disk_cache.get(METADATA, key[0], key)
+        if stored is None:
+            return None
+        value = codec.loads(stored.body)
+        self.metadata_cache.store(key, value, self.metadata_cache.generation, stale=True)
+        return value
+
+    def _save_metadata(self, key: tuple, value) -> None:
+        if self.disk_cache is not None:
+            self.disk_cache.put(METADATA, key[0], key, codec.dumps(value, compact=True).encode())
+
+    def cache_stats(self) -> dict:
+        """Statistics of the on-disk cache tier, None when it is off"""
+        return self.disk_cache.stats() if self.disk_cache is not None else None
+
+    def _feed_views(self, hook: str, user_id: str | int | None, *args, **kwargs) -> None:
+        """Hand what was read or written for a user to the attached views, if any (see NoteViews)"""
+        if self.views is not None:
+            getattr(self.views, hook)(str(self.user_id if user_id is None else user_id), *args, **kwargs)
+
+    def _note_of(self, response: httpx.Response) -> dict | None:
+        """The note of a GET /notes/{id} response, None if it is gone"""
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        data = self._decode(response)
+        return data.get("note") if data.get("success") else None
+
     def _headers_for_user(self, user_id: str | int | None) -> dict:
         headers = dict(self._base_headers)
         if user_id is not None:
@@ -84,19 +411,285 @@ class PoznoteClient:
     def _set_workspace(target: dict, workspace: str | None) -> None:
         if workspace:
             target["workspace"] = workspace
+
+    @staticmethod
+    def _request_kwargs(params: dict | None, json, headers: dict | None, timeout: float | None) -> dict:
+        """httpx keyword arguments, leaving out the ones a call did not set"""
+        kwargs = {}
+        if params is not None:
+            kwargs["params"] = params
+        if json is not None:
+            kwargs["json"] = json
+        if headers is not None:
+            kwargs["headers"] = headers
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        return kwargs
+
+    def _flight_key(self, path: str, params: dict | None, headers: dict | None) -> tuple:
+        """Identity of a GET for coalescing: path, query and acting user"""
+        user = (headers or self._base_headers).get("X-User-ID", self.user_id)
+        query = tuple(sorted((params or {}).items(), key=lambda item: item[0]))
+        return path, query, user
+
+    def coalescing_stats(self) -> dict:
+        """How many GETs reached the API and how many piggybacked on one in flight"""
+        return {
+            "upstream_gets": self._flight_counts["upstream"],
+            "coalesced_gets": self._flight_counts["coalesced"],
+            "in_flight": len(self._inflight),
+        }
+
+    def _record_outcome(self, probe: bool, error: BaseException | None = None, status_code: int | None = None) -> None:
+        """Report one attempt to the circuit breaker"""
+        if is_upstream_failure(error, status_code):
+            self.breaker.record_failure(probe)
+        elif error is None:
+            self.breaker.record_success(probe)
+        else:
+            self.breaker.release_probe(probe)
+
+    def _log_retry(self, method: str, path: str, attempt: int, delay: float, outcome) -> None:
+        logger.warning("Retrying %s %s in %.2fs after attempt %d: %s", method, path, delay, attempt, outcome)
+
+    def resilience_stats(self) -> dict:
+        """Circuit breaker state and retries per endpoint class"""
+        return {"breaker": self.breaker.stats(), "retries": dict(self._retry_counts)}
+
+    @staticmethod
+    def _decode(response: httpx.Response):
+        """Decode a JSON body.
+
+        Coalesced callers share the same response object; each of them gets
+        its own decoded payload, free to change without the others seeing it.
+        """
+        return codec.loads(response.content)
+
+
+class _Flight:
+    """A GET in flight in the sync client, awaited by coalesced callers"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response: httpx.Response | None = None
+        self.error: BaseException | None = None
+
+
+class PoznoteClient(_PoznoteClientBase):
+    """Client for Poznote REST API v1"""
     
-    def list_notes(self, workspace: str | None = None, user_id: str | int | None = None) -> list[dict]:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        
+        # Pooled transport; retries are handled by _send
+        self._transport = httpx.HTTPTransport(**self._transport_options())
+        
+        self.client = httpx.Client(
+            base_url=self.base_url,
+            auth=self._auth,
+            timeout=DEFAULT_TIMEOUT,
+            headers=self._base_headers,
+            transport=self._transport,
+        )
+        self._inflight_lock = threading.Lock()
+
+    def _send(self, method: str, path: str, kwargs: dict, stream: bool = False) -> httpx.Response:
+        """Send a request through the circuit breaker, retrying per endpoint class
+
+        With stream=True the body is left unread; the caller must close the response.
+        """
+        endpoint = endpoint_class(method, path)
+        policy = self.retry_policies[endpoint]
+        self.refresh_service_token()
+        kwargs = self._with_current_token(kwargs)
+        attempt = 0
+        reauthenticated = False
+        while True:
+            attempt += 1
+            attempt_kwargs, cut_short = deadline.bound_request(kwargs, DEFAULT_TIMEOUT)
+            probe = self.breaker.before_call()
+            try:
+                if stream:
+                    response = self.client.send(self.client.build_request(method, path, **attempt_kwargs), stream=True)
+                else:
+                    response = getattr(self.client, method.lower())(path, **attempt_kwargs)
+            except Exception as exc:
+                if cut_short and isinstance(exc, httpx.TimeoutException):
+                    # Out of budget rather than a slow API: not the breaker's business.
+                    self.breaker.release_probe(probe)
+                    raise deadline.exceeded() from exc
+                self._record_outcome(probe, error=exc)
+                delay = policy.backoff(attempt)
+                if not (policy.should_retry(attempt, error=exc) and deadline.allows(delay)):
+                    raise
+                outcome = repr(exc)
+            except BaseException:
+                self.breaker.release_probe(probe)
+                raise
+            else:
+                self._record_outcome(probe, status_code=response.status_code)
+                if response.status_code == 401 and not reauthenticated:
+                    # The token may have been rotated since the last check: retry once with it.
+                    reauthenticated = True
+                    self.refresh_service_token(force=True)
+                    retry_kwargs = self._with_current_token(kwargs)
+                    if retry_kwargs is not kwargs:
+                        kwargs = retry_kwargs
+                        attempt -= 1
+                        response.close()
+                        continue
+                delay = policy.backoff(attempt)
+                if not (policy.should_retry(attempt, status_code=response.status_code) and deadline.allows(delay)):
+                    return response
+                response.close()
+                outcome = f"HTTP {response.status_code}"
+            self._retry_counts[endpoint] += 1
+            self._log_retry(method, path, attempt, delay, outcome)
+            time.sleep(delay)
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: dict | None = None,
+        json=None,
+        headers: dict | None = None,
+        timeout: float | None = None,
+    ) -> httpx.Response:
+        """Send one API request; concurrent identical GETs share a single call"""
+        kwargs = self._request_kwargs(params, json, headers, timeout)
+        if method != "GET":
+            try:
+                return self._send(method, path, kwargs)
+            finally:
+                self._invalidate_after_write(path, headers)
+
+        key = self._flight_key(path, params, headers)
+        with self._inflight_lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self._flight_counts["upstream"] += 1
+            else:
+                self._flight_counts["coalesced"] += 1
+
+        if not leader:
+            if not flight.done.wait(deadline.remaining()):
+                raise deadline.exceeded()
+            if flight.error is not None:
+                raise flight.error
+            return flight.response
+
+        try:
+            flight.response = self._send_conditional(key, path, kwargs)
+            return flight.response
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            flight.done.set()
+
+    def _send_conditional(self, key: tuple, path: str, kwargs: dict) -> httpx.Response:
+        """Send a GET, revalidating a cached body when the endpoint has one"""
+        if not self.http_cache.cacheable(path):
+            return self._send("GET", path, kwargs)
+        entry = self.http_cache.lookup(key)
+        if entry is not None:
+            kwargs = {**kwargs, "headers": self.http_cache.conditional_headers(entry, kwargs.get("headers"))}
+        response = self._send("GET", path, kwargs)
+        return self.http_cache.resolve(key, entry, response)
+
+    def _cached_metadata(self, endpoint: str, workspace: str | None, user_id: str | int | None, fetch):
+        """Serve a metadata list from the cache, refreshing it in the background once stale"""
+        if not self.metadata_cache.enabled(endpoint):
+            return fetch()
+        key = self._metadata_key(endpoint, workspace, user_id)
+        value, state = self.metadata_cache.lookup(key)
+        if state == MISS:
+            value = self._load_metadata(key)
+            if value is None:
+                return self._fetch_metadata(key, fetch)
+            state = STALE
+        if state == STALE and self.metadata_cache.begin_refresh(key):
+            threading.Thread(target=self._refresh_metadata, args=(key, fetch), daemon=True).start()
+        return _copy_metadata(value)
+
+    def _fetch_metadata(self, key: tuple, fetch):
+        generation = self.metadata_cache.generation
+        value = fetch()
+        if self.metadata_cache.store(key, value, generation):
+            self._save_metadata(key, value)
+        return _copy_metadata(value)
+
+    def _refresh_metadata(self, key: tuple, fetch) -> None:
+        try:
+            self._fetch_metadata(key, fetch)
+        except Exception as exc:
+            logger.debug("Background refresh of %s failed: %r", key[1], exc)
+            self.metadata_cache.end_refresh(key, failed=True)
+        else:
+            self.metadata_cache.end_refresh(key)
+
+    def _get_items(
+        self, path: str, key: str, limit: int, *, params: dict | None = None, headers: dict | None = None
+    ) -> list:
+        """GET a list endpoint and decode at most `limit` items of `key`
+
+        The body is parsed as it streams in and the connection is dropped once
+        enough items arrived. These requests are not coalesced.
+        """
+        response = self._send("GET", path, self._request_kwargs(params, None, headers, None), stream=True)
+        try:
+            if response.is_error:
+                response.read()
+                response.raise_for_status()
+            parser = JSONArrayStream(key)
+            items = []
+            for chunk in response.iter_bytes():
+                items.extend(parser.feed(chunk))
+                if len(items) >= limit or parser.done:
+                    break
+            else:
+                items.extend(parser.close())
+            return items[:limit]
+        finally:
+            response.close()
+    
+    def list_notes(
+        self,
+        workspace: str | None = None,
+        user_id: str | int | None = None,
+        limit: int | None = None,
+        sort: str | None = None,
+        after: int | None = None,
+    ) -> list[dict]:
         """
         List all notes
         
-        Returns list of notes with: id, heading, tags, folder, workspace, updated, created
+        Returns list of notes with: id, heading, tags, folder, workspace, updated, created,
+        in the given `sort` order (updated_desc, created_desc or heading_asc) within folders.
+        With a limit, only the first `limit` notes are decoded (see _get_items), and the
+        API renders no more than those. With `after`, the notes that come after that note
+        id; an HTTPStatusError 404 when it is gone.
         """
         params = {}
         self._set_workspace(params, workspace)
+        if sort:
+            params["sort"] = sort
+        if after is not None:
+            params["after"] = after
+        
+        if limit:
+            params["limit"] = limit
+            return self._get_items("/notes", "notes", limit, params=params, headers=self._headers_for_user(user_id))
         
-        response = self.client.get("/notes", params=params, headers=self._headers_for_user(user_id))
+        response = self._request("GET", "/notes", params=params, headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         
         if data.get("success"):
             return data.get("notes", [])
@@ -108,21 +701,41 @@ class PoznoteClient:
         
         Returns note with: id, heading, content, tags, folder, workspace, updated, created
         """
+        key = self._note_cache_key(note_id, workspace, user_id)
+        note = self.note_cache.get(key)
+        if note is not None:
+            return note
+        generation = self.note_cache.generation
+
         params = {}
         self._set_workspace(params, workspace)
         
-        response = self.client.get(f"/notes/{note_id}", params=params, headers=self._headers_for_user(user_id))
+        response = self._request("GET", f"/notes/{note_id}", params=params, headers=self._headers_for_user(user_id))
         
         if response.status_code == 404:
             return None
         
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         
         if data.get("success"):
-            return data.get("note")
+            note = data.get("note")
+            if note:
+                self.note_cache.put(key, note, len(response.content), generation, response.headers.get("etag"))
+            return note
         return None
     
+    def fetch_note(self, note_id: int, user_id: str | int | None = None) -> dict | None:
+        """
+        Get a note straight from the API, as a sync of the local views does
+        
+        Bypasses request coalescing and the note and HTTP caches, which a full
+        sync would flush. Returns None if the note is gone; raises
+        HTTPStatusError for other errors.
+        """
+        kwargs = self._request_kwargs(None, None, self._headers_for_user(user_id), None)
+        return self._note_of(self._send("GET", f"/notes/{note_id}", kwargs))
+    
     def search_notes(
         self,
         query: str,
@@ -144,14 +757,37 @@ class PoznoteClient:
         if created_to:
             params["created_to"] = created_to
         
-        response = self.client.get("/notes/search", params=params, headers=self._headers_for_user(user_id))
+        response = self._request("GET", "/notes/search", params=params, headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         
         if data.get("success"):
             return data.get("results", [])
         return []
     
+    def resolve_note(
+        self, reference: str, workspace: str | None = None, user_id: str | int | None = None
+    ) -> dict | None:
+        """
+        Find a note by ID, or by a title containing `reference`
+        
+        Returns the id and heading of the most recently updated match, or None
+        """
+        params = {"reference": reference}
+        self._set_workspace(params, workspace)
+        
+        response = self._request("GET", "/notes/resolve", params=params, headers=self._headers_for_user(user_id))
+        
+        if response.status_code == 404:
+            return None
+        
+        response.raise_for_status()
+        data = self._decode(response)
+        
+        if data.get("success"):
+            return {"id": data.get("id"), "heading": data.get("heading")}
+        return None
+    
     def create_note(
         self,
         title: str,
@@ -180,9 +816,9 @@ class PoznoteClient:
         if note_type:
             payload["type"] = note_type
         
-        response = self.client.post("/notes", json=payload, headers=self._headers_for_user(user_id))
+        response = self._request("POST", "/notes", json=payload, headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         
         if data.get("success"):
             return data.get("note", {"id": data.get("id")})
@@ -223,7 +859,8 @@ class PoznoteClient:
         params = {}
         self._set_workspace(params, workspace)
 
-        response = self.client.patch(
+        response = self._request(
+            "PATCH",
             f"/notes/{note_id}",
             json=payload,
             params=params,
@@ -234,10 +871,10 @@ class PoznoteClient:
             return None
 
         if response.status_code == 409:
-            return response.json()
+            return self._decode(response)
 
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
 
         if data.get("success"):
             return data.get("note", {"id": note_id})
@@ -257,7 +894,8 @@ class PoznoteClient:
         params = {}
         self._set_workspace(params, workspace)
         
-        response = self.client.delete(
+        response = self._request(
+            "DELETE",
             f"/notes/{note_id}",
             params=params,
             headers=self._headers_for_user(user_id),
@@ -267,8 +905,7 @@ class PoznoteClient:
             return False
         
         response.raise_for_status()
-        data = response.json()
-        
+        data = self._decode(response)
         return data.get("success", False)
     
     def create_folder(
@@ -291,42 +928,54 @@ class PoznoteClient:
         if parent_folder_id is not None:
             payload["parent_folder_id"] = parent_folder_id
         
-        response = self.client.post("/folders", json=payload, headers=self._headers_for_user(user_id))
+        response = self._request("POST", "/folders", json=payload, headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         
         if data.get("success"):
             return data.get("folder")
         return None
 
     def list_folders(self, workspace: str | None = None, user_id: str | int | None = None) -> list[dict]:
+        """List all folders in the specified workspace (cached, see metacache.py)"""
+        return self._cached_metadata("folders", workspace, user_id, lambda: self._list_folders(workspace, user_id))
+
+    def _list_folders(self, workspace: str | None = None, user_id: str | int | None = None) -> list[dict]:
         """List all folders in the specified workspace"""
         params = {}
         self._set_workspace(params, workspace)
         
-        response = self.client.get("/folders", params=params, headers=self._headers_for_user(user_id))
+        response = self._request("GET", "/folders", params=params, headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         
         if data.get("success"):
             return data.get("folders", [])
         return []
 
     def list_workspaces(self, user_id: str | int | None = None) -> list[dict]:
+        """List all available workspaces (cached, see metacache.py)"""
+        return self._cached_metadata("workspaces", None, user_id, lambda: self._list_workspaces(user_id))
+
+    def _list_workspaces(self, user_id: str | int | None = None) -> list[dict]:
         """List all available workspaces"""
-        response = self.client.get("/workspaces", headers=self._headers_for_user(user_id))
+        response = self._request("GET", "/workspaces", headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         
         if data.get("success"):
             return data.get("workspaces", [])
         return []
 
     def list_tags(self, user_id: str | int | None = None) -> list[str]:
+        """List all unique tags (cached, see metacache.py)"""
+        return self._cached_metadata("tags", None, user_id, lambda: self._list_tags(user_id))
+
+    def _list_tags(self, user_id: str | int | None = None) -> list[str]:
         """List all unique tags"""
-        response = self.client.get("/tags", headers=self._headers_for_user(user_id))
+        response = self._request("GET", "/tags", headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         
         if data.get("success"):
             return data.get("tags", [])
@@ -334,9 +983,9 @@ class PoznoteClient:
 
     def get_trash(self, user_id: str | int | None = None) -> list[dict]:
         """List all notes in trash"""
-        response = self.client.get("/trash", headers=self._headers_for_user(user_id))
+        response = self._request("GET", "/trash", headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         
         if data.get("success"):
             return data.get("notes", [])
@@ -344,23 +993,23 @@ class PoznoteClient:
 
     def empty_trash(self, user_id: str | int | None = None) -> bool:
         """Empty the trash (permanently delete all notes in trash)"""
-        response = self.client.delete("/trash", headers=self._headers_for_user(user_id))
+        response = self._request("DELETE", "/trash", headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         return data.get("success", False)
 
     def restore_note(self, note_id: int, user_id: str | int | None = None) -> bool:
         """Restore a note from trash"""
-        response = self.client.post(f"/notes/{note_id}/restore", headers=self._headers_for_user(user_id))
+        response = self._request("POST", f"/notes/{note_id}/restore", headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         return data.get("success", False)
 
     def duplicate_note(self, note_id: int, user_id: str | int | None = None) -> dict | None:
         """Duplicate an existing note"""
-        response = self.client.post(f"/notes/{note_id}/duplicate", headers=self._headers_for_user(user_id))
+        response = self._request("POST", f"/notes/{note_id}/duplicate", headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         
         if data.get("success"):
             return data.get("note")
@@ -368,16 +1017,16 @@ class PoznoteClient:
 
     def toggle_favorite(self, note_id: int, user_id: str | int | None = None) -> bool:
         """Toggle favorite status for a note"""
-        response = self.client.post(f"/notes/{note_id}/favorite", headers=self._headers_for_user(user_id))
+        response = self._request("POST", f"/notes/{note_id}/favorite", headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         return data.get("success", False)
 
     def list_attachments(self, note_id: int, user_id: str | int | None = None) -> list[dict]:
         """List all attachments for a note"""
-        response = self.client.get(f"/notes/{note_id}/attachments", headers=self._headers_for_user(user_id))
+        response = self._request("GET", f"/notes/{note_id}/attachments", headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         if data.get("success"):
             return data.get("attachments", [])
         return []
@@ -385,87 +1034,87 @@ class PoznoteClient:
     def move_note_to_folder(self, note_id: int, folder_id: int, user_id: str | int | None = None) -> bool:
         """Move a note to a specific folder"""
         payload = {"folder_id": folder_id}
-        response = self.client.post(f"/notes/{note_id}/folder", json=payload, headers=self._headers_for_user(user_id))
+        response = self._request("POST", f"/notes/{note_id}/folder", json=payload, headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         return data.get("success", False)
 
     def remove_note_from_folder(self, note_id: int, user_id: str | int | None = None) -> bool:
         """Remove a note from its current folder (move to root)"""
-        response = self.client.post(f"/notes/{note_id}/remove-folder", headers=self._headers_for_user(user_id))
+        response = self._request("POST", f"/notes/{note_id}/remove-folder", headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         return data.get("success", False)
 
     def get_note_share_status(self, note_id: int, user_id: str | int | None = None) -> dict | None:
         """Get public sharing status for a note"""
-        response = self.client.get(f"/notes/{note_id}/share", headers=self._headers_for_user(user_id))
+        response = self._request("GET", f"/notes/{note_id}/share", headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         if data.get("success"):
             return data.get("share")
         return None
 
     def create_note_share(self, note_id: int, user_id: str | int | None = None) -> dict | None:
         """Enable public sharing for a note and return the link"""
-        response = self.client.post(f"/notes/{note_id}/share", headers=self._headers_for_user(user_id))
+        response = self._request("POST", f"/notes/{note_id}/share", headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         if data.get("success"):
             return data.get("share")
         return None
 
     def delete_note_share(self, note_id: int, user_id: str | int | None = None) -> bool:
         """Disable public sharing for a note"""
-        response = self.client.delete(f"/notes/{note_id}/share", headers=self._headers_for_user(user_id))
+        response = self._request("DELETE", f"/notes/{note_id}/share", headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         return data.get("success", False)
 
     def get_folder_share_status(self, folder_id: int, user_id: str | int | None = None) -> dict | None:
         """Get public sharing status for a folder"""
-        response = self.client.get(f"/folders/{folder_id}/share", headers=self._headers_for_user(user_id))
+        response = self._request("GET", f"/folders/{folder_id}/share", headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         if data.get("success"):
             return data.get("share")
         return None
 
     def get_git_status(self, user_id: str | int | None = None) -> dict | None:
         """Get Git synchronization status"""
-        response = self.client.get("/git-sync/status", headers=self._headers_for_user(user_id))
+        response = self._request("GET", "/git-sync/status", headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        return response.json()
+        return self._decode(response)
 
     def git_push(self, user_id: str | int | None = None) -> dict:
         """Force push notes to Git provider"""
-        response = self.client.post("/git-sync/push", headers=self._headers_for_user(user_id), timeout=HEAVY_TIMEOUT)
+        response = self._request("POST", "/git-sync/push", headers=self._headers_for_user(user_id), timeout=HEAVY_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return self._decode(response)
 
     def git_pull(self, user_id: str | int | None = None) -> dict:
         """Force pull notes from Git provider"""
-        response = self.client.post("/git-sync/pull", headers=self._headers_for_user(user_id), timeout=HEAVY_TIMEOUT)
+        response = self._request("POST", "/git-sync/pull", headers=self._headers_for_user(user_id), timeout=HEAVY_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return self._decode(response)
 
     def get_system_version(self) -> dict:
         """Get Poznote version information"""
-        response = self.client.get("/system/version")
+        response = self._request("GET", "/system/version")
         response.raise_for_status()
-        return response.json()
+        return self._decode(response)
 
     def list_backups(self) -> list[dict]:
         """List all available backups"""
-        response = self.client.get("/backups")
+        response = self._request("GET", "/backups")
         response.raise_for_status()
-        return response.json()
+        return self._decode(response)
 
     def create_backup(self) -> dict:
         """Trigger a new full backup"""
-        response = self.client.post("/backups", timeout=HEAVY_TIMEOUT)
+        response = self._request("POST", "/backups", timeout=HEAVY_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return self._decode(response)
 
     def restore_backup(self, filename: str, user_id: str | int | None = None) -> dict:
         """Restore a backup file
@@ -474,28 +1123,28 @@ class PoznoteClient:
             filename: Name of the backup file to restore
             user_id: User profile ID to access (optional, overrides default)
         """
-        response = self.client.post(f"/backups/{filename}/restore", headers=self._headers_for_user(user_id), timeout=HEAVY_TIMEOUT)
+        response = self._request("POST", f"/backups/{filename}/restore", headers=self._headers_for_user(user_id), timeout=HEAVY_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return self._decode(response)
 
     def get_setting(self, key: str, user_id: str | int | None = None) -> dict:
         """Get a specific application setting"""
-        response = self.client.get(f"/settings/{key}", headers=self._headers_for_user(user_id))
+        response = self._request("GET", f"/settings/{key}", headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        return response.json()
+        return self._decode(response)
 
     def update_setting(self, key: str, value: str, user_id: str | int | None = None) -> dict:
         """Update a specific application setting"""
         payload = {"value": value}
-        response = self.client.put(f"/settings/{key}", json=payload, headers=self._headers_for_user(user_id))
+        response = self._request("PUT", f"/settings/{key}", json=payload, headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        return response.json()
+        return self._decode(response)
 
     def get_backlinks(self, note_id: int, user_id: str | int | None = None) -> list[dict]:
         """Get all notes that link to this note"""
-        response = self.client.get(f"/notes/{note_id}/backlinks", headers=self._headers_for_user(user_id))
+        response = self._request("GET", f"/notes/{note_id}/backlinks", headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         if data.get("success"):
             return data.get("backlinks", [])
         return []
@@ -509,9 +1158,9 @@ class PoznoteClient:
             user_id: User profile ID to access (optional)
         """
         payload = {"target": target}
-        response = self.client.post(f"/notes/{note_id}/convert", json=payload, headers=self._headers_for_user(user_id))
+        response = self._request("POST", f"/notes/{note_id}/convert", json=payload, headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         if data.get("success"):
             return data
         return None
@@ -527,7 +1176,8 @@ class PoznoteClient:
         params = {}
         self._set_workspace(params, workspace)
         payload = {"name": new_name}
-        response = self.client.patch(
+        response = self._request(
+            "PATCH",
             f"/folders/{folder_id}",
             json=payload,
             params=params,
@@ -536,7 +1186,7 @@ class PoznoteClient:
         if response.status_code == 404:
             return None
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         if data.get("success"):
             return data.get("folder")
         return None
@@ -550,7 +1200,8 @@ class PoznoteClient:
         """Delete a folder (moves notes to trash)"""
         params = {}
         self._set_workspace(params, workspace)
-        response = self.client.delete(
+        response = self._request(
+            "DELETE",
             f"/folders/{folder_id}",
             params=params,
             headers=self._headers_for_user(user_id),
@@ -558,15 +1209,15 @@ class PoznoteClient:
         if response.status_code == 404:
             return False
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         return data.get("success", False)
 
     def create_workspace(self, name: str, user_id: str | int | None = None) -> dict | None:
         """Create a new workspace"""
         payload = {"name": name}
-        response = self.client.post("/workspaces", json=payload, headers=self._headers_for_user(user_id))
+        response = self._request("POST", "/workspaces", json=payload, headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         if data.get("success"):
             return data
         return None
@@ -574,25 +1225,25 @@ class PoznoteClient:
     def rename_workspace(self, current_name: str, new_name: str, user_id: str | int | None = None) -> dict | None:
         """Rename an existing workspace"""
         payload = {"new_name": new_name}
-        response = self.client.patch(f"/workspaces/{current_name}", json=payload, headers=self._headers_for_user(user_id))
+        response = self._request("PATCH", f"/workspaces/{current_name}", json=payload, headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         if data.get("success"):
             return data
         return None
 
     def delete_workspace(self, name: str, user_id: str | int | None = None) -> bool:
         """Delete a workspace (cannot delete the last one)"""
-        response = self.client.delete(f"/workspaces/{name}", headers=self._headers_for_user(user_id))
+        response = self._request("DELETE", f"/workspaces/{name}", headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         return data.get("success", False)
 
     def delete_backup(self, filename: str) -> bool:
         """Delete a backup file"""
-        response = self.client.delete(f"/backups/{filename}")
+        response = self._request("DELETE", f"/backups/{filename}")
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         return data.get("success", False)
 
     # ------------------------------------------------------------------
@@ -601,11 +1252,11 @@ class PoznoteClient:
 
     def get_reminder(self, note_id: int, user_id: str | int | None = None) -> dict | None:
         """Get the reminder currently set on a note"""
-        response = self.client.get(f"/notes/{note_id}/reminder", headers=self._headers_for_user(user_id))
+        response = self._request("GET", f"/notes/{note_id}/reminder", headers=self._headers_for_user(user_id))
         if response.status_code == 404:
             return None
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         if data.get("success"):
             return data
         return None
@@ -628,7 +1279,8 @@ class PoznoteClient:
         if recurrence is not None:
             payload["recurrence"] = recurrence
 
-        response = self.client.post(
+        response = self._request(
+            "POST",
             f"/notes/{note_id}/reminder",
             json=payload,
             headers=self._headers_for_user(user_id),
@@ -636,30 +1288,39 @@ class PoznoteClient:
         if response.status_code == 404:
             return None
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         if data.get("success"):
             return data
         return None
 
     def remove_reminder(self, note_id: int, user_id: str | int | None = None) -> bool:
         """Remove the reminder of a note"""
-        response = self.client.delete(f"/notes/{note_id}/reminder", headers=self._headers_for_user(user_id))
+        response = self._request("DELETE", f"/notes/{note_id}/reminder", headers=self._headers_for_user(user_id))
         if response.status_code == 404:
             return False
         response.raise_for_status()
-        return response.json().get("success", False)
+        return self._decode(response).get("success", False)
 
     # ------------------------------------------------------------------
     # Tasks (inside a tasklist note)
     # ------------------------------------------------------------------
 
+    def list_all_tasks(self, user_id: str | int | None = None) -> tuple[list[dict], list[dict], str | None] | None:
+        """List the tasks of every note and checklist: (notes, checklists, ETag of the listing)"""
+        response = self._request("GET", "/tasks", headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        if data.get("success"):
+            return data.get("notes", []), data.get("checklists", []), response.headers.get("etag")
+        return None
+
     def list_tasks(self, note_id: int, user_id: str | int | None = None) -> dict | None:
         """List the tasks of one tasklist note"""
-        response = self.client.get(f"/notes/{note_id}/tasks", headers=self._headers_for_user(user_id))
+        response = self._request("GET", f"/notes/{note_id}/tasks", headers=self._headers_for_user(user_id))
         if response.status_code == 404:
             return None
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         if data.get("success"):
             return data
         return None
@@ -689,7 +1350,8 @@ class PoznoteClient:
             if value is not None:
                 payload[key] = value
 
-        response = self.client.post(
+        response = self._request(
+            "POST",
             f"/notes/{note_id}/tasks",
             json=payload,
             headers=self._headers_for_user(user_id),
@@ -697,7 +1359,7 @@ class PoznoteClient:
         if response.status_code == 404:
             return None
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         if data.get("success"):
             return data.get("task")
         return None
@@ -714,7 +1376,8 @@ class PoznoteClient:
         ``fields`` is passed through as-is so callers can explicitly send
         ``due_at: None`` to clear a due date (a value distinct from omitting it).
         """
-        response = self.client.patch(
+        response = self._request(
+            "PATCH",
             f"/notes/{note_id}/tasks/{task_id}",
             json=fields,
             headers=self._headers_for_user(user_id),
@@ -722,29 +1385,34 @@ class PoznoteClient:
         if response.status_code == 404:
             return None
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         if data.get("success"):
             return data.get("task")
         return None
 
     def delete_task(self, note_id: int, task_id: str, user_id: str | int | None = None) -> bool:
         """Delete one task of a tasklist note"""
-        response = self.client.delete(
+        response = self._request(
+            "DELETE",
             f"/notes/{note_id}/tasks/{task_id}",
             headers=self._headers_for_user(user_id),
         )
         if response.status_code == 404:
             return False
         response.raise_for_status()
-        return response.json().get("success", False)
+        return self._decode(response).get("success", False)
 
     def list_shared(self, workspace: str | None = None, user_id: str | int | None = None) -> dict:
+        """List all shared notes and folders (cached, see metacache.py)"""
+        return self._cached_metadata("shared", workspace, user_id, lambda: self._list_shared(workspace, user_id))
+
+    def _list_shared(self, workspace: str | None = None, user_id: str | int | None = None) -> dict:
         """List all shared notes and folders"""
         params = {}
         self._set_workspace(params, workspace)
-        response = self.client.get("/shared", params=params, headers=self._headers_for_user(user_id))
+        response = self._request("GET", "/shared", params=params, headers=self._headers_for_user(user_id))
         response.raise_for_status()
-        data = response.json()
+        data = self._decode(response)
         if data.get("success"):
             return {
                 "shared_notes": data.get("shared_notes", []),
@@ -755,3 +1423,995 @@ class PoznoteClient:
     def close(self):
         """Close the HTTP client"""
         self.client.close()
+        if self.disk_cache is not None:
+            self.disk_cache.close()
+
+
+class AsyncPoznoteClient(_PoznoteClientBase):
+    """Asynchronous client for Poznote REST API v1
+    
+    Mirrors PoznoteClient method for method; every API call is a coroutine.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        
+        # Pooled transport; retries are handled by _send
+        self._transport = httpx.AsyncHTTPTransport(**self._transport_options())
+        
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            auth=self._auth,
+            timeout=DEFAULT_TIMEOUT,
+            headers=self._base_headers,
+            transport=self._transport,
+        )
+        # Background refreshes of stale metadata lists (see _cached_metadata)
+        self._refresh_tasks: set[asyncio.Task] = set()
+
+    async def _send(self, method: str, path: str, kwargs: dict, stream: bool = False) -> httpx.Response:
+        """Send a request through the circuit breaker, retrying per endpoint class
+
+        With stream=True the body is left unread; the caller must close the response.
+        """
+        endpoint = endpoint_class(method, path)
+        policy = self.retry_policies[endpoint]
+        self.refresh_service_token()
+        kwargs = self._with_current_token(kwargs)
+        attempt = 0
+        reauthenticated = False
+        while True:
+            attempt += 1
+            attempt_kwargs, cut_short = deadline.bound_request(kwargs, DEFAULT_TIMEOUT)
+            probe = self.breaker.before_call()
+            try:
+                if stream:
+                    response = await self.client.send(
+                        self.client.build_request(method, path, **attempt_kwargs), stream=True
+                    )
+                else:
+                    response = await getattr(self.client, method.lower())(path, **attempt_kwargs)
+            except Exception as exc:
+                if cut_short and isinstance(exc, httpx.TimeoutException):
+                    # Out of budget rather than a slow API: not the breaker's business.
+                    self.breaker.release_probe(probe)
+                    raise deadline.exceeded() from exc
+                self._record_outcome(probe, error=exc)
+                delay = policy.backoff(attempt)
+                if not (policy.should_retry(attempt, error=exc) and deadline.allows(delay)):
+                    raise
+                outcome = repr(exc)
+            except BaseException:
+                self.breaker.release_probe(probe)
+                raise
+            else:
+                self._record_outcome(probe, status_code=response.status_code)
+                if response.status_code == 401 and not reauthenticated:
+                    # The token may have been rotated since the last check: retry once with it.
+                    reauthenticated = True
+                    self.refresh_service_token(force=True)
+                    retry_kwargs = self._with_current_token(kwargs)
+                    if retry_kwargs is not kwargs:
+                        kwargs = retry_kwargs
+                        attempt -= 1
+                        await response.aclose()
+                        continue
+                delay = policy.backoff(attempt)
+                if not (policy.should_retry(attempt, status_code=response.status_code) and deadline.allows(delay)):
+                    return response
+                await response.aclose()
+                outcome = f"HTTP {response.status_code}"
+            self._retry_counts[endpoint] += 1
+            self._log_retry(method, path, attempt, delay, outcome)
+            await asyncio.sleep(delay)
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: dict | None = None,
+        json=None,
+        headers: dict | None = None,
+        timeout: float | None = None,
+    ) -> httpx.Response:
+        """Send one API request; concurrent identical GETs share a single call"""
+        kwargs = self._request_kwargs(params, json, headers, timeout)
+        if method != "GET":
+            try:
+                return await self._send(method, path, kwargs)
+            finally:
+                self._invalidate_after_write(path, headers)
+
+        key = self._flight_key(path, params, headers)
+        task = self._inflight.get(key)
+        if task is None:
+            # The upstream call runs in its own task so that a cancelled caller
+            # does not cancel it for everyone else waiting on the result.
+            task = asyncio.ensure_future(self._send_conditional(key, path, kwargs))
+            self._inflight[key] = task
+            self._flight_counts["upstream"] += 1
+            task.add_done_callback(lambda done: self._flight_done(key, done))
+        else:
+            self._flight_counts["coalesced"] += 1
+        left = deadline.remaining()
+        if left is None:
+            return await asyncio.shield(task)
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), max(left, 0))
+        except asyncio.TimeoutError:
+            raise deadline.exceeded() from None
+
+    def _flight_done(self, key: tuple, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the error as retrieved even if every caller went away.
+            task.exception()
+
+    async def _send_conditional(self, key: tuple, path: str, kwargs: dict) -> httpx.Response:
+        """Send a GET, revalidating a cached body when the endpoint has one"""
+        if not self.http_cache.cacheable(path):
+            return await self._send("GET", path, kwargs)
+        entry = self.http_cache.lookup(key)
+        if entry is not None:
+            kwargs = {**kwargs, "headers": self.http_cache.conditional_headers(entry, kwargs.get("headers"))}
+        response = await self._send("GET", path, kwargs)
+        return self.http_cache.resolve(key, entry, response)
+
+    async def _cached_metadata(self, endpoint: str, workspace: str | None, user_id: str | int | None, fetch):
+        """Serve a metadata list from the cache, refreshing it in the background once stale"""
+        if not self.metadata_cache.enabled(endpoint):
+            return await fetch()
+        key = self._metadata_key(endpoint, workspace, user_id)
+        value, state = self.metadata_cache.lookup(key)
+        if state == MISS:
+            value = self._load_metadata(key)
+            if value is None:
+                return await self._fetch_metadata(key, fetch)
+            state = STALE
+        if state == STALE and self.metadata_cache.begin_refresh(key):
+            # The task copies the context: without the tool's deadline, which
+            # would cancel the refresh once the tool has answered.
+            with deadline.detached():
+                task = asyncio.ensure_future(self._refresh_metadata(key, fetch))
+            # Keep a reference so the task is not garbage collected mid-flight.
+            self._refresh_tasks.add(task)
+            task.add_done_callback(self._refresh_tasks.discard)
+        return _copy_metadata(value)
+
+    async def _fetch_metadata(self, key: tuple, fetch):
+        generation = self.metadata_cache.generation
+        value = await fetch()
+        if self.metadata_cache.store(key, value, generation):
+            self._save_metadata(key, value)
+        return _copy_metadata(value)
+
+    async def _refresh_metadata(self, key: tuple, fetch) -> None:
+        try:
+            await self._fetch_metadata(key, fetch)
+        except Exception as exc:
+            logger.debug("Background refresh of %s failed: %r", key[1], exc)
+            self.metadata_cache.end_refresh(key, failed=True)
+        else:
+            self.metadata_cache.end_refresh(key)
+
+    async def _get_items(
+        self, path: str, key: str, limit: int, *, params: dict | None = None, headers: dict | None = None
+    ) -> list:
+        """GET a list endpoint and decode at most `limit` items of `key`
+
+        The body is parsed as it streams in and the connection is dropped once
+        enough items arrived. These requests are not coalesced.
+        """
+        response = await self._send("GET", path, self._request_kwargs(params, None, headers, None), stream=True)
+        try:
+            if response.is_error:
+                await response.aread()
+                response.raise_for_status()
+            parser = JSONArrayStream(key)
+            items = []
+            async for chunk in response.aiter_bytes():
+                items.extend(parser.feed(chunk))
+                if len(items) >= limit or parser.done:
+                    break
+            else:
+                items.extend(parser.close())
+            return items[:limit]
+        finally:
+            await response.aclose()
+    
+    async def list_notes(
+        self,
+        workspace: str | None = None,
+        user_id: str | int | None = None,
+        limit: int | None = None,
+        sort: str | None = None,
+        after: int | None = None,
+    ) -> list[dict]:
+        """
+        List all notes
+        
+        Returns list of notes with: id, heading, tags, folder, workspace, updated, created,
+        in the given `sort` order (updated_desc, created_desc or heading_asc) within folders.
+        With a limit, only the first `limit` notes are decoded (see _get_items), and the
+        API renders no more than those. With `after`, the notes that come after that note
+        id; an HTTPStatusError 404 when it is gone.
+        """
+        params = {}
+        self._set_workspace(params, workspace)
+        if sort:
+            params["sort"] = sort
+        if after is not None:
+            params["after"] = after
+        
+        if limit:
+            params["limit"] = limit
+            notes = await self._get_items("/notes", "notes", limit, params=params, headers=self._headers_for_user(user_id))
+            self._feed_views("add_notes", user_id, notes, workspace)
+            return notes
+        
+        response = await self._request("GET", "/notes", params=params, headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        
+        if data.get("success"):
+            notes = data.get("notes", [])
+            if after is None:
+                self._feed_views("add_notes", user_id, notes, workspace, complete=True, version=body_etag(response.content))
+            else:
+                self._feed_views("add_notes", user_id, notes, workspace)
+            return notes
+        return []
+    
+    async def get_note(self, note_id: int, workspace: str | None = None, user_id: str | int | None = None) -> dict | None:
+        """
+        Get a specific note with its content
+        
+        Returns note with: id, heading, content, tags, folder, workspace, updated, created
+        """
+        key = self._note_cache_key(note_id, workspace, user_id)
+        note = self.note_cache.get(key)
+        if note is not None:
+            return note
+        generation = self.note_cache.generation
+
+        params = {}
+        self._set_workspace(params, workspace)
+        
+        response = await self._request("GET", f"/notes/{note_id}", params=params, headers=self._headers_for_user(user_id))
+        
+        if response.status_code == 404:
+            return None
+        
+        response.raise_for_status()
+        data = self._decode(response)
+        
+        if data.get("success"):
+            note = data.get("note")
+            if note:
+                self.note_cache.put(key, note, len(response.content), generation, response.headers.get("etag"))
+            return note
+        return None
+    
+    async def fetch_note(self, note_id: int, user_id: str | int | None = None) -> dict | None:
+        """
+        Get a note straight from the API, as a sync of the local views does
+        
+        Bypasses request coalescing and the note and HTTP caches, which a full
+        sync would flush. Returns None if the note is gone; raises
+        HTTPStatusError for other errors.
+        """
+        kwargs = self._request_kwargs(None, None, self._headers_for_user(user_id), None)
+        return self._note_of(await self._send("GET", f"/notes/{note_id}", kwargs))
+    
+    async def search_notes(
+        self,
+        query: str,
+        limit: int = 10,
+        workspace: str | None = None,
+        created_from: str | None = None,
+        created_to: str | None = None,
+        user_id: str | int | None = None,
+    ) -> list[dict]:
+        """
+        Search notes by text query
+        
+        Returns list of matching notes with excerpts
+        """
+        params = {"q": query, "limit": limit}
+        self._set_workspace(params, workspace)
+        if created_from:
+            params["created_from"] = created_from
+        if created_to:
+            params["created_to"] = created_to
+        
+        response = await self._request("GET", "/notes/search", params=params, headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        
+        if data.get("success"):
+            return data.get("results", [])
+        return []
+    
+    async def resolve_note(
+        self, reference: str, workspace: str | None = None, user_id: str | int | None = None
+    ) -> dict | None:
+        """
+        Find a note by ID, or by a title containing `reference`
+        
+        Returns the id and heading of the most recently updated match, or None
+        """
+        params = {"reference": reference}
+        self._set_workspace(params, workspace)
+        
+        response = await self._request("GET", "/notes/resolve", params=params, headers=self._headers_for_user(user_id))
+        
+        if response.status_code == 404:
+            return None
+        
+        response.raise_for_status()
+        data = self._decode(response)
+        
+        if data.get("success"):
+            return {"id": data.get("id"), "heading": data.get("heading")}
+        return None
+    
+    async def create_note(
+        self,
+        title: str,
+        content: str,
+        tags: str | None = None,
+        folder_name: str | None = None,
+        workspace: str | None = None,
+        note_type: str | None = None,
+        user_id: str | int | None = None,
+    ) -> dict | None:
+        """
+        Create a new note
+        
+        Returns the created note with its ID
+        """
+        payload = {
+            "heading": title,
+            "content": content,
+        }
+        self._set_workspace(payload, workspace)
+        
+        if tags:
+            payload["tags"] = tags
+        if folder_name:
+            payload["folder_name"] = folder_name
+        if note_type:
+            payload["type"] = note_type
+        
+        response = await self._request("POST", "/notes", json=payload, headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        
+        if data.get("success"):
+            note = data.get("note", {"id": data.get("id")})
+            self._feed_views("add_notes", user_id, [{"heading": title, "workspace": workspace, **note}])
+            return note
+        return None
+    
+    async def update_note(
+        self,
+        note_id: int,
+        content: str | None = None,
+        title: str | None = None,
+        tags: str | None = None,
+        workspace: str | None = None,
+        user_id: str | int | None = None,
+        if_version: str | None = None,
+    ) -> dict | None:
+        """
+        Update an existing note
+
+        Returns the updated note. When if_version is given and the note changed
+        since that version, returns the API's conflict payload (success False,
+        code "version_conflict", current version and content under "current").
+        """
+        payload = {}
+
+        if content is not None:
+            payload["content"] = content
+        if title is not None:
+            payload["heading"] = title
+        if tags is not None:
+            payload["tags"] = tags
+
+        if not payload:
+            return None
+
+        if if_version is not None:
+            payload["if_version"] = if_version
+
+        params = {}
+        self._set_workspace(params, workspace)
+
+        response = await self._request(
+            "PATCH",
+            f"/notes/{note_id}",
+            json=payload,
+            params=params,
+            headers=self._headers_for_user(user_id),
+        )
+
+        if response.status_code == 404:
+            return None
+
+        if response.status_code == 409:
+            return self._decode(response)
+
+        response.raise_for_status()
+        data = self._decode(response)
+
+        if data.get("success"):
+            note = data.get("note", {"id": note_id})
+            if "heading" in note:
+                self._feed_views("add_notes", user_id, [note])
+            return note
+        return None
+    
+    async def delete_note(
+        self,
+        note_id: int,
+        workspace: str | None = None,
+        user_id: str | int | None = None,
+    ) -> bool:
+        """
+        Delete a note
+        
+        Returns True if successful, False otherwise
+        """
+        params = {}
+        self._set_workspace(params, workspace)
+        
+        response = await self._request(
+            "DELETE",
+            f"/notes/{note_id}",
+            params=params,
+            headers=self._headers_for_user(user_id),
+        )
+        
+        if response.status_code == 404:
+            return False
+        
+        response.raise_for_status()
+        data = self._decode(response)
+        
+        if data.get("success"):
+            self._feed_views("remove_note", user_id, note_id)
+        return data.get("success", False)
+    
+    async def create_folder(
+        self,
+        folder_name: str,
+        parent_folder_id: int | None = None,
+        workspace: str | None = None,
+        user_id: str | int | None = None,
+    ) -> dict | None:
+        """
+        Create a new folder
+        
+        Returns the created folder with its ID
+        """
+        payload = {
+            "folder_name": folder_name,
+        }
+        self._set_workspace(payload, workspace)
+        
+        if parent_folder_id is not None:
+            payload["parent_folder_id"] = parent_folder_id
+        
+        response = await self._request("POST", "/folders", json=payload, headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        
+        if data.get("success"):
+            return data.get("folder")
+        return None
+
+    async def list_folders(self, workspace: str | None = None, user_id: str | int | None = None) -> list[dict]:
+        """List all folders in the specified workspace (cached, see metacache.py)"""
+        folders = await self._cached_metadata("folders", workspace, user_id, lambda: self._list_folders(workspace, user_id))
+        if workspace:
+            self._feed_views("add_folders", user_id, workspace, folders)
+        return folders
+
+    async def _list_folders(self, workspace: str | None = None, user_id: str | int | None = None) -> list[dict]:
+        """List all folders in the specified workspace"""
+        params = {}
+        self._set_workspace(params, workspace)
+        
+        response = await self._request("GET", "/folders", params=params, headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        
+        if data.get("success"):
+            return data.get("folders", [])
+        return []
+
+    async def list_workspaces(self, user_id: str | int | None = None) -> list[dict]:
+        """List all available workspaces (cached, see metacache.py)"""
+        return await self._cached_metadata("workspaces", None, user_id, lambda: self._list_workspaces(user_id))
+
+    async def _list_workspaces(self, user_id: str | int | None = None) -> list[dict]:
+        """List all available workspaces"""
+        response = await self._request("GET", "/workspaces", headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        
+        if data.get("success"):
+            return data.get("workspaces", [])
+        return []
+
+    async def list_tags(self, user_id: str | int | None = None) -> list[str]:
+        """List all unique tags (cached, see metacache.py)"""
+        return await self._cached_metadata("tags", None, user_id, lambda: self._list_tags(user_id))
+
+    async def _list_tags(self, user_id: str | int | None = None) -> list[str]:
+        """List all unique tags"""
+        response = await self._request("GET", "/tags", headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        
+        if data.get("success"):
+            return data.get("tags", [])
+        return []
+
+    async def get_trash(self, user_id: str | int | None = None) -> list[dict]:
+        """List all notes in trash"""
+        response = await self._request("GET", "/trash", headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        
+        if data.get("success"):
+            return data.get("notes", [])
+        return []
+
+    async def empty_trash(self, user_id: str | int | None = None) -> bool:
+        """Empty the trash (permanently delete all notes in trash)"""
+        response = await self._request("DELETE", "/trash", headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        return data.get("success", False)
+
+    async def restore_note(self, note_id: int, user_id: str | int | None = None) -> bool:
+        """Restore a note from trash"""
+        response = await self._request("POST", f"/notes/{note_id}/restore", headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        return data.get("success", False)
+
+    async def duplicate_note(self, note_id: int, user_id: str | int | None = None) -> dict | None:
+        """Duplicate an existing note"""
+        response = await self._request("POST", f"/notes/{note_id}/duplicate", headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        
+        if data.get("success"):
+            return data.get("note")
+        return None
+
+    async def toggle_favorite(self, note_id: int, user_id: str | int | None = None) -> bool:
+        """Toggle favorite status for a note"""
+        response = await self._request("POST", f"/notes/{note_id}/favorite", headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        return data.get("success", False)
+
+    async def list_attachments(self, note_id: int, user_id: str | int | None = None) -> list[dict]:
+        """List all attachments for a note"""
+        response = await self._request("GET", f"/notes/{note_id}/attachments", headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        if data.get("success"):
+            return data.get("attachments", [])
+        return []
+
+    async def move_note_to_folder(self, note_id: int, folder_id: int, user_id: str | int | None = None) -> bool:
+        """Move a note to a specific folder"""
+        payload = {"folder_id": folder_id}
+        response = await self._request("POST", f"/notes/{note_id}/folder", json=payload, headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        return data.get("success", False)
+
+    async def remove_note_from_folder(self, note_id: int, user_id: str | int | None = None) -> bool:
+        """Remove a note from its current folder (move to root)"""
+        response = await self._request("POST", f"/notes/{note_id}/remove-folder", headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        return data.get("success", False)
+
+    async def get_note_share_status(self, note_id: int, user_id: str | int | None = None) -> dict | None:
+        """Get public sharing status for a note"""
+        response = await self._request("GET", f"/notes/{note_id}/share", headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        if data.get("success"):
+            return data.get("share")
+        return None
+
+    async def create_note_share(self, note_id: int, user_id: str | int | None = None) -> dict | None:
+        """Enable public sharing for a note and return the link"""
+        response = await self._request("POST", f"/notes/{note_id}/share", headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        if data.get("success"):
+            return data.get("share")
+        return None
+
+    async def delete_note_share(self, note_id: int, user_id: str | int | None = None) -> bool:
+        """Disable public sharing for a note"""
+        response = await self._request("DELETE", f"/notes/{note_id}/share", headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        return data.get("success", False)
+
+    async def get_folder_share_status(self, folder_id: int, user_id: str | int | None = None) -> dict | None:
+        """Get public sharing status for a folder"""
+        response = await self._request("GET", f"/folders/{folder_id}/share", headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        if data.get("success"):
+            return data.get("share")
+        return None
+
+    async def get_git_status(self, user_id: str | int | None = None) -> dict | None:
+        """Get Git synchronization status"""
+        response = await self._request("GET", "/git-sync/status", headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        return self._decode(response)
+
+    async def git_push(self, user_id: str | int | None = None) -> dict:
+        """Force push notes to Git provider"""
+        response = await self._request("POST", "/git-sync/push", headers=self._headers_for_user(user_id), timeout=HEAVY_TIMEOUT)
+        response.raise_for_status()
+        return self._decode(response)
+
+    async def git_pull(self, user_id: str | int | None = None) -> dict:
+        """Force pull notes from Git provider"""
+        response = await self._request("POST", "/git-sync/pull", headers=self._headers_for_user(user_id), timeout=HEAVY_TIMEOUT)
+        response.raise_for_status()
+        return self._decode(response)
+
+    async def get_system_version(self) -> dict:
+        """Get Poznote version information"""
+        response = await self._request("GET", "/system/version")
+        response.raise_for_status()
+        return self._decode(response)
+
+    async def list_backups(self) -> list[dict]:
+        """List all available backups"""
+        response = await self._request("GET", "/backups")
+        response.raise_for_status()
+        return self._decode(response)
+
+    async def create_backup(self) -> dict:
+        """Trigger a new full backup"""
+        response = await self._request("POST", "/backups", timeout=HEAVY_TIMEOUT)
+        response.raise_for_status()
+        return self._decode(response)
+
+    async def restore_backup(self, filename: str, user_id: str | int | None = None) -> dict:
+        """Restore a backup file
+        
+        Args:
+            filename: Name of the backup file to restore
+            user_id: User profile ID to access (optional, overrides default)
+        """
+        response = await self._request("POST", f"/backups/{filename}/restore", headers=self._headers_for_user(user_id), timeout=HEAVY_TIMEOUT)
+        response.raise_for_status()
+        return self._decode(response)
+
+    async def get_setting(self, key: str, user_id: str | int | None = None) -> dict:
+        """Get a specific application setting"""
+        response = await self._request("GET", f"/settings/{key}", headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        return self._decode(response)
+
+    async def update_setting(self, key: str, value: str, user_id: str | int | None = None) -> dict:
+        """Update a specific application setting"""
+        payload = {"value": value}
+        response = await self._request("PUT", f"/settings/{key}", json=payload, headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        return self._decode(response)
+
+    async def get_backlinks(self, note_id: int, user_id: str | int | None = None) -> list[dict]:
+        """Get all notes that link to this note"""
+        response = await self._request("GET", f"/notes/{note_id}/backlinks", headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        if data.get("success"):
+            return data.get("backlinks", [])
+        return []
+
+    async def convert_note(self, note_id: int, target: str, user_id: str | int | None = None) -> dict | None:
+        """Convert a note between HTML and Markdown formats
+
+        Args:
+            note_id: ID of the note to convert
+            target: Target format ('html' or 'markdown')
+            user_id: User profile ID to access (optional)
+        """
+        payload = {"target": target}
+        response = await self._request("POST", f"/notes/{note_id}/convert", json=payload, headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        if data.get("success"):
+            return data
+        return None
+
+    async def rename_folder(
+        self,
+        folder_id: int,
+        new_name: str,
+        workspace: str | None = None,
+        user_id: str | int | None = None,
+    ) -> dict | None:
+        """Rename an existing folder"""
+        params = {}
+        self._set_workspace(params, workspace)
+        payload = {"name": new_name}
+        response = await self._request(
+            "PATCH",
+            f"/folders/{folder_id}",
+            json=payload,
+            params=params,
+            headers=self._headers_for_user(user_id),
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        data = self._decode(response)
+        if data.get("success"):
+            return data.get("folder")
+        return None
+
+    async def delete_folder(
+        self,
+        folder_id: int,
+        workspace: str | None = None,
+        user_id: str | int | None = None,
+    ) -> bool:
+        """Delete a folder (moves notes to trash)"""
+        params = {}
+        self._set_workspace(params, workspace)
+        response = await self._request(
+            "DELETE",
+            f"/folders/{folder_id}",
+            params=params,
+            headers=self._headers_for_user(user_id),
+        )
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        data = self._decode(response)
+        return data.get("success", False)
+
+    async def create_workspace(self, name: str, user_id: str | int | None = None) -> dict | None:
+        """Create a new workspace"""
+        payload = {"name": name}
+        response = await self._request("POST", "/workspaces", json=payload, headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        if data.get("success"):
+            return data
+        return None
+
+    async def rename_workspace(self, current_name: str, new_name: str, user_id: str | int | None = None) -> dict | None:
+        """Rename an existing workspace"""
+        payload = {"new_name": new_name}
+        response = await self._request("PATCH", f"/workspaces/{current_name}", json=payload, headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        if data.get("success"):
+            return data
+        return None
+
+    async def delete_workspace(self, name: str, user_id: str | int | None = None) -> bool:
+        """Delete a workspace (cannot delete the last one)"""
+        response = await self._request("DELETE", f"/workspaces/{name}", headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        return data.get("success", False)
+
+    async def delete_backup(self, filename: str) -> bool:
+        """Delete a backup file"""
+        response = await self._request("DELETE", f"/backups/{filename}")
+        response.raise_for_status()
+        data = self._decode(response)
+        return data.get("success", False)
+
+    # ------------------------------------------------------------------
+    # Reminders
+    # ------------------------------------------------------------------
+
+    async def get_reminder(self, note_id: int, user_id: str | int | None = None) -> dict | None:
+        """Get the reminder currently set on a note"""
+        response = await self._request("GET", f"/notes/{note_id}/reminder", headers=self._headers_for_user(user_id))
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        data = self._decode(response)
+        if data.get("success"):
+            self._feed_views("set_reminder", user_id, note_id, data)
+            return data
+        return None
+
+    async def set_reminder(
+        self,
+        note_id: int,
+        reminder_at: str,
+        message: str | None = None,
+        email_enabled: bool | None = None,
+        recurrence: str | None = None,
+        user_id: str | int | None = None,
+    ) -> dict | None:
+        """Set (or replace) the reminder of a note"""
+        payload: dict = {"reminder_at": reminder_at}
+        if message is not None:
+            payload["message"] = message
+        if email_enabled is not None:
+            payload["email_enabled"] = email_enabled
+        if recurrence is not None:
+            payload["recurrence"] = recurrence
+
+        response = await self._request(
+            "POST",
+            f"/notes/{note_id}/reminder",
+            json=payload,
+            headers=self._headers_for_user(user_id),
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        data = self._decode(response)
+        if data.get("success"):
+            self._feed_views("set_reminder", user_id, note_id, data)
+            return data
+        return None
+
+    async def remove_reminder(self, note_id: int, user_id: str | int | None = None) -> bool:
+        """Remove the reminder of a note"""
+        response = await self._request("DELETE", f"/notes/{note_id}/reminder", headers=self._headers_for_user(user_id))
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        success = self._decode(response).get("success", False)
+        if success:
+            self._feed_views("set_reminder", user_id, note_id, None)
+        return success
+
+    # ------------------------------------------------------------------
+    # Tasks (inside a tasklist note)
+    # ------------------------------------------------------------------
+
+    async def list_all_tasks(self, user_id: str | int | None = None) -> tuple[list[dict], list[dict], str | None] | None:
+        """List the tasks of every note and checklist: (notes, checklists, ETag of the listing)"""
+        response = await self._request("GET", "/tasks", headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        if data.get("success"):
+            return data.get("notes", []), data.get("checklists", []), response.headers.get("etag")
+        return None
+
+    async def list_tasks(self, note_id: int, user_id: str | int | None = None) -> dict | None:
+        """List the tasks of one tasklist note"""
+        response = await self._request("GET", f"/notes/{note_id}/tasks", headers=self._headers_for_user(user_id))
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        data = self._decode(response)
+        if data.get("success"):
+            return data
+        return None
+
+    async def add_task(
+        self,
+        note_id: int,
+        text: str,
+        due_at: str | None = None,
+        reminder: bool | None = None,
+        reminder_email: bool | None = None,
+        recurrence: str | None = None,
+        important: bool | None = None,
+        completed: bool | None = None,
+        user_id: str | int | None = None,
+    ) -> dict | None:
+        """Append a task to a tasklist note"""
+        payload: dict = {"text": text}
+        for key, value in (
+            ("due_at", due_at),
+            ("reminder", reminder),
+            ("reminder_email", reminder_email),
+            ("recurrence", recurrence),
+            ("important", important),
+            ("completed", completed),
+        ):
+            if value is not None:
+                payload[key] = value
+
+        response = await self._request(
+            "POST",
+            f"/notes/{note_id}/tasks",
+            json=payload,
+            headers=self._headers_for_user(user_id),
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        data = self._decode(response)
+        if data.get("success"):
+            self._feed_views("put_task", user_id, note_id, data.get("task"))
+            return data.get("task")
+        return None
+
+    async def update_task(
+        self,
+        note_id: int,
+        task_id: str,
+        fields: dict,
+        user_id: str | int | None = None,
+    ) -> dict | None:
+        """Update one task of a tasklist note.
+
+        ``fields`` is passed through as-is so callers can explicitly send
+        ``due_at: None`` to clear a due date (a value distinct from omitting it).
+        """
+        response = await self._request(
+            "PATCH",
+            f"/notes/{note_id}/tasks/{task_id}",
+            json=fields,
+            headers=self._headers_for_user(user_id),
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        data = self._decode(response)
+        if data.get("success"):
+            self._feed_views("put_task", user_id, note_id, data.get("task"))
+            return data.get("task")
+        return None
+
+    async def delete_task(self, note_id: int, task_id: str, user_id: str | int | None = None) -> bool:
+        """Delete one task of a tasklist note"""
+        response = await self._request(
+            "DELETE",
+            f"/notes/{note_id}/tasks/{task_id}",
+            headers=self._headers_for_user(user_id),
+        )
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        success = self._decode(response).get("success", False)
+        if success:
+            self._feed_views("remove_task", user_id, note_id, task_id)
+        return success
+
+    async def list_shared(self, workspace: str | None = None, user_id: str | int | None = None) -> dict:
+        """List all shared notes and folders (cached, see metacache.py)"""
+        return await self._cached_metadata("shared", workspace, user_id, lambda: self._list_shared(workspace, user_id))
+
+    async def _list_shared(self, workspace: str | None = None, user_id: str | int | None = None) -> dict:
+        """List all shared notes and folders"""
+        params = {}
+        self._set_workspace(params, workspace)
+        response = await self._request("GET", "/shared", params=params, headers=self._headers_for_user(user_id))
+        response.raise_for_status()
+        data = self._decode(response)
+        if data.get("success"):
+            return {
+                "shared_notes": data.get("shared_notes", []),
+                "shared_folders": data.get("shared_folders", []),
+            }
+        return {"shared_notes": [], "shared_folders": []}
+    
+    async def aclose(self):
+        """Close the HTTP client"""
+        await self.client.aclose()
+        if self.disk_cache is not None:
+            self.disk_cache.close()
@@ -0,0 +1,108 @@
+"""
+JSON encoding and decoding for API responses and tool results
+
+orjson, or else msgspec, is used when installed, with the standard library
+as the fallback (pip install 'poznote-mcp-server[fast-json]' adds orjson).
+POZNOTE_JSON_CODEC=orjson|msgspec|stdlib picks one explicitly. Every backend
+writes the same JSON: non-ASCII characters are kept as is, and output is
+indented by two spaces unless compact output is enabled
+(POZNOTE_COMPACT_JSON=true or `poznote-mcp serve --compact-json`).
+"""
+
+import json
+import logging
+import os
+
+logger = logging.getLogger("poznote-mcp.codec")
+
+
+def _stdlib():
+    def dumps(obj, compact: bool) -> str:
+        if compact:
+            return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+
+    return json.loads, dumps
+
+
+def _orjson():
+    import orjson
+
+    compact_options = orjson.OPT_NON_STR_KEYS
+    indent_options = compact_options | orjson.OPT_INDENT_2
+
+    def dumps(obj, compact: bool) -> str:
+        return orjson.dumps(obj, option=compact_options if compact else indent_options).decode()
+
+    return orjson.loads, dumps
+
+
+def _msgspec():
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    def loads(data):
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as exc:
+            raise ValueError(str(exc)) from exc
+
+    def dumps(obj, compact: bool) -> str:
+        data = encoder.encode(obj)
+        if not compact:
+            data = msgspec.json.format(data, indent=2)
+        return data.decode()
+
+    return loads, dumps
+
+
+_BACKENDS = {"orjson": _orjson, "msgspec": _msgspec, "stdlib": _stdlib}
+
+backend = "stdlib"
+_loads, _dumps = _stdlib()
+_compact = False
+
+
+def use(name: str = "auto") -> str:
+    """Select the JSON backend ("auto" picks the fastest installed); returns its name"""
+    global backend, _loads, _dumps
+    if name not in _BACKENDS and name != "auto":
+        logger.warning("Unknown JSON codec %r; expected orjson, msgspec, stdlib or auto.", name)
+        name = "auto"
+    candidates = ["orjson", "msgspec", "stdlib"] if name == "auto" else [name, "stdlib"]
+    for candidate in candidates:
+        try:
+            _loads, _dumps = _BACKENDS[candidate]()
+        except ImportError:
+            if candidate == name:
+                logger.warning("JSON codec %r is not installed; falling back to the standard library.", name)
+            continue
+        backend = candidate
+        break
+    return backend
+
+
+def set_compact(enabled: bool) -> None:
+    """Write tool results without indentation"""
+    global _compact
+    _compact = enabled
+
+
+def compact_output() -> bool:
+    return _compact
+
+
+def loads(data: bytes | str):
+    """Decode a JSON document"""
+    return _loads(data)
+
+
+def dumps(obj, compact: bool | None = None) -> str:
+    """Encode obj as JSON text, indented unless compact output is on"""
+    return _dumps(obj, _compact if compact is None else compact)
+
+
+use(os.getenv("POZNOTE_JSON_CODEC", "auto"))
+set_compact(os.getenv("POZNOTE_COMPACT_JSON") == "true")
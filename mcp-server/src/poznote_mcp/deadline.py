@@ -0,0 +1,104 @@
+"""
+Deadline budgets for MCP tool calls
+
+A tool call gets one time budget for all the API requests it makes. The
+deadline lives in a context variable, so it follows the call through the
+client without being threaded through every method signature, and each
+request's timeout is cut down to whatever is left of the budget. A compound
+tool (e.g. create_note with a reminder) therefore returns within its budget
+instead of spending a full timeout on every request.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import httpx
+
+_deadline: ContextVar[float | None] = ContextVar("poznote_deadline", default=None)
+_budget: ContextVar[float | None] = ContextVar("poznote_deadline_budget", default=None)
+
+
+class DeadlineExceeded(httpx.TimeoutException):
+    """The tool call ran out of its time budget"""
+
+    def __init__(self, budget: float | None = None):
+        self.budget = budget
+        message = "Tool call deadline exceeded"
+        if budget is not None:
+            message += f" ({budget:g}s budget)"
+        super().__init__(message)
+
+
+@contextmanager
+def deadline(seconds: float | None):
+    """Run the enclosed calls with a budget of `seconds` (None: no deadline).
+
+    Nesting never extends an outer deadline.
+    """
+    if seconds is None:
+        yield
+        return
+    expires = time.monotonic() + seconds
+    outer = _deadline.get()
+    if outer is not None and outer <= expires:
+        yield
+        return
+    deadline_token = _deadline.set(expires)
+    budget_token = _budget.set(seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(deadline_token)
+        _budget.reset(budget_token)
+
+
+@contextmanager
+def detached():
+    """Run the enclosed calls without the caller's deadline
+
+    For background work started from a tool call, which inherits its context
+    but must not be cut short when the call returns.
+    """
+    deadline_token = _deadline.set(None)
+    budget_token = _budget.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(deadline_token)
+        _budget.reset(budget_token)
+
+
+def remaining() -> float | None:
+    """Seconds left in the current budget, or None without a deadline"""
+    expires = _deadline.get()
+    if expires is None:
+        return None
+    return expires - time.monotonic()
+
+
+def exceeded() -> DeadlineExceeded:
+    return DeadlineExceeded(_budget.get())
+
+
+def bound_request(kwargs: dict, default_timeout: float) -> tuple[dict, bool]:
+    """Cap a request's timeout to the remaining budget.
+
+    Returns the request kwargs and whether the budget, not the request's own
+    timeout, is what limits it. Raises DeadlineExceeded once nothing is left.
+    """
+    left = remaining()
+    if left is None:
+        return kwargs, False
+    if left <= 0:
+        raise exceeded()
+    timeout = kwargs.get("timeout", default_timeout)
+    if timeout is not None and timeout <= left:
+        return kwargs, False
+    return {**kwargs, "timeout": left}, True
+
+
+def allows(delay: float) -> bool:
+    """Whether waiting `delay` seconds still leaves time for another request"""
+    left = remaining()
+    return left is None or delay < left
@@ -0,0 +1,167 @@
+"""
+Persistent cache tier in a SQLite file, so that a restarted server starts warm
+
+The in-memory caches are empty after every restart, and the first minutes
+after a deploy would otherwise download every note and list again. When
+POZNOTE_DISK_CACHE names a file, two things are also written there, per user:
+
+- the bodies kept for conditional GETs (httpcache.py) with their ETag, which
+  for notes includes the version token. After a restart they are loaded on
+  first use and revalidated with If-None-Match like any other stored body,
+  so a 304 is all it takes to serve them;
+- the decoded metadata lists (metacache.py). After a restart they are served
+  right away as stale entries and refreshed in the background.
+
+The file is capped at a total payload size and the least recently used
+entries are deleted first. It is a cache: losing or deleting it is harmless.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+
+from . import codec
+
+logger = logging.getLogger("poznote-mcp.diskcache")
+
+HTTP = "http"
+METADATA = "meta"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    kind TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    version TEXT,
+    meta TEXT,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored REAL NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (kind, user_id, key)
+);
+CREATE INDEX IF NOT EXISTS entries_used ON entries (used);
+"""
+
+
+class DiskEntry:
+    __slots__ = ("version", "meta", "body", "stored")
+
+    def __init__(self, version: str | None, meta, body: bytes, stored: float):
+        self.version = version
+        self.meta = meta
+        self.body = body
+        self.stored = stored
+
+
+class DiskCache:
+    """Size-capped LRU store in SQLite, keyed by (kind, user_id, key)"""
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        self._counts = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "evicted_bytes": 0}
+
+    @staticmethod
+    def encode_key(key) -> str:
+        return codec.dumps(key, compact=True)
+
+    def get(self, kind: str, user_id: str, key) -> DiskEntry | None:
+        key = self.encode_key(key)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT version, meta, body, stored FROM entries WHERE kind = ? AND user_id = ? AND key = ?",
+                (kind, str(user_id), key),
+            ).fetchone()
+            if row is None:
+                self._counts["misses"] += 1
+                return None
+            self._db.execute(
+                "UPDATE entries SET used = ? WHERE kind = ? AND user_id = ? AND key = ?",
+                (time.time(), kind, str(user_id), key),
+            )
+            self._counts["hits"] += 1
+        version, meta, body, stored = row
+        return DiskEntry(version, codec.loads(meta) if meta else None, bytes(body), stored)
+
+    def put(self, kind: str, user_id: str, key, body: bytes, version: str | None = None, meta=None) -> None:
+        key = self.encode_key(key)
+        meta = codec.dumps(meta, compact=True) if meta is not None else None
+        size = len(body) + len(key) + len(meta or "")
+        if size > self.max_bytes:
+            self.delete(kind, user_id, key, encoded=True)
+            return
+        now = time.time()
+        with self._lock:
+            previous = self._db.execute(
+                "SELECT size FROM entries WHERE kind = ? AND user_id = ? AND key = ?", (kind, str(user_id), key)
+            ).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (kind, user_id, key, version, meta, body, size, stored, used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (kind, str(user_id), key, version, meta, body, size, now, now),
+            )
+            self._bytes += size - (previous[0] if previous else 0)
+            self._counts["writes"] += 1
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def delete(self, kind: str, user_id: str, key, encoded: bool = False) -> None:
+        key = key if encoded else self.encode_key(key)
+        where = (kind, str(user_id), key)
+        with self._lock:
+            row = self._db.execute("SELECT size FROM entries WHERE kind = ? AND user_id = ? AND key = ?", where).fetchone()
+            if row:
+                self._db.execute("DELETE FROM entries WHERE kind = ? AND user_id = ? AND key = ?", where)
+                self._bytes -= row[0]
+
+    def delete_all(self, kind: str, user_id: str | None = None) -> None:
+        """Delete every entry of a kind, for one user or for everyone"""
+        where, args = ("kind = ?", (kind,)) if user_id is None else ("kind = ? AND user_id = ?", (kind, str(user_id)))
+        with self._lock:
+            freed = self._db.execute(f"SELECT COALESCE(SUM(size), 0) FROM entries WHERE {where}", args).fetchone()[0]
+            self._db.execute(f"DELETE FROM entries WHERE {where}", args)
+            self._bytes -= freed
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the store fits (lock held)"""
+        while self._bytes > self.max_bytes:
+            victims, freed = [], 0
+            for rowid, size in self._db.execute("SELECT rowid, size FROM entries ORDER BY used LIMIT 64").fetchall():
+                victims.append((rowid,))
+                freed += size
+                if self._bytes - freed <= self.max_bytes:
+                    break
+            if not victims:
+                break
+            self._db.executemany("DELETE FROM entries WHERE rowid = ?", victims)
+            self._bytes -= freed
+            self._counts["evictions"] += len(victims)
+            self._counts["evicted_bytes"] += freed
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            return {"entries": entries, "bytes": self._bytes, "max_bytes": self.max_bytes, **self._counts}
+
+
+def open_disk_cache(path: str | None, max_bytes: int) -> DiskCache | None:
+    """Open the cache file, or return None (with a warning) when it cannot be used"""
+    if not path:
+        return None
+    try:
+        return DiskCache(path, max_bytes)
+    except sqlite3.Error as exc:
+        logger.warning("Cannot use %s as the disk cache, continuing without it: %s", path, exc)
+        return None
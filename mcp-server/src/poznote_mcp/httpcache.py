@@ -0,0 +1,164 @@
+"""
+Conditional-request cache for GET responses of the Poznote API
+
+Bodies of a few frequently re-read endpoints are kept together with their
+validators, keyed by path, query and acting user. The next GET for the same
+key carries If-None-Match / If-Modified-Since, and a 304 answer is served
+from the stored body instead of downloading and decoding it again. The API
+stays the source of truth: nothing is served without asking it first.
+
+The API answers these reads with a weak ETag, W/"<md5 of the body>", and
+honors it in If-None-Match (see src/api/v1/index.php). The client computes
+the same tag from the body it holds. This matters for notes: their ETag
+header is the note version token used for If-Match writes, and that token
+does not change with the reminder, color or icon, so a 304 based on it
+could serve stale metadata. The version ETag is still sent along. The note
+listing (GET /notes) is not revalidated: the API would have to render all of
+it before answering, where list_notes stops reading after the first page.
+
+With a disk tier (diskcache.py), stored bodies are also written to disk and
+loaded from there on a memory miss, e.g. after a restart.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+import httpx
+
+from .diskcache import HTTP, DiskCache
+
+# Endpoints whose responses are worth revalidating instead of re-downloading
+CACHEABLE_PATHS = re.compile(r"^/(notes/\d+|folders|tags|workspaces|trash)$")
+
+# Response headers kept with a body, enough to rebuild the response
+_KEPT_HEADERS = ("content-type", "etag", "last-modified")
+
+
+def body_etag(content: bytes) -> str:
+    """Weak ETag of a response body, as computed by the API"""
+    return f'W/"{hashlib.md5(content, usedforsecurity=False).hexdigest()}"'
+
+
+class _Entry:
+    __slots__ = ("etag", "last_modified", "headers", "content")
+
+    def __init__(self, etag: str, last_modified: str | None, headers: dict, content: bytes):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.headers = headers
+        self.content = content
+
+    @property
+    def size(self) -> int:
+        return len(self.content) + sum(len(name) + len(value) for name, value in self.headers.items())
+
+
+class ConditionalCache:
+    """LRU store of validated response bodies, bounded by total size in bytes"""
+
+    def __init__(self, max_bytes: int, disk: DiskCache | None = None):
+        self.max_bytes = max_bytes
+        self.disk = disk
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "disk_hits": 0, "not_modified": 0, "evictions": 0}
+
+    @staticmethod
+    def cacheable(path: str) -> bool:
+        return bool(CACHEABLE_PATHS.match(path))
+
+    def lookup(self, key: tuple) -> _Entry | None:
+        """Stored entry for a GET about to be sent, counted as hit or miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._counts["hits"] += 1
+                return entry
+        stored = self.disk.get(HTTP, key[-1], key) if self.disk is not None else None
+        with self._lock:
+            if stored is None:
+                self._counts["misses"] += 1
+                return None
+            self._counts["hits"] += 1
+            self._counts["disk_hits"] += 1
+        entry = _Entry(stored.version, stored.meta.get("last_modified"), stored.meta["headers"], stored.body)
+        self._store(key, entry)
+        return entry
+
+    @staticmethod
+    def conditional_headers(entry: _Entry, headers: dict | None) -> dict:
+        """Request headers extended with the entry's validators"""
+        headers = dict(headers or {})
+        headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def resolve(self, key: tuple, entry: _Entry | None, response: httpx.Response) -> httpx.Response:
+        """Turn the API's answer into the response callers see, updating the store
+
+        A 304 is answered from the entry, a 200 replaces it, and anything else
+        drops it.
+        """
+        if response.status_code == 304 and entry is not None:
+            with self._lock:
+                self._counts["not_modified"] += 1
+            return httpx.Response(200, headers=entry.headers, content=entry.content, request=response.request)
+
+        if response.status_code != 200:
+            self._discard(key)
+            if self.disk is not None:
+                self.disk.delete(HTTP, key[-1], key)
+            return response
+
+        etag = body_etag(response.content)
+        header_etag = response.headers.get("etag")
+        if header_etag and header_etag != etag:
+            etag = f"{etag}, {header_etag}"
+        last_modified = response.headers.get("last-modified")
+
+        headers = {name: response.headers[name] for name in _KEPT_HEADERS if name in response.headers}
+        self._store(key, _Entry(etag, last_modified, headers, response.content))
+        if self.disk is not None:
+            meta = {"last_modified": last_modified, "headers": headers}
+            self.disk.put(HTTP, key[-1], key, response.content, version=etag, meta=meta)
+        return response
+
+    def _store(self, key: tuple, entry: _Entry) -> None:
+        size = entry.size
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            if size > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self._counts["evictions"] += 1
+
+    def _discard(self, key: tuple) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                **self._counts,
+            }
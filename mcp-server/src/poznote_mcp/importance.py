@@ -0,0 +1,237 @@
+"""
+PageRank, degrees and connected components of the link graph, with NumPy
+
+traverse_links walks the links around one note; note_importance tells which
+notes are central to all of them. Both read the link graph (linkgraph.py).
+
+- The graph is turned into two arrays of note positions, the source and the
+  target of every link, ignoring links to notes that are not there.
+- In and out degrees are counts of each position in them (np.bincount).
+- PageRank is computed by power iteration: each step spreads every note's
+  rank over its links with one weighted bincount, and the rank of notes
+  without links (dangling notes) over every note. It stops once the ranks
+  change by less than TOLERANCE in total, after MAX_ITERATIONS at most.
+- Connected components ignore the direction of links. Each note starts as
+  its own component; every pass hooks the component of one end of each link
+  to the other's, lowest label first, then shortens label chains until each
+  points to its root. A few passes are enough, whatever the graph's diameter.
+  Components are numbered from the largest, 0, down.
+
+A result is computed for one version of a user's graph and kept until the
+graph changes: a note re-synced without link changes keeps it, a link added
+or removed, or a note created or deleted, does not. 100k notes and 1M links
+take under half a second (benchmarks/bench_note_importance.py).
+
+NumPy is optional: pip install 'poznote-mcp-server[graph]'.
+"""
+
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the installed extras
+    np = None
+
+DAMPING = 0.85
+# Sum of the rank changes of one iteration under which PageRank has converged
+TOLERANCE = 1e-6
+MAX_ITERATIONS = 100
+ORDERS = ("pagerank", "in_degree", "out_degree")
+# Notes looked up at a time while filtering the top notes by workspace
+_CHUNK = 256
+
+
+def available() -> bool:
+    """Whether NumPy is installed"""
+    return np is not None
+
+
+def _rounded(value: float) -> float:
+    return float(f"{value:.4g}")
+
+
+class Importance:
+    """PageRank, degrees and components of one version of a user's graph"""
+
+    def __init__(self, version: int, ids, sources, targets, damping: float, tolerance: float, max_iterations: int):
+        started = time.perf_counter()
+        self.version = version
+        self.ids = ids
+        size = len(ids)
+        self.links = len(sources)
+        self.out_degree = np.bincount(sources, minlength=size)
+        self.in_degree = np.bincount(targets, minlength=size)
+        self.pagerank, self.iterations = self._pagerank(sources, targets, damping, tolerance, max_iterations)
+        self.component, self.sizes = self._components(sources, targets)
+        self._sorted = np.argsort(ids, kind="stable")
+        self._orders: dict[str, object] = {}
+        self.seconds = time.perf_counter() - started
+
+    def _pagerank(self, sources, targets, damping: float, tolerance: float, max_iterations: int):
+        size = len(self.ids)
+        if not size:
+            return np.zeros(0), 0
+        rank = np.full(size, 1.0 / size)
+        dangling = self.out_degree == 0
+        spread = 1.0 / np.maximum(self.out_degree, 1)
+        iterations = 0
+        while iterations < max_iterations:
+            iterations += 1
+            share = (rank * spread)[sources]
+            updated = np.bincount(targets, weights=share, minlength=size)
+            updated = damping * (updated + rank[dangling].sum() / size) + (1 - damping) / size
+            change = np.abs(updated - rank).sum()
+            rank = updated
+            if change < tolerance:
+                break
+        return rank, iterations
+
+    def _components(self, sources, targets):
+        size = len(self.ids)
+        labels = np.arange(size)
+        while True:
+            low = np.minimum(labels[sources], labels[targets])
+            high = np.maximum(labels[sources], labels[targets])
+            if not (low != high).any():
+                break
+            np.minimum.at(labels, high, low)
+            while True:
+                parents = labels[labels]
+                if (parents == labels).all():
+                    break
+                labels = parents
+        _, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+        by_size = np.argsort(-counts, kind="stable")
+        numbers = np.empty_like(by_size)
+        numbers[by_size] = np.arange(len(by_size))
+        return numbers[inverse.reshape(-1)], counts[by_size]
+
+    def position(self, note_id: int) -> int | None:
+        """The index of a note in the arrays, None if it is not in the graph"""
+        found = int(np.searchsorted(self.ids, note_id, sorter=self._sorted))
+        if found < len(self.ids) and self.ids[self._sorted[found]] == note_id:
+            return int(self._sorted[found])
+        return None
+
+    def order(self, by: str = "pagerank"):
+        """Positions of the notes from the highest `by` down, PageRank breaking ties"""
+        order = self._orders.get(by)
+        if order is None:
+            if by == "pagerank":
+                order = np.argsort(-self.pagerank, kind="stable")
+            else:
+                order = np.lexsort((-self.pagerank, -getattr(self, by)))
+            self._orders[by] = order
+        return order
+
+    def describe(self, index: int) -> dict:
+        component = int(self.component[index])
+        return {
+            "pagerank": _rounded(self.pagerank[index]),
+            # 1.0 is the rank every note would have without links.
+            "relative_rank": round(float(self.pagerank[index] * len(self.ids)), 3),
+            "in_degree": int(self.in_degree[index]),
+            "out_degree": int(self.out_degree[index]),
+            "component": component,
+            "component_size": int(self.sizes[component]),
+        }
+
+    def note(self, note_id: int) -> dict | None:
+        """The figures of one note, with its place in the PageRank order (1 is first)"""
+        index = self.position(note_id)
+        if index is None:
+            return None
+        place = int((self.pagerank > self.pagerank[index]).sum()) + 1
+        return {**self.describe(index), "place": place}
+
+    def top(self, graph, user_id, by: str = "pagerank", limit: int = 10, workspace: str | None = None) -> list[dict]:
+        """The first `limit` notes in the `by` order, with their metadata from the link graph"""
+        found = []
+        order = self.order(by)
+        for start in range(0, len(order), _CHUNK):
+            chunk = order[start:start + _CHUNK]
+            positions = dict(zip(self.ids[chunk].tolist(), chunk.tolist()))
+            for meta in graph.notes(user_id, positions):
+                if workspace is not None and meta["workspace"] != workspace:
+                    continue
+                found.append({**meta, **self.describe(positions[meta["id"]])})
+                if len(found) >= limit:
+                    return found
+        return found
+
+    def summary(self) -> dict:
+        return {
+            "notes": len(self.ids),
+            "links": self.links,
+            "components": len(self.sizes),
+            "largest_components": self.sizes[:5].tolist(),
+            "isolated_notes": int(((self.in_degree == 0) & (self.out_degree == 0)).sum()),
+            "iterations": self.iterations,
+            "seconds": round(self.seconds, 3),
+        }
+
+
+def compute(snapshot, damping: float = DAMPING, tolerance: float = TOLERANCE, max_iterations: int = MAX_ITERATIONS) -> Importance:
+    """The Importance of a LinkGraph.snapshot()"""
+    version, ids, sources, counts, targets = snapshot
+    ids = np.frombuffer(ids, dtype=np.intc).astype(np.int64) if len(ids) else np.zeros(0, dtype=np.int64)
+    sources = np.repeat(np.asarray(sources, dtype=np.int64), np.asarray(counts, dtype=np.int64))
+    targets = np.asarray(targets, dtype=np.int64)
+    # Note ids to positions; links to notes that are not there are left out.
+    sorter = np.argsort(ids, kind="stable")
+    positions = []
+    keep = np.ones(len(targets), dtype=bool)
+    for ends in (sources, targets):
+        found = np.minimum(np.searchsorted(ids, ends, sorter=sorter), max(len(ids) - 1, 0))
+        if len(ids):
+            keep &= ids[sorter[found]] == ends
+            positions.append(sorter[found])
+        else:
+            keep[:] = False
+            positions.append(found)
+    return Importance(version, ids, positions[0][keep], positions[1][keep], damping, tolerance, max_iterations)
+
+
+class ImportanceCache:
+    """The last Importance of each user's link graph, computed again once it changed"""
+
+    def __init__(self):
+        self._results: dict[str, Importance] = {}
+        self._lock = threading.Lock()
+        self._counts = {"computations": 0, "hits": 0}
+
+    def get(self, graph, user_id) -> Importance | None:
+        """The Importance of the user's graph as it is now; None while it is not ready"""
+        user_id = str(user_id)
+        version = graph.version(user_id)
+        if version is None:
+            return None
+        with self._lock:
+            result = self._results.get(user_id)
+            if result is not None and result.version == version:
+                self._counts["hits"] += 1
+                return result
+        snapshot = graph.snapshot(user_id)
+        if snapshot is None:
+            return None
+        result = compute(snapshot)
+        with self._lock:
+            self._results[user_id] = result
+            self._counts["computations"] += 1
+        return result
+
+    def drop(self, user_id=None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._results.clear()
+            else:
+                self._results.pop(str(user_id), None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "users": len(self._results),
+                "slowest_seconds": round(max((result.seconds for result in self._results.values()), default=0.0), 3),
+                **self._counts,
+            }
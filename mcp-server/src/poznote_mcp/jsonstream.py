@@ -0,0 +1,135 @@
+"""
+Incremental decoding of list responses from the Poznote API
+
+List endpoints answer with one JSON object such as
+{"success": true, "notes": [...]}. JSONArrayStream is fed the body chunk by
+chunk (e.g. from response.iter_bytes()) and hands back the items of one
+array member as soon as each is complete. A caller that only needs the first
+few items can stop reading there, instead of decoding the whole payload into
+memory first.
+"""
+
+import codecs
+import json
+from json.decoder import WHITESPACE
+
+_START = "start"
+_OBJECT = "object"
+_COLON = "colon"
+_VALUE = "value"
+_ITEMS = "items"
+_DONE = "done"
+
+_INCOMPLETE = object()
+
+
+class JSONArrayStream:
+    """Push parser yielding the items of `key` in a top-level JSON object"""
+
+    def __init__(self, key: str):
+        self.key = key
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = _START
+        self._member = None
+
+    @property
+    def done(self) -> bool:
+        """True once the array (or the whole object, if it has no such key) was read"""
+        return self._state == _DONE
+
+    def feed(self, chunk: bytes) -> list:
+        """Add a chunk of the body; returns the items it completed"""
+        self._buffer = self._buffer[self._pos:] + self._utf8.decode(chunk)
+        self._pos = 0
+        return self._parse(final=False)
+
+    def close(self) -> list:
+        """Signal the end of the body; raises ValueError if it was cut short"""
+        self._buffer = self._buffer[self._pos:] + self._utf8.decode(b"", final=True)
+        self._pos = 0
+        items = self._parse(final=True)
+        if self._state != _DONE:
+            raise ValueError(f"Truncated JSON response while reading {self.key!r}")
+        return items
+
+    def _skip(self, separators: str = "") -> str | None:
+        """Move past whitespace (and separators); return the next character"""
+        buffer = self._buffer
+        pos = WHITESPACE.match(buffer, self._pos).end()
+        while pos < len(buffer) and buffer[pos] in separators:
+            pos = WHITESPACE.match(buffer, pos + 1).end()
+        self._pos = pos
+        return buffer[pos] if pos < len(buffer) else None
+
+    def _value(self, final: bool):
+        """Decode the value at the cursor, or return _INCOMPLETE"""
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise ValueError(f"Invalid JSON response while reading {self.key!r}") from None
+            return _INCOMPLETE
+        # A number at the very end of the buffer may continue in the next chunk.
+        if end == len(self._buffer) and not final:
+            return _INCOMPLETE
+        self._pos = end
+        return value
+
+    def _parse(self, final: bool) -> list:
+        items = []
+        while self._state != _DONE:
+            if self._state == _START:
+                char = self._skip()
+                if char is None:
+                    break
+                if char != "{":
+                    raise ValueError("Expected a JSON object in the API response")
+                self._pos += 1
+                self._state = _OBJECT
+            elif self._state == _OBJECT:
+                char = self._skip(",")
+                if char is None:
+                    break
+                if char == "}":
+                    self._state = _DONE
+                    break
+                member = self._value(final)
+                if member is _INCOMPLETE:
+                    break
+                self._member = member
+                self._state = _COLON
+            elif self._state == _COLON:
+                char = self._skip()
+                if char is None:
+                    break
+                if char != ":":
+                    raise ValueError("Invalid JSON object in the API response")
+                self._pos += 1
+                self._state = _VALUE
+            elif self._state == _VALUE:
+                char = self._skip()
+                if char is None:
+                    break
+                if self._member == self.key and char == "[":
+                    self._pos += 1
+                    self._state = _ITEMS
+                    continue
+                if self._value(final) is _INCOMPLETE:
+                    break
+                self._state = _OBJECT
+            else:
+                char = self._skip(",")
+                if char is None:
+                    break
+                if char == "]":
+                    self._pos += 1
+                    self._state = _DONE
+                    break
+                item = self._value(final)
+                if item is _INCOMPLETE:
+                    break
+                items.append(item)
+        return items
@@ -0,0 +1,305 @@
+"""
+Graph of the links between notes, for multi-hop traversals in one call
+
+GET /notes/{id}/backlinks reads every note of the workspace to answer for one
+note, one hop away. An agent walking the links around a note made one such
+call per note it reached. The MCP server therefore keeps the graph itself,
+fed by the note sync (sync.py) like the search index, and traverse_links
+walks it in memory.
+
+- Links are found in the content like BacklinksController.php finds them: an
+  internal link (data-note-id="12"), a URL (?note=12 or &note=12), or a wiki
+  link ([[Note title]]) to every note with exactly that title.
+- Each note keeps its outgoing and incoming links as arrays of note ids
+  (array('i'), 4 bytes a link). A note synced again only changes its own
+  links, plus the wiki links to its old and new title when it was renamed.
+- A link to a note that is not there (deleted, in the trash, or not synced
+  yet) is kept, and followed once the note is.
+- A traversal is a breadth-first walk from a note, along outgoing links,
+  incoming ones (backlinks) or both, up to `depth` hops. At most `fan_out`
+  links of each note are followed, and at most MAX_NODES notes returned.
+"""
+
+import re
+import threading
+from array import array
+from itertools import count, islice
+
+DEFAULT_DEPTH = 2
+MAX_DEPTH = 5
+DEFAULT_FAN_OUT = 20
+MAX_NODES = 500
+DIRECTIONS = ("out", "in", "both")
+
+_NOTE_LINK = re.compile(r'data-note-id="(\d+)"|[?&]note=(\d+)(?!\d)')
+_WIKI_LINK = re.compile(r"\[\[([^\[\]]+)\]\]")
+# Versions are unique across users and rebuilds, so a cached result of a
+# dropped graph never matches the graph built after it.
+_VERSIONS = count(1)
+
+
+def parse_links(content) -> tuple[list[int], list[str]]:
+    """The ids a note's content links to, and the titles of its wiki links, in order"""
+    if not isinstance(content, str) or not content:
+        return [], []
+    ids = [int(match.group(1) or match.group(2)) for match in _NOTE_LINK.finditer(content)]
+    titles = [match.group(1) for match in _WIKI_LINK.finditer(content)]
+    return list(dict.fromkeys(ids)), list(dict.fromkeys(titles))
+
+
+class _UserGraph:
+    def __init__(self):
+        # note id -> {"id", "heading", "workspace", "folder"}
+        self.metas: dict[int, dict] = {}
+        self.out: dict[int, array] = {}
+        self.incoming: dict[int, array] = {}
+        # What each note's content names, before wiki titles are resolved
+        self.explicit: dict[int, list[int]] = {}
+        self.wikis: dict[int, list[str]] = {}
+        # title -> notes with that title, and notes with a wiki link to it
+        self.by_title: dict[str, set[int]] = {}
+        self.wiki_refs: dict[str, set[int]] = {}
+        self.links = 0
+        # Bumped when notes or links come and go (see importance.py)
+        self.version = next(_VERSIONS)
+        self.ready = False
+
+    def put(self, note_id: int, meta: dict, explicit: list[int], wikis: list[str]) -> None:
+        old = self.metas.get(note_id)
+        old_title = old["heading"] if old is not None else None
+        if old is None:
+            self.version = next(_VERSIONS)
+        title = meta["heading"]
+        self.metas[note_id] = meta
+        affected: set[int] = set()
+        if title != old_title:
+            for name, change in ((old_title, set.discard), (title, set.add)):
+                if name:
+                    change(self.by_title.setdefault(name, set()), note_id)
+                    affected |= self.wiki_refs.get(name, set())
+            self._prune(self.by_title, old_title)
+        self._set_links(note_id, explicit, wikis)
+        for source in affected - {note_id}:
+            self._relink(source)
+
+    def delete(self, note_id: int) -> None:
+        meta = self.metas.pop(note_id, None)
+        if meta is None:
+            return
+        self.version = next(_VERSIONS)
+        title = meta["heading"]
+        self._set_links(note_id, [], [])
+        if title:
+            self.by_title.get(title, set()).discard(note_id)
+            self._prune(self.by_title, title)
+            for source in self.wiki_refs.get(title, set()).copy():
+                self._relink(source)
+
+    def _set_links(self, note_id: int, explicit: list[int], wikis: list[str]) -> None:
+        for title in self.wikis.get(note_id, ()):
+            self.wiki_refs[title].discard(note_id)
+            self._prune(self.wiki_refs, title)
+        for title in wikis:
+            self.wiki_refs.setdefault(title, set()).add(note_id)
+        self.explicit[note_id] = explicit
+        self.wikis[note_id] = wikis
+        if not explicit:
+            del self.explicit[note_id]
+        if not wikis:
+            del self.wikis[note_id]
+        self._relink(note_id)
+
+    def _relink(self, source: int) -> None:
+        """Resolve a note's links again, and update the incoming links of its targets"""
+        targets = list(self.explicit.get(source, ()))
+        for title in self.wikis.get(source, ()):
+            targets.extend(sorted(self.by_title.get(title, ())))
+        targets = [target for target in dict.fromkeys(targets) if target != source]
+        old = self.out.get(source, array("i"))
+        new = set(targets)
+        for target in set(old) - new:
+            incoming = self.incoming[target]
+            incoming.remove(source)
+            if not incoming:
+                del self.incoming[target]
+        for target in targets:
+            if target not in old:
+                self.incoming.setdefault(target, array("i")).append(source)
+        if len(targets) != len(old) or new.symmetric_difference(old):
+            self.version = next(_VERSIONS)
+        self.links += len(targets) - len(old)
+        if targets:
+            self.out[source] = array("i", targets)
+        else:
+            self.out.pop(source, None)
+
+    @staticmethod
+    def _prune(index: dict, key) -> None:
+        if key in index and not index[key]:
+            del index[key]
+
+    def neighbours(self, note_id: int, direction: str):
+        """(neighbour, link source, link target) of the links of a note in a direction"""
+        if direction in ("out", "both"):
+            for target in self.out.get(note_id, ()):
+                yield target, note_id, target
+        if direction in ("in", "both"):
+            for source in self.incoming.get(note_id, ()):
+                yield source, source, note_id
+
+
+class LinkGraph:
+    """Per-user graphs of the links between notes, safe to share between threads"""
+
+    def __init__(self):
+        self._users: dict[str, _UserGraph] = {}
+        self._lock = threading.Lock()
+        self._counts = {"builds": 0, "traversals": 0, "cold_traversals": 0}
+
+    def _user(self, user_id) -> _UserGraph:
+        user_id = str(user_id)
+        graph = self._users.get(user_id)
+        if graph is None:
+            graph = self._users[user_id] = _UserGraph()
+        return graph
+
+    def ready(self, user_id) -> bool:
+        with self._lock:
+            graph = self._users.get(str(user_id))
+            return graph is not None and graph.ready
+
+    def mark_ready(self, user_id) -> None:
+        """Answer the user's traversals from now on"""
+        with self._lock:
+            self._user(user_id).ready = True
+            self._counts["builds"] += 1
+
+    def add(self, user_id, note: dict) -> None:
+        """Take (or take again) the links of a note as returned by GET /notes/{id}"""
+        note_id = int(note["id"])
+        explicit, wikis = parse_links(note.get("content"))
+        meta = {
+            "id": note_id,
+            "heading": note.get("heading") or "",
+            "workspace": note.get("workspace"),
+            "folder": note.get("folder"),
+        }
+        with self._lock:
+            self._user(user_id).put(note_id, meta, explicit, wikis)
+
+    def remove(self, user_id, note_id: int) -> None:
+        with self._lock:
+            graph = self._users.get(str(user_id))
+            if graph is not None:
+                graph.delete(int(note_id))
+
+    def drop(self, user_id=None) -> None:
+        """Forget a user's graph (everyone's for None); it is built again on demand"""
+        with self._lock:
+            if user_id is None:
+                self._users.clear()
+            else:
+                self._users.pop(str(user_id), None)
+
+    def traverse(
+        self,
+        user_id,
+        note_id: int,
+        direction: str = "out",
+        depth: int = DEFAULT_DEPTH,
+        fan_out: int = DEFAULT_FAN_OUT,
+        workspace: str | None = None,
+        max_nodes: int = MAX_NODES,
+    ) -> tuple[dict | None, list[dict], list[list[int]], bool] | None:
+        """The notes within `depth` links of a note, breadth first
+
+        Returns the note, the notes reached (each with its `depth` and the
+        note it was reached `via`), the links between the notes returned as
+        [source, target], and whether fan_out or max_nodes left notes out.
+        The note is None when it is not in the graph; the whole result is
+        None while the user's graph is not ready.
+        """
+        with self._lock:
+            graph = self._users.get(str(user_id))
+            if graph is None or not graph.ready:
+                self._counts["cold_traversals"] += 1
+                return None
+            self._counts["traversals"] += 1
+            root = graph.metas.get(int(note_id))
+            if root is None:
+                return None, [], [], False
+
+            seen = {root["id"]}
+            nodes: list[dict] = []
+            links: dict[tuple[int, int], None] = {}
+            truncated = False
+            frontier = [root["id"]]
+            for level in range(1, depth + 1):
+                reached = []
+                for current in frontier:
+                    # Hubs have thousands of backlinks: stop reading past fan_out.
+                    found = list(islice(
+                        (
+                            link
+                            for link in graph.neighbours(current, direction)
+                            if link[0] in graph.metas
+                            and (workspace is None or graph.metas[link[0]]["workspace"] == workspace)
+                        ),
+                        fan_out + 1,
+                    ))
+                    if len(found) > fan_out:
+                        found, truncated = found[:fan_out], True
+                    for neighbour, source, target in found:
+                        if neighbour not in seen:
+                            if len(nodes) >= max_nodes:
+                                truncated = True
+                                continue
+                            seen.add(neighbour)
+                            nodes.append({**graph.metas[neighbour], "depth": level, "via": current})
+                            reached.append(neighbour)
+                        links[(source, target)] = None
+                frontier = reached
+                if not frontier:
+                    break
+            return dict(root), nodes, [list(link) for link in links], truncated
+
+    def version(self, user_id) -> int | None:
+        """A number that changes with the user's notes and links; None while the graph is not ready"""
+        with self._lock:
+            graph = self._users.get(str(user_id))
+            return graph.version if graph is not None and graph.ready else None
+
+    def snapshot(self, user_id) -> tuple[int, array, array, array, array] | None:
+        """The user's graph as flat arrays: version, note ids, then the notes
+        with outgoing links, how many each has, and all their targets in turn"""
+        with self._lock:
+            graph = self._users.get(str(user_id))
+            if graph is None or not graph.ready:
+                return None
+            targets = array("i")
+            for outgoing in graph.out.values():
+                targets.extend(outgoing)
+            return (
+                graph.version,
+                array("i", graph.metas),
+                array("i", graph.out),
+                array("i", map(len, graph.out.values())),
+                targets,
+            )
+
+    def notes(self, user_id, note_ids) -> list[dict]:
+        """The notes among `note_ids` still in the graph, in that order"""
+        with self._lock:
+            graph = self._users.get(str(user_id))
+            if graph is None:
+                return []
+            return [dict(graph.metas[note_id]) for note_id in note_ids if note_id in graph.metas]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "users": len(self._users),
+                "notes": sum(len(graph.metas) for graph in self._users.values()),
+                "links": sum(graph.links for graph in self._users.values()),
+                **self._counts,
+            }
@@ -0,0 +1,151 @@
+"""
+Stale-while-revalidate cache of workspace, folder, tag and share lists
+
+Agents list workspaces, folders and tags at the start of almost every task.
+These lists are small and rarely change, so they are kept per user (and per
+workspace where the endpoint takes one) with a TTL per endpoint. A fresh
+entry is served as is. Once it is older than its TTL it is still served right
+away, and one refresh per entry runs in the background; only an entry that
+is also older than `max_stale` makes the caller wait for the API.
+
+Folder and workspace writes made through this client drop the entries they
+affect (see _PoznoteClientBase._invalidate_after_write).
+"""
+
+import threading
+import time
+
+# Seconds a list is served without asking the API again
+DEFAULT_TTLS = {"workspaces": 300.0, "folders": 60.0, "tags": 60.0, "shared": 30.0}
+# Seconds past its TTL a list may still be served while it is refreshed
+DEFAULT_MAX_STALE = 600.0
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+
+def parse_ttls(value: str | None) -> dict[str, float]:
+    """Parse "tags=30,shared=0" into per-endpoint TTLs (0 disables caching)"""
+    ttls = {}
+    for entry in (value or "").split(","):
+        name, _, seconds = entry.strip().partition("=")
+        if not name:
+            continue
+        try:
+            ttl = float(seconds)
+        except ValueError:
+            continue
+        if name in DEFAULT_TTLS and ttl >= 0:
+            ttls[name] = ttl
+    return ttls
+
+
+class _Entry:
+    __slots__ = ("value", "stored")
+
+    def __init__(self, value, stored: float):
+        self.value = value
+        self.stored = stored
+
+
+class MetadataCache:
+    """Per-user metadata lists with per-endpoint TTLs and background refresh"""
+
+    def __init__(self, ttls: dict[str, float] | None = None, max_stale: float = DEFAULT_MAX_STALE, clock=time.monotonic):
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_stale = max_stale
+        self._clock = clock
+        self._entries: dict[tuple, _Entry] = {}
+        self._refreshing: set[tuple] = set()
+        # Bumped by every invalidation, so that a fetch which raced with a
+        # write does not store the list from before the write.
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._counts = {
+            endpoint: {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0}
+            for endpoint in self.ttls
+        }
+
+    @staticmethod
+    def key(endpoint: str, user_id: str, workspace: str | None = None) -> tuple:
+        return (str(user_id), endpoint, workspace or "")
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def enabled(self, endpoint: str) -> bool:
+        return self.ttls.get(endpoint, 0) > 0
+
+    def lookup(self, key: tuple) -> tuple:
+        """(value, state) for key; state is FRESH, STALE or MISS
+
+        A STALE answer means the caller should serve the value and refresh it
+        in the background, unless begin_refresh() says one is already running.
+        """
+        endpoint = key[1]
+        with self._lock:
+            entry = self._entries.get(key)
+            age = None if entry is None else self._clock() - entry.stored
+            counts = self._counts[endpoint]
+            if age is not None and age < self.ttls[endpoint]:
+                counts["hits"] += 1
+                return entry.value, FRESH
+            if age is not None and age < self.ttls[endpoint] + self.max_stale:
+                counts["stale_hits"] += 1
+                return entry.value, STALE
+            counts["misses"] += 1
+            return None, MISS
+
+    def begin_refresh(self, key: tuple) -> bool:
+        """Claim the background refresh of key; False if one is running"""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self._counts[key[1]]["refreshes"] += 1
+            return True
+
+    def end_refresh(self, key: tuple, failed: bool = False) -> None:
+        with self._lock:
+            self._refreshing.discard(key)
+            if failed:
+                self._counts[key[1]]["refresh_errors"] += 1
+
+    def store(self, key: tuple, value, generation: int, stale: bool = False) -> bool:
+        """Store a list fetched at `generation` (see the generation property)
+
+        stale=True stores a list of unknown age, e.g. one read back from disk,
+        to be served once while it is refreshed. Returns False when the list
+        was invalidated since it was fetched, and so not stored.
+        """
+        with self._lock:
+            if generation != self._generation:
+                return False
+            stored = self._clock() - (self.ttls[key[1]] if stale else 0)
+            self._entries[key] = _Entry(value, stored)
+            return True
+
+    def invalidate(self, user_id: str, *endpoints: str) -> None:
+        """Drop a user's lists of the given endpoints (all when none given)"""
+        user_id = str(user_id)
+        with self._lock:
+            self._generation += 1
+            for key in [key for key in self._entries if key[0] == user_id and (not endpoints or key[1] in endpoints)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_stale": self.max_stale,
+                "endpoints": {
+                    endpoint: {"ttl": self.ttls[endpoint], **counts} for endpoint, counts in self._counts.items()
+                },
+            }
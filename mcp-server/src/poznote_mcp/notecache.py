@@ -0,0 +1,156 @@
+"""
+Read-through cache of notes returned by get_note
+
+Agents tend to re-read the same notes several times in one conversation.
+Notes are kept in memory for a short time, keyed by (user_id, workspace,
+note id), together with their version token, and served without asking the
+API again. Each caller gets its own copy, nested lists included, so a tool
+changing the note it got does not change what is cached. The cache is
+bounded by the size of the note payloads rather than their number, and
+least recently used notes go first.
+
+Writes made through this client drop the affected entries (see
+_PoznoteClientBase._invalidate_after_write); the TTL bounds how long a change
+made elsewhere, e.g. in the web UI, can go unnoticed.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Entry:
+    __slots__ = ("note", "version", "size", "expires")
+
+    def __init__(self, note: dict, version: str | None, size: int, expires: float):
+        self.note = note
+        self.version = version
+        self.size = size
+        self.expires = expires
+
+
+class NoteCache:
+    """LRU + TTL store of notes, bounded by total size in bytes"""
+
+    def __init__(self, max_bytes: int, ttl: float, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        # (user_id, note id) -> keys of that note, one per workspace it was read in
+        self._by_note: dict[tuple, set] = {}
+        self._bytes = 0
+        # Bumped by every invalidation so that a read which raced with a write
+        # does not put back what the write just dropped.
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._counts = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "invalidations": 0,
+            "evictions": 0,
+            "evicted_bytes": 0,
+        }
+
+    @staticmethod
+    def key(user_id: str, workspace: str | None, note_id: int | str) -> tuple:
+        return (str(user_id), workspace or "", int(note_id))
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: tuple) -> dict | None:
+        """Cached note for key, counted as hit or miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= self._clock():
+                self._remove(key)
+                self._counts["expired"] += 1
+                entry = None
+            if entry is None:
+                self._counts["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counts["hits"] += 1
+            return copy.deepcopy(entry.note)
+
+    def peek(self, key: tuple) -> dict | None:
+        """Cached note for key, like get() but left out of the statistics and the LRU order"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires <= self._clock():
+                return None
+            return copy.deepcopy(entry.note)
+
+    def version(self, key: tuple) -> str | None:
+        """Version token of the cached note, if any"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.version if entry is not None else None
+
+    def put(self, key: tuple, note: dict, size: int, generation: int, version: str | None = None) -> None:
+        """Store a note read at `generation` (see the generation property)"""
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._remove(key)
+            if size > self.max_bytes:
+                return
+            version = note.get("version") or version
+            self._entries[key] = _Entry(copy.deepcopy(note), version, size, self._clock() + self.ttl)
+            self._by_note.setdefault(key[::2], set()).add(key)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                evicted_key, evicted = next(iter(self._entries.items()))
+                self._remove(evicted_key)
+                self._counts["evictions"] += 1
+                self._counts["evicted_bytes"] += evicted.size
+
+    def invalidate(self, user_id: str, note_id: int | str) -> None:
+        """Drop a note of a user, in every workspace it was read in"""
+        with self._lock:
+            self._generation += 1
+            for key in list(self._by_note.get((str(user_id), int(note_id)), ())):
+                self._remove(key)
+                self._counts["invalidations"] += 1
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Drop every note of a user, e.g. after a workspace was renamed"""
+        with self._lock:
+            self._generation += 1
+            for key in [key for key in self._entries if key[0] == str(user_id)]:
+                self._remove(key)
+                self._counts["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._by_note.clear()
+            self._bytes = 0
+
+    def _remove(self, key: tuple) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry.size
+        keys = self._by_note.get(key[::2])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_note[key[::2]]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counts["hits"] + self._counts["misses"]
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hit_ratio": round(self._counts["hits"] / lookups, 4) if lookups else 0.0,
+                **self._counts,
+            }
@@ -0,0 +1,145 @@
+"""
+Opaque cursors for list_notes and search_notes, over bounded result windows
+
+GET /notes/search returns up to 100 results, with no way to ask for the next
+ones; GET /notes takes a `sort`, a `limit` and the note id to list `after`.
+list_notes used to decode the whole list to return its first `limit` notes,
+and neither tool could go past them.
+
+- A cursor names where a page ended: the id of its last result, the offset
+  after it, and a hash of the query it belongs to (kind, workspace, sort,
+  filters), so that it cannot be replayed against another one. It is
+  base64-encoded JSON; callers only pass it back.
+- A page of list_notes asks GET /notes for the `limit` notes after the id
+  in the cursor, so it reads no more than its own notes. The pages of
+  search_notes, and those of list_notes whose last note is gone (the API
+  answers 404), come from a result window: up to MAX_SEARCH_RESULTS ranked
+  results, or the whole sorted list, kept per user and query for
+  DEFAULT_WINDOW_TTL seconds. A page is then found by the id in the cursor
+  (or its offset, when that note is gone), whatever the size of the window.
+- At most MAX_WINDOWS windows are kept, the least recently used are dropped
+  first, and writes through the client drop the user's windows (see
+  _PoznoteClientBase._invalidate_after_write). A cursor outliving its window
+  builds it again and carries on after the same note.
+"""
+
+import base64
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# Seconds a result window is reused for the next pages
+DEFAULT_WINDOW_TTL = 120.0
+MAX_WINDOWS = 32
+# Ranked results kept for the pages of one search
+MAX_SEARCH_RESULTS = 1000
+# Orders GET /notes accepts in `sort`
+LIST_SORTS = ("updated_desc", "created_desc", "heading_asc")
+
+
+class CursorError(ValueError):
+    """A cursor that is malformed or belongs to another query"""
+
+
+def scope(*parts) -> str:
+    """A short hash of what a cursor's query is made of"""
+    return hashlib.sha1(json.dumps(parts, default=str).encode()).hexdigest()[:12]
+
+
+def encode_cursor(kind: str, query_scope: str, last_id, offset: int) -> str:
+    data = json.dumps({"k": kind, "q": query_scope, "id": last_id, "n": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, kind: str, query_scope: str) -> dict:
+    """The position a cursor of `kind` holds; raises CursorError"""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        valid = isinstance(data, dict) and isinstance(data.get("n"), int) and data["n"] >= 0
+    except ValueError:
+        valid = False
+    if not valid or data.get("k") != kind:
+        raise CursorError("Invalid cursor")
+    if data.get("q") != query_scope:
+        raise CursorError("This cursor belongs to another query; start again without it")
+    return data
+
+
+class _Window:
+    __slots__ = ("items", "source", "positions", "stored")
+
+    def __init__(self, items: list, source: str | None, stored: float):
+        self.items = items
+        # Where the items came from, e.g. "index" or "api" for a search
+        self.source = source
+        # id -> offset, built on the first cursor lookup
+        self.positions: dict | None = None
+        self.stored = stored
+
+
+class ResultWindows:
+    """Sorted or ranked results kept per user and query for their next pages"""
+
+    def __init__(self, ttl: float = DEFAULT_WINDOW_TTL, max_windows: int = MAX_WINDOWS, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_windows = max_windows
+        self._clock = clock
+        self._windows: OrderedDict[tuple, _Window] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def key(user_id, kind: str, query_scope: str) -> tuple:
+        return (str(user_id), kind, query_scope)
+
+    def get(self, key: tuple) -> _Window | None:
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or self._clock() - window.stored > self.ttl:
+                self._windows.pop(key, None)
+                self._counts["misses"] += 1
+                return None
+            self._windows.move_to_end(key)
+            self._counts["hits"] += 1
+            return window
+
+    def put(self, key: tuple, items: list, source: str | None = None) -> _Window:
+        window = _Window(items, source, self._clock())
+        with self._lock:
+            self._windows[key] = window
+            self._windows.move_to_end(key)
+            while len(self._windows) > self.max_windows:
+                self._windows.popitem(last=False)
+                self._counts["evictions"] += 1
+        return window
+
+    def drop(self, user_id=None) -> None:
+        """Forget a user's windows (everyone's for None)"""
+        with self._lock:
+            if user_id is None:
+                self._windows.clear()
+                return
+            for key in [key for key in self._windows if key[0] == str(user_id)]:
+                del self._windows[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "windows": len(self._windows),
+                "items": sum(len(window.items) for window in self._windows.values()),
+                **self._counts,
+            }
+
+
+def page(window: _Window, position: dict | None, limit: int) -> tuple[list, int]:
+    """The `limit` items after a cursor's position, and the offset after them"""
+    start = 0
+    if position is not None:
+        if window.positions is None:
+            window.positions = {item.get("id"): offset for offset, item in enumerate(window.items)}
+        found = window.positions.get(position["id"])
+        start = found + 1 if found is not None else min(position["n"], len(window.items))
+    end = start + max(0, limit)
+    return window.items[start:end], end
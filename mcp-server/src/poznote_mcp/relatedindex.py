@@ -0,0 +1,431 @@
+"""
+Hashed TF-IDF vectors of notes in a NumPy matrix, behind related_notes
+
+search_notes finds notes containing given words; related_notes finds the
+notes that read like a given one, without a network call, a model or a GPU:
+
+- Each note is a vector of float32 values (256 unless
+  POZNOTE_RELATED_DIMENSIONS says otherwise). Its words, the title and tags
+  counted more with the search index boosts, are hashed into them with
+  CRC32, and one bit of the hash gives each word a sign, so that two words
+  landing in the same slot tend to cancel out rather than add up.
+- Word counts are damped (1 + log count) and weighted by the inverse of how
+  many notes use the slot (IDF), so common words say little.
+- Rows are L2-normalized: the similarity of two notes is the dot product of
+  their rows, and the notes related to one are a single matrix-vector
+  product followed by a partial sort, about 10 ms for 100k notes
+  (benchmarks/bench_related_notes.py).
+
+Rows are updated one at a time as the note sync (sync.py) hands notes over.
+All rows share one IDF vector; when the number of notes has changed by a
+quarter since it was computed, every row is weighted again in place. This
+needs no word counts: a row divided by its old weights and multiplied by the
+new ones only differs from the exact vector by its length, which the
+normalization removes.
+
+With a directory set (POZNOTE_RELATED_INDEX_DIR), each user's matrix is a
+memory-mapped file there, next to a JSON file mapping its rows to notes. A
+restarted server answers from them right away; the rows are confirmed by the
+next full sync, and the ones it did not see are dropped. Like the disk
+cache, the files can be deleted at any time.
+
+NumPy is optional: pip install 'poznote-mcp-server[related]'.
+"""
+
+import logging
+import os
+import re
+import threading
+import zlib
+from collections import Counter
+from functools import lru_cache
+
+from . import codec
+from .searchindex import DEFAULT_BOOSTS, note_text, tokenize
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the installed extras
+    np = None
+
+logger = logging.getLogger("poznote-mcp.relatedindex")
+
+DEFAULT_DIMENSIONS = 256
+# Rows allocated at first, then doubled as needed
+INITIAL_CAPACITY = 1024
+# Change in the number of notes after which the rows are weighted again
+REWEIGHT_FACTOR = 1.25
+# Similarity below which two notes only share hash collisions and stop words
+MIN_SCORE = 0.05
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_-]")
+
+
+def available() -> bool:
+    """Whether NumPy is installed"""
+    return np is not None
+
+
+@lru_cache(maxsize=1 << 16)
+def _hash(term: str) -> int:
+    """A hash of the word that, unlike hash(), is the same on every run"""
+    return zlib.crc32(term.encode())
+
+
+class _UserVectors:
+    """The matrix of one user's notes and what its rows hold"""
+
+    def __init__(self, dimensions: int, path: str | None, capacity: int = INITIAL_CAPACITY, fresh: bool = True):
+        self.dimensions = dimensions
+        self.path = path
+        self.rows = self._open(capacity, fresh) if path else np.zeros((capacity, dimensions), np.float32)
+        self.live = np.zeros(capacity, bool)
+        self.spaces = np.zeros(capacity, np.int32)
+        # Rows in use, including freed ones below the highest
+        self.size = 0
+        self.slots: dict[int, int] = {}
+        self.metas: list[dict | None] = []
+        self.free: list[int] = []
+        self.workspaces: dict[str | None, int] = {None: 0}
+        # Notes using each dimension, and the weights the rows were made with
+        self.df = np.zeros(dimensions, np.int64)
+        self.idf = np.ones(dimensions, np.float32)
+        self.weighted_at = 0
+        # Notes added since the rows were loaded from disk; None if they were not
+        self.confirmed: set[int] | None = None
+        self.ready = False
+        self.dirty = False
+
+    @property
+    def capacity(self) -> int:
+        return len(self.live)
+
+    def _open(self, capacity: int, fresh: bool):
+        """Map the rows file, grown (with zeros) or cut to `capacity` rows"""
+        with open(self.path, "wb" if fresh else "r+b") as file:
+            file.truncate(capacity * self.dimensions * 4)
+        return np.memmap(self.path, np.float32, "r+", shape=(capacity, self.dimensions))
+
+    def reserve(self, needed: int) -> None:
+        if needed <= self.capacity:
+            return
+        old = self.capacity
+        capacity = max(needed, old * 2)
+        if self.path is None:
+            rows = np.zeros((capacity, self.dimensions), np.float32)
+            rows[:old] = self.rows
+            self.rows = rows
+        else:
+            self.rows.flush()
+            del self.rows
+            self.rows = self._open(capacity, fresh=False)
+        self.live = np.concatenate([self.live, np.zeros(capacity - old, bool)])
+        self.spaces = np.concatenate([self.spaces, np.zeros(capacity - old, np.int32)])
+
+    def workspace_code(self, workspace: str | None) -> int:
+        code = self.workspaces.get(workspace)
+        if code is None:
+            code = self.workspaces[workspace] = len(self.workspaces)
+        return code
+
+    def put(self, note_id: int, row, meta: dict) -> None:
+        slot = self.slots.get(note_id)
+        if slot is None:
+            if self.free:
+                slot = self.free.pop()
+            else:
+                slot = self.size
+                self.reserve(slot + 1)
+                self.size += 1
+                self.metas.append(None)
+            self.slots[note_id] = slot
+        else:
+            self.df -= self.rows[slot] != 0
+        self.rows[slot] = row
+        self.df += row != 0
+        self.live[slot] = True
+        self.spaces[slot] = self.workspace_code(meta.get("workspace"))
+        self.metas[slot] = meta
+        if self.confirmed is not None:
+            self.confirmed.add(note_id)
+        self.dirty = True
+
+    def remove(self, note_id: int) -> bool:
+        slot = self.slots.pop(note_id, None)
+        if slot is None:
+            return False
+        self.df -= self.rows[slot] != 0
+        self.rows[slot] = 0
+        self.live[slot] = False
+        self.metas[slot] = None
+        self.free.append(slot)
+        self.dirty = True
+        return True
+
+    def current_idf(self):
+        count = len(self.slots)
+        return (np.log((1 + count) / (1 + self.df)) + 1).astype(np.float32)
+
+    def reweight_due(self) -> bool:
+        count = len(self.slots)
+        return count > self.weighted_at * REWEIGHT_FACTOR or count * REWEIGHT_FACTOR < self.weighted_at
+
+    def reweight(self) -> None:
+        """Weight every row with the IDF of the notes indexed now"""
+        idf = self.current_idf()
+        used = self.rows[: self.size]
+        used *= idf / self.idf
+        norms = np.sqrt(np.einsum("ij,ij->i", used, used))
+        np.divide(used, norms[:, None], out=used, where=norms[:, None] > 0)
+        self.idf = idf
+        self.weighted_at = len(self.slots)
+        self.dirty = True
+
+    def state(self) -> dict:
+        return {
+            "dimensions": self.dimensions,
+            "capacity": self.capacity,
+            "size": self.size,
+            "notes": [[slot, meta] for slot, meta in enumerate(self.metas) if meta is not None],
+            "workspaces": [[name, code] for name, code in self.workspaces.items()],
+            "df": self.df.tolist(),
+            "idf": self.idf.tolist(),
+            "weighted_at": self.weighted_at,
+        }
+
+    def restore(self, state: dict) -> None:
+        """Take back the rows of an earlier run; they wait for a full sync to confirm them"""
+        self.size = state["size"]
+        self.metas = [None] * self.size
+        self.workspaces = {name: code for name, code in state["workspaces"]}
+        for slot, meta in state["notes"]:
+            self.slots[meta["id"]] = slot
+            self.metas[slot] = meta
+            self.live[slot] = True
+            self.spaces[slot] = self.workspaces.get(meta.get("workspace"), 0)
+        self.free = [slot for slot, meta in enumerate(self.metas) if meta is None]
+        self.df = np.asarray(state["df"], np.int64)
+        self.idf = np.asarray(state["idf"], np.float32)
+        self.weighted_at = state["weighted_at"]
+        self.confirmed = set()
+        self.ready = True
+
+
+class RelatedIndex:
+    """Per-user note vectors, safe to share between threads
+
+    Raises RuntimeError when NumPy is not installed.
+    """
+
+    def __init__(self, dimensions: int = DEFAULT_DIMENSIONS, directory: str | None = None):
+        if np is None:
+            raise RuntimeError("The related notes index needs NumPy: pip install 'poznote-mcp-server[related]'")
+        self.dimensions = dimensions
+        self.directory = directory
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.boosts = dict(DEFAULT_BOOSTS)
+        self._users: dict[str, _UserVectors] = {}
+        self._lock = threading.Lock()
+        self._counts = {"builds": 0, "queries": 0, "cold_queries": 0, "reweights": 0, "loads": 0}
+
+    def _paths(self, user_id: str) -> tuple[str, str] | None:
+        if not self.directory:
+            return None
+        base = os.path.join(self.directory, "related-" + _UNSAFE.sub("_", user_id))
+        return base + ".f32", base + ".json"
+
+    def _user(self, user_id) -> _UserVectors:
+        user_id = str(user_id)
+        vectors = self._users.get(user_id)
+        if vectors is None:
+            vectors = self._users[user_id] = self._load(user_id)
+        return vectors
+
+    def _load(self, user_id: str) -> _UserVectors:
+        paths = self._paths(user_id)
+        if paths is None:
+            return _UserVectors(self.dimensions, None)
+        rows_path, state_path = paths
+        try:
+            with open(state_path, "rb") as file:
+                state = codec.loads(file.read())
+            if state["dimensions"] != self.dimensions:
+                raise ValueError(f"{state['dimensions']} dimensions")
+            if os.path.getsize(rows_path) != state["capacity"] * self.dimensions * 4:
+                raise ValueError("truncated rows")
+        except FileNotFoundError:
+            return _UserVectors(self.dimensions, rows_path)
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.warning("Ignoring the related notes index of user %s in %s: %r", user_id, self.directory, exc)
+            self._delete_files(user_id)
+            return _UserVectors(self.dimensions, rows_path)
+        vectors = _UserVectors(self.dimensions, rows_path, state["capacity"], fresh=False)
+        vectors.restore(state)
+        self._counts["loads"] += 1
+        return vectors
+
+    def _delete_files(self, user_id: str) -> None:
+        for path in self._paths(user_id) or ():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _vector(self, fields: dict[str, list[str]], idf):
+        row = np.zeros(self.dimensions, np.float32)
+        for field, tokens in fields.items():
+            if not tokens:
+                continue
+            counts = Counter(tokens)
+            codes = np.fromiter(map(_hash, counts), np.int64, len(counts))
+            # The lowest bit is the sign, the others the dimension.
+            values = np.log(np.fromiter(counts.values(), np.float32, len(counts))) + 1
+            values *= self.boosts[field] * (1 - 2 * (codes & 1))
+            np.add.at(row, (codes >> 1) % self.dimensions, values)
+        row *= idf
+        norm = float(np.sqrt(row @ row))
+        if norm > 0:
+            row /= norm
+        return row
+
+    # Feeding ---------------------------------------------------------------
+
+    def add(self, user_id, note: dict) -> None:
+        """Index (or re-index) a note as returned by GET /notes/{id}"""
+        fields = {
+            "title": tokenize(note.get("heading") or ""),
+            "tags": tokenize(note.get("tags") or ""),
+            "content": tokenize(note_text(note.get("content"), note.get("type"))),
+        }
+        meta = {
+            "id": int(note["id"]),
+            "heading": note.get("heading") or "Untitled",
+            "tags": note.get("tags") or "",
+            "folder": note.get("folder"),
+            "workspace": note.get("workspace"),
+            "updated": note.get("updated"),
+        }
+        with self._lock:
+            vectors = self._user(user_id)
+            vectors.put(meta["id"], self._vector(fields, vectors.idf), meta)
+            if vectors.reweight_due():
+                vectors.reweight()
+                self._counts["reweights"] += 1
+
+    def remove(self, user_id, note_id: int) -> None:
+        with self._lock:
+            vectors = self._user(user_id)
+            if vectors.remove(int(note_id)) and vectors.reweight_due():
+                vectors.reweight()
+                self._counts["reweights"] += 1
+
+    def drop(self, user_id=None) -> None:
+        """Forget a user's vectors (everyone's for None), on disk too"""
+        with self._lock:
+            if user_id is not None:
+                self._users.pop(str(user_id), None)
+                self._delete_files(str(user_id))
+                return
+            self._users.clear()
+            if self.directory:
+                for name in os.listdir(self.directory):
+                    if name.startswith("related-"):
+                        os.remove(os.path.join(self.directory, name))
+
+    def ready(self, user_id) -> bool:
+        """Whether the user's notes can be answered for, if only from an earlier run"""
+        with self._lock:
+            return self._user(user_id).ready
+
+    def built(self, user_id) -> bool:
+        """Whether a full sync of this run indexed the user's notes"""
+        with self._lock:
+            vectors = self._users.get(str(user_id))
+            return vectors is not None and vectors.ready and vectors.confirmed is None
+
+    def mark_ready(self, user_id) -> None:
+        """Every note of the user was handed over: drop the rows of an earlier run that were not"""
+        with self._lock:
+            vectors = self._user(user_id)
+            if vectors.confirmed is not None:
+                for note_id in [note_id for note_id in vectors.slots if note_id not in vectors.confirmed]:
+                    vectors.remove(note_id)
+                vectors.confirmed = None
+                if vectors.reweight_due():
+                    vectors.reweight()
+                    self._counts["reweights"] += 1
+            vectors.ready = True
+            self._counts["builds"] += 1
+        self.save(user_id)
+
+    def save(self, user_id) -> None:
+        """Write a user's rows and their notes to the directory, if one is set and they changed"""
+        if not self.directory:
+            return
+        with self._lock:
+            vectors = self._users.get(str(user_id))
+            if vectors is None or not vectors.dirty or not vectors.ready:
+                return
+            vectors.rows.flush()
+            data = codec.dumps(vectors.state(), compact=True).encode()
+            vectors.dirty = False
+        _, state_path = self._paths(str(user_id))
+        temporary = state_path + ".tmp"
+        try:
+            with open(temporary, "wb") as file:
+                file.write(data)
+            os.replace(temporary, state_path)
+        except OSError as exc:
+            logger.warning("Saving the related notes index of user %s failed: %r", user_id, exc)
+
+    # Queries ---------------------------------------------------------------
+
+    def related(
+        self, user_id, note_id: int, limit: int = 10, workspace: str | None = None
+    ) -> tuple[dict | None, list[dict]] | None:
+        """The note and the notes most similar to it, best first, with a `score` from 0 to 1
+
+        Returns None while the user's index is not ready, and (None, []) for
+        a note that is not indexed.
+        """
+        with self._lock:
+            vectors = self._user(user_id)
+            if not vectors.ready:
+                self._counts["cold_queries"] += 1
+                return None
+            self._counts["queries"] += 1
+            slot = vectors.slots.get(int(note_id))
+            if slot is None:
+                return None, []
+            size = vectors.size
+            scores = vectors.rows[:size] @ vectors.rows[slot]
+            excluded = ~vectors.live[:size]
+            if workspace:
+                # -1 is no workspace's code: an unknown one excludes every note.
+                excluded |= vectors.spaces[:size] != vectors.workspaces.get(workspace, -1)
+            excluded[slot] = True
+            scores[excluded] = -np.inf
+            count = min(limit, size)
+            if count <= 0:
+                return vectors.metas[slot], []
+            best = np.argpartition(scores, size - count)[size - count:] if count < size else np.arange(size)
+            best = best[np.argsort(scores[best])[::-1]]
+            results = [
+                {**vectors.metas[index], "score": round(float(scores[index]), 4)}
+                for index in best.tolist()
+                if scores[index] >= MIN_SCORE
+            ]
+            return vectors.metas[slot], results
+
+    def stats(self) -> dict:
+        with self._lock:
+            users = list(self._users.values())
+            return {
+                "users": len(users),
+                "ready": sum(1 for vectors in users if vectors.ready),
+                "notes": sum(len(vectors.slots) for vectors in users),
+                "dimensions": self.dimensions,
+                "bytes": sum(vectors.capacity * self.dimensions * 4 for vectors in users),
+                **self._counts,
+            }
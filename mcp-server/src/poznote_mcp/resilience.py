@@ -0,0 +1,186 @@
+"""
+Retry and circuit breaker policy for calls to the Poznote API
+
+Requests are grouped into endpoint classes with their own retry policy:
+reads are idempotent and may be retried on any transient failure, writes are
+only retried when the request provably never reached the API, and heavy
+operations (backups, git sync) are not retried at all. Retries back off
+exponentially with full jitter so that agents do not hammer a saturated
+PHP-FPM pool in lockstep.
+
+A single CircuitBreaker guards the upstream. After enough consecutive
+failures it opens and calls fail immediately with CircuitOpenError instead of
+each waiting for a timeout; once the reset timeout has passed, one probe
+request is let through (half-open) and its outcome closes or re-opens the
+circuit.
+"""
+
+import random
+import threading
+import time
+
+import httpx
+
+READ = "read"
+WRITE = "write"
+HEAVY = "heavy"
+
+# Paths whose operations can run for minutes (see HEAVY_TIMEOUT in client.py)
+HEAVY_PATH_PREFIXES = ("/backups", "/git-sync")
+
+# Responses that mean the upstream itself is unhealthy (nginx in front of a
+# saturated or restarting PHP-FPM), as opposed to an error about the request.
+UNHEALTHY_STATUS_CODES = frozenset({502, 503, 504})
+
+# Failures where the request never reached the API, so retrying a write
+# cannot apply it twice.
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+# Failures worth retrying a read for. Read timeouts are left out: the API is
+# already slow, and a retry would double the wait and the load.
+_TRANSIENT_ERRORS = _NOT_SENT_ERRORS + (httpx.RemoteProtocolError, httpx.ReadError, httpx.WriteError)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised without contacting the API while the circuit breaker is open"""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"Poznote API circuit breaker is open; retry in {retry_after:.0f}s")
+
+
+class RetryPolicy:
+    """How often and how patiently one endpoint class is retried"""
+
+    def __init__(
+        self,
+        attempts: int,
+        base_delay: float = 0.2,
+        max_delay: float = 5.0,
+        retry_errors: tuple = (),
+        retry_statuses: frozenset = frozenset(),
+    ):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_errors = retry_errors
+        self.retry_statuses = retry_statuses
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number `attempt` (1-based), with full jitter"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def should_retry(self, attempt: int, error: BaseException | None = None, status_code: int | None = None) -> bool:
+        if attempt >= self.attempts:
+            return False
+        if error is not None:
+            return isinstance(error, self.retry_errors)
+        return status_code in self.retry_statuses
+
+
+DEFAULT_RETRY_POLICIES = {
+    READ: RetryPolicy(attempts=3, retry_errors=_TRANSIENT_ERRORS, retry_statuses=UNHEALTHY_STATUS_CODES),
+    WRITE: RetryPolicy(attempts=2, retry_errors=_NOT_SENT_ERRORS),
+    HEAVY: RetryPolicy(attempts=1),
+}
+
+
+def endpoint_class(method: str, path: str) -> str:
+    """Retry class of a request: heavy operations first, then read vs write"""
+    if path.startswith(HEAVY_PATH_PREFIXES):
+        return HEAVY
+    return READ if method == "GET" else WRITE
+
+
+def is_upstream_failure(error: BaseException | None = None, status_code: int | None = None) -> bool:
+    """Whether an outcome counts against the health of the upstream"""
+    if error is not None:
+        return isinstance(error, httpx.TransportError) and not isinstance(error, CircuitOpenError)
+    return status_code in UNHEALTHY_STATUS_CODES
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe
+
+    Thread-safe, so one instance can be shared by the worker threads of the
+    sync client as well as by the event loop of the async client.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._counts = {"opened": 0, "rejected": 0, "probes": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+        return self._state
+
+    def before_call(self) -> bool:
+        """Let a call through, or raise CircuitOpenError to fail fast
+
+        Returns True when the call is the half-open probe; pass that flag back
+        to record_success/record_failure/release_probe.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return False
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                self._counts["probes"] += 1
+                return True
+            self._counts["rejected"] += 1
+            retry_after = max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+        raise CircuitOpenError(retry_after)
+
+    def record_success(self, probe: bool = False) -> None:
+        with self._lock:
+            self._failures = 0
+            if probe:
+                self._probe_in_flight = False
+            self._state = CLOSED
+
+    def record_failure(self, probe: bool = False) -> None:
+        with self._lock:
+            self._failures += 1
+            if probe:
+                self._probe_in_flight = False
+            state = self._current_state()
+            if state == HALF_OPEN or (state == CLOSED and self._failures >= self.failure_threshold):
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._counts["opened"] += 1
+
+    def release_probe(self, probe: bool) -> None:
+        """Give the probe slot back when a call ended without a verdict (e.g. cancelled)"""
+        if probe:
+            with self._lock:
+                self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            state = self._current_state()
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout": self.reset_timeout,
+                "opened": self._counts["opened"],
+                "rejected": self._counts["rejected"],
+                "probes": self._counts["probes"],
+            }
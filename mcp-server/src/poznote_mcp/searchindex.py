@@ -0,0 +1,390 @@
+"""
+Local full-text index of note titles, tags and content, ranked with BM25
+
+GET /notes/search is a LIKE scan over every note: it returns at most 100
+results, in no useful order, and is the slowest endpoint the MCP server
+calls on large workspaces. The server therefore keeps its own inverted index
+per user, built in the background from GET /notes and the note bodies, and
+answers search_notes from it once it is warm.
+
+- Content is indexed as text: HTML tags, code fence languages, inline images
+  and Excalidraw payloads are dropped like search_clean_entry() does in
+  src/db_connect.php, and accents are folded like remove_accents().
+- Every query word must match, as a whole word or as the prefix of one.
+  "Quoted words" must also appear next to each other in one field.
+- Matches are scored with BM25 per field and the fields are weighted by
+  their boost, so a word in the title counts more than one in the body.
+- created_from/created_to are read in the user's timezone, as the API does.
+
+The index is built and kept current by the note sync (sync.py): a full
+sync of the user feeds it every note once, and later syncs only the notes
+that changed or disappeared.
+"""
+
+import html
+import json
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+FIELDS = ("title", "tags", "content")
+DEFAULT_BOOSTS = {"title": 3.0, "tags": 2.0, "content": 1.0}
+# BM25 term frequency saturation and length normalization
+K1 = 1.2
+B = 0.75
+
+_CODE_FENCE = re.compile(r"^```[a-zA-Z0-9+#*-]+\s*$", re.M)
+_LANGUAGE_ATTRS = re.compile(r'class="[^"]*language-[^"\s>]+[^"]*"|data-language="[^"]*"', re.I)
+_EXCALIDRAW = re.compile(r'<div[^>]*class="excalidraw-container"[^>]*>.*?</div>', re.S)
+_DATA_IMAGE = re.compile(r"data:image/[^;]+;base64,[A-Za-z0-9+/=]+")
+_SCRIPT = re.compile(r"<(script|style)\b.*?</\1\s*>", re.I | re.S)
+_TAG = re.compile(r"<[^>]*>")
+_SPACE = re.compile(r"\s+")
+_WORD = re.compile(r"\w+")
+_QUERY_PART = re.compile(r'"([^"]*)"?|(\S+)')
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+# Letters NFKD does not decompose, folded like remove_accents()
+_FOLD = str.maketrans({"ß": "ss", "æ": "ae", "œ": "oe", "ø": "o", "ł": "l", "đ": "d", "ð": "d", "þ": "th"})
+
+
+def parse_boosts(value: str | None) -> dict[str, float]:
+    """Parse "title=4,content=1" into field boosts (unknown fields are ignored)"""
+    boosts = {}
+    for entry in (value or "").split(","):
+        name, _, weight = entry.strip().partition("=")
+        try:
+            boost = float(weight)
+        except ValueError:
+            continue
+        if name in DEFAULT_BOOSTS and boost >= 0:
+            boosts[name] = boost
+    return boosts
+
+
+def note_text(content, note_type: str | None = None) -> str:
+    """The searchable text of a note body"""
+    if not content:
+        return ""
+    if not isinstance(content, str):
+        content = json.dumps(content, ensure_ascii=False)
+    if note_type == "tasklist":
+        try:
+            tasks = json.loads(content)
+        except ValueError:
+            tasks = None
+        if isinstance(tasks, list):
+            return " ".join(str(task.get("text", "")) for task in tasks if isinstance(task, dict))
+    if note_type == "markdown":
+        content = _CODE_FENCE.sub("```", content)
+    else:
+        content = _LANGUAGE_ATTRS.sub("", content)
+    content = _EXCALIDRAW.sub(" [Excalidraw diagram] ", content)
+    content = _DATA_IMAGE.sub("[image]", content)
+    # Tags become spaces so that "<p>one</p><p>two</p>" stays two words.
+    content = _TAG.sub(" ", _SCRIPT.sub(" ", content))
+    return _SPACE.sub(" ", html.unescape(content)).strip()
+
+
+def fold(text: str) -> str:
+    """Lowercase text and strip accents"""
+    if text.isascii():
+        return text.lower()
+    text = unicodedata.normalize("NFKD", text.lower().translate(_FOLD))
+    return "".join(char for char in text if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> list[str]:
+    return _WORD.findall(fold(text))
+
+
+def parse_query(query: str) -> tuple[list[str], list[list[str]]]:
+    """Split a query into words and phrases
+
+    A quoted part is a phrase, and so is an unquoted one that folds into
+    several words ("e-mail", "v2.1").
+    """
+    words, phrases = [], []
+    for match in _QUERY_PART.finditer(query):
+        quoted, bare = match.groups()
+        tokens = tokenize(quoted if quoted is not None else bare)
+        if len(tokens) > 1:
+            phrases.append(tokens)
+        elif tokens and bare is not None:
+            words.append(tokens[0])
+        elif tokens:
+            phrases.append(tokens)
+    return words, phrases
+
+
+def utc_boundary(date: str | None, tz_name: str | None, end_of_day: bool) -> str | None:
+    """A YYYY-MM-DD day in the user's timezone as the UTC time stored in `created`
+
+    Mirrors dateOnlyFilterToUtcBoundary() in src/functions.php. Raises
+    ValueError for a malformed date.
+    """
+    if not date:
+        return None
+    if not _DATE.match(date):
+        raise ValueError(date)
+    day = datetime.strptime(date, "%Y-%m-%d")
+    try:
+        zone = ZoneInfo(tz_name) if tz_name else timezone.utc
+    except (ValueError, KeyError):
+        zone = timezone.utc
+    local = day.replace(hour=23, minute=59, second=59) if end_of_day else day
+    return local.replace(tzinfo=zone).astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class _Doc:
+    __slots__ = ("id", "terms", "lengths", "meta")
+
+    def __init__(self, note_id: int, terms: dict, lengths: dict, meta: dict):
+        self.id = note_id
+        # field -> {term: [positions]}, shared with the postings
+        self.terms = terms
+        self.lengths = lengths
+        self.meta = meta
+
+
+class _UserIndex:
+    """The index of one user's notes, across all of their workspaces"""
+
+    def __init__(self):
+        self.docs: dict[int, _Doc] = {}
+        # field -> term -> {note_id: [positions]}
+        self.postings = {field: {} for field in FIELDS}
+        self.total_lengths = dict.fromkeys(FIELDS, 0)
+        self._vocabulary: list[str] | None = None
+        self.timezone: str | None = None
+        self.ready = False
+
+    def vocabulary(self) -> list[str]:
+        if self._vocabulary is None:
+            terms = set()
+            for postings in self.postings.values():
+                terms.update(postings)
+            self._vocabulary = sorted(terms)
+        return self._vocabulary
+
+    def add(self, note_id: int, fields: dict[str, list[str]], meta: dict) -> None:
+        self.remove(note_id)
+        terms, lengths = {}, {}
+        for field, tokens in fields.items():
+            positions: dict[str, list[int]] = {}
+            for position, token in enumerate(tokens):
+                positions.setdefault(token, []).append(position)
+            postings = self.postings[field]
+            for term, hits in positions.items():
+                if term not in postings:
+                    postings[term] = {}
+                    self._vocabulary = None
+                postings[term][note_id] = hits
+            terms[field] = positions
+            lengths[field] = len(tokens)
+            self.total_lengths[field] += len(tokens)
+        self.docs[note_id] = _Doc(note_id, terms, lengths, meta)
+
+    def remove(self, note_id: int) -> bool:
+        doc = self.docs.pop(note_id, None)
+        if doc is None:
+            return False
+        for field, positions in doc.terms.items():
+            postings = self.postings[field]
+            for term in positions:
+                docs = postings[term]
+                del docs[note_id]
+                if not docs:
+                    del postings[term]
+                    self._vocabulary = None
+            self.total_lengths[field] -= doc.lengths[field]
+        return True
+
+    def expand(self, word: str) -> list[str]:
+        """Indexed terms matching a query word: itself, else the words it starts"""
+        if any(word in postings for postings in self.postings.values()):
+            return [word]
+        vocabulary = self.vocabulary()
+        start = bisect_left(vocabulary, word)
+        end = start
+        while end < len(vocabulary) and vocabulary[end].startswith(word):
+            end += 1
+        return vocabulary[start:end]
+
+    def has_phrase(self, doc: _Doc, tokens: list[str]) -> bool:
+        for positions in doc.terms.values():
+            first = positions.get(tokens[0])
+            if not first:
+                continue
+            rest = [positions.get(token) for token in tokens[1:]]
+            if not all(rest):
+                continue
+            rest = [set(hits) for hits in rest]
+            if any(all(start + offset in hits for offset, hits in enumerate(rest, 1)) for start in first):
+                return True
+        return False
+
+
+class SearchIndex:
+    """Per-user BM25 indexes of notes, safe to share between threads"""
+
+    def __init__(self, boosts: dict[str, float] | None = None, k1: float = K1, b: float = B):
+        self.boosts = {**DEFAULT_BOOSTS, **(boosts or {})}
+        self.k1 = k1
+        self.b = b
+        self._users: dict[str, _UserIndex] = {}
+        self._lock = threading.Lock()
+        self._counts = {"builds": 0, "searches": 0, "cold_searches": 0}
+
+    def _user(self, user_id) -> _UserIndex:
+        user_id = str(user_id)
+        index = self._users.get(user_id)
+        if index is None:
+            index = self._users[user_id] = _UserIndex()
+        return index
+
+    def ready(self, user_id) -> bool:
+        with self._lock:
+            index = self._users.get(str(user_id))
+            return index is not None and index.ready
+
+    def mark_ready(self, user_id, tz_name: str | None = None) -> None:
+        """Answer the user's searches from now on; tz_name is their timezone setting"""
+        with self._lock:
+            index = self._user(user_id)
+            index.timezone = tz_name
+            index.ready = True
+            self._counts["builds"] += 1
+
+    def add(self, user_id, note: dict) -> None:
+        """Index (or re-index) a note as returned by GET /notes/{id}"""
+        text = note_text(note.get("content"), note.get("type"))
+        fields = {
+            "title": tokenize(note.get("heading") or ""),
+            "tags": tokenize(note.get("tags") or ""),
+            "content": tokenize(text),
+        }
+        meta = {
+            "id": int(note["id"]),
+            "heading": note.get("heading") or "Untitled",
+            "tags": note.get("tags") or "",
+            "folder": note.get("folder"),
+            "folder_id": note.get("folder_id"),
+            "workspace": note.get("workspace"),
+            "updated": note.get("updated"),
+            "created": note.get("created"),
+            # Excerpts are cut around the query words (see snippets.py).
+            "text": text,
+        }
+        with self._lock:
+            self._user(user_id).add(meta["id"], fields, meta)
+
+    def remove(self, user_id, note_id: int) -> None:
+        with self._lock:
+            index = self._users.get(str(user_id))
+            if index is not None:
+                index.remove(int(note_id))
+
+    def drop(self, user_id=None) -> None:
+        """Forget a user's index (everyone's for None); it is built again on demand"""
+        with self._lock:
+            if user_id is None:
+                self._users.clear()
+            else:
+                self._users.pop(str(user_id), None)
+
+    def search(
+        self,
+        user_id,
+        query: str,
+        limit: int = 10,
+        workspace: str | None = None,
+        created_from: str | None = None,
+        created_to: str | None = None,
+    ) -> list[dict] | None:
+        """Ranked results shaped like GET /notes/search, plus a `score`
+
+        Each result has the note's whole searchable `text` instead of an
+        `excerpt`, to cut excerpts around the query words (see snippets.py).
+        Returns None when the user's index is not ready, or when a date filter
+        is malformed (the API then answers, with its own error).
+        """
+        words, phrases = parse_query(query)
+        with self._lock:
+            index = self._users.get(str(user_id))
+            if index is None or not index.ready:
+                self._counts["cold_searches"] += 1
+                return None
+            try:
+                lower = utc_boundary(created_from, index.timezone, False)
+                upper = utc_boundary(created_to, index.timezone, True)
+            except ValueError:
+                return None
+            self._counts["searches"] += 1
+            if not words and not phrases:
+                return []
+
+            scores = None
+            for word in words + [token for phrase in phrases for token in phrase]:
+                term_scores = self._score(index, index.expand(word))
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {note_id: score + term_scores[note_id] for note_id, score in scores.items() if note_id in term_scores}
+                if not scores:
+                    return []
+
+            results = []
+            for note_id, score in scores.items():
+                doc = index.docs[note_id]
+                meta = doc.meta
+                if workspace and meta["workspace"] != workspace:
+                    continue
+                created = meta["created"] or ""
+                if (lower and created < lower) or (upper and created > upper):
+                    continue
+                if phrases and not all(index.has_phrase(doc, phrase) for phrase in phrases):
+                    continue
+                results.append((score, meta))
+        # Equal scores: most recently updated first, like the API's ORDER BY.
+        results.sort(key=lambda item: item[1]["updated"] or "", reverse=True)
+        results.sort(key=lambda item: item[0], reverse=True)
+        return [{**meta, "score": round(score, 4)} for score, meta in results[:limit]]
+
+    def _score(self, index: _UserIndex, terms: list[str]) -> dict[int, float]:
+        """BM25 score per note for a query word, the best of its expansions"""
+        total = len(index.docs)
+        best: dict[int, float] = {}
+        for term in terms:
+            matches = [(field, index.postings[field].get(term)) for field in FIELDS]
+            matches = [(field, docs) for field, docs in matches if docs]
+            frequency = len(set().union(*(docs for _, docs in matches)))
+            idf = math.log(1 + (total - frequency + 0.5) / (frequency + 0.5))
+            scores: dict[int, float] = {}
+            for field, docs in matches:
+                boost = self.boosts[field]
+                average = index.total_lengths[field] / total or 1
+                for note_id, positions in docs.items():
+                    tf = len(positions)
+                    norm = 1 - self.b + self.b * index.docs[note_id].lengths[field] / average
+                    scores[note_id] = scores.get(note_id, 0.0) + boost * idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+            for note_id, score in scores.items():
+                if score > best.get(note_id, 0.0):
+                    best[note_id] = score
+        return best
+
+    def stats(self) -> dict:
+        with self._lock:
+            users = list(self._users.values())
+            return {
+                "users": len(users),
+                "ready": sum(1 for index in users if index.ready),
+                "notes": sum(len(index.docs) for index in users),
+                "terms": sum(len(postings) for index in users for postings in index.postings.values()),
+                "boosts": dict(self.boosts),
+                **self._counts,
+            }
+
@@ -20,18 +20,38 @@ Usage:
 """
 
 import argparse
-import atexit
 import json
 import logging
 import os
 import socket
 import sys
+from contextlib import asynccontextmanager
 from typing import Optional, Union
 
 import httpx
 from fastmcp import FastMCP
-
-from .client import PoznoteClient
+from fastmcp.server.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from . import codec
+from .client import DEFAULT_TIMEOUT, HEAVY_TIMEOUT, AsyncPoznoteClient, _env_number
+from .deadline import DeadlineExceeded, deadline
+from .importance import ORDERS as IMPORTANCE_ORDERS
+from .linkgraph import DEFAULT_DEPTH, DEFAULT_FAN_OUT, DIRECTIONS, MAX_DEPTH
+from .pagination import LIST_SORTS, MAX_SEARCH_RESULTS, CursorError, ResultWindows, decode_cursor, encode_cursor, page, scope
+from .relatedindex import available as numpy_available
+from .reminders import DEFAULT_DAYS as DEFAULT_REMINDER_DAYS
+from .reminders import KINDS as REMINDER_KINDS
+from .reminders import MAX_DAYS as MAX_REMINDER_DAYS
+from .reminders import window as reminder_window
+from .searchindex import note_text, utc_boundary
+from .snippets import ELLIPSIS, SNIPPET_FRAGMENTS, SNIPPET_LENGTH, join_snippets, make_snippets
+from .resilience import CircuitOpenError
+from .taskindex import SORTS as TASK_SORTS
+from .taskindex import due_bound
+from .views import NoteViews
+from .webhooks import WebhookReceiver
 
 
 def _is_strict_bool_env_value(value: str) -> bool:
@@ -135,34 +155,143 @@ def _assert_port_available(host: str, port: int) -> None:
     if last_error is not None:
         raise last_error
 
+# Poznote client (initialized lazily)
+_client: AsyncPoznoteClient | None = None
+# Client settings given on the command line; unset ones fall back to env vars.
+_client_options: dict = {}
+
+# Tools that wrap long-running operations get HEAVY_TIMEOUT as their budget.
+HEAVY_TOOLS = frozenset({"git_push", "git_pull", "create_backup", "restore_backup"})
+# Per-tool budgets given with --tool-deadline; they win over POZNOTE_TOOL_DEADLINES.
+_tool_deadline_overrides: dict[str, float] = {}
+# Resolved budgets by tool name, "*" being the default (built on first use)
+_tool_deadlines: dict[str, float] | None = None
+# Webhook secret file given with --webhook-secret-file; wins over the env vars.
+_webhook_secret_file: str | None = None
+# Receiver of Poznote's webhooks, False when no secret is configured (built on first use)
+_webhook_receiver: WebhookReceiver | bool | None = None
+# GET /stats enabled with --stats; None leaves POZNOTE_STATS in charge.
+_stats_enabled: bool | None = None
+
+
+def _parse_tool_deadlines(entries: list[str], source: str) -> dict[str, float]:
+    """Parse "tool_name=seconds" entries, skipping invalid ones with a warning"""
+    deadlines = {}
+    for entry in entries:
+        if not entry.strip():
+            continue
+        name, _, value = entry.partition("=")
+        try:
+            seconds = float(value)
+        except ValueError:
+            seconds = 0
+        if not name.strip() or seconds <= 0:
+            logger.warning("Ignoring invalid tool deadline %r in %s; expected tool_name=seconds.", entry, source)
+            continue
+        deadlines[name.strip()] = seconds
+    return deadlines
+
+
+def _tool_deadline(name: str) -> float:
+    """Time budget in seconds for one call of the named tool"""
+    global _tool_deadlines
+    if _tool_deadlines is None:
+        _tool_deadlines = {
+            "*": _env_number("POZNOTE_TOOL_DEADLINE", DEFAULT_TIMEOUT, float),
+            **{tool: HEAVY_TIMEOUT for tool in HEAVY_TOOLS},
+            **_parse_tool_deadlines(os.getenv("POZNOTE_TOOL_DEADLINES", "").split(","), "POZNOTE_TOOL_DEADLINES"),
+            **_tool_deadline_overrides,
+        }
+    return _tool_deadlines.get(name, _tool_deadlines["*"])
+
+
+def _get_webhook_receiver() -> WebhookReceiver | None:
+    """The webhook receiver, or None when no secret enables it"""
+    global _webhook_receiver
+    if _webhook_receiver is None:
+        secret = os.getenv("POZNOTE_WEBHOOK_SECRET", "").strip()
+        secret_file = _webhook_secret_file or os.getenv("POZNOTE_WEBHOOK_SECRET_FILE")
+        if secret_file:
+            try:
+                with open(secret_file, "r", encoding="utf-8") as handle:
+                    secret = handle.read().strip()
+            except OSError as exc:
+                logger.warning("Cannot read the webhook secret from %s: %s", secret_file, exc)
+        _webhook_receiver = WebhookReceiver(secret) if secret else False
+    return _webhook_receiver or None
+
+
+def _stats_endpoint_enabled() -> bool:
+    """Whether GET /stats answers; off unless --stats or POZNOTE_STATS=true"""
+    if _stats_enabled is not None:
+        return _stats_enabled
+    return os.getenv("POZNOTE_STATS") == "true"
+
+
+class ToolDeadlineMiddleware(Middleware):
+    """Run every tool call under its deadline budget.
+
+    API requests made by the tool share the budget: each one's timeout is cut
+    to what is left of it, so compound tools return in time too.
+    """
+
+    async def on_call_tool(self, context, call_next):
+        with deadline(_tool_deadline(context.message.name)):
+            return await call_next(context)
+
+
+@asynccontextmanager
+async def _lifespan(server):
+    """Close the shared API client's connection pool on shutdown"""
+    global _client
+    try:
+        yield {}
+    finally:
+        if _client is not None:
+            await _client.aclose()
+            _client = None
+
+
 # Initialize FastMCP server.
 #
 # FastMCP 3.x: host/port/stateless_http are no longer constructor options —
 # they are passed to mcp.run() in main(), which stays the single source of
 # truth for network settings.
-mcp = FastMCP("poznote-mcp")
+mcp = FastMCP("poznote-mcp", lifespan=_lifespan)
+mcp.add_middleware(ToolDeadlineMiddleware())
 
-# Poznote client (initialized lazily)
-_client: PoznoteClient | None = None
 
-
-def get_client() -> PoznoteClient:
+def get_client() -> AsyncPoznoteClient:
     """Get or create the Poznote API client"""
     global _client
     if _client is None:
-        _client = PoznoteClient()
-        atexit.register(_client.close)
-        logger.info("Connected to Poznote API at %s", _client.base_url)
+        _client = AsyncPoznoteClient(**_client_options)
+        # The local views behind the index-backed tools, fed by the client
+        _client.views = NoteViews(_client)
+        if _client.api_socket:
+            logger.info("Connected to Poznote API at %s via unix socket %s", _client.base_url, _client.api_socket)
+        else:
+            logger.info("Connected to Poznote API at %s", _client.base_url)
+        logger.info(
+            "API connection pool: max_connections=%s, max_keepalive=%s, keepalive_expiry=%ss, http2=%s",
+            _client.limits.max_connections,
+            _client.limits.max_keepalive_connections,
+            _client.limits.keepalive_expiry,
+            _client.http2,
+        )
     return _client
 
 
-def _get_client_or_error() -> tuple[PoznoteClient | None, str | None]:
+def _get_client_or_error() -> tuple[AsyncPoznoteClient | None, str | None]:
     """Return a configured client or a JSON error string.
 
     The MCP tools are expected to return strings; this helper lets us fail fast
     with a clear configuration message instead of surfacing a generic 401.
     """
     client = get_client()
+    if not getattr(client, "service_token", None):
+        # The token file may have been written after the client was created.
+        client.refresh_service_token(force=True)
 
     missing: list[str] = []
     if not getattr(client, "base_url", None):
@@ -171,7 +300,7 @@ def _get_client_or_error() -> tuple[PoznoteClient | None, str | None]:
         missing.append("POZNOTE_SERVICE_TOKEN_FILE")
 
     if missing:
-        return None, json.dumps(
+        return None, codec.dumps(
             {
                 "error": "Missing required configuration for Poznote MCP server.",
                 "missing": missing,
@@ -181,8 +310,6 @@ def _get_client_or_error() -> tuple[PoznoteClient | None, str | None]:
                 },
                 "note": "The shared MCP token file is generated automatically by Poznote and must be mounted into the MCP container.",
             },
-            indent=2,
-            ensure_ascii=False,
         )
 
     return client, None
@@ -190,27 +317,44 @@ def _get_client_or_error() -> tuple[PoznoteClient | None, str | None]:
 
 def _api_error_json(exc: Exception) -> str:
     """Convert an HTTP/network exception into a clean JSON error for the AI."""
+    if isinstance(exc, DeadlineExceeded):
+        return codec.dumps(
+            {
+                "error": "The tool call ran out of time waiting for the Poznote API. Try again later.",
+                "detail": str(exc),
+            },
+            compact=True,
+        )
+    if isinstance(exc, CircuitOpenError):
+        return codec.dumps(
+            {
+                "error": "Poznote API is failing repeatedly; not calling it until it recovers.",
+                "detail": str(exc),
+                "retry_after": round(exc.retry_after),
+            },
+            compact=True,
+        )
     if isinstance(exc, httpx.ConnectError):
-        return json.dumps(
+        return codec.dumps(
             {"error": "Cannot connect to Poznote API. Is the server running?", "detail": str(exc)},
-            ensure_ascii=False,
+            compact=True,
         )
     if isinstance(exc, httpx.TimeoutException):
-        return json.dumps(
+        return codec.dumps(
             {"error": "Poznote API request timed out. Try again or increase timeout.", "detail": str(exc)},
-            ensure_ascii=False,
+            compact=True,
         )
     if isinstance(exc, httpx.HTTPStatusError):
         status = exc.response.status_code
         body = exc.response.text[:500] if exc.response.text else ""
-        return json.dumps(
+        return codec.dumps(
             {"error": f"Poznote API returned HTTP {status}", "detail": body},
-            ensure_ascii=False,
+            compact=True,
         )
     # Generic httpx error
-    return json.dumps(
+    return codec.dumps(
         {"error": f"Poznote API error: {type(exc).__name__}", "detail": str(exc)[:500]},
-        ensure_ascii=False,
+        compact=True,
     )
 
 
@@ -219,7 +363,7 @@ def _api_error_json(exc: Exception) -> str:
 # =============================================================================
 
 @mcp.tool()
-def get_note(id: int, workspace: Optional[str] = None, user_id: Optional[int] = None) -> str:
+async def get_note(id: int, workspace: Optional[str] = None, user_id: Optional[int] = None) -> str:
     """Get a specific note by its ID with full content
 
     The result includes a "version" token; pass it as if_version to update_note
@@ -234,12 +378,12 @@ def get_note(id: int, workspace: Optional[str] = None, user_id: Optional[int] =
     if err:
         return err
     try:
-        note = client.get_note(id, workspace=workspace, user_id=user_id)
+        note = await client.get_note(id, workspace=workspace, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
     
     if note is None:
-        return json.dumps({"error": f"Note {id} not found"}, ensure_ascii=False)
+        return codec.dumps({"error": f"Note {id} not found"}, compact=True)
     
     # Format for AI consumption
     result = {
@@ -254,30 +398,64 @@ def get_note(id: int, workspace: Optional[str] = None, user_id: Optional[int] =
         "reminderAt": note.get("reminder_at"),
     }
 
-    return json.dumps(result, indent=2, ensure_ascii=False)
+    return codec.dumps(result)
 
 
 @mcp.tool()
-def list_notes(workspace: Optional[str] = None, limit: int = 50, user_id: Optional[int] = None) -> str:
+async def list_notes(workspace: Optional[str] = None, limit: int = 50, sort: Optional[str] = None, cursor: Optional[str] = None, user_id: Optional[int] = None) -> str:
     """List all notes from a specific workspace
     
+    Notes come folder by folder, in the given order within each. When there are more,
+    pass `next_cursor` back as `cursor` (with the same workspace and sort) for the next page.
+    
     Args:
         workspace: Workspace name (optional)
         limit: Maximum number of results (default: 50)
+        sort: updated_desc (default), created_desc or heading_asc
+        cursor: next_cursor of the previous page (optional)
         user_id: User profile ID to access (optional, overrides default)
     """
+    if sort is not None and sort not in LIST_SORTS:
+        return codec.dumps({"error": f"sort must be one of: {', '.join(LIST_SORTS)}"}, compact=True)
+    
     client, err = _get_client_or_error()
     if err:
         return err
+    query_scope = scope(workspace, sort)
     try:
-        notes = client.list_notes(workspace=workspace, user_id=user_id)
+        position = decode_cursor(cursor, "notes", query_scope) if cursor else None
+    except CursorError as exc:
+        return codec.dumps({"error": str(exc)}, compact=True)
+    try:
+        notes = None
+        if limit and limit > 0:
+            # One more note than asked tells whether there is a next page; later
+            # pages seek past the note the previous one ended on.
+            try:
+                notes = await client.list_notes(
+                    workspace=workspace, limit=limit + 1, sort=sort,
+                    after=position["id"] if position else None, user_id=user_id,
+                )
+            except httpx.HTTPStatusError as exc:
+                # That note is gone: fall back to the position in the whole list.
+                if position is None or exc.response.status_code != 404:
+                    raise
+            else:
+                more = len(notes) > limit
+                notes = notes[:limit]
+                end = (position["n"] if position else 0) + len(notes)
+        if notes is None:
+            key = ResultWindows.key(client.user_id if user_id is None else user_id, "notes", query_scope)
+            window = client.result_windows.get(key)
+            if window is None:
+                window = client.result_windows.put(
+                    key, await client.list_notes(workspace=workspace, sort=sort, user_id=user_id)
+                )
+            notes, end = page(window, position, limit if limit and limit > 0 else len(window.items))
+            more = end < len(window.items)
     except Exception as exc:
         return _api_error_json(exc)
     
-    # Limit results if specified
-    if limit and len(notes) > limit:
-        notes = notes[:limit]
-    
     # Format for AI consumption
     formatted = []
     for note in notes:
@@ -293,54 +471,328 @@ def list_notes(workspace: Optional[str] = None, limit: int = 50, user_id: Option
     result = {
         "count": len(formatted),
         "notes": formatted,
+        "next_cursor": encode_cursor("notes", query_scope, notes[-1].get("id"), end) if more and notes else None,
     }
     if workspace is not None:
         result["workspace"] = workspace
 
-    return json.dumps(result, indent=2, ensure_ascii=False)
+    return codec.dumps(result)
 
 
 @mcp.tool()
-def search_notes(query: str, workspace: Optional[str] = None, limit: int = 10, created_from: Optional[str] = None, created_to: Optional[str] = None, user_id: Optional[int] = None) -> str:
-    """Search notes by text query. Returns matching notes with excerpts.
+async def search_notes(query: str, workspace: Optional[str] = None, limit: int = 10, created_from: Optional[str] = None, created_to: Optional[str] = None, snippet_length: Optional[int] = None, cursor: Optional[str] = None, user_id: Optional[int] = None) -> str:
+    """Search notes by text query. Returns matching notes with excerpts, best matches first.
+    
+    Every word must match (a word also matches words it starts); put "exact phrases" in quotes.
+    Excerpts are cut around the matching words, which are in **bold**; `snippets` gives their
+    character offsets in the note's text, without markup. When there are more results, pass
+    `next_cursor` back as `cursor` (with the same query and filters) for the next page.
     
     Args:
-        query: Search query (text to find in notes)
+        query: Search query (text to find in note titles, tags and content)
         workspace: Workspace name (optional)
         limit: Maximum number of results (default: 10)
         created_from: Filter notes created on or after this date (YYYY-MM-DD)
         created_to: Filter notes created on or before this date (YYYY-MM-DD)
+        snippet_length: Characters per excerpt fragment (default: 160)
+        cursor: next_cursor of the previous page (optional)
         user_id: User profile ID to access (optional, overrides default)
     """
     if not query:
-        return json.dumps({"error": "query parameter is required"}, ensure_ascii=False)
+        return codec.dumps({"error": "query parameter is required"}, compact=True)
     
     client, err = _get_client_or_error()
     if err:
         return err
+    filters = {"workspace": workspace, "created_from": created_from, "created_to": created_to, "user_id": user_id}
+    query_scope = scope(query, workspace, created_from, created_to)
     try:
-        results = client.search_notes(query, limit=limit, workspace=workspace, created_from=created_from, created_to=created_to, user_id=user_id)
+        position = decode_cursor(cursor, "search", query_scope) if cursor else None
+    except CursorError as exc:
+        return codec.dumps({"error": str(exc)}, compact=True)
+    key = ResultWindows.key(client.user_id if user_id is None else user_id, "search", query_scope)
+    window = client.result_windows.get(key) if position is not None else None
+    try:
+        if window is None:
+            # The local index answers once warm; until then (or when it is
+            # disabled) the API does, up to its 100 results, while the index
+            # is built in the background. A first page ranks afresh, and the
+            # ranking is kept for the next ones when there are more.
+            ranked = await client.views.search_notes_indexed(query, limit=MAX_SEARCH_RESULTS, **filters)
+            source = "index"
+            if ranked is None:
+                ranked = await client.search_notes(query, limit=min(MAX_SEARCH_RESULTS, 100), **filters)
+                source = "api"
+            if position is None:
+                results, end, total = ranked[:limit], limit, len(ranked)
+                if total > limit:
+                    client.result_windows.put(key, ranked, source)
+            else:
+                window = client.result_windows.put(key, ranked, source)
+        if window is not None:
+            results, end = page(window, position, limit)
+            source, total = window.source, len(window.items)
     except Exception as exc:
         return _api_error_json(exc)
     
+    length = snippet_length or _env_number("POZNOTE_SNIPPET_LENGTH", SNIPPET_LENGTH)
+    fragments = _env_number("POZNOTE_SNIPPET_FRAGMENTS", SNIPPET_FRAGMENTS)
+    
     # Format results
     formatted = []
     for r in results:
-        formatted.append({
+        excerpt, snippets = _excerpt(r, query, length, fragments)
+        item = {
             "id": r.get("id"),
             "title": r.get("heading", "Untitled"),
-            "excerpt": r.get("excerpt", r.get("content", "")[:200] + "..."),
+            "excerpt": excerpt,
+            "snippets": snippets,
             "tags": r.get("tags", ""),
             "folder": r.get("folder"),
             "createdAt": r.get("created"),
             "updatedAt": r.get("updated"),
-        })
+        }
+        if "score" in r:
+            item["score"] = r["score"]
+        formatted.append(item)
     
-    return json.dumps({
+    return codec.dumps({
         "query": query,
+        "source": source,
         "count": len(formatted),
         "results": formatted,
-    }, indent=2, ensure_ascii=False)
+        "next_cursor": encode_cursor("search", query_scope, results[-1].get("id"), end) if end < total and results else None,
+    })
+
+
+def _excerpt(result: dict, query: str, length: int, fragments: int) -> tuple[str, list[dict]]:
+    """The excerpt of a search result around the query words, and the offsets of its fragments
+
+    The index gives the note's whole text, the API its first 300 characters
+    (followed by "..." when there are more) or, failing that, the content.
+    """
+    more = False
+    text = result.get("text")
+    if text is None and result.get("excerpt") is not None:
+        text = result["excerpt"]
+        more = text.endswith(ELLIPSIS)
+        text = text.removesuffix(ELLIPSIS)
+    elif text is None:
+        text = note_text(result.get("content"), result.get("type"))
+    snippets = make_snippets(text, query, length, fragments)
+    offsets = [{key: snippet[key] for key in ("start", "end", "highlights")} for snippet in snippets]
+    return join_snippets(len(text), snippets, more), offsets
+
+
+@mcp.tool()
+async def find_notes_by_title(title: str, workspace: Optional[str] = None, limit: int = 10, user_id: Optional[int] = None) -> str:
+    """Find notes by an approximate title, best matches first. Case, accents, punctuation, word order and small typos do not matter.
+    
+    Faster than search_notes when you know roughly what a note is called. Folders with a matching name are listed too.
+    
+    Args:
+        title: Title, or part of it, as you remember it
+        workspace: Workspace name (optional)
+        limit: Maximum number of notes and of folders (default: 10)
+        user_id: User profile ID to access (optional, overrides default)
+    """
+    if not title:
+        return codec.dumps({"error": "title parameter is required"}, compact=True)
+    
+    client, err = _get_client_or_error()
+    if err:
+        return err
+    try:
+        # The title index answers once the user's notes were listed; until
+        # then, or when nothing looks alike, the API looks for the exact text.
+        found = await client.views.find_titles(title, limit=limit, workspace=workspace, user_id=user_id)
+        notes, folders = found if found is not None else ([], [])
+        source = "index"
+        if not notes:
+            note = await client.resolve_note(title, workspace=workspace, user_id=user_id)
+            notes = [note] if note else []
+            source = "api"
+    except Exception as exc:
+        return _api_error_json(exc)
+    
+    formatted = []
+    for n in notes:
+        item = {
+            "id": n.get("id"),
+            "title": n.get("heading", "Untitled"),
+        }
+        if "score" in n:
+            item.update(folder=n.get("folder"), workspace=n.get("workspace"), updatedAt=n.get("updated"), score=n["score"])
+        formatted.append(item)
+    
+    return codec.dumps({
+        "query": title,
+        "source": source,
+        "count": len(formatted),
+        "notes": formatted,
+        "folders": [
+            {"id": f["id"], "name": f["name"], "path": f.get("path"), "workspace": f["workspace"], "score": f["score"]}
+            for f in folders
+        ],
+    })
+
+
+@mcp.tool()
+async def related_notes(note_id: int, workspace: Optional[str] = None, limit: int = 10, user_id: Optional[int] = None) -> str:
+    """Find the notes most similar to a note, by the words they use. Best matches first, with a score from 0 to 1.
+
+    Args:
+        note_id: ID of the note to find related notes for
+        workspace: Only return notes of this workspace (optional)
+        limit: Maximum number of results (default: 10)
+        user_id: User profile ID to access (optional, overrides default)
+    """
+    client, err = _get_client_or_error()
+    if err:
+        return err
+    if client.views.related_index is None:
+        if not numpy_available():
+            return codec.dumps({"error": "related_notes needs NumPy: pip install 'poznote-mcp-server[related]'"}, compact=True)
+        return codec.dumps({"error": "related_notes is disabled (POZNOTE_RELATED_INDEX=false)"}, compact=True)
+    try:
+        found = await client.views.related_notes(note_id, limit=limit, workspace=workspace, user_id=user_id)
+    except Exception as exc:
+        return _api_error_json(exc)
+    if found is None:
+        return codec.dumps({"error": "The notes are being indexed for related_notes; try again in a moment"}, compact=True)
+    note, related = found
+    if note is None:
+        return codec.dumps({"error": f"Note {note_id} is not indexed (it may not exist, or be too recent)"}, compact=True)
+
+    return codec.dumps({
+        "note": {"id": note["id"], "title": note["heading"]},
+        "count": len(related),
+        "results": [
+            {
+                "id": r["id"],
+                "title": r["heading"],
+                "tags": r["tags"],
+                "folder": r["folder"],
+                "workspace": r["workspace"],
+                "updatedAt": r["updated"],
+                "score": r["score"],
+            }
+            for r in related
+        ],
+    })
+
+
+@mcp.tool()
+async def traverse_links(note_id: int, direction: str = "out", depth: int = DEFAULT_DEPTH, fan_out: int = DEFAULT_FAN_OUT, workspace: Optional[str] = None, user_id: Optional[int] = None) -> str:
+    """Walk the links between notes from a note, several hops at once (links, backlinks or both)
+    
+    Returns the notes reached with their distance (`depth`) and the note they were reached
+    `via`, and the links between all of them as [source, target] pairs.
+    
+    Args:
+        note_id: ID of the note to start from
+        direction: "out" for the notes it links to, "in" for its backlinks, "both" (default: out)
+        depth: Maximum number of hops, 1 to 5 (default: 2)
+        fan_out: Maximum number of links followed from each note (default: 20)
+        workspace: Only walk notes of this workspace (optional)
+        user_id: User profile ID to access (optional, overrides default)
+    """
+    if direction not in DIRECTIONS:
+        return codec.dumps({"error": f"direction must be one of: {', '.join(DIRECTIONS)}"}, compact=True)
+    if not 1 <= depth <= MAX_DEPTH:
+        return codec.dumps({"error": f"depth must be between 1 and {MAX_DEPTH}"}, compact=True)
+    if fan_out < 1:
+        return codec.dumps({"error": "fan_out must be at least 1"}, compact=True)
+    client, err = _get_client_or_error()
+    if err:
+        return err
+    if client.views.link_graph is None:
+        return codec.dumps({"error": "traverse_links is disabled (POZNOTE_LINK_GRAPH=false)"}, compact=True)
+    try:
+        found = await client.views.traverse_links(note_id, direction, depth, fan_out, workspace, user_id=user_id)
+    except Exception as exc:
+        return _api_error_json(exc)
+    if found is None:
+        return codec.dumps({"error": "The links between notes are being read for traverse_links; try again in a moment"}, compact=True)
+    note, nodes, links, truncated = found
+    if note is None:
+        return codec.dumps({"error": f"Note {note_id} is not indexed (it may not exist, or be too recent)"}, compact=True)
+
+    return codec.dumps({
+        "note": {"id": note["id"], "title": note["heading"] or "Untitled"},
+        "direction": direction,
+        "count": len(nodes),
+        "notes": [
+            {
+                "id": n["id"],
+                "title": n["heading"] or "Untitled",
+                "workspace": n["workspace"],
+                "folder": n["folder"],
+                "depth": n["depth"],
+                "via": n["via"],
+            }
+            for n in nodes
+        ],
+        "links": links,
+        "truncated": truncated,
+    })
+
+
+@mcp.tool()
+async def note_importance(note_id: Optional[int] = None, by: str = "pagerank", limit: int = 10, workspace: Optional[str] = None, user_id: Optional[int] = None) -> str:
+    """Find the central notes of the link graph: PageRank, links in and out, and connected components
+    
+    Without note_id, returns the top notes and a summary of the graph; with it, that note's figures.
+    `relative_rank` is the PageRank against a note without links (1.0); component 0 is the largest
+    group of notes linked together, directly or not.
+    
+    Args:
+        note_id: ID of a note to get the figures of (optional)
+        by: Order of the top notes: pagerank (default), in_degree or out_degree
+        limit: Maximum number of results (default: 10)
+        workspace: Only list notes of this workspace; ranks are computed over all notes (optional)
+        user_id: User profile ID to access (optional, overrides default)
+    """
+    if by not in IMPORTANCE_ORDERS:
+        return codec.dumps({"error": f"by must be one of: {', '.join(IMPORTANCE_ORDERS)}"}, compact=True)
+    client, err = _get_client_or_error()
+    if err:
+        return err
+    if client.views.importance is None:
+        if client.views.link_graph is None:
+            return codec.dumps({"error": "note_importance is disabled (POZNOTE_LINK_GRAPH=false)"}, compact=True)
+        return codec.dumps({"error": "note_importance needs NumPy: pip install 'poznote-mcp-server[graph]'"}, compact=True)
+    try:
+        importance = await client.views.note_importance(user_id=user_id)
+    except Exception as exc:
+        return _api_error_json(exc)
+    if importance is None:
+        return codec.dumps({"error": "The links between notes are being read for note_importance; try again in a moment"}, compact=True)
+
+    user = client.user_id if user_id is None else user_id
+    if note_id is not None:
+        figures = importance.note(note_id)
+        (note,) = client.views.link_graph.notes(user, [note_id]) or (None,)
+        if figures is None or note is None:
+            return codec.dumps({"error": f"Note {note_id} is not indexed (it may not exist, or be too recent)"}, compact=True)
+        return codec.dumps({"note": {"id": note["id"], "title": note["heading"] or "Untitled", **figures}, "graph": importance.summary()})
+
+    top = importance.top(client.views.link_graph, user, by, limit, workspace)
+    return codec.dumps({
+        "by": by,
+        "graph": importance.summary(),
+        "count": len(top),
+        "notes": [
+            {
+                "id": n["id"],
+                "title": n["heading"] or "Untitled",
+                "workspace": n["workspace"],
+                "folder": n["folder"],
+                **{key: n[key] for key in ("pagerank", "relative_rank", "in_degree", "out_degree", "component", "component_size")},
+            }
+            for n in top
+        ],
+    })
 
 
 def _normalize_content(content, note_type=None):
@@ -373,14 +825,14 @@ def _normalize_content(content, note_type=None):
     return json.dumps(content, ensure_ascii=False)
 
 
-def _reminder_result(client, note_id: int, reminder_at, recurrence, message, email_enabled, user_id):
+async def _reminder_result(client, note_id: int, reminder_at, recurrence, message, email_enabled, user_id):
     """Set the note reminder after a create/update, returning a summary dict.
 
     Errors are reported alongside the note instead of raised, so a successful
     write is never reported as a failure just because the reminder call failed.
     """
     try:
-        result = client.set_reminder(
+        result = await client.set_reminder(
             note_id=note_id,
             reminder_at=reminder_at,
             message=message,
@@ -389,7 +841,7 @@ def _reminder_result(client, note_id: int, reminder_at, recurrence, message, ema
             user_id=user_id,
         )
     except Exception as exc:
-        return {"error": "Note was saved but the reminder failed", "detail": json.loads(_api_error_json(exc))}
+        return {"error": "Note was saved but the reminder failed", "detail": codec.loads(_api_error_json(exc))}
 
     if not result:
         return {"error": "Note was saved but the reminder could not be set"}
@@ -402,7 +854,7 @@ def _reminder_result(client, note_id: int, reminder_at, recurrence, message, ema
 
 
 @mcp.tool()
-def create_note(
+async def create_note(
     title: str,
     content: Union[str, list],
     workspace: Optional[str] = None,
@@ -448,18 +900,18 @@ def create_note(
         if note_type == "html":
             note_type = "note"
         if note_type not in {"note", "markdown", "excalidraw", "tasklist"}:
-            return json.dumps(
+            return codec.dumps(
                 {
                     "error": "Invalid note_type. Use 'note' (HTML), 'markdown', 'tasklist', or 'excalidraw'.",
                     "note_type": note_type,
                 },
-                ensure_ascii=False,
+                compact=True,
             )
 
     content = _normalize_content(content, note_type)
 
     try:
-        result = client.create_note(
+        result = await client.create_note(
             title=title,
             content=content,
             tags=tags,
@@ -472,7 +924,7 @@ def create_note(
         return _api_error_json(exc)
     
     if not result:
-        return json.dumps({"error": "Failed to create note"}, ensure_ascii=False)
+        return codec.dumps({"error": "Failed to create note"}, compact=True)
 
     payload = {
         "success": True,
@@ -485,16 +937,16 @@ def create_note(
         if note_id is None:
             payload["reminder"] = {"error": "Note was created but its ID is unknown, so no reminder was set"}
         else:
-            payload["reminder"] = _reminder_result(
+            payload["reminder"] = await _reminder_result(
                 client, int(note_id), reminder_at, reminder_recurrence,
                 reminder_message, reminder_email, user_id,
             )
 
-    return json.dumps(payload, indent=2, ensure_ascii=False)
+    return codec.dumps(payload)
 
 
 @mcp.tool()
-def update_note(
+async def update_note(
     id: int,
     workspace: Optional[str] = None,
     content: Optional[Union[str, list]] = None,
@@ -544,7 +996,7 @@ def update_note(
 
     if has_note_fields:
         try:
-            result = client.update_note(
+            result = await client.update_note(
                 note_id=id,
                 content=content,
                 title=title,
@@ -557,7 +1009,7 @@ def update_note(
             return _api_error_json(exc)
 
         if result and result.get("code") == "version_conflict":
-            return json.dumps({
+            return codec.dumps({
                 "success": False,
                 "error": "version_conflict",
                 "message": (
@@ -566,15 +1018,15 @@ def update_note(
                     "with the new version token."
                 ),
                 "current": result.get("current"),
-            }, indent=2, ensure_ascii=False)
+            })
 
         if not result:
-            return json.dumps({"error": f"Note {id} not found or update failed"}, ensure_ascii=False)
+            return codec.dumps({"error": f"Note {id} not found or update failed"}, compact=True)
 
     if not has_note_fields and reminder_at is None:
-        return json.dumps(
+        return codec.dumps(
             {"error": "Nothing to update. Provide content, title, tags or reminder_at."},
-            ensure_ascii=False,
+            compact=True,
         )
 
     payload = {
@@ -587,24 +1039,24 @@ def update_note(
     if reminder_at is not None:
         if str(reminder_at).strip().lower() in {"none", ""}:
             try:
-                removed = client.remove_reminder(id, user_id=user_id)
+                removed = await client.remove_reminder(id, user_id=user_id)
             except Exception as exc:
-                payload["reminder"] = {"error": "Failed to remove the reminder", "detail": json.loads(_api_error_json(exc))}
+                payload["reminder"] = {"error": "Failed to remove the reminder", "detail": codec.loads(_api_error_json(exc))}
             else:
                 payload["reminder"] = (
                     {"removed": True} if removed else {"error": f"Note {id} not found or reminder removal failed"}
                 )
         else:
-            payload["reminder"] = _reminder_result(
+            payload["reminder"] = await _reminder_result(
                 client, id, reminder_at, reminder_recurrence,
                 reminder_message, reminder_email, user_id,
             )
 
-    return json.dumps(payload, indent=2, ensure_ascii=False)
+    return codec.dumps(payload)
 
 
 @mcp.tool()
-def delete_note(id: int, workspace: Optional[str] = None, user_id: Optional[int] = None) -> str:
+async def delete_note(id: int, workspace: Optional[str] = None, user_id: Optional[int] = None) -> str:
     """Delete a note by its ID
     
     Args:
@@ -616,17 +1068,17 @@ def delete_note(id: int, workspace: Optional[str] = None, user_id: Optional[int]
     if err:
         return err
     try:
-        success = client.delete_note(id, workspace=workspace, user_id=user_id)
+        success = await client.delete_note(id, workspace=workspace, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
     
     if success:
-        return json.dumps({
+        return codec.dumps({
             "success": True,
             "message": f"Note {id} deleted successfully",
-        }, indent=2, ensure_ascii=False)
+        })
     else:
-        return json.dumps({"error": f"Note {id} not found or deletion failed"}, ensure_ascii=False)
+        return codec.dumps({"error": f"Note {id} not found or deletion failed"}, compact=True)
 
 
 # =============================================================================
@@ -634,7 +1086,7 @@ def delete_note(id: int, workspace: Optional[str] = None, user_id: Optional[int]
 # =============================================================================
 
 @mcp.tool()
-def get_reminder(note_id: int, user_id: Optional[int] = None) -> str:
+async def get_reminder(note_id: int, user_id: Optional[int] = None) -> str:
     """Get the reminder currently set on a note
 
     Args:
@@ -645,23 +1097,23 @@ def get_reminder(note_id: int, user_id: Optional[int] = None) -> str:
     if err:
         return err
     try:
-        reminder = client.get_reminder(note_id, user_id=user_id)
+        reminder = await client.get_reminder(note_id, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
 
     if reminder is None:
-        return json.dumps({"error": f"Note {note_id} not found"}, ensure_ascii=False)
+        return codec.dumps({"error": f"Note {note_id} not found"}, compact=True)
 
-    return json.dumps({
+    return codec.dumps({
         "note_id": note_id,
         "reminder_at": reminder.get("reminder_at"),
         "recurrence": reminder.get("recurrence"),
         "email_enabled": reminder.get("email_enabled"),
-    }, indent=2, ensure_ascii=False)
+    })
 
 
 @mcp.tool()
-def set_reminder(
+async def set_reminder(
     note_id: int,
     reminder_at: str,
     recurrence: Optional[str] = None,
@@ -688,7 +1140,7 @@ def set_reminder(
     if err:
         return err
     try:
-        result = client.set_reminder(
+        result = await client.set_reminder(
             note_id=note_id,
             reminder_at=reminder_at,
             message=message,
@@ -700,20 +1152,20 @@ def set_reminder(
         return _api_error_json(exc)
 
     if not result:
-        return json.dumps({"error": f"Note {note_id} not found or reminder failed"}, ensure_ascii=False)
+        return codec.dumps({"error": f"Note {note_id} not found or reminder failed"}, compact=True)
 
-    return json.dumps({
+    return codec.dumps({
         "success": True,
         "message": f"Reminder set on note {note_id}",
         "note_id": note_id,
         "reminder_at": result.get("reminder_at"),
         "recurrence": result.get("recurrence"),
         "email_enabled": result.get("email_enabled"),
-    }, indent=2, ensure_ascii=False)
+    })
 
 
 @mcp.tool()
-def remove_reminder(note_id: int, user_id: Optional[int] = None) -> str:
+async def remove_reminder(note_id: int, user_id: Optional[int] = None) -> str:
     """Remove the reminder from a note
 
     Args:
@@ -724,14 +1176,60 @@ def remove_reminder(note_id: int, user_id: Optional[int] = None) -> str:
     if err:
         return err
     try:
-        success = client.remove_reminder(note_id, user_id=user_id)
+        success = await client.remove_reminder(note_id, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
 
-    return json.dumps({
+    return codec.dumps({
         "success": success,
         "message": f"Reminder removed from note {note_id}" if success else f"Note {note_id} not found or removal failed",
-    }, ensure_ascii=False)
+    }, compact=True)
+
+
+@mcp.tool()
+async def upcoming_reminders(
+    from_date: Optional[str] = None,
+    days: int = DEFAULT_REMINDER_DAYS,
+    kind: Optional[str] = None,
+    workspace: Optional[str] = None,
+    limit: int = 100,
+    user_id: Optional[int] = None,
+) -> str:
+    """List the reminders that will fire over the coming days, recurring ones at each occurrence
+
+    Covers note reminders and the reminders of open tasks with a due date, in time order,
+    with times in the user's timezone. `total` counts every occurrence in the window, of
+    which at most `limit` are returned.
+
+    Args:
+        from_date: First day of the window (YYYY-MM-DD, in the user's timezone); default: now
+        days: Length of the window in days, 1 to 366 (default: 30)
+        kind: "note" or "task" to list only one kind of reminder (optional)
+        workspace: Only reminders of notes in this workspace (optional)
+        limit: Maximum number of occurrences (default: 100)
+        user_id: User profile ID to access (optional, overrides default)
+    """
+    if kind is not None and kind not in REMINDER_KINDS:
+        return codec.dumps({"error": f"kind must be one of: {', '.join(REMINDER_KINDS)}"}, compact=True)
+    if not 1 <= days <= MAX_REMINDER_DAYS:
+        return codec.dumps({"error": f"days must be between 1 and {MAX_REMINDER_DAYS}"}, compact=True)
+    try:
+        reminder_window(from_date, days, None)
+    except ValueError:
+        return codec.dumps({"error": "from_date must be a date (YYYY-MM-DD)"}, compact=True)
+    client, err = _get_client_or_error()
+    if err:
+        return err
+    if client.views.note_reminders is None:
+        return codec.dumps({"error": "upcoming_reminders needs NumPy: pip install 'poznote-mcp-server[reminders]'"}, compact=True)
+    try:
+        result = await client.views.upcoming_reminders(from_date, days, kind, workspace, max(1, limit), user_id=user_id)
+    except Exception as exc:
+        return _api_error_json(exc)
+    if result is None:
+        return codec.dumps({"error": "The reminders of the notes are being read for upcoming_reminders; try again in a moment"}, compact=True)
+
+    return codec.dumps({**result, "count": len(result["occurrences"])})
 
 
 # =============================================================================
@@ -739,7 +1237,7 @@ def remove_reminder(note_id: int, user_id: Optional[int] = None) -> str:
 # =============================================================================
 
 @mcp.tool()
-def list_tasks(note_id: int, user_id: Optional[int] = None) -> str:
+async def list_tasks(note_id: int, user_id: Optional[int] = None) -> str:
     """List the tasks of a tasklist note, with their IDs, due dates and flags
 
     Use this to get a task's ID before calling update_task, complete_task or
@@ -753,24 +1251,24 @@ def list_tasks(note_id: int, user_id: Optional[int] = None) -> str:
     if err:
         return err
     try:
-        result = client.list_tasks(note_id, user_id=user_id)
+        result = await client.list_tasks(note_id, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
 
     if result is None:
-        return json.dumps({"error": f"Note {note_id} not found"}, ensure_ascii=False)
+        return codec.dumps({"error": f"Note {note_id} not found"}, compact=True)
 
     tasks = result.get("tasks", [])
-    return json.dumps({
+    return codec.dumps({
         "note_id": note_id,
         "title": result.get("heading"),
         "count": len(tasks),
         "tasks": tasks,
-    }, indent=2, ensure_ascii=False)
+    })
 
 
 @mcp.tool()
-def add_task(
+async def add_task(
     note_id: int,
     text: str,
     due_at: Optional[str] = None,
@@ -796,13 +1294,13 @@ def add_task(
         user_id: User profile ID to access (optional, overrides default)
     """
     if not text or not str(text).strip():
-        return json.dumps({"error": "text is required"}, ensure_ascii=False)
+        return codec.dumps({"error": "text is required"}, compact=True)
 
     client, err = _get_client_or_error()
     if err:
         return err
     try:
-        task = client.add_task(
+        task = await client.add_task(
             note_id=note_id,
             text=str(text).strip(),
             due_at=due_at,
@@ -816,18 +1314,18 @@ def add_task(
         return _api_error_json(exc)
 
     if not task:
-        return json.dumps({"error": f"Note {note_id} not found or task creation failed"}, ensure_ascii=False)
+        return codec.dumps({"error": f"Note {note_id} not found or task creation failed"}, compact=True)
 
-    return json.dumps({
+    return codec.dumps({
         "success": True,
         "message": f"Task added to note {note_id}",
         "note_id": note_id,
         "task": task,
-    }, indent=2, ensure_ascii=False)
+    })
 
 
 @mcp.tool()
-def update_task(
+async def update_task(
     note_id: int,
     task_id: str,
     text: Optional[str] = None,
@@ -875,29 +1373,29 @@ def update_task(
         fields["due_at"] = None if str(due_at).strip().lower() in {"none", ""} else due_at
 
     if not fields:
-        return json.dumps({"error": "Nothing to update. Provide at least one field."}, ensure_ascii=False)
+        return codec.dumps({"error": "Nothing to update. Provide at least one field."}, compact=True)
 
     client, err = _get_client_or_error()
     if err:
         return err
     try:
-        task = client.update_task(note_id, str(task_id), fields, user_id=user_id)
+        task = await client.update_task(note_id, str(task_id), fields, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
 
     if not task:
-        return json.dumps({"error": f"Task {task_id} not found in note {note_id}"}, ensure_ascii=False)
+        return codec.dumps({"error": f"Task {task_id} not found in note {note_id}"}, compact=True)
 
-    return json.dumps({
+    return codec.dumps({
         "success": True,
         "message": f"Task {task_id} updated",
         "note_id": note_id,
         "task": task,
-    }, indent=2, ensure_ascii=False)
+    })
 
 
 @mcp.tool()
-def complete_task(note_id: int, task_id: str, completed: bool = True, user_id: Optional[int] = None) -> str:
+async def complete_task(note_id: int, task_id: str, completed: bool = True, user_id: Optional[int] = None) -> str:
     """Mark a task of a tasklist note as done (or undone)
 
     Args:
@@ -910,23 +1408,23 @@ def complete_task(note_id: int, task_id: str, completed: bool = True, user_id: O
     if err:
         return err
     try:
-        task = client.update_task(note_id, str(task_id), {"completed": bool(completed)}, user_id=user_id)
+        task = await client.update_task(note_id, str(task_id), {"completed": bool(completed)}, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
 
     if not task:
-        return json.dumps({"error": f"Task {task_id} not found in note {note_id}"}, ensure_ascii=False)
+        return codec.dumps({"error": f"Task {task_id} not found in note {note_id}"}, compact=True)
 
-    return json.dumps({
+    return codec.dumps({
         "success": True,
         "message": f"Task {task_id} marked as {'completed' if completed else 'not completed'}",
         "note_id": note_id,
         "task": task,
-    }, indent=2, ensure_ascii=False)
+    })
 
 
 @mcp.tool()
-def delete_task(note_id: int, task_id: str, user_id: Optional[int] = None) -> str:
+async def delete_task(note_id: int, task_id: str, user_id: Optional[int] = None) -> str:
     """Delete one task from a tasklist note
 
     Args:
@@ -938,18 +1436,82 @@ def delete_task(note_id: int, task_id: str, user_id: Optional[int] = None) -> st
     if err:
         return err
     try:
-        success = client.delete_task(note_id, str(task_id), user_id=user_id)
+        success = await client.delete_task(note_id, str(task_id), user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
 
-    return json.dumps({
+    return codec.dumps({
         "success": success,
         "message": f"Task {task_id} deleted" if success else f"Task {task_id} not found in note {note_id}",
-    }, ensure_ascii=False)
+    }, compact=True)
 
 
 @mcp.tool()
-def create_folder(
+async def query_tasks(
+    completed: Optional[bool] = False,
+    important: Optional[bool] = None,
+    due_from: Optional[str] = None,
+    due_to: Optional[str] = None,
+    note_id: Optional[int] = None,
+    folder: Optional[str] = None,
+    workspace: Optional[str] = None,
+    include_checklists: bool = False,
+    sort: str = "due",
+    limit: int = 50,
+    user_id: Optional[int] = None,
+) -> str:
+    """Find tasks across every tasklist note, e.g. what is due this week or what is important
+
+    Tasks come with their note, folder and workspace. `total` counts every task matching the
+    filters, of which at most `limit` are returned.
+
+    Args:
+        completed: False for open tasks (default), True for done ones, null for both
+        important: Only important tasks (true) or only the others (false) (optional)
+        due_from: Only tasks due on or after this local date, 'YYYY-MM-DD' or 'YYYY-MM-DDTHH:MM'
+        due_to: Only tasks due on or before this local date, 'YYYY-MM-DD' or 'YYYY-MM-DDTHH:MM'
+        note_id: Only tasks of this tasklist note (optional)
+        folder: Only tasks of notes in this folder, by name or ID (optional)
+        workspace: Only tasks of notes in this workspace (optional)
+        include_checklists: Also list the checklist items of regular notes (default: false)
+        sort: 'due' for the earliest due date first (default), 'important' for important tasks first
+        limit: Maximum number of tasks (default: 50)
+        user_id: User profile ID to access (optional, overrides default)
+    """
+    if sort not in TASK_SORTS:
+        return codec.dumps({"error": f"sort must be one of: {', '.join(TASK_SORTS)}"}, compact=True)
+    try:
+        due_bound(due_from)
+        due_bound(due_to)
+    except ValueError:
+        return codec.dumps({"error": "due_from and due_to must be 'YYYY-MM-DD' or 'YYYY-MM-DDTHH:MM'"}, compact=True)
+    client, err = _get_client_or_error()
+    if err:
+        return err
+    try:
+        result = await client.views.query_tasks(
+            completed, important, note_id, folder, workspace, due_from, due_to,
+            include_checklists, sort, max(1, limit), user_id=user_id,
+        )
+    except Exception as exc:
+        return _api_error_json(exc)
+    if result is None:
+        return codec.dumps({"error": "The tasks are being read for query_tasks; try again in a moment"}, compact=True)
+
+    filters = {
+        "completed": completed, "important": important, "due_from": due_from, "due_to": due_to,
+        "note_id": note_id, "folder": folder, "workspace": workspace,
+    }
+    return codec.dumps({
+        "filters": {key: value for key, value in filters.items() if value is not None},
+        "total": result["total"],
+        "count": len(result["tasks"]),
+        "tasks": result["tasks"],
+    })
+
+
+@mcp.tool()
+async def create_folder(
     folder_name: str,
     workspace: Optional[str] = None,
     parent_folder_id: Optional[int] = None,
@@ -964,13 +1526,13 @@ def create_folder(
         user_id: User profile ID to access (optional, overrides default)
     """
     if not folder_name:
-        return json.dumps({"error": "folder_name is required"}, ensure_ascii=False)
+        return codec.dumps({"error": "folder_name is required"}, compact=True)
     
     client, err = _get_client_or_error()
     if err:
         return err
     try:
-        result = client.create_folder(
+        result = await client.create_folder(
             folder_name=folder_name,
             parent_folder_id=parent_folder_id,
             workspace=workspace,
@@ -980,17 +1542,17 @@ def create_folder(
         return _api_error_json(exc)
     
     if result:
-        return json.dumps({
+        return codec.dumps({
             "success": True,
             "message": f"Folder '{folder_name}' created successfully",
             "folder": result,
-        }, indent=2, ensure_ascii=False)
+        })
     else:
-        return json.dumps({"error": "Failed to create folder"}, ensure_ascii=False)
+        return codec.dumps({"error": "Failed to create folder"}, compact=True)
 
 
 @mcp.tool()
-def list_folders(workspace: Optional[str] = None, user_id: Optional[int] = None) -> str:
+async def list_folders(workspace: Optional[str] = None, user_id: Optional[int] = None) -> str:
     """List all folders from a specific workspace
     
     Args:
@@ -1001,7 +1563,7 @@ def list_folders(workspace: Optional[str] = None, user_id: Optional[int] = None)
     if err:
         return err
     try:
-        folders = client.list_folders(workspace=workspace, user_id=user_id)
+        folders = await client.list_folders(workspace=workspace, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
     result = {
@@ -1011,11 +1573,11 @@ def list_folders(workspace: Optional[str] = None, user_id: Optional[int] = None)
     if workspace is not None:
         result["workspace"] = workspace
 
-    return json.dumps(result, indent=2, ensure_ascii=False)
+    return codec.dumps(result)
 
 
 @mcp.tool()
-def list_workspaces(user_id: Optional[int] = None) -> str:
+async def list_workspaces(user_id: Optional[int] = None) -> str:
     """List all available workspaces
     
     Args:
@@ -1025,17 +1587,17 @@ def list_workspaces(user_id: Optional[int] = None) -> str:
     if err:
         return err
     try:
-        workspaces = client.list_workspaces(user_id=user_id)
+        workspaces = await client.list_workspaces(user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
-    return json.dumps({
+    return codec.dumps({
         "count": len(workspaces),
         "workspaces": workspaces,
-    }, indent=2, ensure_ascii=False)
+    })
 
 
 @mcp.tool()
-def list_tags(user_id: Optional[int] = None) -> str:
+async def list_tags(user_id: Optional[int] = None) -> str:
     """List all unique tags used in notes
     
     Args:
@@ -1045,17 +1607,57 @@ def list_tags(user_id: Optional[int] = None) -> str:
     if err:
         return err
     try:
-        tags = client.list_tags(user_id=user_id)
+        tags = await client.list_tags(user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
-    return json.dumps({
+    return codec.dumps({
         "count": len(tags),
         "tags": tags,
-    }, indent=2, ensure_ascii=False)
+    })
 
 
 @mcp.tool()
-def get_trash(user_id: Optional[int] = None) -> str:
+async def tag_stats(tag: Optional[str] = None, workspace: Optional[str] = None, folder: Optional[str] = None, created_from: Optional[str] = None, created_to: Optional[str] = None, limit: int = 20, user_id: Optional[int] = None) -> str:
+    """Count how tags are used: notes per tag, per workspace, and the tags most often found together
+    
+    Without tag, lists the most used tags, each with its top co-occurring tags; with it, describes
+    that tag only. Filters restrict the notes that are counted.
+    
+    Args:
+        tag: Tag to describe (optional)
+        workspace: Only count notes of this workspace (optional)
+        folder: Only count notes of this folder, by name or ID (optional)
+        created_from: Only count notes created on or after this date (YYYY-MM-DD)
+        created_to: Only count notes created on or before this date (YYYY-MM-DD)
+        limit: Maximum number of tags, or of co-occurring tags with `tag` (default: 20)
+        user_id: User profile ID to access (optional, overrides default)
+    """
+    try:
+        utc_boundary(created_from, None, False)
+        utc_boundary(created_to, None, True)
+    except ValueError:
+        return codec.dumps({"error": "created_from and created_to must be dates (YYYY-MM-DD)"}, compact=True)
+    client, err = _get_client_or_error()
+    if err:
+        return err
+    try:
+        facets = await client.views.tag_stats(workspace, folder, created_from, created_to, tag, limit, user_id=user_id)
+    except Exception as exc:
+        return _api_error_json(exc)
+    if facets is None:
+        return codec.dumps({"error": "The notes are being listed for tag_stats; try again in a moment"}, compact=True)
+    if tag is not None and not facets["tags"]:
+        return codec.dumps({"error": f"No note matching the filters has the tag {tag!r}"}, compact=True)
+
+    filters = {"workspace": workspace, "folder": folder, "created_from": created_from, "created_to": created_to}
+    return codec.dumps({
+        "filters": {key: value for key, value in filters.items() if value is not None},
+        **facets,
+    })
+
+
+@mcp.tool()
+async def get_trash(user_id: Optional[int] = None) -> str:
     """List all notes currently in the trash
     
     Args:
@@ -1065,17 +1667,17 @@ def get_trash(user_id: Optional[int] = None) -> str:
     if err:
         return err
     try:
-        notes = client.get_trash(user_id=user_id)
+        notes = await client.get_trash(user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
-    return json.dumps({
+    return codec.dumps({
         "count": len(notes),
         "notes": notes,
-    }, indent=2, ensure_ascii=False)
+    })
 
 
 @mcp.tool()
-def empty_trash(user_id: Optional[int] = None) -> str:
+async def empty_trash(user_id: Optional[int] = None) -> str:
     """Permanently delete all notes in the trash
     
     Args:
@@ -1085,14 +1687,14 @@ def empty_trash(user_id: Optional[int] = None) -> str:
     if err:
         return err
     try:
-        success = client.empty_trash(user_id=user_id)
+        success = await client.empty_trash(user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
-    return json.dumps({"success": success, "message": "Trash emptied" if success else "Failed to empty trash"}, ensure_ascii=False)
+    return codec.dumps({"success": success, "message": "Trash emptied" if success else "Failed to empty trash"}, compact=True)
 
 
 @mcp.tool()
-def restore_note(id: int, user_id: Optional[int] = None) -> str:
+async def restore_note(id: int, user_id: Optional[int] = None) -> str:
     """Restore a note from the trash
     
     Args:
@@ -1103,14 +1705,14 @@ def restore_note(id: int, user_id: Optional[int] = None) -> str:
     if err:
         return err
     try:
-        success = client.restore_note(id, user_id=user_id)
+        success = await client.restore_note(id, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
-    return json.dumps({"success": success, "message": f"Note {id} restored" if success else f"Failed to restore note {id}"}, ensure_ascii=False)
+    return codec.dumps({"success": success, "message": f"Note {id} restored" if success else f"Failed to restore note {id}"}, compact=True)
 
 
 @mcp.tool()
-def duplicate_note(id: int, user_id: Optional[int] = None) -> str:
+async def duplicate_note(id: int, user_id: Optional[int] = None) -> str:
     """Create a duplicate of an existing note
     
     Args:
@@ -1121,17 +1723,17 @@ def duplicate_note(id: int, user_id: Optional[int] = None) -> str:
     if err:
         return err
     try:
-        note = client.duplicate_note(id, user_id=user_id)
+        note = await client.duplicate_note(id, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
     if note:
-        return json.dumps({"success": True, "note": note}, indent=2, ensure_ascii=False)
+        return codec.dumps({"success": True, "note": note})
     else:
-        return json.dumps({"success": False, "error": f"Failed to duplicate note {id}"}, ensure_ascii=False)
+        return codec.dumps({"success": False, "error": f"Failed to duplicate note {id}"}, compact=True)
 
 
 @mcp.tool()
-def toggle_favorite(id: int, user_id: Optional[int] = None) -> str:
+async def toggle_favorite(id: int, user_id: Optional[int] = None) -> str:
     """Toggle the favorite status of a note
     
     Args:
@@ -1142,14 +1744,14 @@ def toggle_favorite(id: int, user_id: Optional[int] = None) -> str:
     if err:
         return err
     try:
-        success = client.toggle_favorite(id, user_id=user_id)
+        success = await client.toggle_favorite(id, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
-    return json.dumps({"success": success, "message": f"Note {id} favorite status toggled"}, ensure_ascii=False)
+    return codec.dumps({"success": success, "message": f"Note {id} favorite status toggled"}, compact=True)
 
 
 @mcp.tool()
-def list_attachments(note_id: int, user_id: Optional[int] = None) -> str:
+async def list_attachments(note_id: int, user_id: Optional[int] = None) -> str:
     """List all attachments for a specific note
     
     Args:
@@ -1160,18 +1762,18 @@ def list_attachments(note_id: int, user_id: Optional[int] = None) -> str:
     if err:
         return err
     try:
-        attachments = client.list_attachments(note_id, user_id=user_id)
+        attachments = await client.list_attachments(note_id, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
-    return json.dumps({
+    return codec.dumps({
         "note_id": note_id,
         "count": len(attachments),
         "attachments": attachments,
-    }, indent=2, ensure_ascii=False)
+    })
 
 
 @mcp.tool()
-def move_note_to_folder(note_id: int, folder_id: int, user_id: Optional[int] = None) -> str:
+async def move_note_to_folder(note_id: int, folder_id: int, user_id: Optional[int] = None) -> str:
     """Move a note to a specific folder
     
     Args:
@@ -1183,14 +1785,14 @@ def move_note_to_folder(note_id: int, folder_id: int, user_id: Optional[int] = N
     if err:
         return err
     try:
-        success = client.move_note_to_folder(note_id, folder_id, user_id=user_id)
+        success = await client.move_note_to_folder(note_id, folder_id, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
-    return json.dumps({"success": success, "message": f"Note {note_id} moved to folder {folder_id}" if success else "Failed to move note"}, ensure_ascii=False)
+    return codec.dumps({"success": success, "message": f"Note {note_id} moved to folder {folder_id}" if success else "Failed to move note"}, compact=True)
 
 
 @mcp.tool()
-def remove_note_from_folder(note_id: int, user_id: Optional[int] = None) -> str:
+async def remove_note_from_folder(note_id: int, user_id: Optional[int] = None) -> str:
     """Remove a note from its current folder (moves it to root)
     
     Args:
@@ -1201,14 +1803,14 @@ def remove_note_from_folder(note_id: int, user_id: Optional[int] = None) -> str:
     if err:
         return err
     try:
-        success = client.remove_note_from_folder(note_id, user_id=user_id)
+        success = await client.remove_note_from_folder(note_id, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
-    return json.dumps({"success": success, "message": f"Note {note_id} removed from folder" if success else "Failed to remove note from folder"}, ensure_ascii=False)
+    return codec.dumps({"success": success, "message": f"Note {note_id} removed from folder" if success else "Failed to remove note from folder"}, compact=True)
 
 
 @mcp.tool()
-def share_note(note_id: int, user_id: Optional[int] = None) -> str:
+async def share_note(note_id: int, user_id: Optional[int] = None) -> str:
     """Enable public sharing for a note and get the public URL
     
     Args:
@@ -1219,17 +1821,17 @@ def share_note(note_id: int, user_id: Optional[int] = None) -> str:
     if err:
         return err
     try:
-        share = client.create_note_share(note_id, user_id=user_id)
+        share = await client.create_note_share(note_id, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
     if share:
-        return json.dumps({"success": True, "share": share}, indent=2, ensure_ascii=False)
+        return codec.dumps({"success": True, "share": share})
     else:
-        return json.dumps({"success": False, "error": "Failed to enable sharing"}, ensure_ascii=False)
+        return codec.dumps({"success": False, "error": "Failed to enable sharing"}, compact=True)
 
 
 @mcp.tool()
-def unshare_note(note_id: int, user_id: Optional[int] = None) -> str:
+async def unshare_note(note_id: int, user_id: Optional[int] = None) -> str:
     """Disable public sharing for a note
     
     Args:
@@ -1240,14 +1842,14 @@ def unshare_note(note_id: int, user_id: Optional[int] = None) -> str:
     if err:
         return err
     try:
-        success = client.delete_note_share(note_id, user_id=user_id)
+        success = await client.delete_note_share(note_id, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
-    return json.dumps({"success": success, "message": "Sharing disabled" if success else "Failed to disable sharing"}, ensure_ascii=False)
+    return codec.dumps({"success": success, "message": "Sharing disabled" if success else "Failed to disable sharing"}, compact=True)
 
 
 @mcp.tool()
-def get_note_share_status(note_id: int, user_id: Optional[int] = None) -> str:
+async def get_note_share_status(note_id: int, user_id: Optional[int] = None) -> str:
     """Get the current sharing status and public URL for a note
     
     Args:
@@ -1258,17 +1860,17 @@ def get_note_share_status(note_id: int, user_id: Optional[int] = None) -> str:
     if err:
         return err
     try:
-        share = client.get_note_share_status(note_id, user_id=user_id)
+        share = await client.get_note_share_status(note_id, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
     if share:
-        return json.dumps({"success": True, "share": share}, indent=2, ensure_ascii=False)
+        return codec.dumps({"success": True, "share": share})
     else:
-        return json.dumps({"success": False, "message": "Note is not shared publicly"}, ensure_ascii=False)
+        return codec.dumps({"success": False, "message": "Note is not shared publicly"}, compact=True)
 
 
 @mcp.tool()
-def get_git_sync_status(user_id: Optional[int] = None) -> str:
+async def get_git_sync_status(user_id: Optional[int] = None) -> str:
     """Get the current status of Git synchronization (GitHub or Forgejo)
     
     Args:
@@ -1278,14 +1880,14 @@ def get_git_sync_status(user_id: Optional[int] = None) -> str:
     if err:
         return err
     try:
-        status = client.get_git_status(user_id=user_id)
+        status = await client.get_git_status(user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
-    return json.dumps(status, indent=2, ensure_ascii=False)
+    return codec.dumps(status)
 
 
 @mcp.tool()
-def git_push(user_id: Optional[int] = None) -> str:
+async def git_push(user_id: Optional[int] = None) -> str:
     """Force push local notes to the configured Git repository
     
     Args:
@@ -1295,14 +1897,14 @@ def git_push(user_id: Optional[int] = None) -> str:
     if err:
         return err
     try:
-        result = client.git_push(user_id=user_id)
+        result = await client.git_push(user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
-    return json.dumps(result, indent=2, ensure_ascii=False)
+    return codec.dumps(result)
 
 
 @mcp.tool()
-def git_pull(user_id: Optional[int] = None) -> str:
+async def git_pull(user_id: Optional[int] = None) -> str:
     """Force pull notes from the configured Git repository
     
     Args:
@@ -1312,53 +1914,53 @@ def git_pull(user_id: Optional[int] = None) -> str:
     if err:
         return err
     try:
-        result = client.git_pull(user_id=user_id)
+        result = await client.git_pull(user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
-    return json.dumps(result, indent=2, ensure_ascii=False)
+    return codec.dumps(result)
 
 
 @mcp.tool()
-def get_system_info() -> str:
+async def get_system_info() -> str:
     """Get version information about the Poznote installation"""
     client, err = _get_client_or_error()
     if err:
         return err
     try:
-        info = client.get_system_version()
+        info = await client.get_system_version()
     except Exception as exc:
         return _api_error_json(exc)
-    return json.dumps(info, indent=2, ensure_ascii=False)
+    return codec.dumps(info)
 
 
 @mcp.tool()
-def list_backups() -> str:
+async def list_backups() -> str:
     """List all available system backups"""
     client, err = _get_client_or_error()
     if err:
         return err
     try:
-        backups = client.list_backups()
+        backups = await client.list_backups()
     except Exception as exc:
         return _api_error_json(exc)
-    return json.dumps({"count": len(backups), "backups": backups}, indent=2, ensure_ascii=False)
+    return codec.dumps({"count": len(backups), "backups": backups})
 
 
 @mcp.tool()
-def create_backup() -> str:
+async def create_backup() -> str:
     """Trigger the creation of a new system backup"""
     client, err = _get_client_or_error()
     if err:
         return err
     try:
-        result = client.create_backup()
+        result = await client.create_backup()
     except Exception as exc:
         return _api_error_json(exc)
-    return json.dumps(result, indent=2, ensure_ascii=False)
+    return codec.dumps(result)
 
 
 @mcp.tool()
-def restore_backup(filename: str, user_id: Optional[int] = None) -> str:
+async def restore_backup(filename: str, user_id: Optional[int] = None) -> str:
     """Restore a backup file. This will replace all current user data.
     
     Args:
@@ -1369,14 +1971,14 @@ def restore_backup(filename: str, user_id: Optional[int] = None) -> str:
     if err:
         return err
     try:
-        result = client.restore_backup(filename, user_id=user_id)
+        result = await client.restore_backup(filename, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
-    return json.dumps(result, indent=2, ensure_ascii=False)
+    return codec.dumps(result)
 
 
 @mcp.tool()
-def get_app_setting(key: str, user_id: Optional[int] = None) -> str:
+async def get_app_setting(key: str, user_id: Optional[int] = None) -> str:
     """Get the value of a specific application setting
     
     Args:
@@ -1387,14 +1989,14 @@ def get_app_setting(key: str, user_id: Optional[int] = None) -> str:
     if err:
         return err
     try:
-        setting = client.get_setting(key, user_id=user_id)
+        setting = await client.get_setting(key, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
-    return json.dumps(setting, indent=2, ensure_ascii=False)
+    return codec.dumps(setting)
 
 
 @mcp.tool()
-def update_app_setting(key: str, value: str, user_id: Optional[int] = None) -> str:
+async def update_app_setting(key: str, value: str, user_id: Optional[int] = None) -> str:
     """Update the value of a specific application setting
     
     Args:
@@ -1406,14 +2008,14 @@ def update_app_setting(key: str, value: str, user_id: Optional[int] = None) -> s
     if err:
         return err
     try:
-        result = client.update_setting(key, value, user_id=user_id)
+        result = await client.update_setting(key, value, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
-    return json.dumps(result, indent=2, ensure_ascii=False)
+    return codec.dumps(result)
 
 
 @mcp.tool()
-def get_backlinks(note_id: int, user_id: Optional[int] = None) -> str:
+async def get_backlinks(note_id: int, user_id: Optional[int] = None) -> str:
     """Get all notes that link to (reference) a specific note
     
     Args:
@@ -1424,18 +2026,18 @@ def get_backlinks(note_id: int, user_id: Optional[int] = None) -> str:
     if err:
         return err
     try:
-        backlinks = client.get_backlinks(note_id, user_id=user_id)
+        backlinks = await client.get_backlinks(note_id, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
-    return json.dumps({
+    return codec.dumps({
         "note_id": note_id,
         "count": len(backlinks),
         "backlinks": backlinks,
-    }, indent=2, ensure_ascii=False)
+    })
 
 
 @mcp.tool()
-def convert_note(id: int, target: str, user_id: Optional[int] = None) -> str:
+async def convert_note(id: int, target: str, user_id: Optional[int] = None) -> str:
     """Convert a note between HTML and Markdown formats
     
     Args:
@@ -1445,23 +2047,23 @@ def convert_note(id: int, target: str, user_id: Optional[int] = None) -> str:
     """
     target = target.strip().lower()
     if target not in {"html", "markdown"}:
-        return json.dumps({"error": "Invalid target format. Use 'html' or 'markdown'."}, ensure_ascii=False)
+        return codec.dumps({"error": "Invalid target format. Use 'html' or 'markdown'."}, compact=True)
 
     client, err = _get_client_or_error()
     if err:
         return err
     try:
-        result = client.convert_note(id, target, user_id=user_id)
+        result = await client.convert_note(id, target, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
     if result:
-        return json.dumps({"success": True, "message": f"Note {id} converted to {target}", "note": result}, indent=2, ensure_ascii=False)
+        return codec.dumps({"success": True, "message": f"Note {id} converted to {target}", "note": result})
     else:
-        return json.dumps({"error": f"Failed to convert note {id}"}, ensure_ascii=False)
+        return codec.dumps({"error": f"Failed to convert note {id}"}, compact=True)
 
 
 @mcp.tool()
-def rename_folder(
+async def rename_folder(
     folder_id: int,
     new_name: str,
     workspace: Optional[str] = None,
@@ -1476,23 +2078,23 @@ def rename_folder(
         user_id: User profile ID to access (optional, overrides default)
     """
     if not new_name:
-        return json.dumps({"error": "new_name is required"}, ensure_ascii=False)
+        return codec.dumps({"error": "new_name is required"}, compact=True)
 
     client, err = _get_client_or_error()
     if err:
         return err
     try:
-        result = client.rename_folder(folder_id, new_name, workspace=workspace, user_id=user_id)
+        result = await client.rename_folder(folder_id, new_name, workspace=workspace, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
     if result:
-        return json.dumps({"success": True, "message": f"Folder renamed to '{new_name}'", "folder": result}, indent=2, ensure_ascii=False)
+        return codec.dumps({"success": True, "message": f"Folder renamed to '{new_name}'", "folder": result})
     else:
-        return json.dumps({"error": f"Folder {folder_id} not found or rename failed"}, ensure_ascii=False)
+        return codec.dumps({"error": f"Folder {folder_id} not found or rename failed"}, compact=True)
 
 
 @mcp.tool()
-def delete_folder(
+async def delete_folder(
     folder_id: int,
     workspace: Optional[str] = None,
     user_id: Optional[int] = None,
@@ -1508,17 +2110,17 @@ def delete_folder(
     if err:
         return err
     try:
-        success = client.delete_folder(folder_id, workspace=workspace, user_id=user_id)
+        success = await client.delete_folder(folder_id, workspace=workspace, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
     if success:
-        return json.dumps({"success": True, "message": f"Folder {folder_id} deleted"}, indent=2, ensure_ascii=False)
+        return codec.dumps({"success": True, "message": f"Folder {folder_id} deleted"})
     else:
-        return json.dumps({"error": f"Folder {folder_id} not found or deletion failed"}, ensure_ascii=False)
+        return codec.dumps({"error": f"Folder {folder_id} not found or deletion failed"}, compact=True)
 
 
 @mcp.tool()
-def create_workspace(name: str, user_id: Optional[int] = None) -> str:
+async def create_workspace(name: str, user_id: Optional[int] = None) -> str:
     """Create a new workspace
     
     Args:
@@ -1526,23 +2128,23 @@ def create_workspace(name: str, user_id: Optional[int] = None) -> str:
         user_id: User profile ID to access (optional, overrides default)
     """
     if not name:
-        return json.dumps({"error": "name is required"}, ensure_ascii=False)
+        return codec.dumps({"error": "name is required"}, compact=True)
 
     client, err = _get_client_or_error()
     if err:
         return err
     try:
-        result = client.create_workspace(name, user_id=user_id)
+        result = await client.create_workspace(name, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
     if result:
-        return json.dumps({"success": True, "message": f"Workspace '{name}' created", "workspace": result}, indent=2, ensure_ascii=False)
+        return codec.dumps({"success": True, "message": f"Workspace '{name}' created", "workspace": result})
     else:
-        return json.dumps({"error": "Failed to create workspace"}, ensure_ascii=False)
+        return codec.dumps({"error": "Failed to create workspace"}, compact=True)
 
 
 @mcp.tool()
-def rename_workspace(current_name: str, new_name: str, user_id: Optional[int] = None) -> str:
+async def rename_workspace(current_name: str, new_name: str, user_id: Optional[int] = None) -> str:
     """Rename an existing workspace
     
     Args:
@@ -1551,23 +2153,23 @@ def rename_workspace(current_name: str, new_name: str, user_id: Optional[int] =
         user_id: User profile ID to access (optional, overrides default)
     """
     if not new_name:
-        return json.dumps({"error": "new_name is required"}, ensure_ascii=False)
+        return codec.dumps({"error": "new_name is required"}, compact=True)
 
     client, err = _get_client_or_error()
     if err:
         return err
     try:
-        result = client.rename_workspace(current_name, new_name, user_id=user_id)
+        result = await client.rename_workspace(current_name, new_name, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
     if result:
-        return json.dumps({"success": True, "message": f"Workspace renamed from '{current_name}' to '{new_name}'", "workspace": result}, indent=2, ensure_ascii=False)
+        return codec.dumps({"success": True, "message": f"Workspace renamed from '{current_name}' to '{new_name}'", "workspace": result})
     else:
-        return json.dumps({"error": f"Failed to rename workspace '{current_name}'"}, ensure_ascii=False)
+        return codec.dumps({"error": f"Failed to rename workspace '{current_name}'"}, compact=True)
 
 
 @mcp.tool()
-def delete_workspace(name: str, user_id: Optional[int] = None) -> str:
+async def delete_workspace(name: str, user_id: Optional[int] = None) -> str:
     """Delete a workspace (cannot delete the last remaining workspace)
     
     Args:
@@ -1578,17 +2180,17 @@ def delete_workspace(name: str, user_id: Optional[int] = None) -> str:
     if err:
         return err
     try:
-        success = client.delete_workspace(name, user_id=user_id)
+        success = await client.delete_workspace(name, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
     if success:
-        return json.dumps({"success": True, "message": f"Workspace '{name}' deleted"}, indent=2, ensure_ascii=False)
+        return codec.dumps({"success": True, "message": f"Workspace '{name}' deleted"})
     else:
-        return json.dumps({"error": f"Failed to delete workspace '{name}'"}, ensure_ascii=False)
+        return codec.dumps({"error": f"Failed to delete workspace '{name}'"}, compact=True)
 
 
 @mcp.tool()
-def delete_backup(filename: str) -> str:
+async def delete_backup(filename: str) -> str:
     """Delete a specific backup file
     
     Args:
@@ -1598,17 +2200,17 @@ def delete_backup(filename: str) -> str:
     if err:
         return err
     try:
-        success = client.delete_backup(filename)
+        success = await client.delete_backup(filename)
     except Exception as exc:
         return _api_error_json(exc)
     if success:
-        return json.dumps({"success": True, "message": f"Backup '{filename}' deleted"}, indent=2, ensure_ascii=False)
+        return codec.dumps({"success": True, "message": f"Backup '{filename}' deleted"})
     else:
-        return json.dumps({"error": f"Failed to delete backup '{filename}'"}, ensure_ascii=False)
+        return codec.dumps({"error": f"Failed to delete backup '{filename}'"}, compact=True)
 
 
 @mcp.tool()
-def list_shared(workspace: Optional[str] = None, user_id: Optional[int] = None) -> str:
+async def list_shared(workspace: Optional[str] = None, user_id: Optional[int] = None) -> str:
     """List all publicly shared notes and folders
     
     Args:
@@ -1619,14 +2221,60 @@ def list_shared(workspace: Optional[str] = None, user_id: Optional[int] = None)
     if err:
         return err
     try:
-        shared = client.list_shared(workspace=workspace, user_id=user_id)
+        shared = await client.list_shared(workspace=workspace, user_id=user_id)
     except Exception as exc:
         return _api_error_json(exc)
-    return json.dumps({
+    return codec.dumps({
         "shared_notes_count": len(shared.get("shared_notes", [])),
         "shared_folders_count": len(shared.get("shared_folders", [])),
         **shared,
-    }, indent=2, ensure_ascii=False)
+    })
+
+
+# =============================================================================
+# OPERATOR ENDPOINTS
+# =============================================================================
+
+@mcp.custom_route("/webhooks/poznote", methods=["POST"])
+async def poznote_webhook(request: Request) -> JSONResponse:
+    """Receive Poznote's webhooks and drop the cached data they make stale"""
+    receiver = _get_webhook_receiver()
+    if receiver is None:
+        return JSONResponse(
+            {"success": False, "error": "Webhooks are disabled; set POZNOTE_WEBHOOK_SECRET to enable them"},
+            status_code=404,
+        )
+    status, body = receiver.handle(
+        get_client(), await request.body(), request.headers, request.query_params.get("user_id"),
+    )
+    return JSONResponse(body, status_code=status)
+
+
+@mcp.custom_route("/stats", methods=["GET"])
+async def stats(request: Request) -> JSONResponse:
+    """Runtime statistics for operators, e.g. to size the API connection pool
+
+    Counts summed over every user, never what a user's notes contain. The
+    route is not authenticated, so it is off unless enabled.
+    """
+    if not _stats_endpoint_enabled():
+        return JSONResponse(
+            {"success": False, "error": "Statistics are disabled; set POZNOTE_STATS=true to enable them"},
+            status_code=404,
+        )
+    client = get_client()
+    return JSONResponse({
+        "pool": client.pool_stats(),
+        "coalescing": client.coalescing_stats(),
+        "resilience": client.resilience_stats(),
+        "http_cache": client.http_cache.stats(),
+        "note_cache": client.note_cache.stats(),
+        "metadata_cache": client.metadata_cache.stats(),
+        "disk_cache": client.cache_stats(),
+        "result_windows": client.result_windows.stats(),
+        **client.views.stats(),
+        "webhooks": receiver.stats() if (receiver := _get_webhook_receiver()) else None,
+    })
 
 
 # =============================================================================
@@ -1655,12 +2303,95 @@ def create_parser() -> argparse.ArgumentParser:
         default=8045,
         help="Port to listen on (default: 8045)",
     )
+    serve_parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=None,
+        help="Maximum concurrent connections to the Poznote API "
+        "(default: POZNOTE_HTTP_MAX_CONNECTIONS or 100)",
+    )
+    serve_parser.add_argument(
+        "--max-keepalive",
+        type=int,
+        default=None,
+        help="Maximum idle connections kept alive for reuse "
+        "(default: POZNOTE_HTTP_MAX_KEEPALIVE or 20)",
+    )
+    serve_parser.add_argument(
+        "--keepalive-expiry",
+        type=float,
+        default=None,
+        help="Seconds an idle connection is kept alive "
+        "(default: POZNOTE_HTTP_KEEPALIVE_EXPIRY or 5)",
+    )
+    serve_parser.add_argument(
+        "--http2",
+        action="store_true",
+        default=None,
+        help="Talk HTTP/2 to the Poznote API; requires the 'http2' extra "
+        "(default: POZNOTE_HTTP2 or false)",
+    )
+    serve_parser.add_argument(
+        "--api-socket",
+        default=None,
+        help="Reach the Poznote API through this Unix domain socket, e.g. "
+        "unix:/run/poznote/nginx.sock (default: POZNOTE_API_SOCKET)",
+    )
+    serve_parser.add_argument(
+        "--tool-deadline",
+        action="append",
+        default=[],
+        metavar="TOOL=SECONDS",
+        help="Time budget for one tool, e.g. create_note=20; repeat for more tools "
+        "(default: POZNOTE_TOOL_DEADLINES, then POZNOTE_TOOL_DEADLINE or 30)",
+    )
+    serve_parser.add_argument(
+        "--compact-json",
+        action="store_true",
+        default=None,
+        help="Return tool results as compact JSON, without indentation "
+        "(default: POZNOTE_COMPACT_JSON or false)",
+    )
+    serve_parser.add_argument(
+        "--disk-cache",
+        default=None,
+        metavar="PATH",
+        help="Keep cached notes and lists in this SQLite file so restarts start warm "
+        "(default: POZNOTE_DISK_CACHE; off when unset)",
+    )
+    serve_parser.add_argument(
+        "--stats",
+        action="store_true",
+        default=None,
+        help="Serve runtime statistics on GET /stats, without authentication "
+        "(default: POZNOTE_STATS or false)",
+    )
+    serve_parser.add_argument(
+        "--webhook-secret-file",
+        default=None,
+        help="Accept Poznote webhooks on /webhooks/poznote, signed with the secret in this file "
+        "(default: POZNOTE_WEBHOOK_SECRET_FILE or POZNOTE_WEBHOOK_SECRET; disabled when unset)",
+    )
     
     return parser
 
 
+def _client_options_from_args(args: argparse.Namespace) -> dict:
+    """Client settings explicitly given on the command line"""
+    options = {
+        "max_connections": getattr(args, "max_connections", None),
+        "max_keepalive_connections": getattr(args, "max_keepalive", None),
+        "keepalive_expiry": getattr(args, "keepalive_expiry", None),
+        "http2": getattr(args, "http2", None),
+        "api_socket": getattr(args, "api_socket", None),
+        "disk_cache_path": getattr(args, "disk_cache", None),
+    }
+    return {key: value for key, value in options.items() if value is not None}
+
+
 def main():
     """Entry point"""
+    global _webhook_secret_file, _stats_enabled
     parser = create_parser()
     args = parser.parse_args()
     
@@ -1668,6 +2399,14 @@ def main():
     if args.command == "serve":
         host = args.host
         port = args.port
+        _client_options.update(_client_options_from_args(args))
+        _tool_deadline_overrides.update(_parse_tool_deadlines(args.tool_deadline, "--tool-deadline"))
+        if args.compact_json:
+            codec.set_compact(True)
+        if args.webhook_secret_file:
+            _webhook_secret_file = args.webhook_secret_file
+        if args.stats:
+            _stats_enabled = True
     else:
         # Backward compatibility: no subcommand means use env vars
         host = os.getenv("MCP_HOST", "0.0.0.0")
@@ -1675,6 +2414,9 @@ def main():
     
     try:
         logger.info("Starting Poznote MCP Server (HTTP mode on %s:%s)...", host, port)
+        logger.info("JSON codec: %s, %s tool output", codec.backend, "compact" if codec.compact_output() else "indented")
+        if _get_webhook_receiver():
+            logger.info("Accepting Poznote webhooks on http://%s:%s/webhooks/poznote", host, port)
         try:
             _assert_port_available(host, port)
         except OSError:
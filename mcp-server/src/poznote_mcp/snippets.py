@@ -0,0 +1,160 @@
+"""
+Excerpts of note text around the words of a search, with the words highlighted
+
+GET /notes/search returns the first 300 characters of each note as its
+excerpt, wherever the words were found, and results without one used to
+show the first 200 characters of raw content, HTML included. The agent then
+had to fetch the whole note to see why it matched. Excerpts are made here
+instead, for the results of the search index and of the API alike:
+
+- The text is the note's searchable text (searchindex.note_text), so there
+  is no markup in it.
+- A hit is a word of the text that folds to a query word or starts with it,
+  like the search matches it, or one of the words of a quoted phrase.
+- The fragment is the window of at most `length` characters holding the
+  most distinct query words, then the most hits; the earliest one wins a tie.
+  It is widened around its hits to `length` and cut at word boundaries.
+- Further fragments, up to `fragments`, are taken the same way among the
+  hits left out of the previous ones, and all are returned in text order.
+
+Each fragment has its start and end offsets in the text, the offsets of its
+hits, and its text with the hits in **bold**.
+"""
+
+import re
+
+from .searchindex import fold, parse_query
+
+# Characters per fragment and fragments per result, unless configured
+# (POZNOTE_SNIPPET_LENGTH, POZNOTE_SNIPPET_FRAGMENTS)
+SNIPPET_LENGTH = 160
+SNIPPET_FRAGMENTS = 2
+HIGHLIGHT = "**"
+ELLIPSIS = "..."
+
+_WORD = re.compile(r"\w+")
+_SPACE = re.compile(r"\s")
+
+
+def query_terms(query: str) -> tuple[list[str], set[str]]:
+    """The folded words to highlight, and those of them that also match as a prefix"""
+    words, phrases = parse_query(query)
+    terms = list(dict.fromkeys(words + [token for phrase in phrases for token in phrase]))
+    return terms, set(words)
+
+
+def find_hits(text: str, terms: list[str], prefixes: set[str]) -> list[tuple[int, int, int]]:
+    """(start, end, term index) of every word of `text` matching a term"""
+    hits = []
+    if not terms:
+        return hits
+    for match in _WORD.finditer(text):
+        token = fold(match.group())
+        for index, term in enumerate(terms):
+            if token == term or (term in prefixes and token.startswith(term)):
+                hits.append((match.start(), match.end(), index))
+                break
+    return hits
+
+
+def _densest(hits: list[tuple[int, int, int]], length: int) -> tuple[int, int]:
+    """The first and last index of the hits in the best window of `length` characters"""
+    counts: dict[int, int] = {}
+    best, best_range = (0, 0), (0, 0)
+    first = 0
+    for last, (_, end, term) in enumerate(hits):
+        counts[term] = counts.get(term, 0) + 1
+        while first < last and end - hits[first][0] > length:
+            dropped = hits[first][2]
+            counts[dropped] -= 1
+            if not counts[dropped]:
+                del counts[dropped]
+            first += 1
+        score = (len(counts), last - first + 1)
+        if score > best:
+            best, best_range = score, (first, last)
+    return best_range
+
+
+def _snap(text: str, start: int, end: int, keep_start: int, keep_end: int) -> tuple[int, int]:
+    """Move start and end inward to word boundaries, without cutting into [keep_start, keep_end)"""
+    if start > 0 and not _SPACE.match(text[start - 1]):
+        space = _SPACE.search(text, start, keep_start)
+        start = space.end() if space else keep_start
+    if end < len(text) and not _SPACE.match(text[end]):
+        space = max((match.start() for match in _SPACE.finditer(text, keep_end, end)), default=None)
+        end = space if space is not None else keep_end
+    while start < keep_start and text[start].isspace():
+        start += 1
+    while end > keep_end and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _fragment(text: str, start: int, end: int, highlights: list[tuple[int, int]]) -> dict:
+    parts, position = [], start
+    for hit_start, hit_end in highlights:
+        parts += [text[position:hit_start], HIGHLIGHT, text[hit_start:hit_end], HIGHLIGHT]
+        position = hit_end
+    parts.append(text[position:end])
+    return {"start": start, "end": end, "highlights": [list(hit) for hit in highlights], "text": "".join(parts)}
+
+
+def make_snippets(
+    text: str, query: str, length: int = SNIPPET_LENGTH, fragments: int = SNIPPET_FRAGMENTS
+) -> list[dict]:
+    """The fragments of `text` that best show why it matched `query`, in text order
+
+    Without a hit, the beginning of the text is the only fragment. An empty
+    text has none.
+    """
+    if not text:
+        return []
+    length = max(1, length)
+    terms, prefixes = query_terms(query)
+    hits = find_hits(text, terms, prefixes)
+    if not hits:
+        end = min(len(text), length)
+        _, snapped = _snap(text, 0, end, 0, 0)
+        return [_fragment(text, 0, snapped or end, [])]
+
+    taken: list[tuple[int, int]] = []
+    chosen = []
+    left = hits
+    while left and len(chosen) < fragments:
+        first, last = _densest(left, length)
+        span_start, span_end = left[first][0], left[last][1]
+        # Center the hits in the fragment, within the text and out of the
+        # fragments already taken.
+        lower, upper = 0, len(text)
+        for taken_start, taken_end in taken:
+            if taken_end <= span_start:
+                lower = max(lower, taken_end)
+            elif taken_start >= span_end:
+                upper = min(upper, taken_start)
+        start = max(lower, span_start - (length - (span_end - span_start)) // 2)
+        end = min(upper, start + length)
+        start = max(lower, min(start, end - length))
+        start, end = _snap(text, start, end, span_start, span_end)
+        inside = [(hit_start, hit_end) for hit_start, hit_end, _ in hits if start <= hit_start and hit_end <= end]
+        taken.append((start, end))
+        chosen.append(_fragment(text, start, end, inside))
+        left = [hit for hit in left if hit[1] <= start or hit[0] >= end]
+    return sorted(chosen, key=lambda fragment: fragment["start"])
+
+
+def join_snippets(text_length: int, snippets: list[dict], more: bool = False) -> str:
+    """The fragments as one excerpt, with an ellipsis where text was left out
+
+    `more` tells that the text itself was cut off, like the API's excerpts.
+    """
+    parts = []
+    position = 0
+    for snippet in snippets:
+        if snippet["start"] > position:
+            parts.append(ELLIPSIS)
+        parts.append(snippet["text"])
+        position = snippet["end"]
+    if snippets and (position < text_length or more):
+        parts.append(ELLIPSIS)
+    return " ".join(parts)
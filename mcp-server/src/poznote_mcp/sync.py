@@ -0,0 +1,279 @@
+"""
+Incremental sync of a user's notes into local views, driven by `updated`
+
+Local views of the notes (the search index, see searchindex.py) need every
+note body once, then only the ones that changed. A sync of one scope, a user
+and optionally one workspace, does:
+
+1. GET /notes, the metadata of every note, without their content. The whole
+   listing is read: its `after` paging seeks by note within an order that
+   puts folders first, not by `updated`, and every listed id is needed to
+   notice deletions. Comparing it is cheap next to fetching bodies.
+2. Compare each note with what the scope has seen: a new id, or a different
+   `updated`, title, tags, folder or workspace, means the body is fetched
+   again. So do notes that writes through the client queued.
+3. Fetch those bodies concurrently and hand them to the consumers.
+4. Ids that are no longer listed were deleted. Only then is GET /trash read,
+   to tell the trashed notes from the ones deleted for good.
+
+A steady-state sync with no change is that one listing and no note body.
+Each pass reports a cursor, the highest `updated` it listed; it tells how far
+the views have caught up and limits nothing. The time since a scope was last
+synced is its lag, reported with the notes fetched per second in stats().
+"""
+
+import threading
+import time
+
+# Seconds after which a read through a local view syncs its scope first
+DEFAULT_SYNC_MAX_AGE = 60.0
+# Note bodies fetched at the same time
+DEFAULT_SYNC_CONCURRENCY = 8
+
+
+def _signature(item: dict) -> tuple:
+    """The listed fields that, when they change, mean a note must be fetched again"""
+    return (
+        item.get("updated"),
+        item.get("heading"),
+        item.get("tags"),
+        item.get("folder_id"),
+        item.get("workspace"),
+    )
+
+
+class SyncResult:
+    """What one sync pass changed"""
+
+    __slots__ = ("full", "cursor", "listed", "fetched", "failed", "removed", "trashed", "requests", "seconds")
+
+    def __init__(self, full: bool):
+        self.full = full
+        self.cursor: str | None = None
+        self.listed = 0
+        self.fetched: list[int] = []
+        self.failed: list[int] = []
+        self.removed: list[int] = []
+        self.trashed: list[int] = []
+        self.requests = 0
+        self.seconds = 0.0
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class SyncPass:
+    """One sync of a scope in progress, from NoteSync.begin() to commit() or abort()"""
+
+    def __init__(self, key: tuple, epoch: int, ticket: int, pending: set[int], full: bool, started: float):
+        self.key = key
+        self.epoch = epoch
+        self.ticket = ticket
+        self.pending = pending
+        self.started = started
+        self.result = SyncResult(full)
+        self.listed: dict[int, tuple] = {}
+
+    @property
+    def user_id(self) -> str:
+        return self.key[0]
+
+    @property
+    def workspace(self) -> str | None:
+        return self.key[1] or None
+
+
+class _Scope:
+    __slots__ = ("known", "pending", "dirty", "changes", "synced_at", "syncing", "epoch")
+
+    def __init__(self, epoch: int = 0):
+        # note id -> signature of the version the consumers have
+        self.known: dict[int, tuple] = {}
+        self.pending: set[int] = set()
+        self.dirty = False
+        # Bumped by every invalidation, so that a pass does not clear work
+        # that was queued while it ran.
+        self.changes = 0
+        self.synced_at: float | None = None
+        self.syncing = False
+        # Bumped by reset(): a pass that began before it commits nothing.
+        self.epoch = epoch
+
+
+class NoteSync:
+    """What every synced scope has seen and its change queue, safe to share between threads
+
+    NoteViews.sync_notes does the requests through the client; this class
+    decides what to fetch and keeps the state between passes.
+    """
+
+    def __init__(
+        self, max_age: float = DEFAULT_SYNC_MAX_AGE, concurrency: int = DEFAULT_SYNC_CONCURRENCY, clock=time.monotonic
+    ):
+        self.max_age = max_age
+        self.concurrency = concurrency
+        self._clock = clock
+        self._scopes: dict[tuple, _Scope] = {}
+        self._lock = threading.Lock()
+        self._counts = {
+            "syncs": 0,
+            "full_syncs": 0,
+            "sync_errors": 0,
+            "requests": 0,
+            "notes_fetched": 0,
+            "notes_removed": 0,
+            "fetch_errors": 0,
+        }
+        self._seconds = 0.0
+        self._last: SyncResult | None = None
+
+    @staticmethod
+    def key(user_id, workspace: str | None = None) -> tuple:
+        return (str(user_id), workspace or "")
+
+    def _user_scopes(self, user_id) -> list[_Scope]:
+        user_id = str(user_id)
+        return [scope for key, scope in self._scopes.items() if key[0] == user_id]
+
+    def synced(self, key: tuple) -> bool:
+        """Whether the scope completed a sync since it was last reset"""
+        with self._lock:
+            scope = self._scopes.get(key)
+            return scope is not None and scope.synced_at is not None
+
+    def due(self, key: tuple) -> bool:
+        """Whether a read through the scope should sync it first"""
+        with self._lock:
+            scope = self._scopes.get(key)
+            if scope is None or scope.synced_at is None:
+                return True
+            return scope.dirty or bool(scope.pending) or self._clock() - scope.synced_at >= self.max_age
+
+    # Passes -----------------------------------------------------------------
+
+    def begin(self, key: tuple) -> SyncPass | None:
+        """Claim a sync of the scope; None if one is already running"""
+        with self._lock:
+            scope = self._scopes.get(key)
+            if scope is None:
+                scope = self._scopes[key] = _Scope()
+            if scope.syncing:
+                return None
+            scope.syncing = True
+            return SyncPass(key, scope.epoch, scope.changes, set(scope.pending), scope.synced_at is None, self._clock())
+
+    def plan(self, sync_pass: SyncPass, listed: list[dict]) -> tuple[list[int], list[int]]:
+        """Compare GET /notes with the scope: (ids to fetch, ids no longer listed)"""
+        sync_pass.result.requests += 1
+        sync_pass.result.listed = len(listed)
+        current = {}
+        cursor = None
+        for item in listed:
+            current[int(item["id"])] = _signature(item)
+            updated = item.get("updated")
+            if updated and (cursor is None or updated > cursor):
+                cursor = updated
+        sync_pass.listed = current
+        sync_pass.result.cursor = cursor
+        with self._lock:
+            scope = self._scopes[sync_pass.key]
+            known = scope.known
+            fetch = [
+                note_id for note_id, signature in current.items()
+                if known.get(note_id) != signature or note_id in sync_pass.pending
+            ]
+            removed = [note_id for note_id in known if note_id not in current]
+        return fetch, removed
+
+    def commit(self, sync_pass: SyncPass) -> SyncResult:
+        """Record a finished pass (see SyncResult); a reset since begin() discards it"""
+        result = sync_pass.result
+        result.seconds = self._clock() - sync_pass.started
+        with self._lock:
+            scope = self._scopes.get(sync_pass.key)
+            if scope is None or scope.epoch != sync_pass.epoch:
+                return result
+            scope.syncing = False
+            failed = set(result.failed)
+            gone = set(result.removed)
+            scope.known = {
+                note_id: signature for note_id, signature in sync_pass.listed.items()
+                if note_id not in failed and note_id not in gone
+            }
+            scope.synced_at = sync_pass.started
+            if scope.changes == sync_pass.ticket:
+                scope.pending.clear()
+                scope.dirty = False
+            scope.pending.update(failed)
+            counts = self._counts
+            counts["syncs"] += 1
+            counts["full_syncs"] += int(result.full)
+            counts["requests"] += result.requests
+            counts["notes_fetched"] += len(result.fetched)
+            counts["notes_removed"] += len(result.removed)
+            counts["fetch_errors"] += len(result.failed)
+            self._seconds += result.seconds
+            self._last = result
+        return result
+
+    def abort(self, sync_pass: SyncPass) -> None:
+        """Give a failed pass up; the next one starts over from the same state"""
+        with self._lock:
+            scope = self._scopes.get(sync_pass.key)
+            if scope is not None and scope.epoch == sync_pass.epoch:
+                scope.syncing = False
+            self._counts["sync_errors"] += 1
+
+    def current(self, sync_pass: SyncPass) -> bool:
+        """False once the scope was reset, so its results must not be applied"""
+        with self._lock:
+            scope = self._scopes.get(sync_pass.key)
+            return scope is not None and scope.epoch == sync_pass.epoch
+
+    # Changes ----------------------------------------------------------------
+
+    def invalidate(self, user_id, note_id: int) -> None:
+        """Fetch a note again in the next sync of each of the user's scopes"""
+        with self._lock:
+            for scope in self._user_scopes(user_id):
+                scope.pending.add(int(note_id))
+                scope.changes += 1
+
+    def mark_dirty(self, user_id) -> None:
+        """Sync the user's scopes before their next read, whatever their age"""
+        with self._lock:
+            for scope in self._user_scopes(user_id):
+                scope.dirty = True
+                scope.changes += 1
+
+    def reset(self, user_id=None) -> None:
+        """Forget what a user's scopes (everyone's for None) have seen; the next sync is a full one"""
+        with self._lock:
+            for key, scope in list(self._scopes.items()):
+                if user_id is None or key[0] == str(user_id):
+                    self._scopes[key] = _Scope(scope.epoch + 1)
+
+    # Metrics ----------------------------------------------------------------
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = self._clock()
+            lags = [now - scope.synced_at for scope in self._scopes.values() if scope.synced_at is not None]
+            last = self._last
+            return {
+                "scopes": len(self._scopes),
+                "max_age": self.max_age,
+                "concurrency": self.concurrency,
+                "max_lag": round(max(lags), 3) if lags else None,
+                "notes_per_second": round(self._counts["notes_fetched"] / self._seconds, 1) if self._seconds else None,
+                "last_sync": None if last is None else {
+                    "full": last.full,
+                    "listed": last.listed,
+                    "fetched": len(last.fetched),
+                    "removed": len(last.removed),
+                    "requests": last.requests,
+                    "seconds": round(last.seconds, 3),
+                    "notes_per_second": round(len(last.fetched) / last.seconds, 1) if last.seconds else None,
+                },
+                **self._counts,
+            }
@@ -0,0 +1,300 @@
+"""
+Facets of note tags: counts, workspaces and co-occurring tags, in memory
+
+GET /tags lists the names of the tags in use, without saying how many notes
+carry each one. An agent wanting to know how tags are used had to list every
+note and count. The MCP server keeps the counts itself, from the note
+metadata it reads anyway, and tag_stats answers from them:
+
+- Tags are split like TagsController.php splits them, on commas and spaces.
+- For each tag, the index keeps the notes carrying it, how many of them are
+  in each workspace, and how many times each other tag is on the same note.
+  A note read again only moves its own counts.
+- Without filters, stats are read from those counts. With a workspace,
+  folder or creation date range, the notes matching them are counted again,
+  which is a pass over the user's note metadata in memory.
+
+Like the title index (titleindex.py), there is no request of its own: the
+index is fed by every complete GET /notes the client reads (list_notes, the
+note sync, the title refresh) and by the notes returned by update_note.
+Other writes mark the user's tags stale, and the next tag_stats lists the
+notes again in the background while answering from the index.
+"""
+
+import re
+import threading
+from collections import Counter
+
+from .searchindex import utc_boundary
+
+DEFAULT_LIMIT = 20
+# Co-occurring tags listed with each tag
+DEFAULT_RELATED = 5
+
+_SEPARATORS = re.compile(r"[,\s]+")
+
+
+def split_tags(tags) -> tuple[str, ...]:
+    """The distinct tags of a note's `tags` field, in order"""
+    if not tags:
+        return ()
+    if isinstance(tags, list):
+        tags = ",".join(str(tag) for tag in tags)
+    return tuple(dict.fromkeys(tag for tag in _SEPARATORS.split(tags) if tag))
+
+
+class _Entry:
+    __slots__ = ("tags", "workspace", "folder", "folder_id", "created")
+
+    def __init__(self, note: dict, tags: tuple[str, ...]):
+        self.tags = tags
+        self.workspace = note.get("workspace")
+        self.folder = note.get("folder")
+        self.folder_id = note.get("folder_id")
+        self.created = note.get("created") or ""
+
+
+class _UserTags:
+    def __init__(self):
+        self.notes: dict[int, _Entry] = {}
+        self.postings: dict[str, set[int]] = {}
+        self.workspaces: dict[str, Counter] = {}
+        self.pairs: dict[str, Counter] = {}
+        self.tagged = 0
+        # workspace (None for all) -> body hash of the last complete list
+        self.listed: dict[str | None, str | None] = {}
+        self.timezone: str | None = None
+        self.stale = False
+        self.refreshing = False
+
+    def put(self, note_id: int, entry: _Entry) -> None:
+        old = self.notes.get(note_id)
+        if old is not None:
+            self._count(note_id, old, -1)
+        self.notes[note_id] = entry
+        self._count(note_id, entry, 1)
+
+    def remove(self, note_id: int) -> None:
+        old = self.notes.pop(note_id, None)
+        if old is not None:
+            self._count(note_id, old, -1)
+
+    def _count(self, note_id: int, entry: _Entry, step: int) -> None:
+        if entry.tags:
+            self.tagged += step
+        for tag in entry.tags:
+            if step > 0:
+                self.postings.setdefault(tag, set()).add(note_id)
+            else:
+                self.postings[tag].discard(note_id)
+                if not self.postings[tag]:
+                    del self.postings[tag]
+            self._move(self.workspaces, tag, (entry.workspace,), step)
+            self._move(self.pairs, tag, [other for other in entry.tags if other != tag], step)
+
+    @staticmethod
+    def _move(counters: dict[str, Counter], tag: str, keys, step: int) -> None:
+        counter = counters.setdefault(tag, Counter())
+        for key in keys:
+            counter[key] += step
+            if counter[key] <= 0:
+                del counter[key]
+        if not counter:
+            del counters[tag]
+
+
+def _order(counts: dict[str, int]) -> list[str]:
+    return sorted(counts, key=lambda tag: (-counts[tag], tag.casefold(), tag))
+
+
+class TagIndex:
+    """Per-user tag facets, safe to share between threads"""
+
+    def __init__(self):
+        self._users: dict[str, _UserTags] = {}
+        self._lock = threading.Lock()
+        self._counts = {"queries": 0, "filtered_queries": 0, "refreshes": 0}
+
+    def _user(self, user_id) -> _UserTags:
+        user_id = str(user_id)
+        tags = self._users.get(user_id)
+        if tags is None:
+            tags = self._users[user_id] = _UserTags()
+        return tags
+
+    @staticmethod
+    def _listed(tags: _UserTags | None, workspace: str | None) -> bool:
+        return tags is not None and (None in tags.listed or (workspace is not None and workspace in tags.listed))
+
+    def ready(self, user_id, workspace: str | None = None) -> bool:
+        """Whether the user's notes (of one workspace) were all listed once"""
+        with self._lock:
+            return self._listed(self._users.get(str(user_id)), workspace)
+
+    def stale(self, user_id) -> bool:
+        with self._lock:
+            tags = self._users.get(str(user_id))
+            return tags is not None and tags.stale
+
+    # Feeding ---------------------------------------------------------------
+
+    def add_notes(
+        self,
+        user_id,
+        notes: list[dict],
+        workspace: str | None = None,
+        complete: bool = False,
+        version: str | None = None,
+    ) -> None:
+        """Count the tags of notes from a list; a complete list (of one workspace) also drops the missing ones
+
+        A complete list with the body hash of the last one counted is skipped. A
+        note without its `tags` (like the one create_note returns) makes the
+        user's tags stale instead.
+        """
+        with self._lock:
+            tags = self._user(user_id)
+            if complete and version is not None and tags.listed.get(workspace, "") == version:
+                if workspace is None:
+                    tags.stale = False
+                return
+            listed = set()
+            for note in notes:
+                if note.get("id") is None:
+                    continue
+                if "tags" not in note:
+                    tags.stale = True
+                    continue
+                note_id = int(note["id"])
+                listed.add(note_id)
+                tags.put(note_id, _Entry(note, split_tags(note["tags"])))
+            if not complete:
+                return
+            for note_id in [note_id for note_id, entry in tags.notes.items() if note_id not in listed]:
+                if workspace is None or tags.notes[note_id].workspace == workspace:
+                    tags.remove(note_id)
+            tags.listed[workspace] = version
+            if workspace is None:
+                tags.stale = False
+
+    def set_timezone(self, user_id, tz_name: str | None) -> None:
+        """The user's timezone setting, for the creation date filters"""
+        with self._lock:
+            self._user(user_id).timezone = tz_name
+
+    def remove_note(self, user_id, note_id: int) -> None:
+        with self._lock:
+            tags = self._users.get(str(user_id))
+            if tags is not None:
+                tags.remove(int(note_id))
+
+    def mark_stale(self, user_id) -> None:
+        """A write the index cannot follow: list the user's notes again before long"""
+        with self._lock:
+            tags = self._users.get(str(user_id))
+            if tags is not None:
+                tags.stale = True
+
+    def drop(self, user_id=None) -> None:
+        """Forget a user's tags (everyone's for None)"""
+        with self._lock:
+            if user_id is None:
+                self._users.clear()
+            else:
+                self._users.pop(str(user_id), None)
+
+    def begin_refresh(self, user_id) -> bool:
+        """Claim the refresh of a user's tags; False if one is already running"""
+        with self._lock:
+            tags = self._user(user_id)
+            if tags.refreshing:
+                return False
+            tags.refreshing = True
+            self._counts["refreshes"] += 1
+            return True
+
+    def end_refresh(self, user_id) -> None:
+        with self._lock:
+            tags = self._users.get(str(user_id))
+            if tags is not None:
+                tags.refreshing = False
+
+    # Queries ---------------------------------------------------------------
+
+    def facets(
+        self,
+        user_id,
+        workspace: str | None = None,
+        folder: str | None = None,
+        created_from: str | None = None,
+        created_to: str | None = None,
+        tag: str | None = None,
+        limit: int = DEFAULT_LIMIT,
+        related: int = DEFAULT_RELATED,
+    ) -> dict | None:
+        """Tags by number of notes, with their workspaces and co-occurring tags
+
+        Only notes matching the filters count; created_from and created_to
+        are YYYY-MM-DD days in the user's timezone. With a `tag`, only that
+        tag is described, with up to `limit` co-occurring tags. Returns None
+        when the user's notes were never listed; raises ValueError for a
+        malformed date.
+        """
+        with self._lock:
+            tags = self._users.get(str(user_id))
+            if not self._listed(tags, workspace):
+                return None
+            lower = utc_boundary(created_from, tags.timezone, False)
+            upper = utc_boundary(created_to, tags.timezone, True)
+            if workspace is None and folder is None and lower is None and upper is None:
+                self._counts["queries"] += 1
+                notes, tagged = len(tags.notes), tags.tagged
+                counts = {name: len(ids) for name, ids in tags.postings.items()}
+                workspaces, pairs = tags.workspaces, tags.pairs
+            else:
+                self._counts["filtered_queries"] += 1
+                matched = [
+                    entry
+                    for entry in tags.notes.values()
+                    if (workspace is None or entry.workspace == workspace)
+                    and (folder is None or entry.folder == folder or str(entry.folder_id) == folder)
+                    and (lower is None or entry.created >= lower)
+                    and (upper is None or entry.created <= upper)
+                ]
+                notes, tagged = len(matched), sum(1 for entry in matched if entry.tags)
+                counts, workspaces, pairs = {}, {}, {}
+                for entry in matched:
+                    for name in entry.tags:
+                        counts[name] = counts.get(name, 0) + 1
+                        workspaces.setdefault(name, Counter())[entry.workspace] += 1
+                        pairs.setdefault(name, Counter()).update(other for other in entry.tags if other != name)
+
+            if tag is not None:
+                chosen, related = ([tag] if tag in counts else []), limit
+            else:
+                chosen = _order(counts)[:limit]
+            described = []
+            for name in chosen:
+                others = pairs.get(name, {})
+                described.append({
+                    "tag": name,
+                    "count": counts[name],
+                    "share": round(counts[name] / notes, 3) if notes else 0.0,
+                    "workspaces": {str(key): value for key, value in sorted(workspaces.get(name, {}).items(), key=lambda item: -item[1])},
+                    "co_occurring": [{"tag": other, "count": others[other]} for other in _order(others)[:related]],
+                })
+            return {
+                "notes": notes,
+                "tagged_notes": tagged,
+                "distinct_tags": len(counts),
+                "tags": described,
+            }
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "users": len(self._users),
+                "notes": sum(len(tags.notes) for tags in self._users.values()),
+                "tags": sum(len(tags.postings) for tags in self._users.values()),
+                **self._counts,
+            }
@@ -0,0 +1,442 @@
+"""
+In-memory trigram index of note titles and folder names, for fuzzy lookup
+
+Agents often know a note by an approximate title ("docker compose setup" for
+"Docker-compose Setup"). GET /notes/resolve only finds a title that contains
+the reference as typed, and search_notes needs the full-text index. This
+index answers find_notes_by_title from the titles alone:
+
+- Titles are folded like the search index (lowercase, no accents) and split
+  into words, so case, punctuation and word order do not matter.
+- Each distinct word is indexed by its three-letter grams, padded like
+  pg_trgm does ("  docker "). A query word matches the title words that
+  share enough of its grams, so a typo or a missing plural still matches.
+  The grams index the vocabulary rather than the titles: it is much smaller,
+  and a lookup only scans the titles holding the words that matched.
+- Query words weigh more the fewer titles hold them, like in BM25. A
+  title's score is the mean of the weighted share of the query it covers and
+  its similarity to the query (shared words / all words), each word counting
+  as much as it looks like the query word. An exact title scores 1.0, and a
+  longer title containing the query ranks below a closer one.
+- A match must cover MIN_COVERAGE of the query's weight. The candidates are
+  the titles holding every word of one of the smallest sets of query words
+  that can reach it, found by intersecting their postings: the common words
+  of a query only narrow the titles holding its rare ones down. Candidates
+  are scored shortest first, and lengths where even a perfect title could
+  not enter the results are skipped.
+
+benchmarks/bench_title_index.py looks up 100k titles in about 0.2 ms; queries
+made of very common words only take a few ms.
+
+There is no request of its own: the index is fed by the note and folder lists
+the client reads anyway (list_notes, list_folders, and the note sync that
+lists every note), and by the titles returned by create_note and update_note.
+Other writes mark the user's titles stale, and the next lookup refreshes them
+in the background while answering from the index.
+"""
+
+import heapq
+import math
+import threading
+from collections import Counter
+from itertools import repeat
+
+from .searchindex import tokenize
+
+# Share of the query's words a title must have to be a match at all
+MIN_COVERAGE = 0.5
+# How much a title word must look like a query word to count for it
+MIN_WORD_SIMILARITY = 0.4
+# The same for a query word that is itself in some title
+MIN_KNOWN_WORD_SIMILARITY = 0.6
+# Longer queries draw candidates from the union of their rarest words
+MAX_SUBSET_WORDS = 8
+
+
+def trigrams(word: str) -> set[str]:
+    """The three-letter grams of a folded word, pg_trgm style"""
+    padded = f"  {word} "
+    return {padded[start:start + 3] for start in range(len(padded) - 2)}
+
+
+def similarity(shared: int, query: int, other: int) -> float:
+    """Mean of the coverage of the query and the overlap of the two, from 0 to 1"""
+    return (shared / query + shared / (query + other - shared)) / 2
+
+
+def _candidates(postings: list, needed: int) -> Counter:
+    """How many of the postings hold each id, for the ids that can be in `needed` of them
+
+    An id in `needed` of the postings is in at least one of the smallest
+    len - needed + 1 of them: only those are scanned, the others are only
+    intersected with what they found.
+    """
+    postings = sorted(postings, key=len)
+    cut = len(postings) - needed + 1
+    counts = Counter()
+    for ids in postings[:cut]:
+        counts.update(ids)
+    if counts:
+        found = set(counts)
+        for ids in postings[cut:]:
+            counts.update(found.intersection(ids))
+    return counts
+
+
+def _covering_subsets(weights: list[float], needed: float) -> list[list[int]]:
+    """The smallest sets of query words whose weights add up to `needed`
+
+    A matching title holds every word of one of them, so the candidates are
+    their intersections: a mix of common words ("meeting 2026 03") only
+    brings the few titles holding several of them. Long queries, where the
+    sets would be too many, get the union of their rarest words instead.
+    """
+    order = sorted(range(len(weights)), key=weights.__getitem__, reverse=True)
+    if len(order) > MAX_SUBSET_WORDS:
+        subset, left = [], sum(weights)
+        for index in order:
+            subset.append(index)
+            left -= weights[index]
+            if left < needed:
+                break
+        return [[index] for index in subset]
+    after = [sum(weights[index] for index in order[start:]) for start in range(len(order) + 1)]
+    subsets = []
+
+    def extend(start: int, chosen: list[int], reached: float) -> None:
+        if reached >= needed:
+            subsets.append(chosen)
+            return
+        for position in range(start, len(order)):
+            if reached + after[position] < needed:
+                return
+            index = order[position]
+            extend(position + 1, chosen + [index], reached + weights[index])
+
+    extend(0, [], 0.0)
+    return subsets
+
+
+class _Title:
+    __slots__ = ("name", "words", "meta")
+
+    def __init__(self, name: str, words: frozenset[str], meta: dict):
+        self.name = name
+        self.words = words
+        self.meta = meta
+
+
+class _Titles:
+    """The titles of one kind (notes or folders) of one user"""
+
+    def __init__(self):
+        self.entries: dict[int, _Title] = {}
+        # folded word -> ids of the titles holding it
+        self.word_titles: dict[str, set[int]] = {}
+        # gram -> words holding it, and word -> number of its grams
+        self.gram_words: dict[str, set[str]] = {}
+        self.word_grams: dict[str, int] = {}
+        # number of distinct words -> ids of the titles with that many
+        self.by_length: dict[int, set[int]] = {}
+
+    def put(self, entry_id: int, name: str, meta: dict) -> None:
+        current = self.entries.get(entry_id)
+        if current is not None:
+            if current.name == name:
+                current.meta = meta
+                return
+            self.remove(entry_id)
+        words = frozenset(tokenize(name))
+        for word in words:
+            titles = self.word_titles.get(word)
+            if titles is None:
+                titles = self.word_titles[word] = set()
+                grams = trigrams(word)
+                self.word_grams[word] = len(grams)
+                for gram in grams:
+                    self.gram_words.setdefault(gram, set()).add(word)
+            titles.add(entry_id)
+        self.by_length.setdefault(len(words), set()).add(entry_id)
+        self.entries[entry_id] = _Title(name, words, meta)
+
+    def remove(self, entry_id: int) -> None:
+        title = self.entries.pop(entry_id, None)
+        if title is None:
+            return
+        same_length = self.by_length[len(title.words)]
+        same_length.discard(entry_id)
+        if not same_length:
+            del self.by_length[len(title.words)]
+        for word in title.words:
+            titles = self.word_titles[word]
+            titles.discard(entry_id)
+            if titles:
+                continue
+            del self.word_titles[word], self.word_grams[word]
+            for gram in trigrams(word):
+                words = self.gram_words[gram]
+                words.discard(word)
+                if not words:
+                    del self.gram_words[gram]
+
+    def replace(self, items: dict[int, tuple[str, dict]], keep=None) -> None:
+        """Make the entries those of `items`; ones for which keep(meta) is true are left alone"""
+        for entry_id in [entry_id for entry_id in self.entries if entry_id not in items]:
+            if keep is None or not keep(self.entries[entry_id].meta):
+                self.remove(entry_id)
+        for entry_id, (name, meta) in items.items():
+            self.put(entry_id, name, meta)
+
+    def similar_words(self, word: str) -> dict[str, float]:
+        """Indexed words that look like `word`, with their similarity"""
+        grams = trigrams(word)
+        size = len(grams)
+        # A word that is indexed as typed is most likely not a typo: only
+        # its close variants (plurals, other endings) count with it.
+        least = MIN_KNOWN_WORD_SIMILARITY if word in self.word_titles else MIN_WORD_SIMILARITY
+        # similarity() is at most shared / size
+        needed = max(1, math.ceil(size * least))
+        counts = _candidates([self.gram_words.get(gram, ()) for gram in grams], needed)
+        similar = {}
+        for other, shared in counts.items():
+            if shared >= needed:
+                score = similarity(shared, size, self.word_grams[other])
+                if score >= least:
+                    similar[other] = score
+        return similar
+
+    def match(self, words: list[str], limit: int, workspace: str | None) -> list[tuple[float, _Title]]:
+        """The best `limit` titles for the query words, best first, with their score"""
+        if not words or not self.entries:
+            return []
+        similar = [self.similar_words(word) for word in words]
+        # The titles holding each query word, as the sets of its similar
+        # words: common words are only ever intersected, never copied.
+        holding = [[self.word_titles[other] for other in found] for found in similar]
+        sizes = [sum(map(len, parts)) for parts in holding]
+        # Rare words weigh more than ones found in many titles.
+        total = len(self.entries)
+        weights = [math.log(1 + total / (1 + size)) for size in sizes]
+        weight = sum(weights)
+        needed = weight * MIN_COVERAGE
+
+        # A title holding a word covers at most its weight times the best
+        # similarity among the word's matches.
+        reach = [word_weight * max(found.values(), default=0.0) for word_weight, found in zip(weights, similar)]
+        candidates = set()
+        for subset in _covering_subsets(reach, needed):
+            subset.sort(key=sizes.__getitem__)
+            found = set().union(*holding[subset[0]])
+            for index in subset[1:]:
+                if not found:
+                    break
+                found = set().union(*(found.intersection(part) for part in holding[index]))
+            candidates.update(found)
+
+        # Titles with more words than the query score lower: score them by
+        # length, and skip the lengths where even the best possible title
+        # could not enter the results.
+        most = min(sum(reach), weight) / weight
+        closest = sum(max(found.values(), default=0.0) for found in similar)
+        best: list[tuple[float, str, int]] = []
+        entries = self.entries
+        for length in sorted(self.by_length):
+            shared_bound = min(closest, length)
+            bound = (most + shared_bound / (len(words) + length - shared_bound)) / 2
+            if len(best) >= limit and best[0][0] > bound:
+                continue
+            for entry_id in candidates.intersection(self.by_length[length]):
+                title = entries[entry_id]
+                if workspace and title.meta.get("workspace") != workspace:
+                    continue
+                covered = shared = 0.0
+                for found, word_weight in zip(similar, weights):
+                    match = max(map(found.get, title.words, repeat(0.0)))
+                    covered += word_weight * match
+                    shared += match
+                if covered < needed:
+                    continue
+                score = (covered / weight + shared / (len(words) + length - shared)) / 2
+                # Equal scores: the most recently updated first.
+                item = (score, title.meta.get("updated") or "", entry_id)
+                if len(best) < limit:
+                    heapq.heappush(best, item)
+                elif item > best[0]:
+                    heapq.heapreplace(best, item)
+        return [(score, entries[entry_id]) for score, _, entry_id in sorted(best, reverse=True)]
+
+
+class _UserTitles:
+    def __init__(self):
+        self.notes = _Titles()
+        self.folders = _Titles()
+        # Scopes whose complete note list was seen (None for every workspace),
+        # with the body hash of that list
+        self.listed: dict[str | None, str | None] = {}
+        self.stale = False
+        self.refreshing = False
+
+
+class TitleIndex:
+    """Note titles and folder names of every user, safe to share between threads"""
+
+    def __init__(self):
+        self._users: dict[str, _UserTitles] = {}
+        self._lock = threading.Lock()
+        self._counts = {"lookups": 0, "cold_lookups": 0, "refreshes": 0}
+
+    def _user(self, user_id) -> _UserTitles:
+        user_id = str(user_id)
+        titles = self._users.get(user_id)
+        if titles is None:
+            titles = self._users[user_id] = _UserTitles()
+        return titles
+
+    @staticmethod
+    def _note_meta(note: dict) -> dict:
+        return {
+            "id": int(note["id"]),
+            "heading": note.get("heading") or "Untitled",
+            "folder": note.get("folder"),
+            "folder_id": note.get("folder_id"),
+            "workspace": note.get("workspace"),
+            "updated": note.get("updated"),
+        }
+
+    @staticmethod
+    def _listed(titles: _UserTitles | None, workspace: str | None) -> bool:
+        return titles is not None and (None in titles.listed or (workspace is not None and workspace in titles.listed))
+
+    def ready(self, user_id, workspace: str | None = None) -> bool:
+        """Whether the user's titles (of one workspace) were all listed once"""
+        with self._lock:
+            titles = self._users.get(str(user_id))
+            return self._listed(titles, workspace)
+
+    def stale(self, user_id) -> bool:
+        with self._lock:
+            titles = self._users.get(str(user_id))
+            return titles is not None and titles.stale
+
+    # Feeding ---------------------------------------------------------------
+
+    def add_notes(
+        self,
+        user_id,
+        notes: list[dict],
+        workspace: str | None = None,
+        complete: bool = False,
+        version: str | None = None,
+    ) -> None:
+        """Index notes from a list; a complete list (of one workspace) also drops the missing ones
+
+        A complete list with the body hash of the last one indexed is skipped.
+        """
+        if complete and version is not None:
+            with self._lock:
+                titles = self._users.get(str(user_id))
+                if titles is not None and titles.listed.get(workspace, "") == version:
+                    # The same list as last time: whatever made the titles
+                    # stale did not change them.
+                    if workspace is None:
+                        titles.stale = False
+                    return
+        items = {
+            int(note["id"]): (note.get("heading") or "", self._note_meta(note))
+            for note in notes
+            if note.get("id") is not None
+        }
+        with self._lock:
+            titles = self._user(user_id)
+            if not complete:
+                for note_id, (name, meta) in items.items():
+                    titles.notes.put(note_id, name, meta)
+                return
+            keep = None if workspace is None else (lambda meta: meta.get("workspace") != workspace)
+            titles.notes.replace(items, keep)
+            titles.listed[workspace] = version
+            if workspace is None:
+                titles.stale = False
+
+    def add_folders(self, user_id, workspace: str, folders: list[dict]) -> None:
+        """Index the complete folder list of a workspace"""
+        items = {
+            int(folder["id"]): (
+                folder.get("name") or "",
+                {"id": int(folder["id"]), "name": folder.get("name"), "path": folder.get("path"), "workspace": workspace},
+            )
+            for folder in folders
+            if folder.get("id") is not None
+        }
+        with self._lock:
+            self._user(user_id).folders.replace(items, lambda meta: meta.get("workspace") != workspace)
+
+    def remove_note(self, user_id, note_id: int) -> None:
+        with self._lock:
+            titles = self._users.get(str(user_id))
+            if titles is not None:
+                titles.notes.remove(int(note_id))
+
+    def mark_stale(self, user_id) -> None:
+        """A write the index cannot follow: refresh the user's titles before long"""
+        with self._lock:
+            titles = self._users.get(str(user_id))
+            if titles is not None:
+                titles.stale = True
+
+    def drop(self, user_id=None) -> None:
+        """Forget a user's titles (everyone's for None)"""
+        with self._lock:
+            if user_id is None:
+                self._users.clear()
+            else:
+                self._users.pop(str(user_id), None)
+
+    def begin_refresh(self, user_id) -> bool:
+        """Claim the refresh of a user's titles; False if one is already running"""
+        with self._lock:
+            titles = self._user(user_id)
+            if titles.refreshing:
+                return False
+            titles.refreshing = True
+            self._counts["refreshes"] += 1
+            return True
+
+    def end_refresh(self, user_id) -> None:
+        with self._lock:
+            titles = self._users.get(str(user_id))
+            if titles is not None:
+                titles.refreshing = False
+
+    # Lookups ---------------------------------------------------------------
+
+    def find(
+        self, user_id, query: str, limit: int = 10, workspace: str | None = None
+    ) -> tuple[list[dict], list[dict]] | None:
+        """Notes and folders whose title looks like `query`, best first, with a `score`
+
+        Returns None when the user's titles were never listed.
+        """
+        words = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            titles = self._users.get(str(user_id))
+            if not self._listed(titles, workspace):
+                self._counts["cold_lookups"] += 1
+                return None
+            self._counts["lookups"] += 1
+            found = []
+            for kind in (titles.notes, titles.folders):
+                matches = kind.match(words, limit, workspace)
+                found.append([{**title.meta, "score": round(score, 4)} for score, title in matches])
+        return found[0], found[1]
+
+    def stats(self) -> dict:
+        with self._lock:
+            users = list(self._users.values())
+            return {
+                "users": len(users),
+                "notes": sum(len(titles.notes.entries) for titles in users),
+                "folders": sum(len(titles.folders.entries) for titles in users),
+                "words": sum(len(titles.notes.word_titles) + len(titles.folders.word_titles) for titles in users),
+                **self._counts,
+            }
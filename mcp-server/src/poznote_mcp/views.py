@@ -0,0 +1,662 @@
+"""
+Local views of a user's notes, and the tools they answer
+
+The search, title, tag, task and reminder tools are answered from local
+views instead of the API: the BM25 index (searchindex.py), the note vectors
+(relatedindex.py), the link graph and its importance (linkgraph.py,
+importance.py), the title and tag indexes (titleindex.py, tagindex.py), the
+task index (taskindex.py) and the note reminders (reminders.py). NoteViews
+owns them and the sync that keeps them (sync.py), on top of an
+AsyncPoznoteClient:
+
+- The client stays in charge of requests and caches. Set as its `views`,
+  NoteViews gets what the client reads and writes (see _feed_views), and
+  hears of writes and outside changes so that it syncs or lists again
+  (written, invalidate).
+- A view that was never built answers None, or lists first when that is
+  cheap; it is then built by a task on the event loop. One that is due is
+  synced before it answers.
+"""
+
+import asyncio
+import logging
+import os
+import re
+
+import httpx
+
+from . import deadline
+from .client import AsyncPoznoteClient, _env_number
+from .importance import Importance, ImportanceCache
+from .linkgraph import DEFAULT_DEPTH, DEFAULT_FAN_OUT, LinkGraph
+from .notecache import NoteCache
+from .relatedindex import DEFAULT_DIMENSIONS as DEFAULT_RELATED_DIMENSIONS
+from .relatedindex import RelatedIndex
+from .relatedindex import available as numpy_available
+from .reminders import DEFAULT_DAYS as DEFAULT_REMINDER_DAYS
+from .reminders import DEFAULT_LIMIT as DEFAULT_REMINDER_LIMIT
+from .reminders import NoteReminders, task_reminders, upcoming, window
+from .resilience import HEAVY_PATH_PREFIXES
+from .searchindex import SearchIndex, parse_boosts
+from .sync import DEFAULT_SYNC_CONCURRENCY, DEFAULT_SYNC_MAX_AGE, NoteSync, SyncPass, SyncResult
+from .tagindex import DEFAULT_LIMIT as DEFAULT_TAG_LIMIT
+from .tagindex import TagIndex
+from .taskindex import DEFAULT_LIMIT as DEFAULT_TASK_LIMIT
+from .taskindex import TaskIndex
+from .titleindex import TitleIndex
+
+logger = logging.getLogger("poznote-mcp.views")
+
+# Writes whose response gives the title index what changed (update_note,
+# delete_note, create_note); any other write makes it refresh.
+_TITLED_WRITE = re.compile(r"^/notes(?:/\d+)?$")
+# Writes whose response gives the task index the task that changed
+# (add_task, update_task, complete_task, delete_task).
+_TASK_WRITE = re.compile(r"^/notes/\d+/tasks(?:/[^/]+)?$")
+
+
+class NoteViews:
+    """The local views of an AsyncPoznoteClient's users; set it as the client's `views`"""
+
+    def __init__(
+        self,
+        client: AsyncPoznoteClient,
+        search_index: bool | None = None,
+        search_boosts: dict[str, float] | None = None,
+        related_index: bool | None = None,
+        related_index_dir: str | None = None,
+        link_graph: bool | None = None,
+    ):
+        self.client = client
+
+        # Incremental sync of note bodies into the local views below, by
+        # comparing GET /notes with what each user's views have seen.
+        self.note_sync = NoteSync(
+            max_age=_env_number("POZNOTE_SYNC_MAX_AGE", DEFAULT_SYNC_MAX_AGE, float),
+            concurrency=_env_number("POZNOTE_SYNC_CONCURRENCY", DEFAULT_SYNC_CONCURRENCY),
+        )
+
+        # Local BM25 index answering search_notes once a user's notes are
+        # indexed; None when POZNOTE_SEARCH_INDEX=false.
+        if search_index is None:
+            search_index = os.getenv("POZNOTE_SEARCH_INDEX") != "false"
+        self.search_index = (
+            SearchIndex(boosts={**parse_boosts(os.getenv("POZNOTE_SEARCH_BOOSTS")), **(search_boosts or {})})
+            if search_index
+            else None
+        )
+
+        # Note vectors behind related_notes, kept by the same sync as the
+        # search index; None when POZNOTE_RELATED_INDEX=false or without NumPy.
+        if related_index is None:
+            related_index = os.getenv("POZNOTE_RELATED_INDEX") != "false"
+        self.related_index = (
+            RelatedIndex(
+                dimensions=_env_number("POZNOTE_RELATED_DIMENSIONS", DEFAULT_RELATED_DIMENSIONS),
+                directory=related_index_dir or os.getenv("POZNOTE_RELATED_INDEX_DIR") or None,
+            )
+            if related_index and numpy_available()
+            else None
+        )
+
+        # Links between notes behind traverse_links, kept by the same sync as
+        # the search index; None when POZNOTE_LINK_GRAPH=false.
+        if link_graph is None:
+            link_graph = os.getenv("POZNOTE_LINK_GRAPH") != "false"
+        self.link_graph = LinkGraph() if link_graph else None
+        # PageRank and components of the link graph behind note_importance;
+        # None with the graph off or without NumPy.
+        self.importance = ImportanceCache() if self.link_graph is not None and numpy_available() else None
+
+        # Trigram index of note titles and folder names behind
+        # find_notes_by_title, fed by the note and folder lists read anyway.
+        self.title_index = TitleIndex()
+        # Tag counts behind tag_stats, fed by the same lists.
+        self.tag_index = TagIndex()
+        # Tasks of every tasklist note behind query_tasks, read with GET /tasks.
+        self.task_index = TaskIndex()
+        # Note reminders behind upcoming_reminders, kept by the note sync;
+        # None without NumPy, which expands their recurrences.
+        self.note_reminders = NoteReminders() if numpy_available() else None
+
+        # Views being built or refreshed in the background (see _spawn)
+        self._refresh_tasks: set[asyncio.Task] = set()
+
+    def _user(self, user_id: str | int | None) -> str:
+        return str(self.client.user_id if user_id is None else user_id)
+
+    def _spawn(self, coroutine) -> None:
+        """Run a build or refresh on the event loop without waiting for it"""
+        task = asyncio.ensure_future(coroutine)
+        # Keep a reference so the task is not garbage collected mid-flight.
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    # What the client read, wrote or was told about
+
+    def add_notes(self, user: str, notes: list[dict], workspace: str | None = None, **kwargs) -> None:
+        """Notes read or written through the client, for the title and tag indexes"""
+        self.title_index.add_notes(user, notes, workspace, **kwargs)
+        self.tag_index.add_notes(user, notes, workspace, **kwargs)
+
+    def remove_note(self, user: str, note_id: int) -> None:
+        self.title_index.remove_note(user, note_id)
+        self.tag_index.remove_note(user, note_id)
+
+    def add_folders(self, user: str, workspace: str | None, folders: list[dict]) -> None:
+        self.title_index.add_folders(user, workspace, folders)
+
+    def set_reminder(self, user: str, note_id: int, reminder: dict | None) -> None:
+        """A note's reminder as read or written through the client"""
+        if self.note_reminders is not None:
+            self.note_reminders.set_reminder(user, note_id, reminder)
+
+    def put_task(self, user: str, note_id: int, task: dict | None) -> None:
+        """A task returned by a task write"""
+        self.task_index.put_task(user, note_id, task)
+
+    def remove_task(self, user: str, note_id: int, task_id: str) -> None:
+        self.task_index.remove_task(user, note_id, task_id)
+
+    def written(self, user: str, path: str, note_id: str | None) -> None:
+        """Mark what a write through the client to `path` (about note_id, if any) may have changed"""
+        if not _TITLED_WRITE.match(path):
+            self.title_index.mark_stale(user)
+            self.tag_index.mark_stale(user)
+        if not _TASK_WRITE.match(path):
+            self.task_index.mark_stale(user)
+        if note_id is not None:
+            self.note_sync.invalidate(user, note_id)
+        elif path.startswith(("/workspaces", "/folders", "/trash")):
+            self.note_sync.mark_dirty(user)
+        elif path.startswith(HEAVY_PATH_PREFIXES):
+            # A restored backup or a git pull can rewrite any note of anyone.
+            self.note_sync.reset()
+            self.title_index.drop()
+            self.tag_index.drop()
+            self.task_index.drop()
+            for view in self._sync_consumers():
+                view.drop()
+        elif path.startswith("/notes"):
+            self.note_sync.mark_dirty(user)
+
+    def invalidate(self, user: str, note_id: int | None = None) -> None:
+        """Mark a note of a user (all of them for None) changed outside the client"""
+        self.title_index.mark_stale(user)
+        self.tag_index.mark_stale(user)
+        self.task_index.mark_stale(user)
+        if self.note_reminders is not None:
+            self.note_reminders.invalidate(user, note_id)
+        if note_id is None:
+            self.note_sync.mark_dirty(user)
+        else:
+            self.note_sync.invalidate(user, note_id)
+
+    # Statistics
+
+    def search_index_stats(self) -> dict:
+        """Statistics of the local search index, None when it is off"""
+        return self.search_index.stats() if self.search_index is not None else None
+
+    def related_index_stats(self) -> dict:
+        """Statistics of the related notes index, None when it is off"""
+        return self.related_index.stats() if self.related_index is not None else None
+
+    def link_graph_stats(self) -> dict:
+        """Statistics of the link graph, None when it is off"""
+        return self.link_graph.stats() if self.link_graph is not None else None
+
+    def importance_stats(self) -> dict:
+        """Statistics of the note_importance results, None when they are off"""
+        return self.importance.stats() if self.importance is not None else None
+
+    def note_reminders_stats(self) -> dict:
+        """Statistics of the note reminders behind upcoming_reminders, None when they are off"""
+        return self.note_reminders.stats() if self.note_reminders is not None else None
+
+    def sync_stats(self) -> dict:
+        """Lag and throughput of the note sync feeding the local views"""
+        return self.note_sync.stats()
+
+    def stats(self) -> dict:
+        """Statistics of every view, by name"""
+        return {
+            "search_index": self.search_index_stats(),
+            "related_index": self.related_index_stats(),
+            "link_graph": self.link_graph_stats(),
+            "importance": self.importance_stats(),
+            "title_index": self.title_index.stats(),
+            "tag_index": self.tag_index.stats(),
+            "task_index": self.task_index.stats(),
+            "note_reminders": self.note_reminders_stats(),
+            "sync": self.sync_stats(),
+        }
+
+    # Sync
+
+    def _sync_consumers(self) -> list:
+        """Local views fed by sync_notes()"""
+        views = (self.search_index, self.related_index, self.link_graph, self.note_reminders)
+        return [view for view in views if view is not None]
+
+    async def sync_notes(self, workspace: str | None = None, user_id: str | int | None = None) -> SyncResult | None:
+        """
+        Bring the local views of a user's notes up to date (see sync.py)
+
+        Returns what changed, or None if a sync of the same scope is running.
+        The views take each note (tokenizing it, vectorizing it...) and the
+        related index is saved in worker threads, off the event loop.
+        """
+        user = self._user(user_id)
+        sync_pass = self.note_sync.begin(NoteSync.key(user, workspace))
+        if sync_pass is None:
+            return None
+        try:
+            fetch, removed = self.note_sync.plan(
+                sync_pass, await self.client.list_notes(workspace=workspace, user_id=user)
+            )
+            queue = iter(fetch)
+
+            async def worker():
+                for note_id in queue:
+                    await self._sync_note(sync_pass, note_id)
+
+            await asyncio.gather(*(worker() for _ in range(min(self.note_sync.concurrency, len(fetch)))))
+            if removed:
+                sync_pass.result.requests += 1
+                trash = await self.client.get_trash(user_id=user)
+                await asyncio.to_thread(self._sync_removed, sync_pass, removed, trash)
+        except BaseException:
+            self.note_sync.abort(sync_pass)
+            raise
+        result = self.note_sync.commit(sync_pass)
+        if self.related_index is not None:
+            await asyncio.to_thread(self.related_index.save, user)
+        return result
+
+    async def _sync_note(self, sync_pass: SyncPass, note_id: int) -> None:
+        # A peek: the sync's lookups would skew the cache's hit ratio.
+        note = self.client.note_cache.peek(NoteCache.key(sync_pass.user_id, None, note_id))
+        if note is None:
+            sync_pass.result.requests += 1
+            try:
+                note = await self.client.fetch_note(note_id, user_id=sync_pass.user_id)
+            except httpx.HTTPStatusError as exc:
+                self._sync_failed(sync_pass, note_id, exc)
+                return
+        await asyncio.to_thread(self._apply_synced, sync_pass, note_id, note)
+
+    def _apply_synced(self, sync_pass: SyncPass, note_id: int, note: dict | None) -> None:
+        if not self.note_sync.current(sync_pass):
+            return
+        if note is None:
+            sync_pass.result.removed.append(note_id)
+        else:
+            sync_pass.result.fetched.append(note_id)
+        for view in self._sync_consumers():
+            if note is None:
+                view.remove(sync_pass.user_id, note_id)
+            else:
+                view.add(sync_pass.user_id, note)
+
+    def _sync_failed(self, sync_pass: SyncPass, note_id: int, exc: Exception) -> None:
+        """A note that could not be fetched is retried by the next sync"""
+        logger.debug("Syncing note %s of user %s failed: %r", note_id, sync_pass.user_id, exc)
+        sync_pass.result.failed.append(note_id)
+
+    def _sync_removed(self, sync_pass: SyncPass, removed: list[int], trash: list[dict]) -> None:
+        """Drop notes that are no longer listed; /trash tells trashed ones from deleted ones
+
+        A note missing from one workspace may have moved to another, so a
+        workspace scope only drops the notes it finds in the trash.
+        """
+        trashed = {int(item["id"]) for item in trash if "id" in item}
+        result = sync_pass.result
+        result.trashed.extend(note_id for note_id in removed if note_id in trashed)
+        gone = removed if sync_pass.workspace is None else result.trashed
+        result.removed.extend(removed)
+        if not self.note_sync.current(sync_pass):
+            return
+        for view in self._sync_consumers():
+            for note_id in gone:
+                view.remove(sync_pass.user_id, note_id)
+
+    async def _sync_if_due(self, user: str) -> None:
+        """Sync a user's notes before a view answers, when they are due"""
+        if not self.note_sync.due(NoteSync.key(user)):
+            return
+        try:
+            await self.sync_notes(user_id=user)
+        except Exception as exc:
+            # Answered as is; the next query syncs again.
+            logger.debug("Syncing the notes of user %s failed: %r", user, exc)
+
+    async def _build(self, user: str, what: str) -> bool:
+        """Sync every note of a user into the views; False if a sync of theirs was already running or failed"""
+        with deadline.detached():
+            try:
+                result = await self.sync_notes(user_id=user)
+            except Exception as exc:
+                logger.warning("Building the %s of user %s failed: %r", what, user, exc)
+                return False
+        return result is not None and self.note_sync.synced(NoteSync.key(user))
+
+    async def _user_timezone(self, user: str) -> str | None:
+        """The user's timezone setting, for date filters; None when unknown"""
+        try:
+            return (await self.client.get_setting("timezone", user_id=user)).get("value") or None
+        except (httpx.HTTPError, ValueError, AttributeError):
+            return None
+
+    # Search
+
+    async def search_notes_indexed(
+        self,
+        query: str,
+        limit: int = 10,
+        workspace: str | None = None,
+        created_from: str | None = None,
+        created_to: str | None = None,
+        user_id: str | int | None = None,
+    ) -> list[dict] | None:
+        """
+        Search notes in the local BM25 index (see searchindex.py)
+
+        Returns results shaped like search_notes() with a relevance `score`
+        and the note's `text` instead of the excerpt, best first, or None
+        while the user's index is cold; the index is then built in the
+        background and the client's search_notes() should be used meanwhile.
+        """
+        if self.search_index is None:
+            return None
+        user = self._user(user_id)
+        if not self.search_index.ready(user):
+            self._spawn(self.build_search_index(user))
+        else:
+            await self._sync_if_due(user)
+        return self.search_index.search(user, query, limit, workspace, created_from, created_to)
+
+    async def build_search_index(self, user_id: str | int | None = None) -> bool:
+        """Index every note of a user; False if a sync of theirs was already running or failed"""
+        user = self._user(user_id)
+        with deadline.detached():
+            timezone = await self._user_timezone(user)
+        if not await self._build(user, "search index"):
+            return False
+        self.search_index.mark_ready(user, timezone)
+        return True
+
+    # Related notes
+
+    async def related_notes(
+        self, note_id: int, limit: int = 10, workspace: str | None = None, user_id: str | int | None = None
+    ) -> tuple[dict | None, list[dict]] | None:
+        """
+        Notes whose words are closest to a note's, from the local vectors (see relatedindex.py)
+
+        Returns the note and the related notes with a `score`, best first,
+        (None, []) when the note is not indexed, or None while the user's
+        notes are not indexed yet; they are then indexed in the background.
+        """
+        if self.related_index is None:
+            return None
+        user = self._user(user_id)
+        if not self.related_index.built(user):
+            self._spawn(self.build_related_index(user))
+        else:
+            await self._sync_if_due(user)
+        return self.related_index.related(user, note_id, limit, workspace)
+
+    async def build_related_index(self, user_id: str | int | None = None) -> bool:
+        """Index every note of a user for related_notes; False if a sync of theirs was already running or failed"""
+        user = self._user(user_id)
+        if not await self._build(user, "related notes index"):
+            return False
+        self.related_index.mark_ready(user)
+        return True
+
+    # Links
+
+    async def traverse_links(
+        self,
+        note_id: int,
+        direction: str = "out",
+        depth: int = DEFAULT_DEPTH,
+        fan_out: int = DEFAULT_FAN_OUT,
+        workspace: str | None = None,
+        user_id: str | int | None = None,
+    ) -> tuple[dict | None, list[dict], list[list[int]], bool] | None:
+        """
+        Notes within `depth` links of a note, from the local link graph (see linkgraph.py)
+
+        Returns the note, the notes reached, the links between them and
+        whether some were left out, (None, [], [], False) when the note is
+        not in the graph, or None while the user's notes are not read yet;
+        they are then read in the background.
+        """
+        if self.link_graph is None:
+            return None
+        user = self._user(user_id)
+        await self._refresh_link_graph(user)
+        return self.link_graph.traverse(user, note_id, direction, depth, fan_out, workspace)
+
+    async def note_importance(self, user_id: str | int | None = None) -> Importance | None:
+        """
+        PageRank, degrees and components of a user's link graph (see importance.py)
+
+        Computed again, in a worker thread, only when links changed since the
+        last call. Returns None while the user's notes are not read yet; they
+        are then read in the background.
+        """
+        if self.importance is None:
+            return None
+        user = self._user(user_id)
+        await self._refresh_link_graph(user)
+        return await asyncio.to_thread(self.importance.get, self.link_graph, user)
+
+    async def _refresh_link_graph(self, user: str) -> None:
+        """Build a user's link graph in the background, or sync it first when due"""
+        if not self.link_graph.ready(user):
+            self._spawn(self.build_link_graph(user))
+        else:
+            await self._sync_if_due(user)
+
+    async def build_link_graph(self, user_id: str | int | None = None) -> bool:
+        """Read the links of every note of a user; False if a sync of theirs was already running or failed"""
+        user = self._user(user_id)
+        if not await self._build(user, "link graph"):
+            return False
+        self.link_graph.mark_ready(user)
+        return True
+
+    # Titles and tags
+
+    async def find_titles(
+        self, query: str, limit: int = 10, workspace: str | None = None, user_id: str | int | None = None
+    ) -> tuple[list[dict], list[dict]] | None:
+        """
+        Find notes and folders by an approximate title (see titleindex.py)
+
+        Returns (notes, folders), best first with a `score`, or None until the
+        user's notes were listed once; they are then listed in the background
+        and the client's resolve_note() should be used meanwhile. Titles a
+        write may have changed are listed again in the background too.
+        """
+        user = self._user(user_id)
+        if not self.title_index.ready(user, workspace) or self.title_index.stale(user):
+            self._spawn(self.refresh_titles(user))
+        return self.title_index.find(user, query, limit, workspace)
+
+    async def refresh_titles(self, user_id: str | int | None = None) -> bool:
+        """List a user's notes, and the folders of each workspace, into the title index"""
+        user = self._user(user_id)
+        if not self.title_index.begin_refresh(user):
+            return False
+        with deadline.detached():
+            try:
+                await self.client.list_notes(user_id=user)
+                for workspace in await self.client.list_workspaces(user_id=user):
+                    await self.client.list_folders(workspace=workspace["name"], user_id=user)
+            except Exception as exc:
+                logger.warning("Listing the titles of user %s failed: %r", user, exc)
+                return False
+            finally:
+                self.title_index.end_refresh(user)
+        return True
+
+    async def tag_stats(
+        self,
+        workspace: str | None = None,
+        folder: str | None = None,
+        created_from: str | None = None,
+        created_to: str | None = None,
+        tag: str | None = None,
+        limit: int = DEFAULT_TAG_LIMIT,
+        user_id: str | int | None = None,
+    ) -> dict | None:
+        """
+        Tag counts, workspaces and co-occurring tags, from the tag index (see tagindex.py)
+
+        The user's notes are listed first when they never were, and again in
+        the background when a write made their tags stale. Returns None if
+        another listing is already under way; raises ValueError for a
+        malformed date.
+        """
+        user = self._user(user_id)
+        if not self.tag_index.ready(user, workspace):
+            await self.refresh_tags(user)
+        elif self.tag_index.stale(user):
+            self._spawn(self.refresh_tags(user))
+        return self.tag_index.facets(user, workspace, folder, created_from, created_to, tag, limit)
+
+    async def refresh_tags(self, user_id: str | int | None = None) -> bool:
+        """List a user's notes into the tag index, with their timezone for date filters"""
+        user = self._user(user_id)
+        if not self.tag_index.begin_refresh(user):
+            return False
+        with deadline.detached():
+            try:
+                self.tag_index.set_timezone(user, await self._user_timezone(user))
+                await self.client.list_notes(user_id=user)
+            except Exception as exc:
+                logger.warning("Listing the tags of user %s failed: %r", user, exc)
+                return False
+            finally:
+                self.tag_index.end_refresh(user)
+        return True
+
+    # Tasks and reminders
+
+    async def query_tasks(
+        self,
+        completed: bool | None = None,
+        important: bool | None = None,
+        note_id: int | None = None,
+        folder: str | None = None,
+        workspace: str | None = None,
+        due_from: str | None = None,
+        due_to: str | None = None,
+        checklists: bool = False,
+        sort: str = "due",
+        limit: int = DEFAULT_TASK_LIMIT,
+        user_id: str | int | None = None,
+    ) -> dict | None:
+        """
+        Tasks of every tasklist note matching the filters, from the task index (see taskindex.py)
+
+        The user's tasks are read first when they never were, and again in
+        the background when a write made them stale. Returns None if another
+        read is already under way; raises ValueError for a malformed date.
+        """
+        user = self._user(user_id)
+        await self._refresh_task_index(user)
+        return self.task_index.query(
+            user, completed, important, note_id, folder, workspace, due_from, due_to, checklists, sort, limit
+        )
+
+    async def _refresh_task_index(self, user: str) -> None:
+        """Read a user's tasks when they never were, or again in the background when a write made them stale"""
+        if not self.task_index.ready(user):
+            await self.refresh_tasks(user)
+        elif self.task_index.stale(user):
+            self._spawn(self.refresh_tasks(user))
+
+    async def refresh_tasks(self, user_id: str | int | None = None) -> bool:
+        """Read the tasks of all of a user's notes (GET /tasks) into the task index"""
+        user = self._user(user_id)
+        if not self.task_index.begin_refresh(user):
+            return False
+        with deadline.detached():
+            try:
+                found = await self.client.list_all_tasks(user_id=user)
+                if found is not None:
+                    notes, checklists, version = found
+                    self.task_index.load(user, notes, checklists, version=version)
+            except Exception as exc:
+                logger.warning("Reading the tasks of user %s failed: %r", user, exc)
+                return False
+            finally:
+                self.task_index.end_refresh(user)
+        return True
+
+    async def upcoming_reminders(
+        self,
+        from_date: str | None = None,
+        days: int = DEFAULT_REMINDER_DAYS,
+        kind: str | None = None,
+        workspace: str | None = None,
+        limit: int = DEFAULT_REMINDER_LIMIT,
+        user_id: str | int | None = None,
+    ) -> dict | None:
+        """
+        Occurrences of note and task reminders over `days` days, first ones first (see reminders.py)
+
+        Returns None while the user's notes are not read yet; they are then
+        read in the background. Raises ValueError for a malformed from_date.
+        """
+        if self.note_reminders is None:
+            return None
+        user = self._user(user_id)
+        if not self.note_reminders.ready(user):
+            self._spawn(self.build_note_reminders(user))
+            return None
+        await self._sync_if_due(user)
+        unknown = self.note_reminders.unknown(user)
+        read: dict[int, dict | None | Exception] = {}
+        queue = iter(unknown)
+
+        async def worker():
+            # As many reads at a time as the sync makes, not one per note.
+            for note_id in queue:
+                try:
+                    read[note_id] = await self.client.get_reminder(note_id, user_id=user)
+                except Exception as exc:
+                    read[note_id] = exc
+
+        await asyncio.gather(*(worker() for _ in range(min(self.note_sync.concurrency, len(unknown)))))
+        for note_id, reminder in read.items():
+            if reminder is None:
+                self.note_reminders.remove(user, note_id)
+            elif isinstance(reminder, Exception):
+                # A one-off reminder until it is read again.
+                logger.debug("Reading the reminder of note %s failed: %r", note_id, reminder)
+        if kind != "note":
+            await self._refresh_task_index(user)
+        tz_name = self.note_reminders.user_timezone(user)
+        start, end = window(from_date, days, tz_name)
+        found = []
+        if kind != "task":
+            found.extend(self.note_reminders.reminders(user, workspace))
+        if kind != "note":
+            found.extend(task_reminders(self.task_index.reminders(user, workspace) or [], tz_name))
+        return upcoming(found, start, end, tz_name, limit)
+
+    async def build_note_reminders(self, user_id: str | int | None = None) -> bool:
+        """Read the reminders of every note of a user, and their timezone; False if the sync failed"""
+        user = self._user(user_id)
+        with deadline.detached():
+            self.note_reminders.set_timezone(user, await self._user_timezone(user))
+        if not await self._build(user, "reminders"):
+            return False
+        self.note_reminders.mark_ready(user)
+        return True
@@ -0,0 +1,212 @@
+"""
+Receiver for Poznote's outgoing webhooks
+
+Changes made in the web interface do not go through the MCP server, so the
+notes and lists it keeps in memory would only catch up when their TTL runs
+out. When Poznote is told to send its webhooks to `poznote-mcp serve`
+(POST /webhooks/poznote), each event drops what it may have made stale.
+
+Deliveries are authenticated with the HMAC-SHA256 signature Poznote puts in
+X-Poznote-Signature-256 (see docs/WEBHOOKS.md) and deduplicated on their
+delivery_id. Instance events (admin webhooks) name their user in
+data.user.id, inside the signed body, and are signed with the MCP server's
+secret. User webhooks carry no user: each account registers its own
+endpoint with the account in the URL (?user_id=7), which is not signed. So
+each account signs with its own secret, derived from the MCP server's one
+and its id (user_secret()): a delivery replayed with another user_id does
+not verify. A delivery that would drop something but names no user is
+rejected rather than applied to the default user.
+
+Run this module to print an account's secret, or to post a signed event, as
+Poznote would, to a local server:
+
+    python -m poznote_mcp.webhooks --secret s3cret --user-id 1 --print-secret
+    python -m poznote_mcp.webhooks --secret s3cret --user-id 1 note.shared 42
+"""
+
+import argparse
+import hashlib
+import hmac
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from . import codec
+
+SIGNATURE_HEADER = "X-Poznote-Signature-256"
+# Delivery ids remembered for deduplication
+DEFAULT_DELIVERY_LOG_SIZE = 4096
+
+# Metadata lists made stale by an event about one note, by event name.
+# Events not listed here change nothing the MCP server keeps.
+_NOTE_EVENTS = {
+    "note.created": ("tags",),
+    "note.shared": ("shared",),
+    "reminder.due": (),
+    "reminder.due_title": (),
+    "reminder.due_minimal": (),
+}
+# Instance events after which nothing cached for the user can be trusted
+_USER_EVENTS = frozenset({"user.deleted", "user.deactivated"})
+
+
+def sign(body: bytes, secret: str) -> str:
+    """X-Poznote-Signature-256 value of a request body"""
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(body: bytes, header: str | None, secret: str) -> bool:
+    return hmac.compare_digest(sign(body, secret), header or "")
+
+
+def user_secret(secret: str, user_id) -> str:
+    """Secret an account registers with its user webhooks, derived from the MCP server's secret"""
+    return hmac.new(secret.encode(), f"user:{user_id}".encode(), hashlib.sha256).hexdigest()
+
+
+class WebhookReceiver:
+    """Verifies, deduplicates and applies webhook deliveries to a client's caches"""
+
+    def __init__(self, secret: str, max_deliveries: int = DEFAULT_DELIVERY_LOG_SIZE):
+        self.secret = secret
+        self.max_deliveries = max_deliveries
+        self._deliveries: OrderedDict[str, None] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"received": 0, "rejected": 0, "duplicates": 0, "invalidations": 0}
+
+    def handle(self, client, body: bytes, headers, user_id: str | None = None) -> tuple[int, dict]:
+        """Process one delivery; returns the HTTP status and JSON body to answer with
+
+        user_id is the account of a user webhook (?user_id=); its deliveries
+        are signed with that account's secret.
+        """
+        with self._lock:
+            self._counts["received"] += 1
+        secret = user_secret(self.secret, user_id) if user_id else self.secret
+        if not verify_signature(body, headers.get(SIGNATURE_HEADER), secret):
+            return self._reject(401, "Invalid or missing signature")
+        try:
+            payload = codec.loads(body)
+        except ValueError:
+            return self._reject(400, "Invalid JSON payload")
+        if not isinstance(payload, dict) or not isinstance(payload.get("data", {}), dict):
+            return self._reject(400, "Invalid webhook payload")
+
+        delivery_id = str(payload.get("delivery_id") or headers.get("X-Poznote-Delivery") or "")
+        if delivery_id and self._seen(delivery_id):
+            with self._lock:
+                self._counts["duplicates"] += 1
+            return 200, {"success": True, "duplicate": True}
+
+        event = str(payload.get("event") or headers.get("X-Poznote-Event") or "")
+        data = payload.get("data") or {}
+        user = data.get("user") if isinstance(data.get("user"), dict) else {}
+        target = str(user_id or user.get("id") or "")
+        if not target and self._stale(event, data) is not None:
+            return self._reject(400, "The delivery names no user; register the webhook with ?user_id=")
+        invalidated = self._apply(client, event, data, target)
+        # Only remembered once applied, so that a failed delivery can be retried.
+        if delivery_id:
+            self._remember(delivery_id)
+        if invalidated:
+            with self._lock:
+                self._counts["invalidations"] += 1
+        return 200, {"success": True, "event": event, "invalidated": invalidated}
+
+    def _reject(self, status: int, error: str) -> tuple[int, dict]:
+        with self._lock:
+            self._counts["rejected"] += 1
+        return status, {"success": False, "error": error}
+
+    def _seen(self, delivery_id: str) -> bool:
+        """Whether a delivery id was already applied"""
+        with self._lock:
+            if delivery_id in self._deliveries:
+                self._deliveries.move_to_end(delivery_id)
+                return True
+            return False
+
+    def _remember(self, delivery_id: str) -> None:
+        with self._lock:
+            self._deliveries[delivery_id] = None
+            self._deliveries.move_to_end(delivery_id)
+            while len(self._deliveries) > self.max_deliveries:
+                self._deliveries.popitem(last=False)
+
+    @staticmethod
+    def _stale(event: str, data: dict) -> tuple | None:
+        """What an event makes stale: (note id or None for everything, metadata lists); None for nothing"""
+        if event in _USER_EVENTS or event.startswith(("folder.", "workspace.")):
+            return None, ()
+        note = data.get("note") if isinstance(data.get("note"), dict) else {}
+        if not event.startswith(("note.", "reminder.")) or note.get("id") is None:
+            return None
+        # Future note events (e.g. an update) may touch tags and shares too.
+        return note["id"], _NOTE_EVENTS.get(event, ("tags", "shared"))
+
+    @classmethod
+    def _apply(cls, client, event: str, data: dict, user_id: str) -> dict | None:
+        """Drop the cached data an event may have changed; describes what was dropped"""
+        stale = cls._stale(event, data)
+        if stale is None:
+            return None
+        note_id, lists = stale
+        if note_id is None:
+            client.invalidate_cached(user_id)
+            return {"user_id": user_id, "everything": True}
+        client.invalidate_cached(user_id, note_id=note_id, lists=lists)
+        return {"user_id": user_id, "note_id": note_id, "lists": list(lists)}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"deliveries_remembered": len(self._deliveries), **self._counts}
+
+
+def main():
+    """Post one signed event to a running MCP server, standing in for Poznote"""
+    import httpx
+
+    parser = argparse.ArgumentParser(description="Send a signed Poznote webhook event to the MCP server")
+    parser.add_argument("event", nargs="?", help="Event name, e.g. note.shared or reminder.due")
+    parser.add_argument("note_id", type=int, nargs="?", help="Note the event is about")
+    parser.add_argument("--url", default="http://127.0.0.1:8045/webhooks/poznote")
+    parser.add_argument("--secret", required=True)
+    parser.add_argument("--user-id", default=None, help="Account the webhook belongs to")
+    parser.add_argument("--delivery-id", default=None, help="Reuse an id to test deduplication")
+    parser.add_argument(
+        "--print-secret", action="store_true", help="Print the secret to register with the user webhook of --user-id"
+    )
+    args = parser.parse_args()
+    if args.print_secret:
+        if not args.user_id:
+            parser.error("--print-secret needs --user-id")
+        print(user_secret(args.secret, args.user_id))
+        return
+    if not args.event:
+        parser.error("the event is required")
+
+    payload = {
+        "event": args.event,
+        "delivery_id": args.delivery_id or uuid.uuid4().hex,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "data": {"note": {"id": args.note_id}} if args.note_id is not None else {},
+    }
+    body = codec.dumps(payload, compact=True).encode()
+    response = httpx.post(
+        args.url,
+        content=body,
+        params={"user_id": args.user_id} if args.user_id else None,
+        headers={
+            "Content-Type": "application/json",
+            "User-Agent": "Poznote-Webhook",
+            "X-Poznote-Event": args.event,
+            "X-Poznote-Delivery": payload["delivery_id"],
+            SIGNATURE_HEADER: sign(body, user_secret(args.secret, args.user_id) if args.user_id else args.secret),
+        },
+    )
+    print(response.status_code, response.text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Shared fixtures: an in-memory Poznote REST API and a client wired to it"""
+
+import hashlib
+import json
+
+import httpx
+import pytest
+
+from poznote_mcp.client import AsyncPoznoteClient
+from poznote_mcp.views import NoteViews
+
+BASE_URL = "http://example.test/api/v1"
+
+
+class FakeApi:
+    """The notes of one user behind httpx.MockTransport, like src/api/v1/index.php
+
+    Serves GET /notes (seeking past `after` up to `limit`, content left out),
+    GET /notes/{id} with the note version as ETag, /trash and
+    /settings/timezone, and creates, updates and deletes notes. Anything else
+    is looked up in `routes`, keyed by (method, path), whose values are a JSON
+    body or a function of the request; other writes answer `written` if set.
+    With `etags`, reads get a weak ETag over their body and a 304 when
+    If-None-Match names it.
+    """
+
+    def __init__(self, *notes, routes=None, etags=False, written=None):
+        self.notes = {note["id"]: dict(note) for note in notes}
+        self.trash: list[dict] = []
+        self.timezone = "Europe/Paris"
+        self.routes = dict(routes or {})
+        self.etags = etags
+        self.written = written
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        path = request.url.path.removeprefix("/api/v1")
+        response = self.respond(request, path)
+        # Like sendConditionalRead, which leaves the note listing out.
+        if self.etags and request.method == "GET" and response.status_code == 200 and path != "/notes":
+            tag = 'W/"' + hashlib.md5(response.content).hexdigest() + '"'
+            headers = {"ETag": response.headers.get("ETag", tag)}
+            if tag in [value.strip() for value in request.headers.get("If-None-Match", "").split(",")]:
+                return httpx.Response(304, headers=headers)
+            return httpx.Response(200, content=response.content, headers={**headers, "Content-Type": "application/json"})
+        return response
+
+    def respond(self, request: httpx.Request, path: str) -> httpx.Response:
+        route = self.routes.get((request.method, path))
+        if route is not None:
+            body = route(request) if callable(route) else route
+            return body if isinstance(body, httpx.Response) else httpx.Response(200, json=body)
+        if request.method == "GET" and path == "/notes":
+            after = request.url.params.get("after")
+            if after is not None and int(after) not in self.notes:
+                return httpx.Response(404, json={"success": False, "error": "The note to list after was not found"})
+            return httpx.Response(200, json={"success": True, "notes": self.listed(request.url.params)})
+        if request.method == "GET" and path == "/trash":
+            return httpx.Response(200, json={"success": True, "notes": self.trash})
+        if request.method == "GET" and path == "/settings/timezone":
+            return httpx.Response(200, json={"success": True, "key": "timezone", "value": self.timezone})
+        if request.method == "POST" and path == "/notes":
+            note = {"id": max(self.notes, default=0) + 1, "folder": None, "workspace": "Poznote",
+                    **json.loads(request.content)}
+            self.notes[note["id"]] = note
+            return httpx.Response(200, json={"success": True, "note": note})
+        note_id = path.removeprefix("/notes/")
+        if request.method != "GET" and self.written is not None and not note_id.isdigit():
+            return httpx.Response(200, json=self.written)
+        if not note_id.isdigit() or int(note_id) not in self.notes:
+            return httpx.Response(404, json={"success": False, "error": "Note not found"})
+        if request.method == "PATCH":
+            self.notes[int(note_id)].update(json.loads(request.content), updated="2026-03-05 08:00:00")
+        elif request.method == "DELETE":
+            del self.notes[int(note_id)]
+            return httpx.Response(200, json={"success": True})
+        note = self.notes[int(note_id)]
+        headers = {"ETag": f'"{note["version"]}"'} if "version" in note else {}
+        return httpx.Response(200, json={"success": True, "note": note}, headers=headers)
+
+    def listed(self, params) -> list[dict]:
+        notes = [
+            {key: value for key, value in note.items() if key != "content"}
+            for note in self.notes.values()
+            if not params.get("workspace") or note.get("workspace") == params["workspace"]
+        ]
+        if "after" in params:
+            ids = [note["id"] for note in notes]
+            notes = notes[ids.index(int(params["after"])) + 1:]
+        return notes[:int(params["limit"])] if "limit" in params else notes
+
+    def calls(self) -> list[tuple[str, str]]:
+        return [(request.method, request.url.path.removeprefix("/api/v1")) for request in self.requests]
+
+    def fetched(self) -> list[str]:
+        return [path for method, path in self.calls() if method == "GET"]
+
+
+@pytest.fixture
+def make_client():
+    """Build a client on a fake API; the async one gets the local views
+
+    The search and related indexes are off unless `views` turns them on.
+    """
+    def make(api, cls=AsyncPoznoteClient, views=None, **options):
+        client = cls(base_url=BASE_URL, **{"service_token": "secret-token", **options})
+        if cls is AsyncPoznoteClient:
+            transport = httpx.MockTransport(getattr(api, "handle_async", api))
+            client.client = httpx.AsyncClient(base_url=BASE_URL, headers=client._base_headers, transport=transport)
+            client.views = NoteViews(client, **{"search_index": False, "related_index": False, **(views or {})})
+        else:
+            client.client = httpx.Client(base_url=BASE_URL, headers=client._base_headers, transport=httpx.MockTransport(api))
+        return client
+
+    return make
@@ -0,0 +1,103 @@
+"""Tests for AsyncPoznoteClient, the client the MCP tools run on."""
+
+import inspect
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from poznote_mcp.client import AsyncPoznoteClient, PoznoteClient
+
+
+def _mock_response(payload, status_code=200):
+    request = httpx.Request("GET", "http://example.test/api/v1")
+    return httpx.Response(status_code, json=payload, request=request)
+
+
+def _public_methods(cls):
+    """Public API methods a client class defines itself (not the shared base)."""
+    return {
+        name for name, member in vars(cls).items()
+        if inspect.isfunction(member) and not name.startswith("_")
+    }
+
+
+def test_async_client_mirrors_sync_client_surface():
+    """Scripts and the MCP server must be able to call the same methods."""
+    sync_methods = _public_methods(PoznoteClient) - {"close"}
+    async_methods = _public_methods(AsyncPoznoteClient) - {"aclose"}
+
+    assert sync_methods == async_methods
+    for name in async_methods:
+        assert inspect.iscoroutinefunction(getattr(AsyncPoznoteClient, name)), name
+
+
+@pytest.mark.parametrize(
+    "method_name, http_method, response_payload, args, kwargs, expected",
+    [
+        (
+            "list_notes",
+            "get",
+            {"success": True, "notes": [{"id": 1}]},
+            (),
+            {"workspace": "Poznote", "user_id": 2},
+            [{"id": 1}],
+        ),
+        (
+            "get_note",
+            "get",
+            {"success": True, "note": {"id": 7}},
+            (7,),
+            {"user_id": 2},
+            {"id": 7},
+        ),
+        (
+            "create_folder",
+            "post",
+            {"success": True, "folder": {"id": 1}},
+            ("test",),
+            {"workspace": "Poznote", "user_id": 2},
+            {"id": 1},
+        ),
+        (
+            "delete_task",
+            "delete",
+            {"success": True},
+            (100, "1.5"),
+            {"user_id": 2},
+            True,
+        ),
+    ],
+)
+@patch("poznote_mcp.client.httpx.AsyncClient")
+async def test_async_methods_forward_user_and_decode(
+    mock_client_cls,
+    method_name,
+    http_method,
+    response_payload,
+    args,
+    kwargs,
+    expected,
+):
+    http_client = MagicMock()
+    setattr(http_client, http_method, AsyncMock(return_value=_mock_response(response_payload)))
+    mock_client_cls.return_value = http_client
+
+    client = AsyncPoznoteClient(base_url="http://example.test/api/v1", service_token="secret-token")
+    result = await getattr(client, method_name)(*args, **kwargs)
+
+    assert result == expected
+    _, request_kwargs = getattr(http_client, http_method).call_args
+    assert request_kwargs["headers"]["X-User-ID"] == "2"
+    assert request_kwargs["headers"]["Authorization"] == "Bearer secret-token"
+
+
+@patch("poznote_mcp.client.httpx.AsyncClient")
+async def test_async_get_note_returns_none_on_404(mock_client_cls):
+    http_client = MagicMock()
+    http_client.get = AsyncMock(return_value=_mock_response({}, status_code=404))
+    mock_client_cls.return_value = http_client
+
+    client = AsyncPoznoteClient(base_url="http://example.test/api/v1", service_token="secret-token")
+
+    assert await client.get_note(404) is None
@@ -0,0 +1,73 @@
+"""Tests for the pluggable JSON codec."""
+
+import json
+import sys
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from poznote_mcp import codec
+
+PAYLOAD = {
+    "count": 2,
+    "notes": [
+        {"id": 1, "title": "Café ☕ \"quotes\"", "tags": ["a", "b"], "score": 1.5, "folder": None},
+        {"id": 2, "title": "Line\nbreak", "tags": [], "favorite": True, "nested": {"x": [1, 2.25, -3]}},
+    ],
+}
+
+
+@pytest.fixture(autouse=True)
+def restore_codec():
+    backend, compact = codec.backend, codec.compact_output()
+    yield
+    codec.use(backend)
+    codec.set_compact(compact)
+
+
+@pytest.mark.parametrize("name", ["stdlib", "orjson", "msgspec"])
+def test_backends_write_the_same_json(name):
+    if name != "stdlib":
+        pytest.importorskip(name)
+    assert codec.use(name) == name
+
+    assert codec.dumps(PAYLOAD) == json.dumps(PAYLOAD, indent=2, ensure_ascii=False)
+    assert codec.dumps(PAYLOAD, compact=True) == json.dumps(PAYLOAD, ensure_ascii=False, separators=(",", ":"))
+    assert codec.loads(json.dumps(PAYLOAD).encode()) == PAYLOAD
+
+
+@pytest.mark.parametrize("name", ["stdlib", "orjson", "msgspec"])
+def test_invalid_json_raises_value_error(name):
+    if name != "stdlib":
+        pytest.importorskip(name)
+    codec.use(name)
+
+    with pytest.raises(ValueError):
+        codec.loads(b"{not json")
+
+
+def test_missing_backend_falls_back_to_stdlib(monkeypatch):
+    monkeypatch.setitem(sys.modules, "msgspec", None)
+
+    assert codec.use("msgspec") == "stdlib"
+
+
+def test_unknown_backend_means_auto():
+    assert codec.use("simdjson") == codec.use("auto")
+
+
+@patch("poznote_mcp.server._get_client_or_error")
+async def test_compact_mode_applies_to_tool_results(mock_gcoe):
+    from poznote_mcp.server import list_tags
+
+    client = AsyncMock()
+    client.list_tags.return_value = ["a", "b"]
+    mock_gcoe.return_value = (client, None)
+
+    indented = await list_tags()
+    codec.set_compact(True)
+    compact = await list_tags()
+
+    assert "\n" in indented
+    assert "\n" not in compact
+    assert json.loads(compact) == json.loads(indented)
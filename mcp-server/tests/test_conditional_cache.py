@@ -0,0 +1,121 @@
+"""Tests for the ETag conditional-request cache of the API clients."""
+
+import hashlib
+
+import httpx
+
+from conftest import BASE_URL, FakeApi
+from poznote_mcp.client import PoznoteClient
+from poznote_mcp.httpcache import ConditionalCache, body_etag
+
+# The tag list would otherwise be served by the metadata cache, without a request.
+NO_TAG_TTL = {"tags": 0}
+
+
+def _api():
+    api = FakeApi({"id": 7, "heading": "Note", "content": "<p>x</p>", "version": "v1", "reminder_at": None}, etags=True)
+    api.tags = ["a", "b"]
+    api.routes[("GET", "/tags")] = lambda request: {"success": True, "tags": api.tags}
+    return api
+
+
+def test_unchanged_body_is_served_from_the_store_on_304(make_client):
+    api = _api()
+    client = make_client(api, PoznoteClient, metadata_ttls=NO_TAG_TTL)
+
+    assert client.list_tags() == ["a", "b"]
+    assert client.list_tags() == ["a", "b"]
+
+    assert "If-None-Match" not in api.requests[0].headers
+    assert api.requests[1].headers["If-None-Match"].startswith('W/"')
+    stats = client.http_cache.stats()
+    assert (stats["hits"], stats["misses"], stats["not_modified"]) == (1, 1, 1)
+    client.close()
+
+
+def test_changed_body_replaces_the_stored_one(make_client):
+    api = _api()
+    client = make_client(api, PoznoteClient, metadata_ttls=NO_TAG_TTL)
+
+    client.list_tags()
+    api.tags = ["a", "b", "c"]
+
+    assert client.list_tags() == ["a", "b", "c"]
+    assert client.list_tags() == ["a", "b", "c"]
+    assert client.http_cache.stats()["not_modified"] == 1
+    client.close()
+
+
+async def test_note_metadata_change_is_not_hidden_by_the_version_token(make_client):
+    api = _api()
+    client = make_client(api, metadata_ttls=NO_TAG_TTL)
+
+    await client.get_note(7)
+    # Setting a reminder does not change the version token. (The reminder is
+    # set elsewhere, so only the TTL of the note cache would drop the note.)
+    api.notes[7]["reminder_at"] = "2026-11-01 09:00:00"
+    client.note_cache.clear()
+    note = await client.get_note(7)
+
+    assert note["reminder_at"] == "2026-11-01 09:00:00"
+    assert '"v1"' in api.requests[1].headers["If-None-Match"]
+    assert client.http_cache.stats()["not_modified"] == 0
+    await client.aclose()
+
+
+def test_entries_are_per_user(make_client):
+    api = _api()
+    client = make_client(api, PoznoteClient, metadata_ttls=NO_TAG_TTL)
+
+    client.list_tags(user_id=1)
+    client.list_tags(user_id=2)
+
+    assert "If-None-Match" not in api.requests[1].headers
+    assert client.http_cache.stats()["entries"] == 2
+    client.close()
+
+
+def test_error_drops_the_entry():
+    cache = ConditionalCache(max_bytes=1024)
+    request = httpx.Request("GET", f"{BASE_URL}/tags")
+    cache.resolve(("k",), None, httpx.Response(200, content=b"[1]", request=request))
+
+    cache.resolve(("k",), cache.lookup(("k",)), httpx.Response(500, request=request))
+
+    assert cache.stats()["entries"] == 0
+
+
+def test_store_is_bounded_in_bytes():
+    cache = ConditionalCache(max_bytes=600)
+    request = httpx.Request("GET", f"{BASE_URL}/tags")
+    for index in range(10):
+        cache.resolve((index,), None, httpx.Response(200, content=b"x" * 100, request=request))
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 600
+    assert stats["evictions"] > 0
+    assert cache.lookup((9,)) is not None
+    assert cache.lookup((0,)) is None
+
+
+def test_body_etag_matches_the_api():
+    assert body_etag(b'{"success":true}') == 'W/"' + hashlib.md5(b'{"success":true}').hexdigest() + '"'
+
+
+def test_missing_note_is_not_revalidated(make_client):
+    api = _api()
+    client = make_client(api, PoznoteClient, metadata_ttls=NO_TAG_TTL)
+
+    assert client.get_note(8) is None
+    assert client.get_note(8) is None
+
+    assert all("If-None-Match" not in request.headers for request in api.requests)
+    client.close()
+
+
+def test_only_known_reads_are_cacheable():
+    assert ConditionalCache.cacheable("/notes/7")
+    assert ConditionalCache.cacheable("/workspaces")
+    assert not ConditionalCache.cacheable("/notes")
+    assert ConditionalCache.cacheable("/trash")
+    assert not ConditionalCache.cacheable("/notes/search")
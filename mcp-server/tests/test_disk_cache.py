@@ -0,0 +1,132 @@
+"""Tests for the SQLite cache tier that keeps a restarted server warm."""
+
+import asyncio
+
+import pytest
+
+from conftest import FakeApi
+from poznote_mcp.client import PoznoteClient
+from poznote_mcp.diskcache import HTTP, DiskCache, open_disk_cache
+
+
+@pytest.fixture(autouse=True)
+def _no_env_disk_cache(monkeypatch):
+    monkeypatch.delenv("POZNOTE_DISK_CACHE", raising=False)
+
+
+def _api():
+    api = FakeApi({"id": 7, "heading": "Seven", "content": "<p>7</p>", "version": "v1"}, etags=True)
+    api.folders = [{"id": 1, "name": "Inbox"}]
+    api.routes.update({
+        ("GET", "/folders"): lambda request: {"success": True, "folders": api.folders},
+        ("POST", "/folders"): {"success": True, "folder": {"id": 2}},
+    })
+    return api
+
+
+def test_restarted_client_revalidates_notes_from_disk(make_client, tmp_path):
+    api = _api()
+    first = make_client(api, PoznoteClient, disk_cache_path=str(tmp_path / "cache.sqlite"))
+    first.get_note(7)
+    first.close()
+
+    restarted = make_client(api, PoznoteClient, disk_cache_path=str(tmp_path / "cache.sqlite"))
+    note = restarted.get_note(7)
+
+    assert note["content"] == "<p>7</p>"
+    assert api.requests[-1].headers["If-None-Match"].startswith('W/"')
+    assert restarted.http_cache.stats()["disk_hits"] == 1
+    assert restarted.http_cache.stats()["not_modified"] == 1
+    restarted.close()
+
+
+def test_changed_note_is_downloaded_again_after_a_restart(make_client, tmp_path):
+    api = _api()
+    first = make_client(api, PoznoteClient, disk_cache_path=str(tmp_path / "cache.sqlite"))
+    first.get_note(7)
+    first.close()
+
+    api.notes[7].update(content="<p>edited while down</p>", version="v2")
+    restarted = make_client(api, PoznoteClient, disk_cache_path=str(tmp_path / "cache.sqlite"))
+
+    assert restarted.get_note(7)["version"] == "v2"
+    assert restarted.http_cache.stats()["not_modified"] == 0
+    restarted.close()
+
+
+async def test_restarted_client_serves_lists_at_once_and_refreshes_them(make_client, tmp_path):
+    api = _api()
+    first = make_client(api, disk_cache_path=str(tmp_path / "cache.sqlite"))
+    await first.list_folders(workspace="A")
+    await first.aclose()
+
+    api.folders = [{"id": 1, "name": "Renamed while down"}]
+    api.requests.clear()
+    restarted = make_client(api, disk_cache_path=str(tmp_path / "cache.sqlite"))
+
+    assert (await restarted.list_folders(workspace="A"))[0]["name"] == "Inbox"
+    await asyncio.gather(*restarted._refresh_tasks)
+    assert (await restarted.list_folders(workspace="A"))[0]["name"] == "Renamed while down"
+    assert len(api.requests) == 1
+    await restarted.aclose()
+
+
+def test_write_drops_lists_on_disk_too(make_client, tmp_path):
+    api = _api()
+    first = make_client(api, PoznoteClient, disk_cache_path=str(tmp_path / "cache.sqlite"))
+    first.list_folders(workspace="A")
+    first.create_folder("New", workspace="A")
+    first.close()
+
+    api.requests.clear()
+    restarted = make_client(api, PoznoteClient, disk_cache_path=str(tmp_path / "cache.sqlite"))
+    restarted.list_folders(workspace="A")
+
+    # Fetched (and waited for), not served from disk.
+    assert len(api.requests) == 1
+    assert restarted.metadata_cache.stats()["endpoints"]["folders"]["refreshes"] == 0
+    restarted.close()
+
+
+def test_entries_are_per_user(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite"), max_bytes=10_000)
+    cache.put(HTTP, "1", ["/tags", [], "1"], b"one")
+    cache.put(HTTP, "2", ["/tags", [], "2"], b"two")
+
+    assert cache.get(HTTP, "1", ["/tags", [], "1"]).body == b"one"
+    assert cache.get(HTTP, "1", ["/tags", [], "2"]) is None
+    cache.close()
+
+
+def test_size_cap_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite"), max_bytes=300)
+    for name in ("a", "b", "c"):
+        cache.put(HTTP, "1", name, b"x" * 90)
+    cache.get(HTTP, "1", "a")
+    cache.put(HTTP, "1", "d", b"x" * 90)
+
+    assert cache.get(HTTP, "1", "b") is None
+    assert cache.get(HTTP, "1", "a") is not None
+    stats = cache.stats()
+    assert stats["bytes"] <= 300
+    assert stats["evictions"] == 1
+    cache.close()
+
+
+def test_size_survives_reopening(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = DiskCache(path, max_bytes=10_000)
+    cache.put(HTTP, "1", "a", b"x" * 100, version='W/"1"', meta={"headers": {}})
+    size = cache.stats()["bytes"]
+    cache.close()
+
+    reopened = DiskCache(path, max_bytes=10_000)
+    assert reopened.stats()["bytes"] == size
+    assert reopened.get(HTTP, "1", "a").version == 'W/"1"'
+    reopened.close()
+
+
+def test_unusable_path_disables_the_tier(tmp_path, caplog):
+    assert open_disk_cache(str(tmp_path / "missing" / "cache.sqlite"), 1000) is None
+    assert open_disk_cache(None, 1000) is None
+    assert "continuing without it" in caplog.text
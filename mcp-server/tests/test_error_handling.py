@@ -5,7 +5,7 @@ Poznote API is unreachable, times out, or returns an HTTP error.
 """
 
 import json
-from unittest.mock import MagicMock, patch, PropertyMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import httpx
 import pytest
@@ -16,12 +16,15 @@ import pytest
 # ---------------------------------------------------------------------------
 
 def _fake_client(**overrides):
-    """Return a MagicMock PoznoteClient."""
-    client = MagicMock()
+    """Return an AsyncMock AsyncPoznoteClient."""
+    client = AsyncMock()
     client.base_url = "http://localhost:8040/api/v1"
     client.username = "1"
     client.password = ""
     client.service_token = "secret-token"
+    client.refresh_service_token = MagicMock(return_value=False)
+    # A cold search index, so search_notes goes to the API
+    client.views.search_notes_indexed = AsyncMock(return_value=None)
     for k, v in overrides.items():
         setattr(client, k, v)
     return client
@@ -108,7 +111,7 @@ class TestToolErrorHandling:
     @pytest.mark.parametrize("tool_name,kwargs", TOOL_CALLS)
     @pytest.mark.parametrize("exception", EXCEPTIONS)
     @patch("poznote_mcp.server._get_client_or_error")
-    def test_tool_returns_json_error_on_exception(self, mock_gcoe, tool_name, kwargs, exception):
+    async def test_tool_returns_json_error_on_exception(self, mock_gcoe, tool_name, kwargs, exception):
         import poznote_mcp.server as srv
 
         tool_fn = getattr(srv, tool_name)
@@ -137,7 +140,7 @@ class TestToolErrorHandling:
 
         mock_gcoe.return_value = (client, None)
 
-        result_json = tool_fn(**kwargs)
+        result_json = await tool_fn(**kwargs)
         result = json.loads(result_json)
 
         assert "error" in result, f"{tool_name} did not return an error key"
@@ -148,13 +151,13 @@ class TestMissingEnvVars:
     """Tools must return clear config errors when env vars are missing."""
 
     @patch("poznote_mcp.server.get_client")
-    def test_missing_service_token(self, mock_get_client):
+    async def test_missing_service_token(self, mock_get_client):
         from poznote_mcp.server import list_notes
 
         client = _fake_client(service_token="")
         mock_get_client.return_value = client
 
-        result_json = list_notes()
+        result_json = await list_notes()
         result = json.loads(result_json)
 
         assert "error" in result
@@ -0,0 +1,106 @@
+"""Tests for the link graph behind traverse_links."""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+from conftest import FakeApi
+from poznote_mcp import server
+from poznote_mcp.linkgraph import LinkGraph, parse_links
+
+# 1 -> 2 -> 3 -> 4, 1 -> 5, 5 -> 1, and 6 -> [[Roadmap]] (note 2)
+NOTES = {
+    1: ("Home", '<p><a data-note-id="2">Plan</a> and <a href="index.php?workspace=Poznote&note=5">Ops</a></p>'),
+    2: ("Roadmap", '<p>Next: <a data-note-id="3">Q3</a></p>'),
+    3: ("Q3", "See [Q4](index.php?note=4)"),
+    4: ("Q4", "<p>Nothing linked</p>"),
+    5: ("Ops", '<p>Back to <a data-note-id="1">home</a></p>'),
+    6: ("Ideas", "<p>Part of the [[Roadmap]]</p>"),
+}
+
+
+def _note(note_id, workspace="Poznote"):
+    heading, content = NOTES[note_id]
+    return {"id": note_id, "heading": heading, "content": content, "workspace": workspace,
+            "folder": None, "tags": "", "folder_id": None, "updated": "2026-03-01 10:00:00"}
+
+
+def _graph():
+    graph = LinkGraph()
+    for note_id in NOTES:
+        graph.add("1", _note(note_id))
+    graph.mark_ready("1")
+    return graph
+
+
+def _walk(graph, note_id, **kwargs):
+    _, nodes, _, _ = graph.traverse("1", note_id, **kwargs)
+    return [(node["id"], node["depth"]) for node in nodes]
+
+
+def test_links_are_found_like_the_backlinks_endpoint_does():
+    ids, titles = parse_links('<a data-note-id="12">x</a> ?note=7&x=1 &note=70 note=8 [[A title]] [[A title]]')
+
+    assert ids == [12, 7, 70]
+    assert titles == ["A title"]
+
+
+def test_walks_follow_direction_and_depth():
+    graph = _graph()
+
+    assert _walk(graph, 1, depth=3) == [(2, 1), (5, 1), (3, 2), (4, 3)]
+    assert _walk(graph, 2, direction="in") == [(1, 1), (6, 1), (5, 2)]
+    root, nodes, links, truncated = graph.traverse("1", 2, direction="both", depth=1)
+    assert root["heading"] == "Roadmap"
+    assert sorted(node["id"] for node in nodes) == [1, 3, 6]
+    assert sorted(links) == [[1, 2], [2, 3], [6, 2]]
+    assert not truncated
+    assert graph.traverse("1", 99) == (None, [], [], False)
+    assert graph.traverse("2", 1) is None
+
+
+def test_fan_out_and_workspace_limit_the_walk():
+    graph = _graph()
+    graph.add("1", _note(5, workspace="Work"))
+
+    _, nodes, _, truncated = graph.traverse("1", 1, depth=1, fan_out=1)
+    assert [node["id"] for node in nodes] == [2] and truncated
+    assert _walk(graph, 1, depth=3, workspace="Poznote") == [(2, 1), (3, 2), (4, 3)]
+
+
+def test_edits_renames_and_deletions_update_the_links():
+    graph = _graph()
+
+    # Renaming the note a wiki link names moves the link to the new title.
+    graph.add("1", {**_note(2), "heading": "Old roadmap"})
+    assert _walk(graph, 6, depth=1) == []
+    graph.add("1", {**_note(4), "heading": "Roadmap"})
+    assert _walk(graph, 6, depth=1) == [(4, 1)]
+
+    graph.add("1", {**_note(3), "content": "<p>No links anymore</p>"})
+    assert _walk(graph, 3, direction="in", depth=1) == [(2, 1)]
+    assert _walk(graph, 4, direction="in", depth=1) == [(6, 1)]
+
+    graph.remove("1", 5)
+    assert _walk(graph, 1, depth=1) == [(2, 1)]
+    # A link to a note that comes back is followed again.
+    graph.add("1", _note(5))
+    assert _walk(graph, 1, depth=1) == [(2, 1), (5, 1)]
+    assert graph.stats()["links"] == 5
+
+
+async def test_tool_walks_once_the_links_are_read(make_client):
+    client = make_client(FakeApi(*map(_note, NOTES)))
+
+    with patch("poznote_mcp.server._get_client_or_error", return_value=(client, None)):
+        cold = json.loads(await server.traverse_links(4, direction="in"))
+        await asyncio.gather(*client.views._refresh_tasks)
+        warm = json.loads(await server.traverse_links(4, direction="in", depth=3))
+        bad = json.loads(await server.traverse_links(4, depth=9))
+
+    assert "being read" in cold["error"]
+    assert warm["note"] == {"id": 4, "title": "Q4"}
+    assert [(n["id"], n["depth"], n["via"]) for n in warm["notes"]] == [(3, 1, 4), (2, 2, 3), (1, 3, 2), (6, 3, 2)]
+    assert [3, 4] in warm["links"]
+    assert "depth" in bad["error"]
+    await client.aclose()
@@ -0,0 +1,250 @@
+"""Tests for the stale-while-revalidate cache of metadata lists."""
+
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from conftest import FakeApi
+from poznote_mcp import deadline
+from poznote_mcp.client import PoznoteClient
+from poznote_mcp.metacache import FRESH, MISS, STALE, MetadataCache, parse_ttls
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Api(FakeApi):
+    """The lists behind the metadata cache; every read fails while `fail` is set"""
+
+    def __init__(self):
+        super().__init__(written={"success": True, "folder": {"id": 2}, "workspace": {"name": "B"}})
+        self.folders = [{"id": 1, "name": "Inbox"}]
+        self.fail = False
+        self.routes.update({
+            ("GET", "/folders"): lambda request: {"success": True, "folders": self.folders},
+            ("GET", "/workspaces"): {"success": True, "workspaces": [{"name": "Poznote"}]},
+            ("GET", "/tags"): {"success": True, "tags": ["a"]},
+            ("GET", "/shared"): {"success": True, "shared_notes": [{"id": 3}], "shared_folders": []},
+        })
+
+    def respond(self, request: httpx.Request, path: str) -> httpx.Response:
+        if self.fail and request.method == "GET":
+            return httpx.Response(500, json={"success": False})
+        return super().respond(request, path)
+
+    def reads(self, path: str) -> int:
+        return self.fetched().count(path)
+
+
+def test_fresh_lists_are_served_without_a_request(make_client):
+    api = _Api()
+    client = make_client(api, PoznoteClient)
+
+    for _ in range(3):
+        assert client.list_folders(workspace="A") == [{"id": 1, "name": "Inbox"}]
+        assert client.list_tags() == ["a"]
+        assert client.list_shared()["shared_notes"] == [{"id": 3}]
+        assert client.list_workspaces() == [{"name": "Poznote"}]
+
+    assert len(api.requests) == 4
+    assert client.metadata_cache.stats()["endpoints"]["folders"]["hits"] == 2
+
+
+def test_keys_include_user_and_workspace(make_client):
+    api = _Api()
+    client = make_client(api, PoznoteClient)
+
+    client.list_folders(workspace="A")
+    client.list_folders(workspace="B")
+    client.list_folders(workspace="A", user_id=2)
+    client.list_folders(workspace="A", user_id=1)
+
+    assert api.reads("/folders") == 3
+
+
+async def test_stale_list_is_served_then_refreshed_in_the_background(make_client):
+    api = _Api()
+    clock = _Clock()
+    client = make_client(api)
+    client.metadata_cache._clock = clock
+
+    await client.list_folders()
+    api.folders = [{"id": 1, "name": "Renamed elsewhere"}]
+    clock.now = 61
+
+    assert (await client.list_folders())[0]["name"] == "Inbox"
+    await asyncio.gather(*client._refresh_tasks)
+    assert (await client.list_folders())[0]["name"] == "Renamed elsewhere"
+
+    assert api.reads("/folders") == 2
+    counts = client.metadata_cache.stats()["endpoints"]["folders"]
+    assert (counts["stale_hits"], counts["refreshes"], counts["hits"]) == (1, 1, 1)
+    await client.aclose()
+
+
+async def test_background_refresh_outlives_the_tools_deadline(make_client):
+    api = _Api()
+
+    async def slow(request):
+        await asyncio.sleep(0.2)
+        return api(request)
+
+    api.handle_async = slow
+    clock = _Clock()
+    client = make_client(api)
+    client.metadata_cache._clock = clock
+    await client.list_folders()
+    api.folders = [{"id": 1, "name": "Renamed elsewhere"}]
+    clock.now = 61
+
+    with deadline.deadline(0.1):
+        assert (await client.list_folders())[0]["name"] == "Inbox"
+    await asyncio.gather(*client._refresh_tasks)
+
+    assert (await client.list_folders())[0]["name"] == "Renamed elsewhere"
+    assert client.metadata_cache.stats()["endpoints"]["folders"]["refresh_errors"] == 0
+    await client.aclose()
+
+
+def test_sync_client_refreshes_in_a_thread(make_client):
+    api = _Api()
+    clock = _Clock()
+    client = make_client(api, PoznoteClient)
+    client.metadata_cache._clock = clock
+    client.list_tags()
+    clock.now = 61
+
+    threads = set(threading.enumerate())
+    assert client.list_tags() == ["a"]
+    for thread in set(threading.enumerate()) - threads:
+        thread.join(5)
+
+    assert api.reads("/tags") == 2
+    assert client.metadata_cache.lookup(client._metadata_key("tags", None, None))[1] == FRESH
+
+
+async def test_failed_refresh_keeps_the_stale_list(make_client):
+    api = _Api()
+    clock = _Clock()
+    client = make_client(api)
+    client.metadata_cache._clock = clock
+    await client.list_tags()
+    api.fail = True
+    clock.now = 61
+
+    assert await client.list_tags() == ["a"]
+    await asyncio.gather(*client._refresh_tasks)
+
+    assert await client.list_tags() == ["a"]
+    assert client.metadata_cache.stats()["endpoints"]["tags"]["refresh_errors"] == 1
+    await client.aclose()
+
+
+def test_list_too_old_to_serve_is_fetched_again(make_client):
+    api = _Api()
+    clock = _Clock()
+    client = make_client(api, PoznoteClient)
+    client.metadata_cache._clock = clock
+    client.list_workspaces()
+    clock.now = 300 + client.metadata_cache.max_stale
+
+    client.list_workspaces()
+
+    assert api.reads("/workspaces") == 2
+    assert client.metadata_cache.stats()["endpoints"]["workspaces"]["misses"] == 2
+
+
+@pytest.mark.parametrize(
+    "write",
+    [
+        lambda c: c.create_folder("New", workspace="A"),
+        lambda c: c.rename_folder(1, "Renamed", workspace="A"),
+        lambda c: c.delete_folder(1, workspace="A"),
+        lambda c: c.create_workspace("B"),
+        lambda c: c.rename_workspace("A", "B"),
+        lambda c: c.delete_workspace("B"),
+    ],
+)
+def test_folder_and_workspace_tools_drop_the_lists(make_client, write):
+    api = _Api()
+    client = make_client(api, PoznoteClient)
+    client.list_folders(workspace="A")
+    client.list_workspaces()
+
+    write(client)
+    client.list_folders(workspace="A")
+    client.list_workspaces()
+
+    assert (api.reads("/folders"), api.reads("/workspaces")) == (2, 2)
+
+
+def test_note_writes_only_drop_the_tag_list(make_client):
+    api = _Api()
+    client = make_client(api, PoznoteClient)
+    client.list_tags()
+    client.list_folders()
+
+    client.update_note(7, tags="b")
+    client.list_tags()
+    client.list_folders()
+
+    assert (api.reads("/tags"), api.reads("/folders")) == (2, 1)
+
+
+def test_cached_lists_cannot_be_mutated_by_callers(make_client):
+    api = _Api()
+    client = make_client(api, PoznoteClient)
+
+    client.list_tags().append("mutated")
+    client.list_shared()["shared_notes"].clear()
+    client.list_shared()["shared_notes"][0]["id"] = 4
+
+    assert client.list_tags() == ["a"]
+    assert client.list_shared()["shared_notes"] == [{"id": 3}]
+
+
+def test_zero_ttl_disables_caching(make_client):
+    api = _Api()
+    client = make_client(api, PoznoteClient, metadata_ttls={"tags": 0})
+
+    client.list_tags()
+    client.list_tags()
+
+    assert api.reads("/tags") == 2
+
+
+def test_fetch_racing_an_invalidation_is_not_stored():
+    cache = MetadataCache()
+    key = MetadataCache.key("tags", "1")
+    generation = cache.generation
+
+    cache.invalidate("1")
+    cache.store(key, ["old"], generation)
+
+    assert cache.lookup(key) == (None, MISS)
+
+
+def test_only_one_refresh_per_entry():
+    clock = _Clock()
+    cache = MetadataCache(clock=clock)
+    key = MetadataCache.key("tags", "1")
+    cache.store(key, ["a"], cache.generation)
+    clock.now = 61
+
+    assert cache.lookup(key) == (["a"], STALE)
+    assert cache.begin_refresh(key) is True
+    assert cache.begin_refresh(key) is False
+    cache.end_refresh(key)
+    assert cache.begin_refresh(key) is True
+
+
+def test_parse_ttls():
+    assert parse_ttls("folders=10, shared=0, bogus=5, tags=x, notes") == {"folders": 10.0, "shared": 0.0}
+    assert parse_ttls(None) == {}
@@ -0,0 +1,149 @@
+"""Tests for the read-through note cache and its invalidation by writes."""
+
+import json
+
+import pytest
+
+from conftest import FakeApi
+from poznote_mcp.client import PoznoteClient
+from poznote_mcp.notecache import NoteCache
+
+
+def _api():
+    note = {"id": 7, "heading": "Seven", "content": "<p>7</p>", "version": "v1"}
+    return FakeApi(note, written={"success": True, "note": {"id": 7}, "task": {"id": "t1"}})
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_repeated_reads_are_served_from_memory(make_client):
+    api = _api()
+    client = make_client(api, PoznoteClient)
+
+    for _ in range(4):
+        assert client.get_note(7)["heading"] == "Seven"
+
+    assert len(api.fetched()) == 1
+    stats = client.note_cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (3, 1, 0.75)
+    assert client.note_cache.version(NoteCache.key("1", None, 7)) == "v1"
+
+
+def test_key_includes_user_and_workspace(make_client):
+    api = _api()
+    client = make_client(api, PoznoteClient)
+
+    client.get_note(7)
+    client.get_note(7, user_id=2)
+    client.get_note(7, workspace="Work")
+    client.get_note(7, user_id=1)
+
+    assert len(api.fetched()) == 3
+
+
+@pytest.mark.parametrize(
+    "write",
+    [
+        lambda c: c.update_note(7, content="new"),
+        lambda c: c.delete_note(7),
+        lambda c: c.convert_note(7, "markdown"),
+        lambda c: c.restore_note(7),
+        lambda c: c.add_task(7, "task"),
+        lambda c: c.update_task(7, "t1", {"completed": True}),
+        lambda c: c.delete_task(7, "t1"),
+        lambda c: c.set_reminder(7, "2026-11-01 09:00:00"),
+        lambda c: c.rename_workspace("A", "B"),
+    ],
+)
+def test_writes_drop_the_cached_note(make_client, write):
+    api = _api()
+    client = make_client(api, PoznoteClient)
+    client.get_note(7, workspace="Work")
+
+    write(client)
+    client.get_note(7, workspace="Work")
+
+    assert len(api.fetched()) == 2
+    assert client.note_cache.stats()["invalidations"] == 1
+
+
+def test_writes_only_drop_the_acting_users_notes(make_client):
+    api = _api()
+    client = make_client(api, PoznoteClient)
+    client.get_note(7, user_id=2)
+
+    client.update_note(7, content="new", user_id=3)
+    client.get_note(7, user_id=2)
+
+    assert len(api.fetched()) == 1
+
+
+async def test_async_client_invalidates_on_update(make_client):
+    api = _api()
+    client = make_client(api)
+
+    await client.get_note(7)
+    api.notes[7] = {**api.notes[7], "content": "<p>new</p>", "version": "v2"}
+    await client.update_note(7, content="<p>new</p>")
+    note = await client.get_note(7)
+
+    assert note["version"] == "v2"
+    assert len(api.fetched()) == 2
+    await client.aclose()
+
+
+def test_entries_expire():
+    clock = _Clock()
+    cache = NoteCache(max_bytes=1000, ttl=10, clock=clock)
+    key = NoteCache.key("1", None, 7)
+    cache.put(key, {"id": 7}, 10, cache.generation)
+
+    clock.now = 9.9
+    assert cache.get(key) == {"id": 7}
+    clock.now = 10
+    assert cache.get(key) is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_size_is_bounded_in_bytes():
+    cache = NoteCache(max_bytes=250, ttl=60)
+    for note_id in range(3):
+        cache.put(NoteCache.key("1", None, note_id), {"id": note_id}, 100, cache.generation)
+    cache.put(NoteCache.key("1", None, 99), {"id": 99}, 1000, cache.generation)
+
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"]) == (2, 200)
+    assert (stats["evictions"], stats["evicted_bytes"]) == (1, 100)
+    assert cache.get(NoteCache.key("1", None, 0)) is None
+
+
+def test_read_racing_a_write_is_not_stored():
+    cache = NoteCache(max_bytes=1000, ttl=60)
+    key = NoteCache.key("1", None, 7)
+    generation = cache.generation
+
+    cache.invalidate("1", 7)
+    cache.put(key, {"id": 7, "content": "stale"}, 10, generation)
+
+    assert cache.get(key) is None
+
+
+def test_cached_note_cannot_be_mutated_by_callers():
+    cache = NoteCache(max_bytes=1000, ttl=60)
+    key = NoteCache.key("1", None, 7)
+    note = {"id": 7, "heading": "Seven", "tags": ["a"]}
+    cache.put(key, note, 10, cache.generation)
+    note["tags"].append("put")
+
+    got = cache.get(key)
+    got["heading"] = "changed"
+    got["tags"].append("got")
+
+    assert cache.get(key) == {"id": 7, "heading": "Seven", "tags": ["a"]}
+    assert json.dumps(cache.stats())
@@ -0,0 +1,122 @@
+"""Tests for the PageRank and components behind note_importance."""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from poznote_mcp import server
+from poznote_mcp.importance import ImportanceCache, available
+from poznote_mcp.linkgraph import LinkGraph
+
+needs_numpy = pytest.mark.skipif(not available(), reason="NumPy is not installed")
+
+# A hub (1) linked from 2, 3 and 4, a chain 5 -> 6 -> 7, a pair 8 <-> 9, a
+# note alone (10), and a link to a note that is not there (11 -> 99).
+LINKS = {1: [2], 2: [1], 3: [1], 4: [1], 5: [6], 6: [7], 7: [], 8: [9], 9: [8], 10: [], 11: [99]}
+
+
+def _graph(links=LINKS):
+    graph = LinkGraph()
+    for note_id, targets in links.items():
+        content = " ".join(f'<a data-note-id="{target}">x</a>' for target in targets)
+        graph.add("1", {"id": note_id, "heading": f"Note {note_id}", "content": content,
+                        "workspace": "Work" if note_id in (5, 6, 7) else "Poznote"})
+    graph.mark_ready("1")
+    return graph
+
+
+def _power_iteration(links, damping=0.85, steps=200):
+    """PageRank the textbook way, over the notes that are there"""
+    notes = list(links)
+    rank = {note: 1 / len(notes) for note in notes}
+    for _ in range(steps):
+        dangling = sum(rank[note] for note in notes if not [t for t in links[note] if t in links])
+        updated = {note: (1 - damping) / len(notes) + damping * dangling / len(notes) for note in notes}
+        for note in notes:
+            targets = [t for t in links[note] if t in links]
+            for target in targets:
+                updated[target] += damping * rank[note] / len(targets)
+        rank = updated
+    return rank
+
+
+@needs_numpy
+def test_pagerank_and_degrees_match_the_definition():
+    importance = ImportanceCache().get(_graph(), "1")
+    expected = _power_iteration(LINKS)
+
+    for note_id, rank in expected.items():
+        assert importance.note(note_id)["pagerank"] == pytest.approx(rank, rel=1e-3)
+    hub = importance.note(1)
+    assert (hub["place"], hub["in_degree"], hub["out_degree"]) == (1, 3, 1)
+    assert importance.note(11)["out_degree"] == 0
+    assert importance.summary()["links"] == 8
+    assert importance.note(99) is None
+
+
+@needs_numpy
+def test_components_are_numbered_from_the_largest():
+    importance = ImportanceCache().get(_graph(), "1")
+
+    components = {note_id: importance.note(note_id)["component"] for note_id in LINKS}
+    assert components[1] == components[4] == 0
+    assert components[5] == components[7] == 1
+    assert components[8] == components[9] == 2
+    assert len({components[10], components[11]}) == 2
+    summary = importance.summary()
+    assert summary["largest_components"] == [4, 3, 2, 1, 1]
+    assert summary["isolated_notes"] == 2
+
+
+@needs_numpy
+def test_results_are_kept_until_links_change():
+    graph = _graph()
+    cache = ImportanceCache()
+    first = cache.get(graph, "1")
+
+    graph.add("1", {"id": 3, "heading": "Renamed", "content": '<a data-note-id="1">x</a>', "workspace": "Poznote"})
+    assert cache.get(graph, "1") is first
+    graph.add("1", {"id": 10, "heading": "Note 10", "content": '<a data-note-id="5">x</a>', "workspace": "Poznote"})
+    second = cache.get(graph, "1")
+    assert second is not first
+    assert second.note(10)["component"] == second.note(5)["component"]
+    assert cache.stats()["computations"] == 2
+
+
+@needs_numpy
+def test_top_notes_by_order_and_workspace():
+    importance = ImportanceCache().get(_graph(), "1")
+    graph = _graph()
+
+    assert [n["id"] for n in importance.top(graph, "1", "in_degree", limit=1)] == [1]
+    assert [n["id"] for n in importance.top(graph, "1", "pagerank", limit=2, workspace="Work")] == [7, 6]
+
+
+@needs_numpy
+async def test_tool_lists_the_top_notes_and_one_note():
+    graph = _graph()
+    client = MagicMock(user_id="1", **{"views.link_graph": graph, "views.importance": ImportanceCache()})
+
+    async def note_importance(user_id=None):
+        return client.views.importance.get(graph, "1")
+
+    client.views.note_importance = note_importance
+    with patch("poznote_mcp.server._get_client_or_error", return_value=(client, None)):
+        top = json.loads(await server.note_importance(limit=3))
+        one = json.loads(await server.note_importance(note_id=8))
+        missing = json.loads(await server.note_importance(note_id=99))
+
+    assert top["notes"][0]["id"] == 1 and top["notes"][0]["title"] == "Note 1"
+    assert top["graph"]["components"] == 5
+    assert one["note"]["component_size"] == 2
+    assert "not indexed" in missing["error"]
+
+
+async def test_tool_says_how_to_install_numpy():
+    client = MagicMock(**{"views.importance": None})
+
+    with patch("poznote_mcp.server._get_client_or_error", return_value=(client, None)):
+        result = json.loads(await server.note_importance())
+
+    assert "poznote-mcp-server[graph]" in result["error"]
@@ -0,0 +1,119 @@
+"""Tests for the cursors of list_notes and search_notes."""
+
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from conftest import FakeApi
+from poznote_mcp import server
+from poznote_mcp.pagination import CursorError, ResultWindows, decode_cursor, encode_cursor, scope
+
+
+def _api(count):
+    return FakeApi(*[{"id": note_id, "heading": f"Note {note_id}", "tags": "", "folder": None} for note_id in range(1, count + 1)])
+
+
+def _listings(api):
+    """(after, limit) of each page read from GET /notes"""
+    return [(request.url.params.get("after"), request.url.params.get("limit")) for request in api.requests]
+
+
+def test_cursors_only_decode_for_their_query():
+    cursor = encode_cursor("notes", scope("Poznote", "heading_asc"), 7, 20)
+
+    assert decode_cursor(cursor, "notes", scope("Poznote", "heading_asc")) == {"k": "notes", "q": scope("Poznote", "heading_asc"), "id": 7, "n": 20}
+    with pytest.raises(CursorError, match="another query"):
+        decode_cursor(cursor, "notes", scope("Poznote", "updated_desc"))
+    for bad in ("not a cursor", encode_cursor("search", scope("Poznote", "heading_asc"), 7, 20)):
+        with pytest.raises(CursorError, match="Invalid"):
+            decode_cursor(bad, "notes", scope("Poznote", "heading_asc"))
+
+
+def test_windows_expire_and_evict_the_least_recently_used():
+    now = [0.0]
+    windows = ResultWindows(ttl=10, max_windows=2, clock=lambda: now[0])
+    for name in ("a", "b"):
+        windows.put(ResultWindows.key(1, "notes", name), [])
+    windows.get(ResultWindows.key(1, "notes", "a"))
+    windows.put(ResultWindows.key(2, "notes", "c"), [])
+
+    assert windows.get(ResultWindows.key(1, "notes", "b")) is None
+    assert windows.get(ResultWindows.key(1, "notes", "a")) is not None
+    windows.drop(1)
+    assert windows.stats()["windows"] == 1
+    now[0] = 11
+    assert windows.get(ResultWindows.key(2, "notes", "c")) is None
+
+
+async def test_list_notes_pages_through_the_sorted_list(make_client):
+    api = _api(5)
+    client = make_client(api)
+
+    pages = []
+    cursor = None
+    with patch("poznote_mcp.server._get_client_or_error", return_value=(client, None)):
+        while True:
+            result = json.loads(await server.list_notes(limit=2, sort="heading_asc", cursor=cursor))
+            pages.append([note["id"] for note in result["notes"]])
+            cursor = result["next_cursor"]
+            if cursor is None:
+                break
+        other = json.loads(await server.list_notes(limit=2, sort="created_desc", cursor=json.loads(await server.list_notes(limit=2, sort="heading_asc"))["next_cursor"]))
+
+    assert pages == [[1, 2], [3, 4], [5]]
+    assert {request.url.params.get("sort") for request in api.requests} == {"heading_asc"}
+    # Each page reads its own notes, seeking past the last one of the previous page.
+    assert _listings(api)[:3] == [(None, "3"), ("2", "3"), ("4", "3")]
+    assert client.result_windows.stats()["windows"] == 0
+    assert "another query" in other["error"]
+    await client.aclose()
+
+
+async def test_a_write_between_pages_resumes_after_the_last_note_seen(make_client):
+    api = _api(6)
+    client = make_client(api)
+
+    with patch("poznote_mcp.server._get_client_or_error", return_value=(client, None)):
+        first = json.loads(await server.list_notes(limit=3))
+        await client._request("DELETE", "/notes/2")
+        second = json.loads(await server.list_notes(limit=3, cursor=first["next_cursor"]))
+
+    assert [note["id"] for note in second["notes"]] == [4, 5, 6]
+    assert second["next_cursor"] is None
+    await client.aclose()
+
+
+async def test_a_page_whose_last_note_is_gone_resumes_at_its_offset(make_client):
+    api = _api(6)
+    client = make_client(api)
+
+    with patch("poznote_mcp.server._get_client_or_error", return_value=(client, None)):
+        first = json.loads(await server.list_notes(limit=2))
+        del api.notes[2]
+        api.notes = {7: {"id": 7, "heading": "Note 7", "tags": "", "folder": None}, **api.notes}
+        second = json.loads(await server.list_notes(limit=2, cursor=first["next_cursor"]))
+        third = json.loads(await server.list_notes(limit=2, cursor=second["next_cursor"]))
+
+    assert [note["id"] for note in second["notes"]] == [3, 4]
+    assert [note["id"] for note in third["notes"]] == [5, 6]
+    assert _listings(api)[1:] == [("2", "3"), (None, None), ("4", "3")]
+    await client.aclose()
+
+
+async def test_search_notes_pages_through_one_ranking():
+    ranked = [{"id": note_id, "heading": f"Note {note_id}", "excerpt": "backup"} for note_id in range(1, 8)]
+    client = MagicMock(user_id="1", result_windows=ResultWindows())
+    client.views.search_notes_indexed = AsyncMock(return_value=None)
+    client.search_notes = AsyncMock(return_value=ranked)
+
+    with patch("poznote_mcp.server._get_client_or_error", return_value=(client, None)):
+        first = json.loads(await server.search_notes("backup", limit=3))
+        second = json.loads(await server.search_notes("backup", limit=3, cursor=first["next_cursor"]))
+        third = json.loads(await server.search_notes("backup", limit=3, cursor=second["next_cursor"]))
+        wrong = json.loads(await server.search_notes("restic", limit=3, cursor=first["next_cursor"]))
+
+    assert [[r["id"] for r in result["results"]] for result in (first, second, third)] == [[1, 2, 3], [4, 5, 6], [7]]
+    assert third["next_cursor"] is None and third["source"] == "api"
+    assert client.search_notes.await_count == 1
+    assert "another query" in wrong["error"]
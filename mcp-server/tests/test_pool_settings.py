@@ -0,0 +1,145 @@
+"""Tests for the configurable upstream connection pool."""
+
+import json
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from conftest import FakeApi
+from poznote_mcp.client import (
+    DEFAULT_MAX_CONNECTIONS,
+    AsyncPoznoteClient,
+    PoznoteClient,
+)
+
+
+def _client(cls=PoznoteClient, **kwargs):
+    return cls(base_url="http://example.test/api/v1", service_token="secret-token", **kwargs)
+
+
+def test_pool_limits_come_from_env(monkeypatch):
+    monkeypatch.setenv("POZNOTE_HTTP_MAX_CONNECTIONS", "5")
+    monkeypatch.setenv("POZNOTE_HTTP_MAX_KEEPALIVE", "5")
+    monkeypatch.setenv("POZNOTE_HTTP_KEEPALIVE_EXPIRY", "30")
+
+    client = _client()
+    try:
+        assert client.limits.max_connections == 5
+        assert client.limits.max_keepalive_connections == 5
+        assert client.limits.keepalive_expiry == 30.0
+    finally:
+        client.close()
+
+
+def test_explicit_pool_settings_override_env(monkeypatch):
+    monkeypatch.setenv("POZNOTE_HTTP_MAX_CONNECTIONS", "5")
+
+    client = _client(max_connections=12)
+    try:
+        assert client.limits.max_connections == 12
+    finally:
+        client.close()
+
+
+@pytest.mark.parametrize("value", ["banana", "0", "-3", "   "])
+def test_invalid_pool_env_falls_back_to_default(monkeypatch, value):
+    monkeypatch.setenv("POZNOTE_HTTP_MAX_CONNECTIONS", value)
+
+    client = _client()
+    try:
+        assert client.limits.max_connections == DEFAULT_MAX_CONNECTIONS
+    finally:
+        client.close()
+
+
+def test_http2_falls_back_to_http1_without_h2(monkeypatch):
+    monkeypatch.setenv("POZNOTE_HTTP2", "true")
+    monkeypatch.setitem(sys.modules, "h2", None)
+
+    client = _client()
+    try:
+        assert client.http2 is False
+    finally:
+        client.close()
+
+
+@patch("poznote_mcp.client.httpx.AsyncHTTPTransport")
+def test_async_transport_receives_pool_limits(mock_transport_cls):
+    _client(AsyncPoznoteClient, max_connections=5, max_keepalive_connections=3)
+
+    _, kwargs = mock_transport_cls.call_args
+    assert kwargs["limits"].max_connections == 5
+    assert kwargs["limits"].max_keepalive_connections == 3
+    assert kwargs["http2"] is False
+
+
+def test_pool_stats_on_idle_pool():
+    client = _client(max_connections=5)
+    try:
+        stats = client.pool_stats()
+        assert stats["max_connections"] == 5
+        assert stats["connections"] == 0
+        assert stats["in_use"] == 0
+        assert stats["idle"] == 0
+        assert stats["waiting"] == 0
+    finally:
+        client.close()
+
+
+def test_serve_flags_become_client_options():
+    from poznote_mcp.server import _client_options_from_args, create_parser
+
+    args = create_parser().parse_args(
+        ["serve", "--max-connections", "5", "--keepalive-expiry", "15", "--http2"]
+    )
+
+    assert _client_options_from_args(args) == {
+        "max_connections": 5,
+        "keepalive_expiry": 15.0,
+        "http2": True,
+    }
+
+
+def test_unset_serve_flags_leave_env_in_charge():
+    from poznote_mcp.server import _client_options_from_args, create_parser
+
+    args = create_parser().parse_args(["serve"])
+
+    assert _client_options_from_args(args) == {}
+
+
+async def test_stats_endpoint_reports_pool(make_client, monkeypatch):
+    from poznote_mcp.server import stats
+
+    monkeypatch.setenv("POZNOTE_STATS", "true")
+    client = make_client(FakeApi({"id": 7, "heading": "Seven"}), max_connections=5)
+    await client.get_note(7)
+    await client.get_note(7)
+
+    with patch("poznote_mcp.server.get_client", return_value=client):
+        response = await stats(MagicMock())
+
+    body = json.loads(response.body)
+    assert body["pool"]["max_connections"] == 5
+    assert body["coalescing"]["upstream_gets"] == 1
+    assert body["resilience"]["breaker"]["state"] == "closed"
+    assert body["note_cache"]["hits"] == 1
+    assert body["disk_cache"] is None
+    # Every local view reports under its own name.
+    assert set(client.views.stats()) <= set(body)
+    await client.aclose()
+
+
+async def test_stats_endpoint_is_off_unless_enabled(monkeypatch):
+    from poznote_mcp import server
+
+    monkeypatch.delenv("POZNOTE_STATS", raising=False)
+    with patch("poznote_mcp.server.get_client") as mock_get_client:
+        response = await server.stats(MagicMock())
+
+    assert response.status_code == 404
+    mock_get_client.assert_not_called()
+
+    monkeypatch.setattr(server, "_stats_enabled", True)
+    assert server._stats_endpoint_enabled()
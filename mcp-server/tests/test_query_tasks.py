@@ -0,0 +1,118 @@
+"""Tests for the task index behind query_tasks."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from conftest import FakeApi
+from poznote_mcp import server
+from poznote_mcp.taskindex import TaskIndex
+
+NOTES = [
+    {"id": 1, "heading": "Sprint", "folder": "Work", "folder_id": 3, "workspace": "Poznote", "tasks": [
+        {"id": 11, "text": "Ship release", "completed": False, "important": True, "dueAt": "2026-03-12", "dueReminder": True},
+        {"id": 12, "text": "Write notes", "completed": False, "important": False, "dueAt": "2026-03-10T14:30", "dueReminder": False},
+        {"id": 13, "text": "Book room", "completed": True, "important": False, "dueAt": "2026-03-09", "dueReminder": False},
+    ]},
+    {"id": 2, "heading": "Home", "folder": "", "folder_id": None, "workspace": "Private", "tasks": [
+        {"id": "a", "text": "Pay rent", "completed": False, "important": True, "dueAt": "2026-03-10", "dueReminder": True,
+         "dueRecurrence": "1m"},
+        {"id": "b", "text": "Call plumber", "completed": False, "important": False, "dueAt": None, "dueReminder": False},
+    ]},
+]
+CHECKLISTS = [
+    {"id": 7, "heading": "Packing", "folder": "", "folder_id": None, "workspace": "Private", "type": "markdown", "tasks": [
+        {"id": 0, "text": "Passport", "completed": False},
+    ]},
+]
+
+
+def _index():
+    index = TaskIndex()
+    index.load("1", NOTES, CHECKLISTS)
+    return index
+
+
+def _texts(result):
+    return [task["text"] for task in result["tasks"]]
+
+
+def test_tasks_sort_by_due_date_then_importance():
+    index = _index()
+
+    assert _texts(index.query("1", completed=False)) == ["Pay rent", "Write notes", "Ship release", "Call plumber"]
+    assert _texts(index.query("1", sort="important")) == [
+        "Pay rent", "Ship release", "Book room", "Write notes", "Call plumber"
+    ]
+    assert _texts(index.query("1", important=True, sort="important")) == ["Pay rent", "Ship release"]
+    rent = index.query("1", note_id=2, limit=1)
+    assert rent["total"] == 2
+    assert rent["tasks"] == [{
+        "note_id": 2, "note": "Home", "folder": None, "workspace": "Private", "id": "a", "text": "Pay rent",
+        "completed": False, "important": True, "due_at": "2026-03-10", "reminder": True, "recurrence": "1m",
+    }]
+
+
+def test_due_ranges_include_whole_days_and_leave_undated_tasks_out():
+    index = _index()
+
+    assert _texts(index.query("1", due_from="2026-03-10", due_to="2026-03-10")) == ["Pay rent", "Write notes"]
+    assert _texts(index.query("1", due_to="2026-03-10T12:00")) == ["Book room", "Pay rent"]
+    assert _texts(index.query("1", due_from="2026-03-11")) == ["Ship release"]
+    assert _texts(index.query("1", due_from="2026-03-10", sort="important")) == ["Pay rent", "Ship release", "Write notes"]
+    with pytest.raises(ValueError):
+        index.query("1", due_to="next week")
+
+
+def test_filters_by_folder_workspace_and_checklists():
+    index = _index()
+
+    assert _texts(index.query("1", folder="3")) == _texts(index.query("1", folder="Work"))
+    assert _texts(index.query("1", workspace="Private", completed=False)) == ["Pay rent", "Call plumber"]
+    with_checklists = index.query("1", workspace="Private", checklists=True)
+    assert with_checklists["tasks"][-1] == {
+        "note_id": 7, "note": "Packing", "folder": None, "workspace": "Private", "id": 0, "text": "Passport",
+        "completed": False, "checklist": True,
+    }
+    assert index.query("2") is None
+
+
+def test_task_writes_move_their_row_only():
+    index = _index()
+
+    index.put_task("1", 1, {"id": 12, "text": "Write notes", "completed": True, "important": True, "dueAt": "2026-03-08"})
+    index.put_task("1", 2, {"id": "c", "text": "Water plants", "completed": False, "important": False, "dueAt": "2026-03-11"})
+    index.remove_task("1", 1, 11)
+    assert _texts(index.query("1", completed=None)) == ["Write notes", "Book room", "Pay rent", "Water plants", "Call plumber"]
+    assert _texts(index.query("1", important=True, completed=None, sort="important")) == ["Write notes", "Pay rent"]
+    assert not index.stale("1")
+
+    # A task of a note the index never read cannot be placed.
+    index.put_task("1", 9, {"id": 1, "text": "Elsewhere"})
+    assert index.stale("1")
+
+
+async def test_tool_reads_the_tasks_once_and_follows_task_writes(make_client):
+    task = dict(NOTES[0]["tasks"][1], completed=True)
+    api = FakeApi(*NOTES, routes={
+        ("GET", "/tasks"): {"success": True, "notes": NOTES, "checklists": CHECKLISTS},
+        ("PATCH", "/notes/1/tasks/12"): {"success": True, "note_id": 1, "task": task},
+    })
+    client = make_client(api)
+
+    with patch("poznote_mcp.server._get_client_or_error", return_value=(client, None)):
+        week = json.loads(await server.query_tasks(due_from="2026-03-09", due_to="2026-03-15"))
+        await server.complete_task(note_id=1, task_id="12")
+        after = json.loads(await server.query_tasks(due_from="2026-03-09", due_to="2026-03-15"))
+        reads = api.calls().count(("GET", "/tasks"))
+        bad = json.loads(await server.query_tasks(due_to="Friday"))
+        await client.update_note(1, content="[]")
+        assert client.views.task_index.stale("1")
+
+    assert week["filters"] == {"completed": False, "due_from": "2026-03-09", "due_to": "2026-03-15"}
+    assert (week["total"], _texts(week)) == (3, ["Pay rent", "Write notes", "Ship release"])
+    assert _texts(after) == ["Pay rent", "Ship release"]
+    assert reads == 1
+    assert "YYYY-MM-DD" in bad["error"]
+    await client.aclose()
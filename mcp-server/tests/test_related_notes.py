@@ -0,0 +1,148 @@
+"""Tests for the hashed TF-IDF vectors behind related_notes."""
+
+import asyncio
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from conftest import FakeApi
+from poznote_mcp import server
+from poznote_mcp.relatedindex import RelatedIndex, available
+from poznote_mcp.searchindex import note_text, tokenize
+
+needs_numpy = pytest.mark.skipif(not available(), reason="NumPy is not installed")
+
+NOTES = {
+    1: ("Docker setup", "docker compose file for the nginx reverse proxy and its containers"),
+    2: ("Reverse proxy", "nginx reverse proxy in front of the docker containers, with certificates"),
+    3: ("Bread recipe", "flour water salt and yeast, knead the dough and bake the bread"),
+    4: ("Pizza dough", "flour yeast salt and olive oil, knead the dough before baking"),
+    5: ("Holidays", "train tickets to the mountains and a hotel near the lake"),
+}
+
+
+def _note(note_id, workspace="Poznote"):
+    heading, text = NOTES[note_id]
+    return {"id": note_id, "heading": heading, "content": f"<p>{text}</p>", "workspace": workspace,
+            "tags": "", "folder_id": None, "updated": "2026-03-01 10:00:00"}
+
+
+def _index(**kwargs):
+    index = RelatedIndex(**kwargs)
+    for note_id in NOTES:
+        index.add("1", _note(note_id))
+    index.mark_ready("1")
+    return index
+
+
+def _ids(index, note_id, **kwargs):
+    _, related = index.related("1", note_id, **kwargs)
+    return [item["id"] for item in related]
+
+
+@needs_numpy
+def test_notes_sharing_words_rank_first():
+    index = _index()
+
+    note, related = index.related("1", 1, limit=3)
+
+    assert note["heading"] == "Docker setup"
+    assert related[0]["id"] == 2
+    assert 0 < related[0]["score"] <= 1
+    assert 1 not in [item["id"] for item in related]
+    assert _ids(index, 3, limit=1) == [4]
+
+
+@needs_numpy
+def test_workspace_filter_and_unknown_notes():
+    index = _index()
+    index.add("1", _note(2, workspace="Work"))
+
+    assert _ids(index, 1, workspace="Work") == [2]
+    assert _ids(index, 1, workspace="Elsewhere") == []
+    assert index.related("1", 99) == (None, [])
+    assert index.related("2", 1) is None
+
+
+@needs_numpy
+def test_rows_follow_edits_and_deletions():
+    index = _index()
+    index.add("1", {**_note(5), "content": "<p>knead the dough with flour and yeast</p>"})
+    index.remove("1", 4)
+
+    assert _ids(index, 3, limit=1) == [5]
+    assert 4 not in _ids(index, 3)
+    assert index.stats()["notes"] == 4
+
+
+@needs_numpy
+def test_reweighting_in_place_matches_vectors_made_from_scratch():
+    np = pytest.importorskip("numpy")
+    index = _index()
+    vectors = index._users["1"]
+    vectors.df[:] = vectors.df * 3 + 1
+    vectors.reweight()
+
+    heading, _ = NOTES[3]
+    fields = {"title": tokenize(heading), "tags": [], "content": tokenize(note_text(_note(3)["content"]))}
+    expected = index._vector(fields, vectors.idf)
+    np.testing.assert_allclose(vectors.rows[vectors.slots[3]], expected, atol=1e-6)
+    assert np.linalg.norm(vectors.rows[vectors.slots[3]]) == pytest.approx(1.0, abs=1e-6)
+
+
+@needs_numpy
+def test_restart_answers_from_the_mapped_files_until_a_full_sync(tmp_path):
+    _index(directory=str(tmp_path))
+
+    restarted = RelatedIndex(directory=str(tmp_path))
+    assert restarted.ready("1") and not restarted.built("1")
+    assert _ids(restarted, 1, limit=1) == [2]
+
+    # A full sync hands every note over again: the ones it did not are gone.
+    for note_id in (1, 2, 3):
+        restarted.add("1", _note(note_id))
+    restarted.mark_ready("1")
+
+    assert restarted.built("1")
+    assert 4 not in _ids(restarted, 3)
+    again = RelatedIndex(directory=str(tmp_path))
+    assert _ids(again, 1, limit=1) == [2]
+    assert again.stats()["notes"] == 3
+
+
+@needs_numpy
+def test_files_of_another_size_are_ignored(tmp_path):
+    _index(directory=str(tmp_path))
+
+    other = RelatedIndex(dimensions=128, directory=str(tmp_path))
+
+    assert not other.ready("1")
+    assert other.stats()["loads"] == 0
+
+
+@needs_numpy
+async def test_tool_answers_once_the_notes_are_indexed(make_client):
+    client = make_client(FakeApi(*map(_note, NOTES)), views={"related_index": None})
+
+    with patch("poznote_mcp.server._get_client_or_error", return_value=(client, None)):
+        cold = json.loads(await server.related_notes(1))
+        await asyncio.gather(*client.views._refresh_tasks)
+        warm = json.loads(await server.related_notes(1, limit=2))
+        missing = json.loads(await server.related_notes(42))
+
+    assert "being indexed" in cold["error"]
+    assert warm["note"] == {"id": 1, "title": "Docker setup"}
+    assert warm["results"][0]["id"] == 2
+    assert "not indexed" in missing["error"]
+    await client.aclose()
+
+
+async def test_tool_says_how_to_install_numpy():
+    client = MagicMock(**{"views.related_index": None})
+
+    with patch("poznote_mcp.server._get_client_or_error", return_value=(client, None)), \
+            patch("poznote_mcp.server.numpy_available", return_value=False):
+        result = json.loads(await server.related_notes(1))
+
+    assert "poznote-mcp-server[related]" in result["error"]
@@ -0,0 +1,151 @@
+"""Tests for single-flight coalescing of identical concurrent GETs."""
+
+import asyncio
+import threading
+
+import httpx
+
+from poznote_mcp.client import PoznoteClient
+
+
+class _GatedApi:
+    """Fake API that holds every request until release() is called."""
+
+    def __init__(self, payload=None, status_code=200):
+        self.payload = payload if payload is not None else {"success": True, "tags": ["a", "b"]}
+        self.status_code = status_code
+        self.calls: list[httpx.Request] = []
+        self.gate = asyncio.Event()
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append(request)
+        await self.gate.wait()
+        return httpx.Response(self.status_code, json=self.payload)
+
+    async def release(self):
+        # Let every caller reach the single-flight table first.
+        await asyncio.sleep(0)
+        self.gate.set()
+
+
+async def test_identical_gets_share_one_upstream_call(make_client):
+    api = _GatedApi()
+    client = make_client(api)
+
+    calls = asyncio.gather(*(client.list_tags() for _ in range(5)))
+    await api.release()
+    results = await calls
+
+    assert len(api.calls) == 1
+    assert results == [["a", "b"]] * 5
+    assert client.coalescing_stats() == {"upstream_gets": 1, "coalesced_gets": 4, "in_flight": 0}
+    await client.aclose()
+
+
+async def test_coalesced_callers_get_their_own_payload(make_client):
+    api = _GatedApi()
+    client = make_client(api)
+
+    calls = asyncio.gather(client.list_tags(), client.list_tags())
+    await api.release()
+    first, second = await calls
+    first.append("mutated")
+
+    assert len(api.calls) == 1
+    assert second == ["a", "b"]
+    await client.aclose()
+
+
+async def test_different_users_are_not_coalesced(make_client):
+    api = _GatedApi()
+    client = make_client(api)
+
+    calls = asyncio.gather(client.list_tags(user_id=1), client.list_tags(user_id=2))
+    await api.release()
+    await calls
+
+    assert sorted(request.headers["X-User-ID"] for request in api.calls) == ["1", "2"]
+    await client.aclose()
+
+
+async def test_different_params_are_not_coalesced(make_client):
+    api = _GatedApi(payload={"success": True, "folders": []})
+    client = make_client(api)
+
+    calls = asyncio.gather(client.list_folders(workspace="A"), client.list_folders(workspace="B"))
+    await api.release()
+    await calls
+
+    assert len(api.calls) == 2
+    await client.aclose()
+
+
+async def test_upstream_error_reaches_every_caller(make_client):
+    api = _GatedApi(payload={"success": False}, status_code=500)
+    client = make_client(api)
+
+    calls = asyncio.gather(*(client.list_tags() for _ in range(3)), return_exceptions=True)
+    await api.release()
+    results = await calls
+
+    assert len(api.calls) == 1
+    assert all(isinstance(result, httpx.HTTPStatusError) for result in results)
+    await client.aclose()
+
+
+async def test_cancelled_caller_does_not_cancel_the_shared_request(make_client):
+    api = _GatedApi()
+    client = make_client(api)
+
+    first = asyncio.ensure_future(client.list_tags())
+    second = asyncio.ensure_future(client.list_tags())
+    await asyncio.sleep(0)
+    first.cancel()
+    await api.release()
+
+    assert await second == ["a", "b"]
+    assert first.cancelled()
+    await client.aclose()
+
+
+async def test_writes_are_never_coalesced(make_client):
+    api = _GatedApi(payload={"success": True, "folder": {"id": 1}})
+    client = make_client(api)
+
+    calls = asyncio.gather(client.create_folder("F"), client.create_folder("F"))
+    await api.release()
+    await calls
+
+    assert len(api.calls) == 2
+    assert client.coalescing_stats()["coalesced_gets"] == 0
+    await client.aclose()
+
+
+def test_sync_client_coalesces_across_threads(make_client):
+    release = threading.Event()
+    arrived = threading.Semaphore(0)
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        arrived.release()
+        release.wait(timeout=5)
+        return httpx.Response(200, json={"success": True, "workspaces": [{"name": "Poznote"}]})
+
+    client = make_client(handler, PoznoteClient)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.list_workspaces())) for _ in range(4)]
+
+    threads[0].start()
+    assert arrived.acquire(timeout=5)
+    for thread in threads[1:]:
+        thread.start()
+    while client.coalescing_stats()["coalesced_gets"] < 3:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert len(calls) == 1
+    assert results == [[{"name": "Poznote"}]] * 4
+    client.close()
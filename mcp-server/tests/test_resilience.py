@@ -0,0 +1,207 @@
+"""Tests for retry policies and the circuit breaker in front of the Poznote API."""
+
+import json
+
+import httpx
+import pytest
+
+from conftest import BASE_URL
+from poznote_mcp.client import PoznoteClient
+from poznote_mcp.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    endpoint_class,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _ScriptedApi:
+    """Fake API answering from a list of status codes or exceptions, in order."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append(request)
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(outcome, json={"success": True, "tags": ["ok"], "folder": {"id": 1}})
+
+
+def _no_delay(client):
+    # Copies: the default policies are shared by every client.
+    client.retry_policies = {
+        name: RetryPolicy(**{**vars(policy), "base_delay": 0}) for name, policy in client.retry_policies.items()
+    }
+    return client
+
+
+@pytest.mark.parametrize(
+    "method,path,expected",
+    [
+        ("GET", "/notes/3", "read"),
+        ("POST", "/notes", "write"),
+        ("DELETE", "/trash", "write"),
+        ("POST", "/backups", "heavy"),
+        ("GET", "/git-sync/status", "heavy"),
+    ],
+)
+def test_endpoint_classes(method, path, expected):
+    assert endpoint_class(method, path) == expected
+
+
+def test_backoff_is_jittered_and_capped():
+    policy = RetryPolicy(attempts=10, base_delay=0.5, max_delay=2.0)
+
+    delays = [policy.backoff(attempt) for attempt in range(1, 10) for _ in range(20)]
+
+    assert all(0 <= delay <= 2.0 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_reads_are_retried_on_unhealthy_status(make_client):
+    api = _ScriptedApi(503, 502, 200)
+    client = _no_delay(make_client(api, PoznoteClient))
+
+    assert client.list_tags() == ["ok"]
+    assert len(api.calls) == 3
+    assert client.resilience_stats()["retries"]["read"] == 2
+    client.close()
+
+
+def test_reads_give_up_after_their_attempts(make_client):
+    api = _ScriptedApi(503)
+    client = _no_delay(make_client(api, PoznoteClient))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        client.list_tags()
+    assert len(api.calls) == 3
+    client.close()
+
+
+def test_writes_are_not_retried_once_sent(make_client):
+    api = _ScriptedApi(httpx.ReadTimeout("slow"), 200)
+    client = _no_delay(make_client(api, PoznoteClient))
+
+    with pytest.raises(httpx.ReadTimeout):
+        client.create_folder("F")
+    assert len(api.calls) == 1
+    client.close()
+
+
+def test_writes_are_retried_when_never_sent(make_client):
+    api = _ScriptedApi(httpx.ConnectError("refused"), 200)
+    client = _no_delay(make_client(api, PoznoteClient))
+
+    assert client.create_folder("F") == {"id": 1}
+    assert len(api.calls) == 2
+    client.close()
+
+
+def test_client_errors_do_not_trip_the_breaker(make_client):
+    api = _ScriptedApi(404)
+    client = _no_delay(make_client(api, PoznoteClient, breaker_failures=2))
+
+    for _ in range(5):
+        assert client.get_note(1) is None
+
+    assert client.breaker.state == CLOSED
+    client.close()
+
+
+async def test_breaker_opens_and_fails_fast(make_client):
+    api = _ScriptedApi(httpx.ConnectError("refused"))
+    client = _no_delay(make_client(api, breaker_failures=3))
+
+    with pytest.raises(httpx.ConnectError):
+        await client.list_tags()
+    calls_before = len(api.calls)
+    with pytest.raises(CircuitOpenError):
+        await client.list_tags()
+
+    assert calls_before == 3
+    assert len(api.calls) == 3
+    stats = client.resilience_stats()["breaker"]
+    assert stats["state"] == OPEN
+    assert stats["opened"] == 1
+    assert stats["rejected"] == 1
+    await client.aclose()
+
+
+def test_half_open_probe_closes_the_breaker():
+    clock = _Clock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    clock.now += 10
+    assert breaker.state == HALF_OPEN
+    probe = breaker.before_call()
+    # Only one probe at a time; the others keep failing fast.
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success(probe)
+
+    assert breaker.state == CLOSED
+    assert breaker.before_call() is False
+
+
+def test_failed_probe_reopens_the_breaker():
+    clock = _Clock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now += 10
+
+    probe = breaker.before_call()
+    breaker.record_failure(probe)
+
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.before_call()
+    assert excinfo.value.retry_after == 10
+    assert breaker.stats()["opened"] == 2
+
+
+def test_cancelled_probe_frees_the_probe_slot():
+    clock = _Clock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now += 10
+
+    breaker.release_probe(breaker.before_call())
+
+    assert breaker.before_call() is True
+
+
+def test_breaker_settings_come_from_env(monkeypatch):
+    monkeypatch.setenv("POZNOTE_BREAKER_FAILURES", "9")
+    monkeypatch.setenv("POZNOTE_BREAKER_RESET_TIMEOUT", "4.5")
+
+    client = PoznoteClient(base_url=BASE_URL, service_token="secret-token")
+    try:
+        assert client.breaker.failure_threshold == 9
+        assert client.breaker.reset_timeout == 4.5
+    finally:
+        client.close()
+
+
+def test_open_circuit_becomes_a_json_error():
+    from poznote_mcp.server import _api_error_json
+
+    result = json.loads(_api_error_json(CircuitOpenError(12.3)))
+
+    assert "not calling it" in result["error"]
+    assert result["retry_after"] == 12
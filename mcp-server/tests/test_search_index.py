@@ -0,0 +1,194 @@
+"""Tests for the local BM25 index behind search_notes."""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+from conftest import FakeApi
+from poznote_mcp import server
+from poznote_mcp.searchindex import SearchIndex, note_text, parse_query, tokenize, utc_boundary
+
+
+def _note(note_id, heading, content, tags="", workspace="Poznote", created="2026-03-01 10:00:00", **extra):
+    return {
+        "id": note_id,
+        "heading": heading,
+        "content": content,
+        "tags": tags,
+        "workspace": workspace,
+        "folder": None,
+        "created": created,
+        "updated": created,
+        "type": "note",
+        **extra,
+    }
+
+
+def _index(*notes, tz=None):
+    index = SearchIndex()
+    for note in notes:
+        index.add("1", note)
+    index.mark_ready("1", tz)
+    return index
+
+
+def _api(*notes):
+    return FakeApi(*notes, routes={
+        ("GET", "/notes/search"): {"success": True, "results": [{"id": 1, "heading": "From the API"}]},
+    })
+
+
+def test_note_text_keeps_only_the_words():
+    html = '<p>Deploy&nbsp;<b>with</b> Docker</p><pre class="language-bash">ls</pre><img src="data:image/png;base64,AAAA">'
+    assert note_text(html) == "Deploy with Docker ls"
+    assert note_text("```python\nprint()\n```", "markdown") == "``` print() ```"
+    assert note_text('[{"text": "Buy milk", "completed": false}]', "tasklist") == "Buy milk"
+
+
+def test_words_are_folded_like_remove_accents():
+    assert tokenize("Réunion Straße Ærø") == ["reunion", "strasse", "aero"]
+
+
+def test_query_parsing_keeps_phrases_together():
+    assert parse_query('docker "reverse proxy" e-mail') == (["docker"], [["reverse", "proxy"], ["e", "mail"]])
+
+
+def test_title_match_outranks_body_match():
+    index = _index(
+        _note(1, "Shopping list", "Remember the docker meetup"),
+        _note(2, "Docker setup", "How we run it"),
+    )
+
+    results = index.search("1", "docker")
+
+    assert [result["id"] for result in results] == [2, 1]
+    assert results[0]["score"] > results[1]["score"] > 0
+
+
+def test_every_word_must_match_and_prefixes_count():
+    index = _index(
+        _note(1, "Deploy notes", "docker compose up"),
+        _note(2, "Docker", "nothing else"),
+    )
+
+    assert [result["id"] for result in index.search("1", "dock comp")] == [1]
+    assert index.search("1", "docker kubernetes") == []
+
+
+def test_phrase_requires_adjacent_words():
+    index = _index(
+        _note(1, "A", "<p>reverse proxy in front</p>"),
+        _note(2, "B", "<p>proxy the reverse way</p>"),
+    )
+
+    assert [result["id"] for result in index.search("1", '"reverse proxy"')] == [1]
+
+
+def test_workspace_and_created_filters_use_the_users_timezone():
+    index = _index(
+        # 23:30 UTC on the 1st is already the 2nd in Paris.
+        _note(1, "Late", "report", created="2026-03-01 23:30:00"),
+        _note(2, "Early", "report", created="2026-03-01 08:00:00"),
+        _note(3, "Other", "report", workspace="Work", created="2026-03-01 08:00:00"),
+        tz="Europe/Paris",
+    )
+
+    results = index.search("1", "report", workspace="Poznote", created_from="2026-03-02")
+
+    assert [result["id"] for result in results] == [1]
+    assert utc_boundary("2026-03-02", "Europe/Paris", False) == "2026-03-01 23:00:00"
+    # A malformed date is left to the API and its error message.
+    assert index.search("1", "report", created_from="03/02/2026") is None
+
+
+def test_cold_index_answers_nothing():
+    index = SearchIndex()
+
+    assert index.search("1", "docker") is None
+    assert index.stats()["cold_searches"] == 1
+
+
+def test_removed_notes_leave_no_terms_behind():
+    index = _index(_note(1, "Docker", "compose"), _note(2, "Groceries", "milk"))
+
+    index.remove("1", 1)
+
+    assert index.search("1", "docker") == []
+    assert index.stats()["terms"] == 2
+
+
+async def test_search_falls_back_to_the_api_until_the_index_is_built(make_client):
+    api = _api(_note(1, "Docker setup", "<p>compose</p>"), _note(2, "Groceries", "<p>milk</p>"))
+    client = make_client(api, views={"search_index": True})
+
+    with patch("poznote_mcp.server._get_client_or_error", return_value=(client, None)):
+        cold = json.loads(await server.search_notes("docker"))
+        await asyncio.gather(*client.views._refresh_tasks)
+        warm = json.loads(await server.search_notes("docker"))
+
+    assert cold["source"] == "api"
+    assert cold["results"][0]["title"] == "From the API"
+    assert warm["source"] == "index"
+    assert warm["results"][0]["id"] == 1
+    assert warm["results"][0]["score"] > 0
+    assert api.fetched().count("/notes/search") == 1
+    await client.aclose()
+
+
+async def test_writes_through_the_client_are_searchable_next_time(make_client):
+    api = _api(_note(1, "Docker setup", "<p>compose</p>"), _note(2, "Groceries", "<p>milk</p>"))
+    client = make_client(api, views={"search_index": True})
+    assert await client.views.build_search_index()
+
+    await client.update_note(2, content="<p>milk and kubernetes</p>")
+    created = await client.create_note("Cluster", "<p>kubernetes nodes</p>")
+    await client.delete_note(1)
+    api.requests.clear()
+
+    results = await client.views.search_notes_indexed("kubernetes")
+
+    assert sorted(result["id"] for result in results) == [2, created["id"]]
+    assert await client.views.search_notes_indexed("compose") == []
+    # The listing, the updated and created notes, and the trash for the deleted one.
+    assert sorted(api.fetched()) == sorted(["/notes", "/notes/2", f"/notes/{created['id']}", "/trash"])
+    api.requests.clear()
+    await client.views.search_notes_indexed("kubernetes")
+    assert api.fetched() == []
+    await client.aclose()
+
+
+async def test_webhook_invalidation_refreshes_the_note(make_client):
+    api = _api(_note(1, "Docker setup", "<p>compose</p>"))
+    client = make_client(api, views={"search_index": True})
+    await client.views.build_search_index()
+
+    api.notes[1]["content"] = "<p>podman</p>"
+    client.invalidate_cached("1", note_id=1, lists=())
+
+    assert [result["id"] for result in await client.views.search_notes_indexed("podman")] == [1]
+    await client.aclose()
+
+
+async def test_edits_made_elsewhere_are_found_once_the_index_is_old(make_client):
+    api = _api(_note(1, "Docker setup", "<p>compose</p>"))
+    client = make_client(api, views={"search_index": True})
+    now = [0.0]
+    client.views.note_sync._clock = lambda: now[0]
+    await client.views.build_search_index()
+
+    api.notes[1].update(content="<p>podman</p>", updated="2026-03-06 09:00:00")
+    assert await client.views.search_notes_indexed("podman") == []
+
+    now[0] += client.views.note_sync.max_age
+    assert [result["id"] for result in await client.views.search_notes_indexed("podman")] == [1]
+    await client.aclose()
+
+
+async def test_disabled_index_always_uses_the_api(make_client, monkeypatch):
+    monkeypatch.setenv("POZNOTE_SEARCH_INDEX", "false")
+    client = make_client(FakeApi(), views={"search_index": None})
+
+    assert client.views.search_index is None
+    assert await client.views.search_notes_indexed("docker") is None
+    assert client.views.search_index_stats() is None
+    await client.aclose()
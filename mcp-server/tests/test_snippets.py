@@ -0,0 +1,85 @@
+"""Tests for the excerpts cut around the query words of search_notes."""
+
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from poznote_mcp import server
+from poznote_mcp.searchindex import note_text
+from poznote_mcp.snippets import join_snippets, make_snippets
+
+FILLER = "Nothing to see in this sentence. " * 10
+
+
+def _hits(text, snippet):
+    return [text[start:end] for start, end in snippet["highlights"]]
+
+
+def test_densest_window_wins_over_the_first_hit():
+    text = "Docker is mentioned here. " + FILLER + "Docker compose on the NAS, then docker again."
+
+    (snippet,) = make_snippets(text, "docker nas", length=80, fragments=1)
+
+    assert _hits(text, snippet) == ["Docker", "NAS", "docker"]
+    assert "**Docker** compose on the **NAS**" in snippet["text"]
+    assert snippet["start"] > len("Docker is mentioned here. ")
+
+
+def test_fragments_are_cut_at_words_and_ordered_in_the_text():
+    text = "Kubernetes cluster notes. " + FILLER + "The ingress controller runs on every node. " + FILLER
+
+    snippets = make_snippets(text, "ingress kubernetes", length=60, fragments=2)
+
+    assert [_hits(text, snippet) for snippet in snippets] == [["Kubernetes"], ["ingress"]]
+    for snippet in snippets:
+        assert snippet["start"] == 0 or text[snippet["start"] - 1] == " "
+        assert snippet["end"] == len(text) or text[snippet["end"]] in " ."
+        assert snippet["end"] - snippet["start"] <= 60
+    assert snippets[0]["end"] <= snippets[1]["start"]
+
+
+def test_prefixes_accents_and_phrases_are_highlighted():
+    text = "Réunion d'équipe: the deployments of the release pipeline"
+
+    (snippet,) = make_snippets(text, 'reunion deploy "release pipeline"')
+
+    assert _hits(text, snippet) == ["Réunion", "deployments", "release", "pipeline"]
+
+
+def test_without_a_hit_the_text_starts_the_excerpt():
+    text = FILLER
+
+    snippets = make_snippets(text, "zebra", length=50)
+
+    assert snippets[0]["start"] == 0 and snippets[0]["highlights"] == []
+    assert join_snippets(len(text), snippets).endswith("sentence. Nothing to see in ...")
+    assert make_snippets("", "zebra") == []
+
+
+def _client(results):
+    client = MagicMock()
+    client.views.search_notes_indexed = AsyncMock(return_value=None)
+    client.search_notes = AsyncMock(return_value=results)
+    return client
+
+
+async def test_tool_strips_markup_from_content_without_excerpt():
+    content = '<div class="x"><p>' + FILLER + '</p><p>The <b>backup</b> job runs nightly</p></div>'
+    client = _client([{"id": 1, "heading": "Ops", "content": content}])
+
+    with patch("poznote_mcp.server._get_client_or_error", return_value=(client, None)):
+        result = json.loads(await server.search_notes("backup", snippet_length=40))["results"][0]
+
+    assert result["excerpt"] == "... sentence. The **backup** job runs nightly"
+    assert "<" not in result["excerpt"]
+    (offsets,) = result["snippets"]
+    (start, end), = offsets["highlights"]
+    assert note_text(content)[start:end] == "backup"
+
+
+async def test_tool_keeps_the_ellipsis_of_a_cut_api_excerpt():
+    client = _client([{"id": 1, "heading": "Ops", "excerpt": "Short intro. Restic backup of the NAS" + "..."}])
+
+    with patch("poznote_mcp.server._get_client_or_error", return_value=(client, None)):
+        result = json.loads(await server.search_notes("restic"))["results"][0]
+
+    assert result["excerpt"] == "Short intro. **Restic** backup of the NAS ..."
@@ -0,0 +1,110 @@
+"""Tests for the streaming decode of large list responses."""
+
+import json
+import random
+
+import httpx
+import pytest
+
+from poznote_mcp.client import PoznoteClient
+from poznote_mcp.jsonstream import JSONArrayStream
+
+
+def _notes_body(count: int) -> bytes:
+    notes = [{"id": i, "heading": f"Note {i} é/\"", "tags": "a,b", "folder": None} for i in range(count)]
+    return json.dumps({"success": True, "notes": notes}).encode()
+
+
+def _chunks(body: bytes, size: int, served: list):
+    for start in range(0, len(body), size):
+        served.append(start)
+        yield body[start:start + size]
+
+
+def _feed_randomly(parser: JSONArrayStream, body: bytes) -> list:
+    items = []
+    pos = 0
+    while pos < len(body):
+        step = random.randint(1, 40)
+        items.extend(parser.feed(body[pos:pos + step]))
+        pos += step
+    return items + parser.close()
+
+
+def test_parser_handles_any_chunking():
+    payload = {
+        "success": True,
+        "meta": {"notes": [0], "nested": [1, {"x": "]"}]},
+        "notes": [{"id": 1, "heading": "café ☃"}, 12, 345, "s", None, [1, 2]],
+        "count": 6,
+    }
+    body = json.dumps(payload, ensure_ascii=False).encode()
+
+    for _ in range(50):
+        assert _feed_randomly(JSONArrayStream("notes"), body) == payload["notes"]
+
+
+def test_parser_without_the_key_yields_nothing():
+    parser = JSONArrayStream("notes")
+
+    assert parser.feed(b'{"success": false, "error": "nope"}') == []
+    assert parser.done
+
+
+def test_truncated_body_is_an_error():
+    parser = JSONArrayStream("notes")
+    parser.feed(b'{"success": true, "notes": [{"id": 1}, {"id"')
+
+    with pytest.raises(ValueError):
+        parser.close()
+
+
+def test_sync_list_notes_stops_reading_at_limit(make_client):
+    body = _notes_body(2000)
+    served = []
+
+    def handler(request):
+        return httpx.Response(200, content=_chunks(body, 1024, served))
+
+    client = make_client(handler, PoznoteClient)
+
+    notes = client.list_notes(workspace="Poznote", limit=5)
+
+    assert [note["id"] for note in notes] == [0, 1, 2, 3, 4]
+    assert len(served) < 3
+    client.close()
+
+
+async def test_async_list_notes_stops_reading_at_limit(make_client):
+    body = _notes_body(2000)
+    served = []
+
+    async def handler(request):
+        async def stream():
+            for chunk in _chunks(body, 1024, served):
+                yield chunk
+
+        assert request.url.params["workspace"] == "Poznote"
+        return httpx.Response(200, content=stream())
+
+    client = make_client(handler)
+
+    notes = await client.list_notes(workspace="Poznote", limit=5)
+
+    assert len(notes) == 5
+    assert len(served) < 3
+    assert await client.list_notes(workspace="Poznote", limit=5000) == json.loads(body)["notes"]
+    await client.aclose()
+
+
+async def test_streamed_error_keeps_its_body(make_client):
+    async def handler(request):
+        return httpx.Response(500, json={"success": False, "error": "database is locked"})
+
+    client = make_client(handler)
+
+    with pytest.raises(httpx.HTTPStatusError) as excinfo:
+        await client.list_notes(limit=10)
+
+    assert "database is locked" in excinfo.value.response.text
+    await client.aclose()
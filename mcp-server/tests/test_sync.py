@@ -0,0 +1,223 @@
+"""Tests for the incremental note sync that feeds the local views."""
+
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from conftest import FakeApi
+from poznote_mcp.sync import NoteSync
+
+
+class _Api(FakeApi):
+    """Notes with body ETags, answered a few at a time"""
+
+    def __init__(self, count: int = 5, workspace: str = "Poznote"):
+        super().__init__(*(
+            {
+                "id": note_id,
+                "heading": f"Note {note_id}",
+                "tags": "",
+                "folder_id": None,
+                "workspace": workspace,
+                "updated": f"2026-03-01 10:00:{note_id % 60:02d}",
+                "content": f"<p>body {note_id}</p>",
+            }
+            for note_id in range(1, count + 1)
+        ), etags=True)
+        self.fail: set[int] = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def respond(self, request: httpx.Request, path: str) -> httpx.Response:
+        if path.removeprefix("/notes/").isdigit() and int(path.removeprefix("/notes/")) in self.fail:
+            return httpx.Response(403, json={"success": False})
+        return super().respond(request, path)
+
+    async def handle_async(self, request: httpx.Request) -> httpx.Response:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.001)
+            return self(request)
+        finally:
+            self.in_flight -= 1
+
+
+class _View:
+    """A local view recording what the sync hands it"""
+
+    def __init__(self):
+        self.notes: dict[int, dict] = {}
+        self.threads = set()
+
+    def add(self, user_id, note):
+        self.threads.add(threading.current_thread())
+        self.notes[note["id"]] = note
+
+    def remove(self, user_id, note_id):
+        self.threads.add(threading.current_thread())
+        self.notes.pop(note_id, None)
+
+    def drop(self, user_id=None):
+        self.notes.clear()
+
+
+def _watched(client):
+    view = _View()
+    client.views._sync_consumers = lambda: [view]
+    return client, view
+
+
+async def test_first_sync_fetches_every_body_concurrently(make_client):
+    api = _Api(count=20)
+    client, view = _watched(make_client(api))
+
+    result = await client.views.sync_notes()
+
+    assert result.full
+    assert sorted(view.notes) == list(range(1, 21))
+    assert result.requests == 21
+    assert result.cursor == max(note["updated"] for note in api.notes.values())
+    assert 1 < api.max_in_flight <= client.views.note_sync.concurrency
+    # The views take the notes in worker threads, leaving the event loop free.
+    assert view.threads and threading.main_thread() not in view.threads
+    await client.aclose()
+
+
+async def test_steady_state_sync_is_one_listing(make_client):
+    api = _Api(count=2000)
+    client, _ = _watched(make_client(api))
+    await client.views.sync_notes()
+    api.requests.clear()
+
+    result = await client.views.sync_notes()
+
+    assert api.fetched() == ["/notes"]
+    assert result.fetched == [] and result.requests == 1
+    await client.aclose()
+
+
+async def test_notes_the_cache_holds_are_not_fetched_or_counted(make_client):
+    api = _Api(count=3)
+    client, view = _watched(make_client(api))
+    await client.get_note(2)
+
+    await client.views.sync_notes()
+
+    assert sorted(view.notes) == [1, 2, 3]
+    assert api.fetched().count("/notes/2") == 1
+    stats = client.note_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (0, 1)
+    await client.aclose()
+
+
+async def test_only_changed_notes_are_fetched_again(make_client):
+    api = _Api(count=5)
+    client, view = _watched(make_client(api))
+    await client.views.sync_notes()
+    api.notes[3].update(updated="2026-03-02 09:00:00", content="<p>edited</p>")
+    api.notes[6] = {**api.notes[1], "id": 6, "heading": "New"}
+    api.requests.clear()
+
+    result = await client.views.sync_notes()
+
+    assert sorted(result.fetched) == [3, 6]
+    assert sorted(api.fetched()) == ["/notes", "/notes/3", "/notes/6"]
+    assert view.notes[3]["content"] == "<p>edited</p>"
+    await client.aclose()
+
+
+async def test_deletions_are_told_apart_with_the_trash(make_client):
+    api = _Api(count=4)
+    client, view = _watched(make_client(api))
+    await client.views.sync_notes()
+    api.trash = [{"id": 2, "heading": "Note 2"}]
+    del api.notes[2]
+    del api.notes[3]
+
+    result = await client.views.sync_notes()
+
+    assert sorted(result.removed) == [2, 3]
+    assert result.trashed == [2]
+    assert sorted(view.notes) == [1, 4]
+    await client.aclose()
+
+
+async def test_workspace_scope_keeps_notes_that_moved_elsewhere(make_client):
+    api = _Api(count=3, workspace="A")
+    client, view = _watched(make_client(api))
+    await client.views.sync_notes(workspace="A")
+    api.notes[1]["workspace"] = "B"
+
+    result = await client.views.sync_notes(workspace="A")
+
+    assert result.removed == [1] and result.trashed == []
+    assert 1 in view.notes
+    assert client.views.note_sync.synced(NoteSync.key("1", "A"))
+    assert not client.views.note_sync.synced(NoteSync.key("1"))
+    await client.aclose()
+
+
+async def test_failed_note_is_retried_by_the_next_sync(make_client):
+    api = _Api(count=3)
+    api.fail = {2}
+    client, view = _watched(make_client(api))
+
+    first = await client.views.sync_notes()
+    api.fail.clear()
+    second = await client.views.sync_notes()
+
+    assert first.failed == [2]
+    assert second.fetched == [2]
+    assert sorted(view.notes) == [1, 2, 3]
+    assert client.views.note_sync.stats()["fetch_errors"] == 1
+    await client.aclose()
+
+
+async def test_write_through_the_client_makes_the_sync_due(make_client):
+    api = _Api(count=2)
+    client, _ = _watched(make_client(api))
+    await client.views.sync_notes()
+    key = NoteSync.key("1")
+    assert not client.views.note_sync.due(key)
+
+    client._invalidate_after_write("/notes/2", None)
+
+    assert client.views.note_sync.due(key)
+    assert (await client.views.sync_notes()).fetched == [2]
+    assert not client.views.note_sync.due(key)
+    await client.aclose()
+
+
+def test_reset_during_a_pass_discards_it():
+    sync = NoteSync()
+    key = NoteSync.key("1")
+    sync_pass = sync.begin(key)
+    assert sync.begin(key) is None
+
+    sync.reset()
+    sync.plan(sync_pass, [{"id": 1, "updated": "2026-03-01 10:00:00"}])
+    sync.commit(sync_pass)
+
+    assert not sync.current(sync_pass)
+    assert not sync.synced(key)
+    assert sync.begin(key) is not None
+
+
+def test_stats_report_lag_and_throughput():
+    now = [100.0]
+    sync = NoteSync(clock=lambda: now[0])
+    sync_pass = sync.begin(NoteSync.key("1"))
+    sync.plan(sync_pass, [{"id": 1}, {"id": 2}])
+    sync_pass.result.fetched.extend([1, 2])
+    now[0] += 0.5
+    sync.commit(sync_pass)
+    now[0] += 10
+
+    stats = sync.stats()
+
+    assert stats["max_lag"] == pytest.approx(10.5)
+    assert stats["notes_per_second"] == 4.0
+    assert stats["last_sync"]["fetched"] == 2
@@ -0,0 +1,102 @@
+"""Tests for the tag facets behind tag_stats."""
+
+import json
+from unittest.mock import patch
+
+from conftest import FakeApi
+from poznote_mcp import server
+from poznote_mcp.tagindex import TagIndex, split_tags
+
+NOTES = [
+    {"id": 1, "tags": "docker,linux", "workspace": "Work", "folder": "Ops", "folder_id": 3, "created": "2026-01-10 09:00:00"},
+    {"id": 2, "tags": "docker, nginx", "workspace": "Work", "folder": "Ops", "folder_id": 3, "created": "2026-02-10 09:00:00"},
+    {"id": 3, "tags": "docker linux nginx", "workspace": "Home", "folder": None, "folder_id": None, "created": "2026-03-10 09:00:00"},
+    {"id": 4, "tags": "recipes", "workspace": "Home", "folder": "Kitchen", "folder_id": 5, "created": "2026-03-11 09:00:00"},
+    {"id": 5, "tags": "", "workspace": "Home", "folder": None, "folder_id": None, "created": "2026-03-12 09:00:00"},
+]
+
+
+def _index(notes=NOTES):
+    index = TagIndex()
+    index.add_notes("1", [dict(note, heading=f"Note {note['id']}") for note in notes], complete=True, version='"v1"')
+    return index
+
+
+def _counts(facets):
+    return {item["tag"]: item["count"] for item in facets["tags"]}
+
+
+def test_tags_are_split_like_the_api_does():
+    assert split_tags("docker, nginx  linux,,docker") == ("docker", "nginx", "linux")
+    assert split_tags(None) == ()
+
+
+def test_counts_workspaces_and_co_occurring_tags():
+    facets = _index().facets("1")
+
+    assert (facets["notes"], facets["tagged_notes"], facets["distinct_tags"]) == (5, 4, 4)
+    docker = facets["tags"][0]
+    assert docker["tag"] == "docker" and docker["count"] == 3 and docker["share"] == 0.6
+    assert docker["workspaces"] == {"Work": 2, "Home": 1}
+    assert docker["co_occurring"] == [{"tag": "linux", "count": 2}, {"tag": "nginx", "count": 2}]
+    assert _counts(facets) == {"docker": 3, "linux": 2, "nginx": 2, "recipes": 1}
+
+
+def test_filters_count_the_matching_notes_only():
+    index = _index()
+
+    assert _counts(index.facets("1", workspace="Work")) == {"docker": 2, "linux": 1, "nginx": 1}
+    assert _counts(index.facets("1", folder="3")) == _counts(index.facets("1", folder="Ops"))
+    march = index.facets("1", created_from="2026-03-01", created_to="2026-03-11")
+    assert march["notes"] == 2
+    assert _counts(march) == {"docker": 1, "linux": 1, "nginx": 1, "recipes": 1}
+    nginx = index.facets("1", tag="nginx", limit=1)
+    assert [item["tag"] for item in nginx["tags"]] == ["nginx"]
+    assert nginx["tags"][0]["co_occurring"] == [{"tag": "docker", "count": 2}]
+
+
+def test_counts_follow_edits_deletions_and_complete_lists():
+    index = _index()
+
+    index.add_notes("1", [{"id": 1, "tags": "linux", "workspace": "Work"}])
+    index.remove_note("1", 2)
+    assert _counts(index.facets("1")) == {"linux": 2, "docker": 1, "nginx": 1, "recipes": 1}
+    assert index.facets("1", tag="docker")["tags"][0]["co_occurring"] == [
+        {"tag": "linux", "count": 1}, {"tag": "nginx", "count": 1}
+    ]
+
+    # A complete list of one workspace drops its notes that are gone.
+    index.add_notes("1", [{"id": 4, "tags": "recipes, baking", "workspace": "Home"}], workspace="Home", complete=True)
+    assert _counts(index.facets("1")) == {"baking": 1, "linux": 1, "recipes": 1}
+
+    # A note returned without its tags leaves the counts for the next listing.
+    index.add_notes("1", [{"id": 9, "heading": "New", "workspace": "Home"}])
+    assert index.stale("1")
+
+
+def test_unlisted_users_have_no_facets():
+    index = TagIndex()
+
+    assert index.facets("1") is None
+    index.add_notes("1", NOTES, workspace="Work", complete=True)
+    assert index.facets("1", workspace="Work") is not None
+    assert index.facets("1") is None
+
+
+async def test_tool_lists_notes_once_then_answers_from_memory(make_client):
+    api = FakeApi(*NOTES)
+    client = make_client(api)
+
+    with patch("poznote_mcp.server._get_client_or_error", return_value=(client, None)):
+        first = json.loads(await server.tag_stats(limit=2))
+        listed = api.fetched().count("/notes")
+        work = json.loads(await server.tag_stats(workspace="Work"))
+        missing = json.loads(await server.tag_stats(tag="python"))
+        bad = json.loads(await server.tag_stats(created_from="March"))
+
+    assert [item["tag"] for item in first["tags"]] == ["docker", "linux"]
+    assert listed == 1 and api.fetched().count("/notes") == 1
+    assert work["filters"] == {"workspace": "Work"} and work["notes"] == 2
+    assert "python" in missing["error"]
+    assert "YYYY-MM-DD" in bad["error"]
+    await client.aclose()
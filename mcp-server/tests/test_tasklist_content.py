@@ -8,7 +8,7 @@ to the API client.
 """
 
 import json
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, patch
 
 import pytest
 
@@ -23,8 +23,8 @@ TASK_LIST = [
 
 
 def _fake_client():
-    """Return a MagicMock that behaves like PoznoteClient enough for the tool handlers."""
-    client = MagicMock()
+    """Return an AsyncMock that behaves like AsyncPoznoteClient enough for the tool handlers."""
+    client = AsyncMock()
     client.create_note.return_value = {"id": 100, "heading": "Tasks"}
     client.update_note.return_value = {"id": 100, "heading": "Tasks"}
     return client
@@ -38,13 +38,13 @@ class TestUpdateNote:
     """update_note must accept both str and list content."""
 
     @patch("poznote_mcp.server._get_client_or_error")
-    def test_list_content_is_converted_to_json_string(self, mock_gcoe):
+    async def test_list_content_is_converted_to_json_string(self, mock_gcoe):
         from poznote_mcp.server import update_note
 
         client = _fake_client()
         mock_gcoe.return_value = (client, None)
 
-        result_json = update_note(id=100, content=TASK_LIST)
+        result_json = await update_note(id=100, content=TASK_LIST)
         result = json.loads(result_json)
 
         assert result["success"] is True
@@ -56,20 +56,20 @@ class TestUpdateNote:
         assert json.loads(sent_content) == TASK_LIST
 
     @patch("poznote_mcp.server._get_client_or_error")
-    def test_string_content_passes_through(self, mock_gcoe):
+    async def test_string_content_passes_through(self, mock_gcoe):
         from poznote_mcp.server import update_note
 
         client = _fake_client()
         mock_gcoe.return_value = (client, None)
 
         html = "<p>Hello world</p>"
-        update_note(id=100, content=html)
+        await update_note(id=100, content=html)
 
         _, kwargs = client.update_note.call_args
         assert kwargs["content"] == html
 
     @patch("poznote_mcp.server._get_client_or_error")
-    def test_client_wrapped_string_is_unwrapped(self, mock_gcoe):
+    async def test_client_wrapped_string_is_unwrapped(self, mock_gcoe):
         """A client that wraps a plain string in an array must not produce
         a note body containing literal bracket syntax (regression for the
         6.29.0 MCP bug)."""
@@ -78,20 +78,20 @@ class TestUpdateNote:
         client = _fake_client()
         mock_gcoe.return_value = (client, None)
 
-        update_note(id=100, content=["# My Note\n\nSome text"])
+        await update_note(id=100, content=["# My Note\n\nSome text"])
 
         _, kwargs = client.update_note.call_args
         assert kwargs["content"] == "# My Note\n\nSome text"
         assert not kwargs["content"].startswith("[")
 
     @patch("poznote_mcp.server._get_client_or_error")
-    def test_none_content_passes_through(self, mock_gcoe):
+    async def test_none_content_passes_through(self, mock_gcoe):
         from poznote_mcp.server import update_note
 
         client = _fake_client()
         mock_gcoe.return_value = (client, None)
 
-        update_note(id=100, title="New title")
+        await update_note(id=100, title="New title")
 
         _, kwargs = client.update_note.call_args
         assert kwargs["content"] is None
@@ -105,13 +105,13 @@ class TestCreateNote:
     """create_note must accept both str and list content."""
 
     @patch("poznote_mcp.server._get_client_or_error")
-    def test_list_content_is_converted_to_json_string(self, mock_gcoe):
+    async def test_list_content_is_converted_to_json_string(self, mock_gcoe):
         from poznote_mcp.server import create_note
 
         client = _fake_client()
         mock_gcoe.return_value = (client, None)
 
-        result_json = create_note(title="Tasks", content=TASK_LIST)
+        result_json = await create_note(title="Tasks", content=TASK_LIST)
         result = json.loads(result_json)
 
         assert result["success"] is True
@@ -122,20 +122,20 @@ class TestCreateNote:
         assert json.loads(sent_content) == TASK_LIST
 
     @patch("poznote_mcp.server._get_client_or_error")
-    def test_string_content_passes_through(self, mock_gcoe):
+    async def test_string_content_passes_through(self, mock_gcoe):
         from poznote_mcp.server import create_note
 
         client = _fake_client()
         mock_gcoe.return_value = (client, None)
 
         md = "# Hello\nSome markdown"
-        create_note(title="MD Note", content=md, note_type="markdown")
+        await create_note(title="MD Note", content=md, note_type="markdown")
 
         _, kwargs = client.create_note.call_args
         assert kwargs["content"] == md
 
     @patch("poznote_mcp.server._get_client_or_error")
-    def test_client_wrapped_markdown_is_unwrapped(self, mock_gcoe):
+    async def test_client_wrapped_markdown_is_unwrapped(self, mock_gcoe):
         """Regression: markdown note whose string content was wrapped in an
         array by the MCP client must be stored as a plain string."""
         from poznote_mcp.server import create_note
@@ -143,7 +143,7 @@ class TestCreateNote:
         client = _fake_client()
         mock_gcoe.return_value = (client, None)
 
-        create_note(
+        await create_note(
             title="MD Note",
             content=["# My Note Content\n\nSome text"],
             note_type="markdown",
@@ -154,7 +154,7 @@ class TestCreateNote:
         assert not kwargs["content"].startswith("[")
 
     @patch("poznote_mcp.server._get_client_or_error")
-    def test_json_string_content_not_double_encoded(self, mock_gcoe):
+    async def test_json_string_content_not_double_encoded(self, mock_gcoe):
         """If the caller already passes a JSON *string*, it must not be double-encoded."""
         from poznote_mcp.server import create_note
 
@@ -162,7 +162,7 @@ class TestCreateNote:
         mock_gcoe.return_value = (client, None)
 
         json_str = json.dumps(TASK_LIST)
-        create_note(title="Tasks", content=json_str)
+        await create_note(title="Tasks", content=json_str)
 
         _, kwargs = client.create_note.call_args
         assert kwargs["content"] == json_str
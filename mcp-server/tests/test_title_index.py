@@ -0,0 +1,171 @@
+"""Tests for the trigram title index behind find_notes_by_title."""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import httpx
+
+from conftest import FakeApi
+from poznote_mcp import server
+from poznote_mcp.titleindex import TitleIndex, trigrams
+
+
+def _note(note_id, heading, workspace="Poznote", updated="2026-03-01 10:00:00", **extra):
+    return {"id": note_id, "heading": heading, "workspace": workspace, "folder": None, "updated": updated, **extra}
+
+
+def _index(*headings):
+    index = TitleIndex()
+    index.add_notes("1", [_note(note_id, heading) for note_id, heading in enumerate(headings, 1)], complete=True)
+    return index
+
+
+def _ids(index, query, **kwargs):
+    notes, _ = index.find("1", query, **kwargs)
+    return [note["id"] for note in notes]
+
+
+def _api(*notes):
+    """The notes plus /notes/resolve, /workspaces, /folders and moves into a folder"""
+    api = FakeApi(*notes)
+
+    def resolve(request):
+        reference = request.url.params["reference"].lower()
+        matches = [note for note in api.notes.values() if reference in note["heading"].lower()]
+        if not matches:
+            return httpx.Response(404, json={"success": False, "error": "Note not found"})
+        return {"success": True, "id": matches[0]["id"], "heading": matches[0]["heading"]}
+
+    folders = [{"id": 7, "name": "Infrastructure", "parent_id": None, "path": "Infrastructure"}]
+    api.routes.update({
+        ("GET", "/notes/resolve"): resolve,
+        ("GET", "/workspaces"): {"success": True, "workspaces": [{"name": "Poznote"}]},
+        ("GET", "/folders"): {"success": True, "folders": folders},
+        ("POST", "/notes/1/folder"): {"success": True},
+    })
+    return api
+
+
+def test_trigrams_are_padded_like_pg_trgm():
+    assert trigrams("cat") == {"  c", " ca", "cat", "at "}
+
+
+def test_case_punctuation_and_word_order_do_not_matter():
+    index = _index("Groceries", "Docker-compose Setup")
+
+    notes, _ = index.find("1", "setup docker compose")
+
+    assert notes[0]["id"] == 2
+    assert notes[0]["score"] == 1.0
+
+
+def test_typos_still_match():
+    index = _index("Kubernetes cluster", "Weekly groceries", "Réunion d'équipe")
+
+    assert _ids(index, "kubernets clustr") == [1]
+    assert _ids(index, "reunion equipe") == [3]
+
+
+def test_closest_title_ranks_first():
+    index = _index("Docker notes for the NAS and the homelab", "Docker notes")
+
+    assert _ids(index, "docker notes") == [2, 1]
+
+
+def test_common_words_alone_do_not_match_everything():
+    index = _index(*[f"Meeting notes {day}" for day in range(1, 40)], "Budget meeting")
+
+    assert _ids(index, "budget meeting")[0] == 40
+    assert _ids(index, "meeting notes 12")[0] == 12
+
+
+def test_workspace_filter_and_complete_lists():
+    index = TitleIndex()
+    index.add_notes("1", [_note(1, "Docker", "A"), _note(2, "Docker", "B")], complete=True)
+
+    # A complete list of workspace A drops its missing notes but keeps B's.
+    index.add_notes("1", [], workspace="A", complete=True)
+
+    assert _ids(index, "docker") == [2]
+    assert _ids(index, "docker", workspace="A") == []
+
+
+def test_unchanged_list_is_not_indexed_again():
+    index = TitleIndex()
+    index.add_notes("1", [_note(1, "Docker")], complete=True, version='W/"a"')
+    index.mark_stale("1")
+
+    index.add_notes("1", [_note(2, "Ignored")], complete=True, version='W/"a"')
+
+    assert _ids(index, "docker") == [1]
+    assert not index.stale("1")
+
+
+def test_cold_index_answers_nothing():
+    index = TitleIndex()
+    index.add_notes("1", [_note(1, "Docker")])
+
+    assert index.find("1", "docker") is None
+    assert index.stats()["cold_lookups"] == 1
+
+
+def test_folders_are_found_by_name():
+    index = _index("Docker")
+    index.add_folders("1", "Poznote", [{"id": 7, "name": "Infrastructure", "path": "Work/Infrastructure"}])
+
+    _, folders = index.find("1", "infrastructur")
+
+    assert [(folder["id"], folder["path"]) for folder in folders] == [(7, "Work/Infrastructure")]
+
+
+async def test_tool_resolves_through_the_api_until_titles_are_listed(make_client):
+    api = _api(_note(1, "Docker-compose Setup"), _note(2, "Groceries"))
+    client = make_client(api)
+
+    with patch("poznote_mcp.server._get_client_or_error", return_value=(client, None)):
+        cold = json.loads(await server.find_notes_by_title("Docker-compose"))
+        await asyncio.gather(*client.views._refresh_tasks)
+        warm = json.loads(await server.find_notes_by_title("docker compose setpu"))
+
+    assert cold["source"] == "api"
+    assert cold["notes"] == [{"id": 1, "title": "Docker-compose Setup"}]
+    assert warm["source"] == "index"
+    assert warm["notes"][0]["id"] == 1
+    assert warm["folders"] == []
+    assert sorted(api.fetched()) == ["/folders", "/notes", "/notes/resolve", "/workspaces"]
+    await client.aclose()
+
+
+async def test_writes_keep_titles_current_without_listing_again(make_client):
+    api = _api(_note(1, "Docker setup"), _note(2, "Groceries"))
+    client = make_client(api)
+    assert await client.views.refresh_titles()
+    api.requests.clear()
+
+    created = await client.create_note("Kubernetes cluster", "<p>nodes</p>")
+    await client.update_note(2, title="Weekly shopping")
+    await client.delete_note(1)
+    notes, _ = await client.views.find_titles("kubernetes")
+    renamed, _ = await client.views.find_titles("shopping")
+    deleted, _ = await client.views.find_titles("docker setup")
+
+    assert [note["id"] for note in notes] == [created["id"]]
+    assert [note["id"] for note in renamed] == [2]
+    assert deleted == []
+    assert api.fetched() == []
+    await client.aclose()
+
+
+async def test_other_writes_list_titles_again_in_the_background(make_client):
+    api = _api(_note(1, "Docker setup"))
+    client = make_client(api)
+    await client.views.refresh_titles()
+
+    await client.move_note_to_folder(1, 7)
+    assert client.views.title_index.stale("1")
+    await client.views.find_titles("docker")
+    await asyncio.gather(*client.views._refresh_tasks)
+
+    assert not client.views.title_index.stale("1")
+    await client.aclose()
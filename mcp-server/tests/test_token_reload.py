@@ -0,0 +1,128 @@
+"""Tests for picking up a rotated service token without rebuilding the client."""
+
+import os
+
+import httpx
+import pytest
+
+from conftest import BASE_URL
+from poznote_mcp import client as client_module
+from poznote_mcp.client import PoznoteClient
+
+
+def _rotate(path, token: str) -> None:
+    path.write_text(token + "\n")
+    # Make sure the mtime moves even on filesystems with coarse timestamps.
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def _handler(valid: dict, calls: list):
+    def handler(request):
+        calls.append(request.headers.get("Authorization"))
+        if request.headers.get("Authorization") != f"Bearer {valid['token']}":
+            return httpx.Response(401, json={"error": "Unauthorized"})
+        return httpx.Response(200, json={"success": True, "tags": ["t"]})
+
+    return handler
+
+
+@pytest.fixture
+def token_file(tmp_path):
+    path = tmp_path / ".mcp_token"
+    path.write_text("old-token\n")
+    return path
+
+
+@pytest.fixture
+def no_check_interval(monkeypatch):
+    monkeypatch.setattr(client_module, "TOKEN_CHECK_INTERVAL", 0)
+
+
+def _from_file(token_file) -> dict:
+    return {"service_token": None, "service_token_file": str(token_file), "metadata_ttls": {"tags": 0}}
+
+
+def test_changed_token_file_is_picked_up(make_client, token_file, no_check_interval):
+    valid, calls = {"token": "old-token"}, []
+    client = make_client(_handler(valid, calls), PoznoteClient, **_from_file(token_file))
+    pool = client.client
+
+    assert client.list_tags() == ["t"]
+    _rotate(token_file, "new-token")
+    valid["token"] = "new-token"
+    assert client.list_tags() == ["t"]
+
+    assert calls == ["Bearer old-token", "Bearer new-token"]
+    assert client.client is pool
+    assert client.client.headers["Authorization"] == "Bearer new-token"
+
+
+def test_mtime_is_checked_at_most_once_per_interval(token_file, monkeypatch):
+    client = PoznoteClient(base_url=BASE_URL, service_token_file=str(token_file))
+    stats = []
+    real_stat = os.stat
+    monkeypatch.setattr(client_module.os, "stat", lambda path: stats.append(path) or real_stat(path))
+
+    for _ in range(5):
+        assert client.refresh_service_token() is False
+
+    assert stats == []
+
+
+def test_unauthorized_is_retried_once_with_the_rotated_token(make_client, token_file):
+    valid, calls = {"token": "old-token"}, []
+    client = make_client(_handler(valid, calls), PoznoteClient, **_from_file(token_file))
+
+    # Rotated within the check interval: only the 401 reveals it.
+    _rotate(token_file, "new-token")
+    valid["token"] = "new-token"
+
+    assert client.list_tags() == ["t"]
+    assert calls == ["Bearer old-token", "Bearer new-token"]
+    assert client.breaker.stats()["consecutive_failures"] == 0
+
+
+def test_unauthorized_with_unchanged_token_is_not_retried(make_client, token_file):
+    valid, calls = {"token": "something-else"}, []
+    client = make_client(_handler(valid, calls), PoznoteClient, **_from_file(token_file))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        client.list_tags()
+
+    assert calls == ["Bearer old-token"]
+
+
+def test_explicit_token_is_never_reloaded(token_file, no_check_interval):
+    client = PoznoteClient(base_url=BASE_URL, service_token="explicit", service_token_file=str(token_file))
+    _rotate(token_file, "new-token")
+
+    assert client.refresh_service_token(force=True) is False
+    assert client.service_token == "explicit"
+
+
+def test_token_replaces_basic_auth(tmp_path, no_check_interval):
+    token_file = tmp_path / ".mcp_token"
+    client = PoznoteClient(base_url=BASE_URL, service_token_file=str(token_file), password="pw")
+    assert client.client.auth is not None
+
+    _rotate(token_file, "new-token")
+
+    assert client.refresh_service_token() is True
+    assert client.client.auth is None
+    assert client._headers_for_user(2)["Authorization"] == "Bearer new-token"
+
+
+async def test_async_client_keeps_its_caches_across_rotation(make_client, token_file):
+    valid, calls = {"token": "old-token"}, []
+    client = make_client(_handler(valid, calls), **_from_file(token_file))
+
+    await client.list_tags()
+    cached = client.http_cache.stats()["entries"]
+    _rotate(token_file, "new-token")
+    valid["token"] = "new-token"
+
+    assert await client.list_tags() == ["t"]
+    assert calls == ["Bearer old-token", "Bearer old-token", "Bearer new-token"]
+    assert client.http_cache.stats()["entries"] == cached == 1
+    await client.aclose()
@@ -0,0 +1,155 @@
+"""Tests for per-tool deadline budgets shared by every API call of a tool."""
+
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from poznote_mcp import deadline, server
+from poznote_mcp.deadline import DeadlineExceeded
+from poznote_mcp.resilience import RetryPolicy
+
+
+def _slow_api(latency: float, status_code: int = 200) -> tuple:
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        await asyncio.sleep(latency)
+        return httpx.Response(status_code, json={"success": True, "tags": ["t"], "folder": {"id": 1}})
+
+    return handler, calls
+
+
+@pytest.fixture
+def reset_tool_deadlines(monkeypatch):
+    monkeypatch.setattr(server, "_tool_deadlines", None)
+    monkeypatch.setattr(server, "_tool_deadline_overrides", {})
+
+
+def test_no_deadline_leaves_requests_alone():
+    kwargs = {"params": {"workspace": "A"}}
+
+    assert deadline.remaining() is None
+    assert deadline.bound_request(kwargs, 30.0) == (kwargs, False)
+
+
+def test_request_timeout_is_cut_to_the_remaining_budget():
+    with deadline.deadline(2):
+        kwargs, cut_short = deadline.bound_request({"timeout": 120.0}, 30.0)
+
+    assert cut_short is True
+    assert 0 < kwargs["timeout"] <= 2
+
+
+def test_nested_deadline_never_extends_the_outer_one():
+    with deadline.deadline(1):
+        with deadline.deadline(60):
+            assert deadline.remaining() <= 1
+
+
+def test_spent_budget_raises():
+    with deadline.deadline(0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceeded):
+            deadline.bound_request({}, 30.0)
+
+
+async def test_sequential_calls_share_one_budget(make_client):
+    handler, calls = _slow_api(latency=0.2)
+    client = make_client(handler)
+
+    start = time.perf_counter()
+    with deadline.deadline(0.3):
+        await client.list_tags()
+        with pytest.raises(DeadlineExceeded):
+            await client.list_folders()
+
+    assert time.perf_counter() - start < 0.45
+    assert len(calls) == 2
+    # Running out of budget says nothing about the API's health.
+    assert client.breaker.stats()["consecutive_failures"] == 0
+    await client.aclose()
+
+
+async def test_retry_is_skipped_when_the_backoff_does_not_fit(make_client):
+    handler, calls = _slow_api(latency=0, status_code=503)
+    client = make_client(handler)
+    policy = client.retry_policies["read"] = RetryPolicy(attempts=3, retry_statuses={503})
+    policy.backoff = lambda attempt: 5.0
+
+    with deadline.deadline(1):
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.list_tags()
+
+    assert len(calls) == 1
+    await client.aclose()
+
+
+async def test_coalesced_caller_keeps_its_own_deadline(make_client):
+    handler, calls = _slow_api(latency=0.3)
+    client = make_client(handler)
+
+    async def impatient():
+        with deadline.deadline(0.05):
+            return await client.list_tags()
+
+    leader = asyncio.ensure_future(client.list_tags())
+    await asyncio.sleep(0)
+    with pytest.raises(DeadlineExceeded):
+        await impatient()
+
+    assert await leader == ["t"]
+    assert len(calls) == 1
+    await client.aclose()
+
+
+def test_tool_deadlines_resolution(monkeypatch, reset_tool_deadlines):
+    monkeypatch.setenv("POZNOTE_TOOL_DEADLINE", "12")
+    monkeypatch.setenv("POZNOTE_TOOL_DEADLINES", "create_note=20, bogus, git_push=-1")
+    server._tool_deadline_overrides["update_note"] = 8
+
+    assert server._tool_deadline("list_notes") == 12
+    assert server._tool_deadline("create_note") == 20
+    assert server._tool_deadline("update_note") == 8
+    assert server._tool_deadline("git_push") == server.HEAVY_TIMEOUT
+
+
+def test_tool_deadline_flag_is_repeatable():
+    args = server.create_parser().parse_args(
+        ["serve", "--tool-deadline", "create_note=20", "--tool-deadline", "git_pull=300"]
+    )
+
+    assert server._parse_tool_deadlines(args.tool_deadline, "--tool-deadline") == {
+        "create_note": 20.0,
+        "git_pull": 300.0,
+    }
+
+
+async def test_tool_calls_run_under_their_budget(monkeypatch, reset_tool_deadlines):
+    from fastmcp import Client
+
+    monkeypatch.setenv("POZNOTE_TOOL_DEADLINES", "list_tags=7")
+    seen = {}
+
+    async def list_tags(user_id=None):
+        seen["remaining"] = deadline.remaining()
+        return ["t"]
+
+    client = AsyncMock()
+    client.list_tags.side_effect = list_tags
+    with patch("poznote_mcp.server.get_client", return_value=client):
+        async with Client(server.mcp) as mcp_client:
+            await mcp_client.call_tool("list_tags", {})
+
+    assert 6 < seen["remaining"] <= 7
+
+
+def test_deadline_error_is_reported_as_json():
+    result = json.loads(server._api_error_json(DeadlineExceeded(30)))
+
+    assert "ran out of time" in result["error"]
+    assert "30s" in result["detail"]
@@ -0,0 +1,90 @@
+"""Tests for reaching the Poznote API over a Unix domain socket."""
+
+import json
+import os
+import socketserver
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler
+from unittest.mock import patch
+
+import pytest
+
+from poznote_mcp.client import AsyncPoznoteClient, PoznoteClient
+
+
+class _TagsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps({"success": True, "tags": ["via-socket"]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        return "unix"
+
+    def log_message(self, *args):
+        pass
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def socket_path():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "nginx.sock")
+        server = _UnixHTTPServer(path, _TagsHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield path
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+@pytest.mark.parametrize("prefix", ["unix:", ""])
+def test_socket_path_accepts_unix_prefix(monkeypatch, prefix):
+    monkeypatch.setenv("POZNOTE_API_SOCKET", f"{prefix}/run/poznote/nginx.sock")
+
+    client = PoznoteClient(base_url="http://localhost/api/v1", service_token="secret-token")
+    try:
+        assert client.api_socket == "/run/poznote/nginx.sock"
+    finally:
+        client.close()
+
+
+def test_tcp_is_used_without_socket(monkeypatch):
+    monkeypatch.delenv("POZNOTE_API_SOCKET", raising=False)
+
+    with patch("poznote_mcp.client.httpx.HTTPTransport") as mock_transport_cls:
+        PoznoteClient(base_url="http://localhost/api/v1", service_token="secret-token")
+
+    _, kwargs = mock_transport_cls.call_args
+    assert kwargs["uds"] is None
+
+
+def test_sync_client_talks_over_unix_socket(socket_path):
+    client = PoznoteClient(
+        base_url="http://localhost/api/v1", service_token="secret-token", api_socket=f"unix:{socket_path}",
+    )
+    try:
+        assert client.list_tags() == ["via-socket"]
+    finally:
+        client.close()
+
+
+async def test_async_client_talks_over_unix_socket(socket_path):
+    client = AsyncPoznoteClient(
+        base_url="http://localhost/api/v1", service_token="secret-token", api_socket=socket_path,
+    )
+    try:
+        assert await client.list_tags() == ["via-socket"]
+    finally:
+        await client.aclose()
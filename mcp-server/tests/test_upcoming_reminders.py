@@ -0,0 +1,178 @@
+"""Tests for the recurrence expansion behind upcoming_reminders."""
+
+import asyncio
+import json
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from conftest import FakeApi
+from poznote_mcp import server
+from poznote_mcp.reminders import NoteReminders, Reminder, available, upcoming, window
+
+needs_numpy = pytest.mark.skipif(not available(), reason="NumPy is not installed")
+
+
+def _utc(value: str) -> int:
+    return int(datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp())
+
+
+def _times(reminders, from_date="2024-01-01", days=800, tz_name=None, limit=100):
+    start, end = window(from_date, days, tz_name)
+    return [occurrence["at"] for occurrence in upcoming(reminders, start, end, tz_name, limit)["occurrences"]]
+
+
+@needs_numpy
+def test_fixed_steps_start_at_the_first_occurrence_in_the_window():
+    daily = Reminder("note", 1, _utc("2026-02-20 07:30"), "1d", "Standup")
+    half_hourly = Reminder("note", 2, _utc("2026-03-01 23:00"), "30i", "Stretch")
+    once = Reminder("note", 3, _utc("2026-03-02 12:00"), None, "Dentist")
+    gone = Reminder("note", 4, _utc("2026-02-01 12:00"), None, "Past")
+
+    start, end = window("2026-03-02", 1, None)
+    result = upcoming([daily, half_hourly, once, gone], start, end, None, limit=3)
+
+    assert result["total"] == 1 + 48 + 1
+    assert [(o["at"], o["title"]) for o in result["occurrences"]] == [
+        ("2026-03-02T00:00+00:00", "Stretch"),
+        ("2026-03-02T00:30+00:00", "Stretch"),
+        ("2026-03-02T01:00+00:00", "Stretch"),
+    ]
+    assert _times([daily], "2026-03-02", 2) == ["2026-03-02T07:30+00:00", "2026-03-03T07:30+00:00"]
+
+
+@needs_numpy
+def test_calendar_steps_run_over_short_months_like_datetime_modify():
+    # Jan 31 + 1 month is "Feb 31", March 2nd in 2024; later months keep the 2nd.
+    monthly = Reminder("note", 1, _utc("2024-01-31 10:00"), "1m")
+    yearly = Reminder("note", 2, _utc("2024-02-29 08:00"), "1y")
+    quarterly = Reminder("note", 3, _utc("2024-01-15 09:00"), "3m")
+
+    assert _times([monthly], limit=4) == [
+        "2024-01-31T10:00+00:00", "2024-03-02T10:00+00:00", "2024-04-02T10:00+00:00", "2024-05-02T10:00+00:00",
+    ]
+    assert _times([yearly]) == ["2024-02-29T08:00+00:00", "2025-03-01T08:00+00:00", "2026-03-01T08:00+00:00"]
+    assert _times([quarterly], "2024-03-01", 200) == ["2024-04-15T09:00+00:00", "2024-07-15T09:00+00:00"]
+
+
+@needs_numpy
+def test_windows_and_times_follow_the_user_timezone():
+    # Europe/Paris moves to summer time on 2026-03-29: the window starts at
+    # local midnight, and a weekly reminder stepped in UTC shows an hour later.
+    weekly = Reminder("note", 1, _utc("2026-03-20 10:00"), "1w")
+    start, end = window("2026-03-20", 14, "Europe/Paris")
+
+    assert (start, end) == (_utc("2026-03-19 23:00"), _utc("2026-04-02 22:00"))
+    assert _times([weekly], "2026-03-20", 14, "Europe/Paris") == ["2026-03-20T11:00+01:00", "2026-03-27T11:00+01:00"]
+    assert _times([weekly], "2026-03-28", 7, "Europe/Paris") == ["2026-04-03T12:00+02:00"]
+    with pytest.raises(ValueError):
+        window("next week", 7, None)
+
+
+def test_note_reminders_read_a_recurrence_again_only_when_the_time_changes():
+    reminders = NoteReminders()
+    reminders.add("1", {"id": 5, "heading": "Rent", "workspace": "Home", "reminder_at": "2026-03-01 09:00:00"})
+    reminders.add("1", {"id": 6, "heading": "No reminder", "workspace": "Home", "reminder_at": None})
+    assert reminders.unknown("1") == [5]
+
+    reminders.set_reminder("1", 5, {"reminder_at": "2026-03-01 09:00:00", "recurrence": "1m"})
+    reminders.add("1", {"id": 5, "heading": "Pay rent", "workspace": "Home", "reminder_at": "2026-03-01 09:00:00"})
+    assert reminders.unknown("1") == []
+    [rent] = reminders.reminders("1")
+    assert (rent.title, rent.recurrence, rent.at) == ("Pay rent", "1m", _utc("2026-03-01 09:00"))
+
+    reminders.add("1", {"id": 5, "heading": "Pay rent", "workspace": "Home", "reminder_at": "2026-04-01 09:00:00"})
+    assert reminders.unknown("1") == [5]
+    reminders.set_reminder("1", 5, None)
+    assert reminders.reminders("1") == []
+
+
+@needs_numpy
+async def test_tool_lists_note_and_task_occurrences_once_the_notes_are_read(make_client):
+    task = {"id": "a", "text": "Call bank", "completed": False, "important": False, "dueAt": "2026-03-04", "dueReminder": True}
+    errands = {"id": 3, "heading": "Errands", "folder": "", "folder_id": None, "workspace": "Home", "tasks": [task]}
+    api = FakeApi(
+        {"id": 1, "heading": "Pay rent", "workspace": "Home", "updated": "2026-02-01 10:00:00", "reminder_at": "2026-02-28 08:00:00"},
+        {"id": 2, "heading": "Ideas", "workspace": "Home", "updated": "2026-02-01 10:00:00", "reminder_at": None},
+        routes={
+            ("GET", "/notes/1/reminder"): {"success": True, "note_id": 1, "reminder_at": "2026-02-28 08:00:00",
+                                           "email_enabled": False, "recurrence": "1w"},
+            ("GET", "/tasks"): {"success": True, "notes": [errands], "checklists": []},
+        },
+    )
+    client = make_client(api)
+
+    with patch("poznote_mcp.server._get_client_or_error", return_value=(client, None)):
+        pending = json.loads(await server.upcoming_reminders(from_date="2026-03-01", days=14))
+        await asyncio.gather(*client.views._refresh_tasks)
+        week = json.loads(await server.upcoming_reminders(from_date="2026-03-01", days=14))
+        notes = json.loads(await server.upcoming_reminders(from_date="2026-03-01", days=14, kind="note", limit=1))
+        bad = json.loads(await server.upcoming_reminders(from_date="March", days=14))
+
+    assert "try again" in pending["error"]
+    assert week["timezone"] == "Europe/Paris"
+    assert [(o["at"], o["kind"], o["title"]) for o in week["occurrences"]] == [
+        ("2026-03-04T09:00+01:00", "task", "Errands"),
+        ("2026-03-07T09:00+01:00", "note", "Pay rent"),
+        ("2026-03-14T09:00+01:00", "note", "Pay rent"),
+    ]
+    assert week["occurrences"][0]["text"] == "Call bank"
+    assert (notes["total"], notes["count"]) == (2, 1)
+    assert api.calls().count(("GET", "/notes/1/reminder")) == 1
+    assert "YYYY-MM-DD" in bad["error"]
+    await client.aclose()
+
+
+class _SlowReminders(FakeApi):
+    """Notes with a reminder each, counting how many reminder reads overlap"""
+
+    def __init__(self, count: int):
+        super().__init__(*(
+            {"id": note_id, "heading": f"Note {note_id}", "workspace": "Home", "updated": "2026-02-01 10:00:00",
+             "reminder_at": "2026-03-02 08:00:00"}
+            for note_id in range(1, count + 1)
+        ))
+        for note_id in self.notes:
+            self.routes[("GET", f"/notes/{note_id}/reminder")] = {
+                "success": True, "note_id": note_id, "reminder_at": "2026-03-02 08:00:00", "recurrence": "1d",
+            }
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handle_async(self, request):
+        if not request.url.path.endswith("/reminder"):
+            return self(request)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.001)
+            return self(request)
+        finally:
+            self.in_flight -= 1
+
+
+@needs_numpy
+async def test_reminders_are_read_a_few_at_a_time(make_client):
+    api = _SlowReminders(40)
+    client = make_client(api)
+    client.views.note_sync.concurrency = 4
+    assert await client.views.build_note_reminders()
+
+    found = await client.views.upcoming_reminders(from_date="2026-03-01", days=7, kind="note")
+
+    assert api.calls().count(("GET", "/notes/40/reminder")) == 1
+    assert 1 < api.max_in_flight <= 4
+    assert found["total"] == 40 * 6
+    await client.aclose()
+
+
+async def test_tool_explains_when_numpy_is_missing():
+    client = MagicMock(**{"views.note_reminders": None})
+
+    with patch("poznote_mcp.server._get_client_or_error", return_value=(client, None)):
+        missing = json.loads(await server.upcoming_reminders())
+        too_long = json.loads(await server.upcoming_reminders(days=400))
+
+    assert "pip install" in missing["error"]
+    assert "366" in too_long["error"]
@@ -1,16 +1,15 @@
 import json
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
 
 from poznote_mcp.client import PoznoteClient
 
 
 def _mock_response(payload):
-    response = MagicMock()
-    response.raise_for_status.return_value = None
-    response.json.return_value = payload
-    return response
+    request = httpx.Request("GET", "http://example.test/api/v1")
+    return httpx.Response(200, json=payload, request=request)
 
 
 def test_headers_for_user_overrides_default_user_and_preserves_auth():
@@ -98,16 +97,16 @@ def test_client_methods_send_x_user_id_header(
     ],
 )
 @patch("poznote_mcp.server._get_client_or_error")
-def test_tool_handlers_forward_user_id(mock_gcoe, tool_name, call_kwargs, client_method):
+async def test_tool_handlers_forward_user_id(mock_gcoe, tool_name, call_kwargs, client_method):
     import poznote_mcp.server as srv
 
-    client = MagicMock()
+    client = AsyncMock()
     client.list_notes.return_value = []
     client.create_note.return_value = {"id": 1}
     client.create_folder.return_value = {"id": 1}
     mock_gcoe.return_value = (client, None)
 
-    result = json.loads(getattr(srv, tool_name)(**call_kwargs))
+    result = json.loads(await getattr(srv, tool_name)(**call_kwargs))
 
     assert result.get("error") is None
     _, kwargs = getattr(client, client_method).call_args
@@ -0,0 +1,216 @@
+"""Tests for the webhook receiver that drops cached data on Poznote events."""
+
+import hashlib
+import hmac
+import json
+import uuid
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+from conftest import FakeApi
+from poznote_mcp import server
+from poznote_mcp.metacache import MISS
+from poznote_mcp.notecache import NoteCache
+from poznote_mcp.webhooks import SIGNATURE_HEADER, WebhookReceiver, sign, user_secret, verify_signature
+
+SECRET = "s3cret"
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client(FakeApi({"id": 42, "version": "v1"}, routes={
+        ("GET", "/tags"): {"success": True, "tags": ["a"]},
+        ("GET", "/shared"): {"success": True, "shared_notes": [], "shared_folders": []},
+    }))
+
+
+@pytest.fixture
+def receiver(monkeypatch):
+    """Enable the receiver and post to it the way Poznote would (the local stand-in)"""
+    monkeypatch.setenv("POZNOTE_WEBHOOK_SECRET", SECRET)
+    monkeypatch.setattr(server, "_webhook_receiver", None)
+    monkeypatch.setattr(server, "_webhook_secret_file", None)
+
+
+async def _post(event: str, data: dict, *, user_id=None, delivery_id=None, secret=SECRET, body=None, signed_for=None):
+    """Post a delivery signed like Poznote would: with the secret of the account's user webhook, if any"""
+    payload = {"event": event, "delivery_id": delivery_id or uuid.uuid4().hex, "created_at": "", "data": data}
+    body = body if body is not None else json.dumps(payload).encode()
+    signed_for = signed_for if signed_for is not None else user_id
+    if signed_for:
+        secret = user_secret(secret, signed_for)
+    transport = httpx.ASGITransport(app=server.mcp.http_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://mcp.test") as mcp:
+        return await mcp.post(
+            "/webhooks/poznote",
+            content=body,
+            params={"user_id": user_id} if user_id is not None else None,
+            headers={"Content-Type": "application/json", SIGNATURE_HEADER: sign(body, secret)},
+        )
+
+
+def test_signature_matches_the_documented_scheme():
+    body = b'{"event":"ping"}'
+    expected = "sha256=" + hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+    assert sign(body, SECRET) == expected
+    assert verify_signature(body, expected, SECRET)
+    assert not verify_signature(body + b" ", expected, SECRET)
+    assert not verify_signature(body, None, SECRET)
+
+
+async def test_reminder_event_drops_the_users_cached_note(client, receiver):
+    await client.get_note(42, user_id=7)
+    await client.get_note(42, user_id=8)
+
+    with patch("poznote_mcp.server.get_client", return_value=client):
+        response = await _post("reminder.due", {"note": {"id": 42}, "reminder": {"id": 1}}, user_id=7)
+
+    assert response.status_code == 200
+    assert response.json()["invalidated"] == {"user_id": "7", "note_id": 42, "lists": []}
+    assert client.note_cache.get(NoteCache.key("7", None, 42)) is None
+    assert client.note_cache.get(NoteCache.key("8", None, 42)) is not None
+    await client.aclose()
+
+
+async def test_note_events_drop_the_lists_they_change(client, receiver):
+    await client.list_tags()
+    await client.list_shared()
+
+    with patch("poznote_mcp.server.get_client", return_value=client):
+        await _post("note.shared", {"note": {"id": 42}, "share": {}}, user_id=1)
+
+    assert client.metadata_cache.lookup(client._metadata_key("shared", None, None))[1] == MISS
+    assert client.metadata_cache.lookup(client._metadata_key("tags", None, None))[1] != MISS
+
+    with patch("poznote_mcp.server.get_client", return_value=client):
+        await _post("note.created", {"note": {"id": 43}}, user_id=1)
+
+    assert client.metadata_cache.lookup(client._metadata_key("tags", None, None))[1] == MISS
+    await client.aclose()
+
+
+async def test_instance_event_targets_the_user_in_the_payload(client, receiver):
+    await client.get_note(42, user_id=7)
+    await client.list_tags(user_id=7)
+
+    with patch("poznote_mcp.server.get_client", return_value=client):
+        response = await _post("user.deactivated", {"user": {"id": 7, "username": "nina"}})
+
+    assert response.json()["invalidated"] == {"user_id": "7", "everything": True}
+    assert client.note_cache.stats()["entries"] == 0
+    assert client.metadata_cache.stats()["entries"] == 0
+    await client.aclose()
+
+
+async def test_duplicate_delivery_is_applied_once(client, receiver):
+    with patch("poznote_mcp.server.get_client", return_value=client):
+        first = await _post("note.shared", {"note": {"id": 42}}, user_id=1, delivery_id="abc")
+        await client.get_note(42)
+        second = await _post("note.shared", {"note": {"id": 42}}, user_id=1, delivery_id="abc")
+
+    assert "duplicate" not in first.json()
+    assert second.json() == {"success": True, "duplicate": True}
+    assert client.note_cache.get(NoteCache.key("1", None, 42)) is not None
+    assert server._get_webhook_receiver().stats()["duplicates"] == 1
+    await client.aclose()
+
+
+async def test_bad_signature_is_rejected(client, receiver):
+    await client.get_note(42)
+
+    with patch("poznote_mcp.server.get_client", return_value=client):
+        response = await _post("note.shared", {"note": {"id": 42}}, user_id=1, secret="wrong")
+
+    assert response.status_code == 401
+    assert client.note_cache.get(NoteCache.key("1", None, 42)) is not None
+    await client.aclose()
+
+
+async def test_delivery_replayed_for_another_user_is_rejected(client, receiver):
+    await client.get_note(42, user_id=8)
+
+    with patch("poznote_mcp.server.get_client", return_value=client):
+        replayed = await _post("reminder.due", {"note": {"id": 42}}, user_id=8, signed_for=7)
+        admin_signed = await _post("reminder.due", {"note": {"id": 42}}, user_id=8, signed_for="")
+
+    assert (replayed.status_code, admin_signed.status_code) == (401, 401)
+    assert client.note_cache.get(NoteCache.key("8", None, 42)) is not None
+    await client.aclose()
+
+
+async def test_delivery_naming_no_user_is_rejected(client, receiver):
+    await client.get_note(42)
+
+    with patch("poznote_mcp.server.get_client", return_value=client):
+        response = await _post("note.shared", {"note": {"id": 42}})
+
+    assert response.status_code == 400
+    assert client.note_cache.get(NoteCache.key("1", None, 42)) is not None
+    await client.aclose()
+
+
+def test_failed_delivery_is_applied_again_when_retried():
+    receiver = WebhookReceiver(SECRET)
+    client = MagicMock()
+    client.invalidate_cached.side_effect = [RuntimeError("boom"), None]
+    body = json.dumps({"event": "reminder.due", "delivery_id": "abc", "data": {"note": {"id": 42}}}).encode()
+    headers = {SIGNATURE_HEADER: sign(body, user_secret(SECRET, "7"))}
+
+    with pytest.raises(RuntimeError):
+        receiver.handle(client, body, headers, "7")
+    status, answer = receiver.handle(client, body, headers, "7")
+
+    assert (status, answer["invalidated"]["note_id"]) == (200, 42)
+    assert receiver.stats()["duplicates"] == 0
+    assert receiver.handle(client, body, headers, "7")[1] == {"success": True, "duplicate": True}
+
+
+async def test_invalid_json_is_rejected(client, receiver):
+    with patch("poznote_mcp.server.get_client", return_value=client):
+        response = await _post("note.shared", {}, body=b"not json")
+
+    assert response.status_code == 400
+    await client.aclose()
+
+
+async def test_ping_changes_nothing(client, receiver):
+    with patch("poznote_mcp.server.get_client", return_value=client):
+        response = await _post("ping", {"message": "Poznote webhook test"})
+
+    assert response.json() == {"success": True, "event": "ping", "invalidated": None}
+    await client.aclose()
+
+
+async def test_disabled_without_a_secret(monkeypatch):
+    monkeypatch.delenv("POZNOTE_WEBHOOK_SECRET", raising=False)
+    monkeypatch.delenv("POZNOTE_WEBHOOK_SECRET_FILE", raising=False)
+    monkeypatch.setattr(server, "_webhook_receiver", None)
+    monkeypatch.setattr(server, "_webhook_secret_file", None)
+
+    response = await _post("ping", {})
+
+    assert response.status_code == 404
+
+
+def test_secret_file_wins_over_the_environment(tmp_path, monkeypatch):
+    secret_file = tmp_path / "webhook_secret"
+    secret_file.write_text("from-file\n")
+    monkeypatch.setenv("POZNOTE_WEBHOOK_SECRET", "from-env")
+    monkeypatch.setattr(server, "_webhook_receiver", None)
+    monkeypatch.setattr(server, "_webhook_secret_file", str(secret_file))
+
+    assert server._get_webhook_receiver().secret == "from-file"
+
+
+def test_delivery_log_is_bounded():
+    receiver = WebhookReceiver(SECRET, max_deliveries=2)
+
+    for delivery_id in ("a", "b", "c"):
+        assert receiver._seen(delivery_id) is False
+        receiver._remember(delivery_id)
+
+    assert receiver._seen("a") is False
+    assert receiver._seen("c") is True
+    assert receiver.stats()["deliveries_remembered"] == 2
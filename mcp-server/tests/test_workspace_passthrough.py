@@ -1,13 +1,13 @@
 from unittest.mock import MagicMock, patch
 
+import httpx
+
 from poznote_mcp.client import PoznoteClient
 
 
 def _mock_response(payload):
-    response = MagicMock()
-    response.raise_for_status.return_value = None
-    response.json.return_value = payload
-    return response
+    request = httpx.Request("GET", "http://example.test/api/v1")
+    return httpx.Response(200, json=payload, request=request)
 
 
 @patch("poznote_mcp.client.httpx.Client")
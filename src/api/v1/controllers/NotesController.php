@@ -386,6 +386,8 @@ class NotesController {
      *   - search: Search query to filter notes by heading or content
      *   - created_from: Filter notes created on or after this date (YYYY-MM-DD)
      *   - created_to: Filter notes created on or before this date (YYYY-MM-DD)
+     *   - limit: Return at most this many notes
+     *   - after: Return the notes that come after this note id in the same order
      */
     public function index(): void {
         $workspace = $_GET['workspace'] ?? null;
@@ -399,8 +401,20 @@ class NotesController {
         $createdToRaw = trim((string)($_GET['created_to'] ?? ''));
         $createdFrom = normalizeDateOnlyFilter($createdFromRaw);
         $createdTo = normalizeDateOnlyFilter($createdToRaw);
+        $limitRaw = trim((string)($_GET['limit'] ?? ''));
+        $afterRaw = trim((string)($_GET['after'] ?? ''));
         
         try {
+            if ($limitRaw !== '' && (!ctype_digit($limitRaw) || (int)$limitRaw < 1)) {
+                $this->sendError(400, 'limit must be a positive integer');
+                return;
+            }
+
+            if ($afterRaw !== '' && !ctype_digit($afterRaw)) {
+                $this->sendError(400, 'after must be a note id');
+                return;
+            }
+
             if ($createdFromRaw !== '' && $createdFrom === '') {
                 $this->sendError(400, 'created_from must use YYYY-MM-DD format');
                 return;
@@ -492,31 +506,56 @@ class NotesController {
             
             $folder_null_case = $notes_without_folders_after ? '1' : '0';
             $folder_case = $notes_without_folders_after ? '0' : '1';
+            // Text, like the bound parameters `after` compares it with.
+            $folder_group = "CASE WHEN folder_id IS NULL THEN '$folder_null_case' ELSE '$folder_case' END";
             
+            // Sort keys of each order, as [expression, direction]. The note id
+            // comes last so that the order is total and `after` can seek in it.
             $allowed = [
-                'updated_desc' => "CASE WHEN folder_id IS NULL THEN $folder_null_case ELSE $folder_case END, folder, updated DESC",
-                'created_desc' => "CASE WHEN folder_id IS NULL THEN $folder_null_case ELSE $folder_case END, folder, created DESC",
-                'heading_asc'  => 'folder, heading COLLATE NOCASE ASC'
+                'updated_desc' => [[$folder_group, 'ASC'], ["COALESCE(folder, '')", 'ASC'], ["COALESCE(updated, '')", 'DESC']],
+                'created_desc' => [[$folder_group, 'ASC'], ["COALESCE(folder, '')", 'ASC'], ["COALESCE(created, '')", 'DESC']],
+                'heading_asc'  => [["COALESCE(folder, '')", 'ASC'], ['heading COLLATE NOCASE', 'ASC']]
             ];
             
-            $order_by = $allowed['updated_desc'];
+            $sort_keys = $allowed['updated_desc'];
             
             if ($sort && isset($allowed[$sort])) {
-                $order_by = $allowed[$sort];
+                $sort_keys = $allowed[$sort];
             } else if (!$sort) {
                 try {
                     $stmtPref = $this->con->prepare('SELECT value FROM settings WHERE key = ?');
                     $stmtPref->execute(['note_list_sort']);
                     $pref = $stmtPref->fetchColumn();
                     if ($pref && isset($allowed[$pref])) {
-                        $order_by = $allowed[$pref];
+                        $sort_keys = $allowed[$pref];
                     }
                 } catch (Exception $e) {
                     // ignore
                 }
             }
+            $sort_keys[] = ['id', 'ASC'];
             
-            $sql .= " ORDER BY " . $order_by;
+            if ($afterRaw !== '') {
+                // Seek past the given note by its sort keys: only the notes
+                // after it are rendered and sent, wherever it is in the list.
+                $columns = [];
+                foreach ($sort_keys as $index => $key) {
+                    $columns[] = $key[0] . " AS k$index";
+                }
+                $stmtAfter = $this->con->prepare('SELECT ' . implode(', ', $columns) . ' FROM entries WHERE id = ? AND trash = 0');
+                $stmtAfter->execute([(int)$afterRaw]);
+                $anchor = $stmtAfter->fetch(PDO::FETCH_NUM);
+                if ($anchor === false) {
+                    $this->sendError(404, 'The note to list after was not found');
+                    return;
+                }
+                $sql .= ' AND ' . $this->seekCondition($sort_keys, $anchor, $params);
+            }
+            
+            $sql .= " ORDER BY " . implode(', ', array_map(fn($key) => "$key[0] $key[1]", $sort_keys));
+            if ($limitRaw !== '') {
+                $sql .= ' LIMIT ' . (int)$limitRaw;
+            }
             
             $stmt = $this->con->prepare($sql);
             $stmt->execute($params);
@@ -537,6 +576,30 @@ class NotesController {
         }
     }
     
+    /**
+     * SQL condition for the rows that come after $values in the order of
+     * $keys ([expression, direction] pairs): greater on the first key, or
+     * equal on it and after on the next ones. Appends its parameters.
+     */
+    private function seekCondition(array $keys, array $values, array &$params): string {
+        $condition = '';
+        $condition_params = [];
+        for ($index = count($keys) - 1; $index >= 0; $index--) {
+            [$expression, $direction] = $keys[$index];
+            $operator = $direction === 'DESC' ? '<' : '>';
+            $value = $values[$index];
+            if ($condition === '') {
+                $condition = "$expression $operator ?";
+                $condition_params = [$value];
+            } else {
+                $condition = "($expression $operator ? OR ($expression = ? AND $condition))";
+                $condition_params = array_merge([$value, $value], $condition_params);
+            }
+        }
+        array_push($params, ...$condition_params);
+        return $condition;
+    }
+    
     /**
      * Helper to list folders (used when get_folders param is set)
      */
@@ -1005,5 +1005,54 @@ $router->post('/public/notes/lock/release', function($params) use ($publicContro
     $publicController->releaseEditLock();
 });
 
+/**
+ * Send a buffered read with a weak ETag over its body, or an empty 304 when
+ * the client's If-None-Match already names that body. Controllers that set
+ * their own ETag (notes send their version token) keep it; the body tag is
+ * still honored for them.
+ */
+function sendConditionalRead(string $body): void {
+    if (http_response_code() !== 200) {
+        echo $body;
+        return;
+    }
+
+    $bodyEtag = 'W/"' . md5($body) . '"';
+    $hasEtag = false;
+    foreach (headers_list() as $header) {
+        if (stripos($header, 'ETag:') === 0) {
+            $hasEtag = true;
+            break;
+        }
+    }
+    if (!$hasEtag) {
+        header('ETag: ' . $bodyEtag);
+    }
+
+    $ifNoneMatch = trim((string)($_SERVER['HTTP_IF_NONE_MATCH'] ?? ''));
+    if ($ifNoneMatch !== '' && in_array($bodyEtag, array_map('trim', explode(',', $ifNoneMatch)), true)) {
+        http_response_code(304);
+        header_remove('Content-Type');
+        return;
+    }
+
+    echo $body;
+}
+
+// Reads that API clients (the MCP server) re-fetch often can be revalidated
+// with If-None-Match instead of transferring the same body again. The note
+// listing is left out: hashing it would hold the whole list back until it is
+// rendered, while clients stop reading it after the first page.
+$isConditionalRead = $_SERVER['REQUEST_METHOD'] === 'GET'
+    && preg_match('#/api/v1/(notes/\d+|folders|tags|workspaces|trash)$#', $uri);
+
+if ($isConditionalRead) {
+    ob_start();
+}
+
 // Dispatch the request
 $router->dispatch();
+
+if ($isConditionalRead) {
+    sendConditionalRead((string)ob_get_clean());
+}